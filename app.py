@@ -1,135 +1,274 @@
+import startup
 import sys
 import os
 import threading
-import sqlite3
 import webbrowser
-from flask import Flask, request, jsonify
+
+# Per-module import times for the startup report (python app.py --startup-report)
+if startup.requested():
+    startup.record_imports()
+
+from flask import Flask, Request, Response, request, jsonify
 from flask_cors import CORS
+import compression
+import leads
+import metrics
+import paths
+import profiling
+import serve
+import storage
+
+# Production server mode: the server imports this module in each worker (serve.py)
+if __name__ == "__main__" and "--serve" in sys.argv[1:]:
+    sys.exit(serve.main(sys.argv[1:]))
 
 app = Flask(__name__)
 CORS(app)
 
-# Import modular blueprints (NEW - replaces monolithic scraper.py)
-try:
-    from scraper_core import scraper_core_bp
-    app.register_blueprint(scraper_core_bp)
-    print("✓ Core scraping module loaded (contacts, WHOIS, tech, sitemap, metadata)")
-except ImportError as e:
-    print(f"Warning: scraper_core.py not found: {e}")
-
-try:
-    from scraper_osint import scraper_osint_bp
-    app.register_blueprint(scraper_osint_bp)
-    print("✓ OSINT module loaded (dorking, GitHub, RSS)")
-except ImportError as e:
-    print(f"Warning: scraper_osint.py not found: {e}")
-
-# Import remaining endpoints from original scraper.py
-try:
-    from scraper import scraper_bp
-    app.register_blueprint(scraper_bp)
-    print("✓ Additional endpoints loaded (growth, profile, jobs, business, health)")
-except ImportError as e:
-    print(f"Warning: scraper.py not found: {e}")
-
-# ------------------ PATH FIXES ------------------
-def get_resource_path(relative_path):
-    """ Get absolute path to resource (index.html inside the exe) """
-    try:
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.dirname(os.path.abspath(__file__))
-    return os.path.join(base_path, relative_path)
-
-def get_db_path():
-    """ 
-    CLEAN FIX: 
-    Store the database in the user's hidden AppData folder.
-    This keeps the EXE folder clean, but data persists.
-    Location: C:/Users/NAME/AppData/Roaming/LeadDork/database.db
-    """
-    # 1. Get the AppData folder
-    app_data = os.getenv('APPDATA')
-    
-    # 2. Create a specific folder for your app
-    app_folder = os.path.join(app_data, 'LeadDork')
-    
-    # 3. If it doesn't exist, create it
-    if not os.path.exists(app_folder):
-        os.makedirs(app_folder)
-    
-    # 4. Return the full path to the db
-    return os.path.join(app_folder, "database.db")
-
-INDEX_PATH = get_resource_path("index.html")
-DB_PATH = get_db_path()
+# gzip / brotli for JSON responses (runs after every other after_request hook)
+compression.init_app(app)
+
+# Endpoint latency histograms (served on /metrics)
+metrics.init_app(app)
+
+# Opt-in cProfile per request (?profile=1 or X-Profile: 1; listed on /api/profiles)
+profiling.configure(enabled=os.getenv("LEADGEN_PROFILING") == "1")
+profiling.init_app(app)
+
+# Every successful enrichment result is stored server-side (leads.py)
+app.after_request(leads.record_response)
+
+# ------------------ PATHS ------------------
+# index.html ships next to this file (inside the exe); data lives in the
+# per-user data folder (paths.py): %APPDATA%/LeadDork on Windows
+INDEX_PATH = paths.resource_path("index.html")
+DB_PATH = paths.db_path()
+
+# The UI page is kept in memory, precompressed, and revalidated with its ETag
+INDEX = compression.StaticAsset(INDEX_PATH, "text/html")
+
+# History/saved tables: pooled WAL connections (storage.py)
+storage.configure(DB_PATH)
+
+startup.mark("flask app")
+
+# ------------------ BLUEPRINTS ------------------
+# The scraping blueprints import requests, bs4, lxml and aiohttp, which is most
+# of the startup time. They are loaded in the background once the server is up
+# (or by the first request that needs them), so the UI page doesn't wait.
+# (module, blueprint, loaded message, missing message)
+BLUEPRINTS = [
+    ("scraper_core", "scraper_core_bp", "✓ Core scraping module loaded (contacts, WHOIS, tech, sitemap, metadata)",
+     "Warning: scraper_core.py not found"),
+    ("scraper_osint", "scraper_osint_bp", "✓ OSINT module loaded (dorking, GitHub, RSS)",
+     "Warning: scraper_osint.py not found"),
+    ("scraper", "scraper_bp", "✓ Additional endpoints loaded (growth, profile, jobs, business, health)",
+     "Warning: scraper.py not found"),
+    ("scraper_analyze", "scraper_analyze_bp", "✓ Composite analysis loaded (one fetch, one parse: /api/analyze/full)",
+     "Warning: scraper_analyze.py not found"),
+    ("scraper_batch", "scraper_batch_bp", "✓ Batch enrichment loaded (NDJSON streaming: /api/batch/enrich)",
+     "Warning: scraper_batch.py not found"),
+    ("scraper_async", "scraper_async_bp", "✓ Async endpoints loaded (/api/async/: growth, profile, business, feeds)",
+     "Warning: async endpoints unavailable (pip install aiohttp \"flask[async]\")"),
+    ("scraper_leads", "scraper_leads_bp", "✓ Lead store loaded (full-text search: /api/leads/search)",
+     "Warning: scraper_leads.py not found"),
+    ("scraper_jobs", "scraper_jobs_bp", "✓ Background jobs loaded (/api/jobs/submit, /api/jobs/status/<id>)",
+     "Warning: scraper_jobs.py not found"),
+    ("scraper_changes", "scraper_changes_bp", "✓ Change detection loaded (/api/changes)",
+     "Warning: scraper_changes.py not found"),
+    ("scraper_metrics", "scraper_metrics_bp", "✓ Metrics loaded (Prometheus text format: /metrics)",
+     "Warning: scraper_metrics.py not found"),
+    ("scraper_profiles", "scraper_profiles_bp",
+     "✓ Request profiling loaded (/api/profiles, enable with LEADGEN_PROFILING=1)",
+     "Warning: scraper_profiles.py not found"),
+]
+
+_blueprints_loaded = False
+_blueprints_lock = threading.Lock()
+
+def load_blueprints():
+    """ Import and register the scraping blueprints (once), then start the services they use """
+    global _blueprints_loaded
+    if _blueprints_loaded:
+        return
+    with _blueprints_lock:
+        if _blueprints_loaded:
+            return
+        with startup.timed("blueprints"):
+            for module_name, blueprint, loaded, missing in BLUEPRINTS:
+                try:
+                    with startup.timed(f"blueprint {module_name}"):
+                        module = __import__(module_name)
+                    app.register_blueprint(getattr(module, blueprint))
+                    print(loaded)
+                except ImportError as e:
+                    print(f"{missing}: {e}")
+
+            import http_cache
+            import jobs
+            import parsing
+
+            # HTML parser backend: lxml when installed, unless LEADGEN_PARSER names another (parsing.BACKENDS)
+            try:
+                parsing.configure(backend=os.getenv("LEADGEN_PARSER") or None)
+            except ValueError as e:
+                print(f"Warning: {e}; using {parsing.backend()}")
+
+            # Persistent HTTP cache (bodies + ETag/Last-Modified) lives next to the database
+            http_cache.configure(path=os.path.join(os.path.dirname(DB_PATH), "http_cache.db"))
+
+            # Background jobs live in the same database; unfinished ones resume on startup
+            # (a multi-process server recovers them once, before its workers start)
+            jobs.manager.init_app(app, recover=not serve.is_worker())
+        _blueprints_loaded = True
+
+def _lazy_blueprints(wsgi_app):
+    """ Serve the UI page right away; every other request waits until the blueprints are loaded """
+    def dispatch(environ, start_response):
+        if not _blueprints_loaded:
+            if environ.get("PATH_INFO", "/") == "/" and environ.get("REQUEST_METHOD") == "GET":
+                return index_response(Request(environ))(environ, start_response)
+            load_blueprints()
+        return wsgi_app(environ, start_response)
+    return dispatch
+
+app.wsgi_app = _lazy_blueprints(app.wsgi_app)
 
 # ------------------ DATABASE INIT ------------------
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("""CREATE TABLE IF NOT EXISTS history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT, keyword TEXT, category TEXT, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)""")
-    c.execute("""CREATE TABLE IF NOT EXISTS saved (
-            id INTEGER PRIMARY KEY AUTOINCREMENT, keyword TEXT, category TEXT, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)""")
-    conn.commit()
-    conn.close()
+    storage.init()
+
+def page_args():
+    """Pagination and filter query parameters shared by the get endpoints"""
+    args = request.args
+    return {
+        "limit": args.get("limit", storage.DEFAULT_LIMIT, type=int),
+        "cursor": args.get("cursor", type=int),
+        "keyword": args.get("keyword"),
+        "category": args.get("category"),
+        "q": args.get("q"),
+        "since": args.get("since"),
+        "until": args.get("until"),
+    }
+
+def list_rows(table):
+    rows, next_cursor = storage.query(table, **page_args())
+    return jsonify({table: rows, "next_cursor": next_cursor})
+
+def bulk_add(table, upsert=False):
+    data = request.json or {}
+    try:
+        ids = storage.add_many(table, data.get("items"), upsert=upsert)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    return jsonify(status="ok", count=len(ids), ids=ids)
 
 # ------------------ ROUTES ------------------
+def index_response(req):
+    return INDEX.response(req) or Response("<h1>Error: index.html not found.</h1>", mimetype="text/html")
+
 @app.route("/", methods=["GET"])
 def home():
-    try:
-        with open(INDEX_PATH, "r", encoding="utf8") as f:
-            return f.read()
-    except FileNotFoundError:
-        return "<h1>Error: index.html not found.</h1>"
+    return index_response(request)
+
+@app.route("/api/startup", methods=["GET"])
+def api_startup():
+    """ Startup phase timings, and import cost per module when recorded """
+    return jsonify(startup.report())
 
 @app.route("/api/history/add", methods=["POST"])
 def api_history_add():
     data = request.json
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute("INSERT INTO history(keyword, category) VALUES (?, ?)", (data["keyword"], data["category"]))
-    return jsonify(status="ok")
+    row_id = storage.add("history", data["keyword"], data["category"])
+    return jsonify(status="ok", id=row_id)
+
+@app.route("/api/history/bulk", methods=["POST"])
+def api_history_bulk():
+    return bulk_add("history")
 
 @app.route("/api/history/get", methods=["GET"])
 def api_history_get():
-    with sqlite3.connect(DB_PATH) as conn:
-        rows = conn.execute("SELECT id, keyword, category, timestamp FROM history ORDER BY id DESC").fetchall()
-    return jsonify(history=[{"id": r[0], "keyword": r[1], "category": r[2], "timestamp": r[3]} for r in rows])
+    return list_rows("history")
 
 @app.route("/api/history/delete/<int:id>", methods=["DELETE"])
 def api_history_delete(id):
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute("DELETE FROM history WHERE id=?", (id,))
+    storage.delete("history", id)
     return jsonify(status="deleted")
 
 @app.route("/api/saved/add", methods=["POST"])
 def api_saved_add():
     data = request.json
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute("INSERT INTO saved(keyword, category) VALUES (?, ?)", (data["keyword"], data["category"]))
-    return jsonify(status="ok")
+    row_id = storage.add("saved", data["keyword"], data["category"])
+    return jsonify(status="ok", id=row_id)
+
+@app.route("/api/saved/bulk", methods=["POST"])
+def api_saved_bulk():
+    return bulk_add("saved")
+
+@app.route("/api/saved/upsert", methods=["POST"])
+def api_saved_upsert():
+    return bulk_add("saved", upsert=True)
 
 @app.route("/api/saved/get", methods=["GET"])
 def api_saved_get():
-    with sqlite3.connect(DB_PATH) as conn:
-        rows = conn.execute("SELECT id, keyword, category, timestamp FROM saved ORDER BY id DESC").fetchall()
-    return jsonify(saved=[{"id": r[0], "keyword": r[1], "category": r[2], "timestamp": r[3]} for r in rows])
+    return list_rows("saved")
 
 @app.route("/api/saved/delete/<int:id>", methods=["DELETE"])
 def api_saved_delete(id):
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute("DELETE FROM saved WHERE id=?", (id,))
+    storage.delete("saved", id)
     return jsonify(status="deleted")
 
+# ------------------ SHUTDOWN ------------------
+_stop_server = None
+
+def on_shutdown(stop):
+    """ Let POST /shutdown stop the server running the app by calling stop() """
+    global _stop_server
+    _stop_server = stop
+
+def close():
+    """ Release background work and pooled connections once the server has stopped """
+    if _blueprints_loaded:
+        import http_cache
+        import http_client
+        import jobs
+        jobs.manager.shutdown()
+        http_client.close()
+        http_cache.close()
+    storage.close()
+
 @app.route('/shutdown', methods=['POST'])
 def shutdown():
-    os._exit(0)
+    if _stop_server is None:
+        return jsonify(error="Shutdown is disabled for this server; stop the service instead"), 403
+    if request.remote_addr not in ("127.0.0.1", "::1"):
+        return jsonify(error="Shutdown is only accepted from this machine"), 403
+    # Stop once this response is out; requests in flight finish first
+    threading.Timer(0.2, _stop_server).start()
+    return jsonify(status="shutting down")
 
 def open_browser():
     webbrowser.open("http://127.0.0.1:5000")
 
 if __name__ == "__main__":
+    if "--startup-report" in sys.argv[1:]:
+        load_blueprints()
+        print(startup.format_report())
+        sys.exit(0)
+
+    # Desktop mode: local threaded server plus a browser window
+    from werkzeug.serving import make_server
     init_db()
-    threading.Timer(1, open_browser).start()
-    app.run(port=5000, debug=False)
\ No newline at end of file
+    server = make_server("127.0.0.1", 5000, app, threaded=True)
+    on_shutdown(server.shutdown)
+    # The socket is listening, so the browser can ask for the UI at once;
+    # the blueprints load meanwhile
+    threading.Thread(target=open_browser, daemon=True).start()
+    threading.Thread(target=load_blueprints, daemon=True).start()
+    startup.mark("serving")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close()
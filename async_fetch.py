@@ -0,0 +1,254 @@
+"""
+Asyncio fetch engine
+One background event loop owns a shared aiohttp session with a bounded
+connection limit; coroutines from any thread or loop (e.g. Flask async
+views) hand their requests to it, so hundreds of fetches can be in flight
+from a single worker and keep-alive connections are reused across requests
+"""
+
+import asyncio
+import threading
+import time
+from urllib.parse import urljoin, urlsplit
+
+import aiohttp
+from requests.structures import CaseInsensitiveDict
+
+import http_client
+import metrics
+import page_cache
+import politeness
+import probe
+import resolver
+
+CONNECTION_LIMIT = 200      # total sockets across all hosts
+PER_HOST_LIMIT = politeness.DEFAULT_CONCURRENCY     # sockets per host, same cap as the threaded client
+DEFAULT_TIMEOUT = 15
+
+
+def _trace_config():
+    """aiohttp hooks feeding the dns / connect / wait phases (metrics.py) and charging redirect hops to politeness"""
+    trace = aiohttp.TraceConfig()
+
+    async def request_start(session, ctx, params):
+        ctx.start = time.perf_counter()
+        ctx.connect = 0.0
+
+    async def phase_start(session, ctx, params):
+        ctx.phase_start = time.perf_counter()
+
+    async def dns_end(session, ctx, params):
+        metrics.phase('dns', time.perf_counter() - ctx.phase_start)
+
+    async def connect_end(session, ctx, params):
+        elapsed = time.perf_counter() - ctx.phase_start
+        ctx.connect += elapsed
+        metrics.phase('connect', elapsed)
+
+    async def request_end(session, ctx, params):
+        metrics.phase('wait', max(0.0, time.perf_counter() - ctx.start - ctx.connect))
+
+    async def request_redirect(session, ctx, params):
+        location = params.response.headers.get('Location')
+        if location:
+            await politeness.wait_async(urljoin(str(params.url), location))
+
+    trace.on_request_start.append(request_start)
+    trace.on_dns_resolvehost_start.append(phase_start)
+    trace.on_dns_resolvehost_end.append(dns_end)
+    trace.on_connection_create_start.append(phase_start)
+    trace.on_connection_create_end.append(connect_end)
+    trace.on_request_end.append(request_end)
+    trace.on_request_redirect.append(request_redirect)
+    return trace
+
+
+class AsyncFetchEngine:
+    def __init__(self, limit=CONNECTION_LIMIT, limit_per_host=PER_HOST_LIMIT):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self._loop = None
+        self._session = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._loop is not None:
+                return
+            ready = threading.Event()
+
+            def run():
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                self._loop = loop
+                loop.run_until_complete(self._open_session())
+                ready.set()
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=run, name='async-fetch', daemon=True)
+            self._thread.start()
+            ready.wait()
+
+    async def _open_session(self):
+        connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host,
+                                         ttl_dns_cache=300)
+        self._session = aiohttp.ClientSession(connector=connector, headers=http_client.get_headers(),
+                                              trace_configs=[_trace_config()])
+
+    async def _request(self, method, url, timeout, allow_redirects):
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        try:
+            async with politeness.slot_async(url):
+                async with self._session.request(method, url, timeout=client_timeout,
+                                                 allow_redirects=allow_redirects) as resp:
+                    start = time.perf_counter()
+                    body = await resp.read() if method != 'HEAD' else b''
+                    metrics.phase('download', time.perf_counter() - start)
+        except Exception as e:
+            metrics.outbound(url, error=e)
+            raise
+        metrics.outbound(url, resp.status)
+        encoding = resp.get_encoding() if body else 'utf-8'
+        text = body.decode(encoding or 'utf-8', errors='replace')
+        headers = CaseInsensitiveDict(resp.headers)
+        size = len(body) + sum(len(k) + len(v) for k, v in headers.items())
+        return page_cache.Page(str(resp.url), resp.status, headers, text, size)
+
+    def submit(self, coro):
+        """Schedule a coroutine on the engine loop; returns a concurrent.futures.Future"""
+        self._start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def request(self, method, url, timeout=DEFAULT_TIMEOUT, allow_redirects=True):
+        """Run a request on the engine loop and await it from the caller's loop"""
+        return await asyncio.wrap_future(self.submit(
+            self._request(method.upper(), url, timeout, allow_redirects)))
+
+    def close(self):
+        with self._lock:
+            if self._loop is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+            self._session = None
+
+
+engine = AsyncFetchEngine()
+
+
+def configure(limit=None, limit_per_host=None):
+    """Change connection limits; takes effect on the next session"""
+    engine.close()
+    if limit is not None:
+        engine.limit = limit
+    if limit_per_host is not None:
+        engine.limit_per_host = limit_per_host
+
+
+async def fetch_page(url, timeout=DEFAULT_TIMEOUT):
+    """Async counterpart of page_cache.fetch_page: cached GET returning a Page"""
+    key = page_cache.normalize_url(url)
+    page = page_cache.cache.get(key)
+    if page is not None:
+        return page
+    page = await engine.request('GET', url, timeout=timeout)
+    if 200 <= page.status_code < 300:
+        page_cache.cache.put(key, page)
+    return page
+
+
+async def get(url, timeout=DEFAULT_TIMEOUT):
+    return await engine.request('GET', url, timeout=timeout)
+
+
+async def timed_get(url, timeout=DEFAULT_TIMEOUT):
+    """GET returning (page, seconds)"""
+    start = time.time()
+    page = await engine.request('GET', url, timeout=timeout)
+    return page, time.time() - start
+
+
+async def _probe_one(method, url, timeout, allow_redirects):
+    """Runs on the engine loop, so it completes (and is cached) even if the caller stops waiting"""
+    key = (method, url, allow_redirects)
+    try:
+        page = await engine._request(method, url, timeout, allow_redirects)
+        if method == 'GET' and 200 <= page.status_code < 300:
+            page_cache.cache.put(page_cache.normalize_url(url), page)
+        status = page.status_code
+    except Exception:
+        status = None
+    probe.outcomes.put(key, status)
+    return status
+
+
+async def probe_urls(urls, method='HEAD', timeout=5, deadline=10, first_match=False, allow_redirects=False):
+    """Async counterpart of probe.probe with the same deadline/first-match semantics"""
+    method = method.upper()
+    urls = list(urls)
+    results = [None] * len(urls)
+    tasks = {}
+    stop_at = time.time() + deadline
+    uncached = []
+    for i, url in enumerate(urls):
+        cached = probe.outcomes.get((method, url, allow_redirects))
+        if cached is not None:
+            results[i] = probe.ProbeResult(url, cached[0], cached=True)
+        else:
+            uncached.append(i)
+
+    missing = ()
+    if uncached:
+        missing = await asyncio.to_thread(resolver.missing_hosts, [urls[i] for i in uncached],
+                                          min(timeout, deadline))
+    for i in uncached:
+        if urlsplit(urls[i]).hostname in missing:
+            results[i] = probe.ProbeResult(urls[i], None)
+        else:
+            remaining = max(0.1, min(timeout, stop_at - time.time()))
+            future = engine.submit(_probe_one(method, urls[i], remaining, allow_redirects))
+            tasks[asyncio.wrap_future(future)] = i
+
+    def settled_match():
+        for result in results:
+            if result is None:
+                return None
+            if result.ok:
+                return result
+        return None
+
+    pending = set(tasks)
+    while pending:
+        if first_match and settled_match():
+            break
+        remaining = stop_at - time.time()
+        if remaining <= 0:
+            break
+        done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            i = tasks[task]
+            results[i] = probe.ProbeResult(urls[i], task.result())
+
+    # Not cancelled: unfinished probes complete on the engine loop and land in the outcome cache
+    for task in pending:
+        results[tasks[task]] = probe.ProbeResult(urls[tasks[task]], None)
+
+    if first_match:
+        match = settled_match()
+        if match is not None:
+            return results[:results.index(match) + 1]
+    return results
+
+
+async def first_ok(urls, **kwargs):
+    for result in await probe_urls(urls, first_match=True, **kwargs):
+        if result.ok:
+            return result.url
+    return None
+
+
+async def all_ok(urls, **kwargs):
+    return [result.url for result in await probe_urls(urls, **kwargs) if result.ok]
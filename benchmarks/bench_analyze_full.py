@@ -0,0 +1,90 @@
+"""
+Benchmark: /api/analyze/full vs. the six single-purpose routes back to back
+
+The page cache is cleared before every round so both modes pay for their
+downloads; the individual routes additionally parse the page six times.
+
+    python benchmarks/bench_analyze_full.py [rounds] [page_kb]
+"""
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+import page_cache
+from scraper_core import scraper_core_bp
+from scraper import scraper_bp
+from scraper_analyze import scraper_analyze_bp
+from fixture_server import FixtureServer
+
+ROUTES = ['/api/scrape/contacts', '/api/tech/detect', '/api/metadata/extract',
+          '/api/osint/keywords', '/api/osint/competitors', '/api/osint/score']
+
+BLOCK = ('<div class="card"><h3>Enterprise CRM automation</h3>'
+         '<p>Contact sales@example.com or +1 (555) 010-2030. Integrates with Salesforce, '
+         'HubSpot and Slack. <span class="date">2025-03-01</span></p>'
+         '<a href="https://www.linkedin.com/company/example">LinkedIn</a>'
+         '<img alt="partner logo" src="/logo.png"></div>\n')
+
+
+def build_page(kb):
+    head = ('<html><head><title>Example</title><meta name="description" content="Example">'
+            '<meta property="og:title" content="Example"><script src="/jquery.js"></script></head><body>')
+    repeats = max(1, kb * 1024 // len(BLOCK))
+    return head + BLOCK * repeats + '</body></html>'
+
+
+def timed(fn, rounds):
+    timings = []
+    for _ in range(rounds):
+        page_cache.cache.clear()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    page_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    app = Flask(__name__)
+    for bp in (scraper_core_bp, scraper_bp, scraper_analyze_bp):
+        app.register_blueprint(bp)
+    client = app.test_client()
+
+    with FixtureServer({'/': (200, {'Content-Type': 'text/html'}, build_page(page_kb))}, latency=0.02) as server:
+        url = server.base_url + '/'
+
+        def individual_uncached():
+            for route in ROUTES:
+                page_cache.cache.clear()
+                assert client.post(route, json={'url': url}).status_code == 200
+
+        def individual_cached():
+            for route in ROUTES:
+                assert client.post(route, json={'url': url}).status_code == 200
+
+        def composite():
+            assert client.post('/api/analyze/full', json={'url': url}).status_code == 200
+
+        results = [
+            ('6 routes, no cache', timed(individual_uncached, rounds)),
+            ('6 routes, page cache', timed(individual_cached, rounds)),
+            ('/api/analyze/full', timed(composite, rounds)),
+        ]
+
+    baseline = results[0][1]
+    print(f'page size {page_kb} KB, {rounds} rounds, 20ms simulated server latency')
+    print(f'{"mode":<22} {"p50 ms":>9} {"speedup":>8}')
+    for name, ms in results:
+        print(f'{name:<22} {ms:>9.1f} {baseline / ms:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
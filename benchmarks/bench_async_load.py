@@ -0,0 +1,101 @@
+"""
+Load test: threaded fan-out routes vs. their /api/async/ counterparts
+
+Spins up several local fixture hosts (each a separate port, so per-host
+connection limits apply as they would in production), then enriches a list
+of domains with feed discovery and growth signals through the Flask test
+client using a small number of client threads ("workers").
+
+    python benchmarks/bench_async_load.py [domains] [workers] [latency_ms]
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+import page_cache
+import probe
+from scraper_osint import scraper_osint_bp
+from scraper import scraper_bp, GROWTH_SUBDOMAINS
+from scraper_async import scraper_async_bp
+from fixture_server import FixtureServer
+
+PAGE = ('<html><head><title>Host</title>'
+        '<link rel="alternate" type="application/rss+xml" href="/feed.xml"></head>'
+        '<body><a href="/blog">blog</a> careers 2025 '
+        '<a href="https://linkedin.com/company/x">in</a></body></html>')
+SITEMAP = '<urlset>' + '<url><loc>http://example.test/p</loc></url>' * 60 + '</urlset>'
+ROUTES = {
+    '/': (200, {'Content-Type': 'text/html'}, PAGE),
+    '/feed': (200, {}, '<rss/>'),
+    '/careers': (200, {}, 'careers'),
+    '/sitemap.xml': (200, {'Content-Type': 'application/xml'}, SITEMAP),
+}
+
+MODES = [
+    ('threaded', ['/api/osint/feeds', '/api/growth/signals']),
+    ('async', ['/api/async/osint/feeds', '/api/async/growth/signals']),
+]
+
+
+def run_mode(client, servers, routes, domains, workers):
+    page_cache.cache.clear()
+    probe.outcomes.clear()
+    for server in servers:
+        server.reset_counters()
+        # Fixture hosts have no subdomains; record them as misses so results don't
+        # depend on how fast the sandbox resolver fails "blog.127.0.0.1"-style names
+        for sub in GROWTH_SUBDOMAINS:
+            probe.outcomes.put(('HEAD', f'https://{sub}.127.0.0.1:{server.port}', True), None)
+
+    jobs = [(route, servers[i % len(servers)].base_url + f'/?d={i}')
+            for i in range(domains) for route in routes]
+
+    def call(job):
+        route, url = job
+        res = client.post(route, json={'url': url})
+        assert res.status_code == 200, res.data
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(call, jobs))
+    elapsed = time.perf_counter() - start
+    return {
+        'seconds': elapsed,
+        'enrichments_per_s': len(jobs) / elapsed,
+        'outbound_requests': sum(s.requests for s in servers),
+        'peak_in_flight': sum(s.peak_in_flight for s in servers),
+    }
+
+
+def main():
+    domains = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    latency = (int(sys.argv[3]) if len(sys.argv) > 3 else 100) / 1000
+
+    app = Flask(__name__)
+    for bp in (scraper_osint_bp, scraper_bp, scraper_async_bp):
+        app.register_blueprint(bp)
+    client = app.test_client()
+
+    servers = [FixtureServer(ROUTES, latency=latency).start() for _ in range(10)]
+    try:
+        print(f'{domains} domains x 2 routes, {workers} client workers, '
+              f'{len(servers)} hosts, {latency * 1000:.0f}ms server latency')
+        print(f'{"mode":<10} {"seconds":>8} {"enrich/s":>9} {"requests":>9} {"peak in flight":>15}')
+        for name, routes in MODES:
+            r = run_mode(client, servers, routes, domains, workers)
+            print(f'{name:<10} {r["seconds"]:>8.2f} {r["enrichments_per_s"]:>9.1f} '
+                  f'{r["outbound_requests"]:>9} {r["peak_in_flight"]:>15}')
+    finally:
+        for server in servers:
+            server.stop()
+
+
+if __name__ == '__main__':
+    main()
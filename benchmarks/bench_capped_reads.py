@@ -0,0 +1,66 @@
+"""
+Benchmark: full-body fetches vs. streamed capped reads for metadata and tech detection
+
+Serves a multi-megabyte page from the local fixture server and compares
+fetch + parse + extract with and without the endpoint read limits
+(metadata stops at </head>, tech reads the first 512 KB). Peak memory is
+Python-allocated memory during one run (tracemalloc).
+
+    python benchmarks/bench_capped_reads.py [rounds] [page_mb]
+"""
+
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import page_cache
+import parsing
+from scraper_core import tech_from_page, metadata_from_page, METADATA_READ, TECH_READ
+from bench_analyze_full import build_page
+from fixture_server import FixtureServer
+
+CASES = [
+    ('metadata', metadata_from_page, METADATA_READ),
+    ('tech', tech_from_page, TECH_READ),
+]
+
+
+def run(url, extract, limits):
+    page_cache.cache.clear()
+    page = page_cache.fetch_page(url, **limits)
+    extract(url, page, parsing.parse_fast(page.text))
+    return page
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    page_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 4
+    html = build_page(int(page_mb * 1024))
+    server = FixtureServer({'/': (200, {'Content-Type': 'text/html; charset=utf-8'}, html)}).start()
+    url = server.base_url + '/'
+    try:
+        print(f'{len(html) / 1024 / 1024:.1f} MB page, parser {parsing.backend()}, median of {rounds}')
+        print(f'{"analysis":<10} {"mode":<7} {"ms":>8} {"bytes read":>11} {"peak MB":>8}')
+        for name, extract, limits in CASES:
+            for mode, read_limits in (('full', {}), ('capped', limits)):
+                timings = []
+                for _ in range(rounds):
+                    start = time.perf_counter()
+                    run(url, extract, read_limits)
+                    timings.append(time.perf_counter() - start)
+                tracemalloc.start()
+                page = run(url, extract, read_limits)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print(f'{name:<10} {mode:<7} {statistics.median(timings) * 1000:>8.1f} '
+                      f'{len(page.text):>11} {peak / 1024 / 1024:>8.1f}')
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: UI page and JSON response sizes and serving time
+
+Serves / through the Flask test client the old way (reading index.html
+from disk on every hit) and from memory: uncompressed, gzip, brotli
+(when installed) and a 304 revalidation. Then compares the size and time
+of a 1,000-row /api/history/get response with and without compression.
+
+    python benchmarks/bench_compression.py [iterations]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def timed(client, iterations, path, headers=None):
+    response = client.get(path, headers=headers)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        client.get(path, headers=headers)
+    return (time.perf_counter() - start) / iterations, response
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    tmp = tempfile.TemporaryDirectory()
+    os.environ['LEADGEN_DATA_DIR'] = tmp.name
+    import app as application
+    import compression
+    import storage
+
+    app = application.app
+    application.load_blueprints()
+
+    @app.route('/bench/index-from-disk')
+    def index_from_disk():
+        with open(application.INDEX_PATH, 'r', encoding='utf8') as f:
+            return f.read()
+
+    client = app.test_client()
+    etag = client.get('/').headers['ETag']
+    cases = [('from disk (before)', '/bench/index-from-disk', None),
+             ('memory, identity', '/', None),
+             ('memory, gzip', '/', {'Accept-Encoding': 'gzip'})]
+    if 'br' in compression.encodings():
+        cases.append(('memory, brotli', '/', {'Accept-Encoding': 'br, gzip'}))
+    cases.append(('304 revalidation', '/', {'If-None-Match': etag, 'Accept-Encoding': 'gzip'}))
+    print('GET /')
+    for name, path, headers in cases:
+        seconds, response = timed(client, iterations, path, headers)
+        print(f'  {name:<20} {len(response.data):8d} bytes  {seconds * 1e6:8.0f} us/request')
+
+    storage.add_many('history', [{'keyword': f'keyword {i} lead generation', 'category': 'company'}
+                                 for i in range(1000)])
+    print('GET /api/history/get?limit=1000')
+    for name in ('identity', *compression.encodings()):
+        headers = {'Accept-Encoding': name} if name != 'identity' else None
+        seconds, response = timed(client, iterations // 4, '/api/history/get?limit=1000', headers)
+        print(f'  {name:<20} {len(response.data):8d} bytes  {seconds * 1e6:8.0f} us/request')
+    application.close()
+
+
+if __name__ == '__main__':
+    main()
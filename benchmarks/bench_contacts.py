@@ -0,0 +1,77 @@
+"""
+Micro-benchmark: single-pass contact extraction vs. the previous per-pattern scans
+
+The previous extractor ran each social regex over `text + str(soup)`,
+re-serializing the parsed document six times, then scanned the text again
+for emails and phones. Both versions get the same already parsed soup, so
+only extraction is timed.
+
+    python benchmarks/bench_contacts.py [rounds] [page_kb ...]
+"""
+
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+import page_cache
+from scraper_core import contacts_from_page
+from bench_analyze_full import build_page
+
+
+def legacy_contacts(url, response, soup):
+    """contacts_from_page as it was before contacts.py"""
+    text = soup.get_text()
+    emails = list(set(re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)))
+    phones = list(set(re.findall(r'(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}', text)))
+    social_links = {}
+    social_patterns = {
+        'LinkedIn': r'https?://(?:www\.)?linkedin\.com/(?:company|in)/[^\s<>"]+',
+        'Twitter': r'https?://(?:www\.)?(?:twitter|x)\.com/[^\s<>"]+',
+        'Facebook': r'https?://(?:www\.)?facebook\.com/[^\s<>"]+',
+        'Instagram': r'https?://(?:www\.)?instagram\.com/[^\s<>"]+',
+        'YouTube': r'https?://(?:www\.)?youtube\.com/[^\s<>"]+',
+        'GitHub': r'https?://(?:www\.)?github\.com/[^\s<>"]+',
+    }
+    for platform, pattern in social_patterns.items():
+        matches = re.findall(pattern, text + ' ' + str(soup))
+        if matches:
+            social_links[platform] = matches[0]
+    return {'url': url, 'emails': emails[:10], 'phones': phones[:10], 'social_links': social_links}
+
+
+def timed(fn, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    sizes = [int(kb) for kb in sys.argv[2:]] or [100, 500, 2000]
+
+    print(f'{"page KB":>8} {"legacy ms":>10} {"single-pass ms":>15} {"speedup":>8}')
+    for kb in sizes:
+        html = build_page(kb)
+        response = page_cache.Page('https://example.com', 200, {}, html, len(html))
+        soup = BeautifulSoup(html, 'html.parser')
+
+        old = legacy_contacts(response.url, response, soup)
+        new = contacts_from_page(response.url, response, soup)
+        assert set(old['emails']) <= set(new['emails']) and old['social_links'] == new['social_links']
+
+        legacy_ms = timed(lambda: legacy_contacts(response.url, response, soup), rounds)
+        single_ms = timed(lambda: contacts_from_page(response.url, response, soup), rounds)
+        print(f'{kb:>8} {legacy_ms:>10.1f} {single_ms:>15.1f} {legacy_ms / single_ms:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
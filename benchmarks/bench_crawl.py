@@ -0,0 +1,93 @@
+"""
+Benchmark: bounded site crawl for contact harvesting
+
+Serves a synthetic site (a home page linking to blog pages, product pages
+and, a few levels down, contact / about / team pages that hold the emails)
+from the fixture server with per-page latency. It crawls a 50-page budget
+with one worker and with the default pool, and reports how many of the
+site's emails each crawl found. It also compares the memory used by the
+exact visited set and the Bloom filter for a large crawl. The site is
+served as the virtual host crawl.test (fixture_sites.install), so the
+crawl runs under the default per-host politeness limits like a real one;
+each crawl is repeated with politeness off to show what the limits cost.
+
+    python benchmarks/bench_crawl.py [pages] [latency_s]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fixture_sites
+from fixture_server import FixtureServer
+
+HOST = 'crawl.test'
+
+CONTACT_PAGES = ['/contact-us', '/about/team', '/company/about', '/careers', '/support/locations']
+
+
+def build_site(pages):
+    """path -> html for a site whose contact pages are linked only from deep pages"""
+    site = {}
+    site['/'] = ''.join(f'<a href="/blog/post-{i}?utm_source=nav#top">Post {i}</a>' for i in range(20))
+    site['/'] += ''.join(f'<a href="/products/item-{i}">Item {i}</a>' for i in range(20))
+    for i in range(pages):
+        links = [f'/blog/post-{(i * 7 + k) % pages}' for k in range(1, 6)] + [f'/products/item-{i % 40}']
+        if i % 10 == 9:
+            links += CONTACT_PAGES
+        site[f'/blog/post-{i}'] = ''.join(f'<a href="{link}">x</a>' for link in links) + '<p>No contacts here</p>'
+    for i in range(40):
+        site[f'/products/item-{i}'] = '<a href="/">Home</a><a href="/img/photo.jpg">Photo</a>'
+    for n, path in enumerate(CONTACT_PAGES):
+        site[path] = f'<p>Email us at team{n}@example.com or call +1 555-010-{n:04d}</p><a href="/">Home</a>'
+    return {path: (200, {'Content-Type': 'text/html'}, f'<html><body>{html}</body></html>')
+            for path, html in site.items()}
+
+
+def main():
+    import crawler
+    import page_cache
+    import politeness
+
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+
+    with FixtureServer(hosts={HOST: build_site(pages)}, latency=latency) as web:
+        uninstall = fixture_sites.install(web)
+        print(f'site of {len(web.hosts[HOST])} pages, {latency:g} s per page, budget 50 pages, '
+              f'politeness {politeness.DEFAULT_RATE:g} req/s, burst {politeness.DEFAULT_BURST}, '
+              f'{politeness.DEFAULT_CONCURRENCY} in flight')
+        try:
+            for workers in (1, crawler.DEFAULT_WORKERS, 16):
+                for polite in (True, False):
+                    politeness.configure(enabled=polite)
+                    page_cache.cache.clear()
+                    web.reset_counters()
+                    start = time.perf_counter()
+                    result = crawler.crawl(f'https://{HOST}/', crawler._page_contacts, max_pages=50, workers=workers)
+                    elapsed = time.perf_counter() - start
+                    merged = crawler.merge_contacts(result['results'])
+                    print(f'{workers:>2} workers  politeness {"on " if polite else "off"}  {elapsed:6.2f} s  '
+                          f'{len(result["pages"])} pages  {len(result["pages"]) / elapsed:5.1f} pages/s  '
+                          f'peak in flight {web.peak_in_flight:2d}  '
+                          f'emails found {len(merged["emails"])}/{len(CONTACT_PAGES)}  stopped: {result["stopped"]}')
+        finally:
+            politeness.configure(enabled=True)
+            uninstall()
+
+    urls = [f'https://example.com/blog/post-{i}?page={i % 7}' for i in range(200000)]
+    for name, make in (('set', crawler._Visited), ('bloom', lambda: crawler.BloomFilter(len(urls)))):
+        tracemalloc.start()
+        visited = make()
+        for url in urls:
+            visited.add(url)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f'visited {name:<6} {len(urls)} URLs  {current / 1e6:6.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: caching DNS resolver against a local stub DNS server
+
+A stub server with simulated latency answers a few names and NXDOMAINs
+everything else. The benchmark compares one blocking lookup at a time
+(the old gethostbyname pattern) with the concurrent pool and the warm
+cache, then probes growth-style subdomains that don't exist and counts
+the HTTP attempts made.
+
+    python benchmarks/bench_dns.py [hosts] [latency_ms]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dns_stub import StubDnsServer
+from fixture_server import FixtureServer
+
+SUBDOMAINS = ['blog', 'shop', 'store', 'app', 'portal', 'careers', 'jobs', 'api', 'docs', 'support']
+
+
+def main():
+    import probe
+    import resolver
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 20) / 1000
+    records = {f'site{i}.test': ['127.0.0.1'] for i in range(0, count, 2)}
+    hosts = [f'site{i}.test' for i in range(count)]
+
+    with StubDnsServer(records, latency=latency) as stub, FixtureServer({'/': (200, {}, 'ok')}) as web:
+        print(f'{count} hosts, half NXDOMAIN, {latency * 1000:.0f} ms per answer')
+
+        lookup = resolver.DnsLookup(['127.0.0.1'], stub.port)
+        start = time.perf_counter()
+        for host in hosts:
+            lookup(host, 3)
+        sequential = time.perf_counter() - start
+        print(f'{"sequential, uncached":<24} {sequential:>7.2f} s')
+
+        resolver.configure(nameservers=['127.0.0.1'], port=stub.port)
+        stub.queries = 0
+        start = time.perf_counter()
+        resolved = resolver.resolve_many(hosts, timeout=60)
+        cold = time.perf_counter() - start
+        print(f'{"pool, cold cache":<24} {cold:>7.2f} s  ({stub.queries} queries)')
+        assert sum(r.ok for r in resolved.values()) == len(records)
+
+        stub.queries = 0
+        start = time.perf_counter()
+        resolver.resolve_many(hosts)
+        warm = time.perf_counter() - start
+        print(f'{"pool, warm cache":<24} {warm * 1000:>7.2f} ms ({stub.queries} queries)')
+
+        urls = [f'https://{sub}.site1.test' for sub in SUBDOMAINS] + [web.base_url + '/']
+        start = time.perf_counter()
+        results = probe.probe(urls, timeout=3, deadline=5, allow_redirects=True)
+        elapsed = time.perf_counter() - start
+        print(f'{"subdomain probe":<24} {elapsed:>7.2f} s  ({len(urls)} URLs, {web.requests} HTTP requests, '
+              f'{sum(r.ok for r in results)} ok)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: shared pooled client vs. one connection per call
+
+Runs the feed discovery enrichment (8 HEAD probes + 1 page GET against the
+same host) through the Flask test client against a local fixture server and
+reports TCP connections opened and latency per enrichment. The probe outcome
+cache and the page cache are cleared before every enrichment, so each one
+makes all nine requests.
+
+    python benchmarks/bench_http_client.py [rounds]
+"""
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from flask import Flask
+
+import http_client
+import page_cache
+import probe
+from scraper_osint import scraper_osint_bp
+from fixture_server import FixtureServer
+
+PAGE = ('<html><head><title>Fixture</title>'
+        '<link rel="alternate" type="application/rss+xml" href="/feed.xml" title="Blog">'
+        '</head><body>' + '<p>lorem ipsum</p>' * 200 + '</body></html>')
+
+ROUTES = {
+    '/': (200, {'Content-Type': 'text/html'}, PAGE),
+    '/feed': (200, {'Content-Type': 'application/rss+xml'}, '<rss/>'),
+    '/feed.xml': (200, {'Content-Type': 'application/rss+xml'}, '<rss/>'),
+}
+
+
+def unpooled_session():
+    """Old behaviour: every call builds its own connection"""
+    session = requests.Session()
+    session.headers.update(http_client.get_headers())
+    return session
+
+
+def run(client, server, rounds):
+    timings = []
+    server.reset_counters()
+    for _ in range(rounds):
+        probe.outcomes.clear()
+        page_cache.cache.clear()
+        start = time.perf_counter()
+        res = client.post('/api/osint/feeds', json={'url': server.base_url + '/'})
+        timings.append(time.perf_counter() - start)
+        assert res.status_code == 200, res.data
+    return {
+        'connections_per_enrichment': server.connections / rounds,
+        'requests_per_enrichment': server.requests / rounds,
+        'p50_ms': statistics.median(timings) * 1000,
+        'mean_ms': statistics.mean(timings) * 1000,
+    }
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    app = Flask(__name__)
+    app.register_blueprint(scraper_osint_bp)
+    client = app.test_client()
+
+    # 2ms simulated server think time keeps the comparison about connections
+    with FixtureServer(ROUTES, latency=0.002) as server:
+        original = http_client.get_session
+        http_client.get_session = unpooled_session
+        try:
+            before = run(client, server, rounds)
+        finally:
+            http_client.get_session = original
+
+        http_client.close()
+        after = run(client, server, rounds)
+
+    print(f'{"mode":<10} {"conns/enrich":>13} {"reqs/enrich":>12} {"p50 ms":>9} {"mean ms":>9}')
+    for name, result in (('unpooled', before), ('pooled', after)):
+        print(f'{name:<10} {result["connections_per_enrichment"]:>13.2f} '
+              f'{result["requests_per_enrichment"]:>12.2f} '
+              f'{result["p50_ms"]:>9.2f} {result["mean_ms"]:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: background jobs vs. blocking requests for slow analyses
+
+Against a fixture server that answers after `latency` seconds, compares
+calling /api/analyze/full directly (each call holds a request thread
+until the page arrives) with submitting the same work as jobs. It reports
+how long submission takes, the time until every job has finished on the
+worker pool, and the peak number of request threads busy at once.
+
+    python benchmarks/bench_jobs.py [analyses] [latency_s]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixture_server import FixtureServer
+
+
+def main():
+    from flask import Flask
+
+    import jobs
+    import storage
+    from scraper_analyze import scraper_analyze_bp
+    from scraper_jobs import scraper_jobs_bp
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+
+    app = Flask(__name__)
+    app.register_blueprint(scraper_analyze_bp)
+    app.register_blueprint(scraper_jobs_bp)
+    busy = {'now': 0, 'peak': 0}
+    lock = threading.Lock()
+
+    @app.before_request
+    def enter():
+        with lock:
+            busy['now'] += 1
+            busy['peak'] = max(busy['peak'], busy['now'])
+
+    @app.teardown_request
+    def leave(exc):
+        with lock:
+            busy['now'] -= 1
+
+    with tempfile.TemporaryDirectory() as tmp, FixtureServer(latency=latency) as web:
+        web.routes = {f'/p{i}': (200, {'Content-Type': 'text/html'}, f'<title>Page {i}</title>') for i in range(count)}
+        storage.configure(os.path.join(tmp, 'database.db'))
+        jobs.manager.init_app(app)
+        client = app.test_client()
+        print(f'{count} analyses, {latency:g} s per page, {jobs.WORKERS} job workers')
+
+        def direct(i):
+            return client.post('/api/analyze/full', json={'url': f'{web.base_url}/p{i}', 'sections': ['metadata']})
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=count) as pool:
+            list(pool.map(direct, range(count)))
+        print(f'{"blocking requests":<20} all done {time.perf_counter() - start:6.2f} s, '
+              f'peak busy request threads {busy["peak"]}')
+
+        busy['peak'] = 0
+        # Fresh URLs, so the page cache doesn't answer for the jobs
+        web.routes = {f'/j{i}': (200, {'Content-Type': 'text/html'}, f'<title>Job {i}</title>') for i in range(count)}
+        start = time.perf_counter()
+        ids = [client.post('/api/jobs/submit', json={'analysis': 'metadata', 'url': f'{web.base_url}/j{i}'}).json['id']
+               for i in range(count)]
+        submitted = time.perf_counter() - start
+        peak_requests = busy['peak']
+        for job_id in ids:
+            while client.get(f'/api/jobs/status/{job_id}?wait=30').json['status'] in (jobs.QUEUED, jobs.RUNNING):
+                pass
+        done = time.perf_counter() - start
+        print(f'{"jobs":<20} all done {done:6.2f} s, submitted in {submitted * 1000:.1f} ms, '
+              f'peak busy request threads {peak_requests}')
+        print(jobs.manager.stats())
+        storage.configure(None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: lead store full-text search
+
+Fills a temporary database with synthetic enrichment results through the
+background writer, then times FTS5 searches in auto order and forced bm25
+ranking, filtered searches and plain browsing. The vocabulary is tiny, so
+common terms match a large share of all leads (the worst case for ranking).
+It also times the localStorage pattern the store replaces: re-serializing
+the whole saved array on every save.
+
+    python benchmarks/bench_leads.py [leads]
+"""
+
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = ('crm marketing agency dental clinic plumbing saas analytics ecommerce fashion bakery legal '
+         'accounting fitness gym roofing solar insurance realty travel hotel coffee pet vet').split()
+TECH = ['WordPress', 'Shopify', 'React', 'Vue.js', 'HubSpot', 'Google Analytics', 'Stripe', 'Cloudflare',
+        'Wix', 'Squarespace', 'jQuery', 'Next.js']
+QUERIES = ['dental', 'dental clinic', 'tech:shopify', 'tech:shopify dental', 'analyt*', 'crm OR gym',
+           'roofing solar vet', 'site 4242']
+
+
+def synthetic_result(rng, i):
+    return {
+        'url': f'https://site{i}.example',
+        'metadata': {'title': f'Site {i} ' + ' '.join(rng.sample(WORDS, 3)),
+                     'description': ' '.join(rng.sample(WORDS, 8)),
+                     'keywords': ', '.join(rng.sample(WORDS, 4))},
+        'tech': {'technologies': {'cms': rng.sample(TECH, 1), 'libraries': rng.sample(TECH, 2)}},
+        'contacts': {'emails': [f'info@site{i}.example'], 'phones': []},
+    }
+
+
+def timed(fn, rounds=20):
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    import leads
+    import storage
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rng = random.Random(7)
+    leads.MAX_LEADS = max(leads.MAX_LEADS, count)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage.configure(os.path.join(tmp, 'database.db'))
+        start = time.perf_counter()
+        for i in range(count):
+            leads.writer.submit('/api/analyze/full', f'https://site{i}.example', synthetic_result(rng, i))
+            if i % 5000 == 4999:
+                leads.writer.flush()
+        leads.writer.flush()
+        print(f'{count} leads written in {time.perf_counter() - start:.2f} s ({leads.writer.stats()})')
+
+        print(f'{"query":<24} {"auto ms":>8} {"rank ms":>8} {"matches":>8}  order')
+        for q in QUERIES:
+            page = leads.search(q=q, limit=20)
+            auto = timed(lambda: leads.search(q=q, limit=20))
+            ranked = timed(lambda: leads.search(q=q, limit=20, order='rank'), 5)
+            print(f'{q:<24} {auto:>8.2f} {ranked:>8.2f} {page["total"]:>8}  {page["order"]}')
+        cursor = leads.search(limit=20)['next_cursor']
+        print(f'{"browse, next page":<24} {timed(lambda: leads.search(limit=20, cursor=cursor)):>8.2f}')
+        print(f'{"domain filter":<24} {timed(lambda: leads.search(domain="site4242.example")):>8.2f}')
+
+        saved = [synthetic_result(rng, i) for i in range(2000)]
+        print(f'{"localStorage-style save":<24} {timed(lambda: json.dumps(saved)):>8.2f}  '
+              f'(re-serializing {len(saved)} results, {len(json.dumps(saved)) / 1e6:.1f} MB)')
+        storage.configure(None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: instrumentation overhead
+
+Times the raw cost of one histogram observation and one counter increment,
+then serves a cheap endpoint through the Flask test client with and without
+the metrics request hooks, and renders /metrics after many series exist.
+
+    python benchmarks/bench_metrics.py [requests]
+"""
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def per_call(fn, n=200000):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def serve(client, count):
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        client.get('/ping')
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1e6
+
+
+def main():
+    from flask import Flask, jsonify
+
+    import metrics
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    print(f'histogram observe   {per_call(lambda: metrics.PHASE_SECONDS.observe(0.0123, "parse")):6.2f} us')
+    print(f'counter inc         {per_call(lambda: metrics.OUTBOUND.inc("example.com", "2xx")):6.2f} us')
+
+    def timed_block():
+        with metrics.timed('parse'):
+            pass
+
+    print(f'timed() block       {per_call(timed_block):6.2f} us')
+
+    plain, instrumented = Flask('plain'), Flask('instrumented')
+    for app in (plain, instrumented):
+        app.add_url_rule('/ping', 'ping', lambda: jsonify({'ok': True}))
+    metrics.init_app(instrumented)
+    base = serve(plain.test_client(), count)
+    timed = serve(instrumented.test_client(), count)
+    print(f'request, no hooks   {base:6.1f} us')
+    print(f'request, metrics    {timed:6.1f} us  (+{timed - base:.1f} us)')
+
+    for i in range(400):
+        metrics.OUTBOUND.inc(f'host{i}.example', '2xx')
+        metrics.REQUEST_SECONDS.observe(0.01, f'/api/route{i % 40}', 'POST')
+    start = time.perf_counter()
+    text = metrics.render()
+    print(f'render /metrics     {(time.perf_counter() - start) * 1000:6.2f} ms for {len(text.splitlines())} lines')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark: HTML parser backends (html.parser, lxml via BeautifulSoup, raw lxml.html)
+
+For each backend, parses every page of a corpus and runs the hot extractors
+(contacts, tech, metadata) over it. Reports median parse time, median
+parse + extract time, and peak memory. Each backend runs in its own
+subprocess, and peak memory is the growth of max RSS over the
+post-import baseline. lxml allocates outside Python's allocator, so
+tracemalloc would undercount it.
+
+    python benchmarks/bench_parsers.py [rounds] [saved_pages_dir]
+
+Without a directory a synthetic corpus (landing page, article, large listing)
+is generated.
+"""
+
+import glob
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_analyze_full import build_page
+
+ARTICLE = ('<article><h2>Scaling outbound</h2>' +
+           '<p>Teams using <a href="/crm">CRM</a> automation reply faster. ' * 40 +
+           '</p><ul>' + '<li><a href="/post">related</a></li>' * 30 + '</ul></article>')
+
+
+def write_corpus(directory):
+    pages = {
+        'landing_40kb.html': build_page(40),
+        'article_150kb.html': '<html><head><title>Blog</title></head><body>' + ARTICLE * 30 + '</body></html>',
+        'listing_1500kb.html': build_page(1500),
+    }
+    for name, html in pages.items():
+        with open(os.path.join(directory, name), 'w', encoding='utf8') as f:
+            f.write(html)
+    return sorted(os.path.join(directory, name) for name in pages)
+
+
+def measure(backend, rounds, paths):
+    """Runs in the child process; prints one JSON line"""
+    import parsing
+    from page_cache import Page
+    from scraper_core import contacts_from_page, tech_from_page, metadata_from_page
+
+    parsing.configure(backend)
+    parse = parsing.parse_fast
+    pages = []
+    for path in paths:
+        with open(path, encoding='utf8', errors='replace') as f:
+            html = f.read()
+        pages.append(Page('https://example.com', 200, {}, html, len(html)))
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    parse_ms, total_ms = [], []
+    for page in pages:
+        parse_times, total_times = [], []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            doc = parse(page.text)
+            parsed = time.perf_counter()
+            contacts_from_page(page.url, page, doc)
+            tech_from_page(page.url, page, doc)
+            metadata_from_page(page.url, page, doc)
+            parse_times.append(parsed - start)
+            total_times.append(time.perf_counter() - start)
+            del doc
+        parse_ms.append(statistics.median(parse_times) * 1000)
+        total_ms.append(statistics.median(total_times) * 1000)
+
+    peak_mb = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) / 1024
+    print(json.dumps({'parse_ms': parse_ms, 'total_ms': total_ms, 'peak_mb': peak_mb}))
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--measure':
+        measure(sys.argv[2], int(sys.argv[3]), sys.argv[4:])
+        return
+
+    import parsing
+
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    tmp = None
+    if len(sys.argv) > 2:
+        paths = sorted(glob.glob(os.path.join(sys.argv[2], '*.htm*')))
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        paths = write_corpus(tmp.name)
+
+    print(f'{len(paths)} pages, median of {rounds}; time per page in ms (parse / parse + extract)')
+    names = [os.path.basename(p)[:22] for p in paths]
+    print(f'{"backend":<12} ' + ' '.join(f'{n:>24}' for n in names) + f' {"peak MB":>8}')
+    for backend in parsing.BACKENDS:
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure', backend, str(rounds)] + paths,
+                             capture_output=True, text=True, check=True).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        cells = [f'{p:.1f} / {t:.1f}' for p, t in zip(r['parse_ms'], r['total_ms'])]
+        print(f'{backend:<12} ' + ' '.join(f'{c:>24}' for c in cells) + f' {r["peak_mb"]:>8.1f}')
+
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark: interleaving multi-host work under per-host rate limits
+
+A batch where one host's work comes first (the usual shape of a lead list
+sorted by domain) runs on a thread pool, once in list order and once
+through politeness.interleave(). With per-host token buckets, list order
+leaves the pool waiting on the first host while the other hosts sit idle.
+The fixture server listens on all loopback addresses, so 127.0.0.N are
+separate hosts to the limiter.
+
+Then checks that the limits hold for hosts politeness does not exempt
+(virtual hosts through fixture_sites.install): requests past the burst are
+spaced at the host's rate, no more than its concurrency cap are in flight,
+and a robots.txt Crawl-delay spaces requests by that delay. Exits with
+status 1 if a check fails.
+
+    python benchmarks/bench_politeness.py [hosts] [requests_per_host]
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fixture_sites
+from fixture_server import FixtureServer
+
+TOLERANCE = 0.05        # seconds of scheduling jitter allowed per check
+
+
+def run(urls, workers):
+    import http_client
+
+    finished = {}
+    start = time.perf_counter()
+
+    def fetch(url):
+        http_client.get(url, timeout=30)
+        host = urlsplit(url).hostname
+        finished[host] = time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(fetch, urls))
+    return time.perf_counter() - start, finished
+
+
+def _arrivals(log):
+    """Route that records when each request reached the server"""
+    def route(handler):
+        log.append(time.perf_counter())
+        return 200, {'Content-Type': 'text/html'}, '<title>x</title>'
+    return route
+
+
+def _fetch_all(urls, workers):
+    import http_client
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda url: http_client.get(url, timeout=60), urls))
+
+
+def check():
+    """Token bucket spacing, concurrency cap and Crawl-delay on non-exempt hosts; returns failures"""
+    import politeness
+
+    paced, capped, delayed = [], [], []
+    hosts = {
+        'paced.test': {f'/p{i}': _arrivals(paced) for i in range(24)},
+        'capped.test': {f'/p{i}': (200, {'Content-Type': 'text/html'}, '<title>x</title>') for i in range(24)},
+        'delayed.test': {'/robots.txt': (200, {'Content-Type': 'text/plain'}, 'User-agent: *\nCrawl-delay: 1\n'),
+                         **{f'/p{i}': _arrivals(delayed) for i in range(6)}},
+    }
+    failures = []
+    politeness.configure(host_limits={'capped.test': (100.0, 100, 3)})
+    with FixtureServer(hosts=hosts) as web:
+        uninstall = fixture_sites.install(web)
+        try:
+            # 24 requests from 8 threads: the burst goes at once, the rest at DEFAULT_RATE
+            politeness.configure(respect_robots=False)
+            _fetch_all([f'https://paced.test/p{i}' for i in range(24)], 8)
+            rate, burst = politeness.DEFAULT_RATE, politeness.DEFAULT_BURST
+            paced.sort()
+            early = [k for k, t in enumerate(paced) if k >= burst and
+                     t - paced[0] < (k - burst + 1) / rate - TOLERANCE]
+            spread = paced[-1] - paced[0]
+            print(f'check spacing       24 requests in {spread:.2f} s '
+                  f'(expected {(24 - burst) / rate:.2f} s at {rate:g} req/s after a burst of {burst})')
+            if early:
+                failures.append(f'paced.test: requests {early} arrived before their token')
+
+            # A fast bucket but a concurrency cap of 3, 12 threads and 0.2 s responses
+            web.latency = 0.2
+            web.reset_counters()
+            _fetch_all([f'https://capped.test/p{i}' for i in range(12)], 12)
+            web.latency = 0.0
+            print(f'check concurrency   peak in flight {web.peak_in_flight} (cap 3)')
+            if web.peak_in_flight > 3:
+                failures.append(f'capped.test: {web.peak_in_flight} requests in flight, cap is 3')
+
+            # robots.txt asks for Crawl-delay: 1; it is read in the background on first contact
+            politeness.configure(respect_robots=True)
+            _fetch_all(['https://delayed.test/p0'], 1)
+            bucket = politeness.limiter.bucket('delayed.test')
+            for _ in range(100):
+                if bucket.robots_state == 'done':
+                    break
+                time.sleep(0.05)
+            del delayed[:]
+            _fetch_all([f'https://delayed.test/p{i}' for i in range(1, 6)], 4)
+            delayed.sort()
+            gaps = [b - a for a, b in zip(delayed, delayed[1:])]
+            print(f'check crawl-delay   crawl_delay {bucket.crawl_delay}, gaps between requests '
+                  + ', '.join(f'{gap:.2f}' for gap in gaps) + ' s')
+            if bucket.crawl_delay != 1 or not gaps or min(gaps) < 1 - TOLERANCE:
+                failures.append(f'delayed.test: Crawl-delay 1 not honoured (gaps {gaps})')
+        finally:
+            uninstall()
+            politeness.configure(respect_robots=True)
+    return failures
+
+
+def main():
+    import politeness
+
+    hosts = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    per_host = int(sys.argv[2]) if len(sys.argv) > 2 else 24
+    workers = 8
+
+    with FixtureServer(latency=0.05, host='0.0.0.0') as web:
+        web.routes = {f'/p{i}': (200, {'Content-Type': 'text/html'}, '<title>x</title>') for i in range(per_host)}
+        urls = [f'http://127.0.0.{h + 1}:{web.port}/p{i}' for h in range(hosts) for i in range(per_host)]
+        print(f'{hosts} hosts x {per_host} requests, {workers} threads, '
+              f'{politeness.DEFAULT_RATE:g} req/s per host, burst {politeness.DEFAULT_BURST}')
+
+        for name, order in (('list order', lambda: urls),
+                            ('interleaved', lambda: politeness.interleave(urls, lambda u: urlsplit(u).hostname))):
+            politeness.configure(exempt=[], respect_robots=False)
+            total, finished = run(order(), workers)
+            last = ', '.join(f'{host} {t:.1f}s' for host, t in sorted(finished.items()))
+            print(f'{name:<12} {total:6.2f} s   last response per host: {last}')
+        print(f'peak in flight at the server: {web.peak_in_flight}')
+        politeness.configure(exempt=['localhost', '127.0.0.1', '::1'], respect_robots=True)
+
+    failures = check()
+    for failure in failures:
+        print('FAILED', failure)
+    print('politeness checks', 'failed' if failures else 'passed')
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
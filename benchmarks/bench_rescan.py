@@ -0,0 +1,75 @@
+"""
+Benchmark: weekly re-scan of a lead list with content fingerprints
+
+Scans a list of pages once, changes a share of them, and re-scans the
+list with all analysis sections. The fixture pages carry ETags, so
+unchanged pages revalidate with a 304 through http_cache, as real sites
+do. With fingerprints, unchanged pages return their stored analysis.
+Without them (no storage configured), every page is parsed and extracted
+again. The in-memory page cache is cleared before each pass.
+
+    python benchmarks/bench_rescan.py [pages] [changed_share] [page_kb]
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_analyze_full import build_page
+from fixture_server import FixtureServer
+
+
+def etag_route(pages, path):
+    def route(handler):
+        body = pages[path]
+        etag = '"%s"' % hashlib.md5(body.encode()).hexdigest()
+        if handler.headers.get('If-None-Match') == etag:
+            return 304, {'ETag': etag}, b''
+        return 200, {'Content-Type': 'text/html', 'ETag': etag}, body
+    return route
+
+
+def main():
+    import fingerprints
+    import http_cache
+    import page_cache
+    import storage
+    from scraper_analyze import analyze_page
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    share = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+    page_kb = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+
+    pages = {f'/lead{i}': build_page(page_kb) for i in range(count)}
+    with tempfile.TemporaryDirectory() as tmp, FixtureServer({p: etag_route(pages, p) for p in pages}) as web:
+        http_cache.configure(path=os.path.join(tmp, 'http_cache.db'), policies={'page': 0})
+        urls = [web.base_url + path for path in pages]
+
+        def scan():
+            page_cache.cache.clear()
+            start = time.perf_counter()
+            results = [analyze_page(url) for url in urls]
+            return time.perf_counter() - start, sum(r['unchanged'] for r in results)
+
+        print(f'{count} pages of {page_kb} KB, {share:.0%} changed between scans')
+        for name, db in (('fingerprints', os.path.join(tmp, 'database.db')), ('no fingerprints', None)):
+            storage.configure(db)
+            first, _ = scan()
+            changed = list(pages)[:int(count * share)]
+            for path in changed:
+                pages[path] = pages[path].replace('sales@example.com', f'sales+{time.time_ns()}@example.com', 1)
+            rescan, skipped = scan()
+            print(f'{name:<16} first scan {first:6.2f} s   re-scan {rescan:6.2f} s   '
+                  f'{skipped} of {count} served from the stored analysis')
+        storage.configure(os.path.join(tmp, 'database.db'))
+        print(fingerprints.stats())
+        storage.configure(None)
+        http_cache.configure(path=None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: server mode throughput by worker count
+
+Starts `app.py --serve` (gunicorn) with 1 worker and with one worker per
+core, then sends concurrent POST /api/tech/detect requests for a 300 KB page
+from the fixture server. The page is cached after the first request, so each
+request is mostly parsing and signature matching (CPU), which one process
+can only do on one core at a time. Reports requests/s and p50 / p95 latency.
+
+    python benchmarks/bench_serve.py [requests] [concurrency]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_analyze_full import build_page
+from fixture_server import FixtureServer
+
+PORT = 5097
+
+
+def wait_ready(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    raise RuntimeError('server did not start')
+
+
+def run(workers, page_url, count, concurrency, data_dir):
+    env = dict(os.environ, LEADGEN_DATA_DIR=data_dir)
+    env.pop('APPDATA', None)
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'app.py'), '--serve', '--server', 'gunicorn',
+                               '--port', str(PORT), '--workers', str(workers), '--threads', '4'],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        base = f'http://127.0.0.1:{PORT}'
+        wait_ready(base + '/api/cache/stats')
+        session = requests.Session()
+        for _ in range(workers * 2):
+            session.post(base + '/api/tech/detect', json={'url': page_url})      # warm every worker's cache
+
+        def one(_):
+            start = time.perf_counter()
+            requests.post(base + '/api/tech/detect', json={'url': page_url}, timeout=60).raise_for_status()
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = sorted(pool.map(one, range(count)))
+        elapsed = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait(timeout=40)
+    return count / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    cores = os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as tmp, FixtureServer({'/': (200, {'Content-Type': 'text/html'},
+                                                                    build_page(300))}) as web:
+        print(f'{count} requests, {concurrency} concurrent, {cores} core(s)')
+        for workers in sorted({1, cores}):
+            rps, p50, p95 = run(workers, web.base_url + '/', count, concurrency, tmp)
+            print(f'{workers:3d} worker(s): {rps:7.1f} req/s   p50 {p50 * 1000:7.1f} ms   p95 {p95 * 1000:7.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Micro-benchmark: signature engine vs. one substring scan per pattern
+
+Grows the shipped rule set with synthetic fingerprints and times matching a
+large page. Per-pattern scans (the previous `'x' in html` style) grow
+linearly with the rule count; the engine's single pass should stay roughly
+flat. Runs the regex fallback too when pyahocorasick is installed.
+
+    python benchmarks/bench_signatures.py [rounds] [page_kb]
+"""
+
+import os
+import random
+import string
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import signatures
+from bench_analyze_full import build_page
+
+
+def synthetic_rules(count, seed=7):
+    rng = random.Random(seed)
+    return [{'name': f'Tech {i}', 'group': 'tech', 'category': 'libraries',
+             'body': [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(6, 12)))]}
+            for i in range(count)]
+
+
+def naive_match(rules, html):
+    text = html.lower()
+    return [rule['name'] for rule in rules if any(p.lower() in text for p in rule.get('body', ()))]
+
+
+def timed(fn, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    page_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    html = build_page(page_kb)
+    base = signatures.SignatureEngine.from_file(signatures.SIGNATURES_PATH).rules
+    base = [{k: v for k, v in rule.items() if k != 'regex'} for rule in base]
+
+    backends = [('aho-corasick' if signatures.ahocorasick else 'trie regex', signatures.ahocorasick)]
+    if signatures.ahocorasick is not None:
+        backends.append(('trie regex', None))
+
+    print(f'{page_kb} KB page, median of {rounds}')
+    print(f'{"rules":>6} {"per-pattern ms":>15} ' + ' '.join(f'{name + " ms":>16}' for name, _ in backends))
+    for extra in (0, 1000, 5000):
+        rules = base + synthetic_rules(extra)
+        row = [timed(lambda: naive_match(rules, html), rounds)]
+        for _, module in backends:
+            signatures.ahocorasick = module
+            engine = signatures.SignatureEngine(rules)
+            expected = naive_match(rules, html)
+            assert [r['name'] for r in engine.match(html).rules] == expected
+            row.append(timed(lambda: engine.match(html), rounds))
+        print(f'{len(rules):>6} {row[0]:>15.1f} ' + ' '.join(f'{ms:>16.1f}' for ms in row[1:]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: streaming sitemap summary vs. loading the sitemap into BeautifulSoup('xml')
+
+Serves sitemaps of increasing size from the local fixture server and
+compares the old approach with sitemap.read_sitemaps. The old approach
+downloads the whole body, builds a soup and counts <loc>. Each mode runs
+in a subprocess, and peak memory is the growth of max RSS.
+
+    python benchmarks/bench_sitemap.py [url_counts ...]
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixture_server import FixtureServer
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def build_sitemap(count):
+    entries = ''.join(f'<url><loc>https://example.com/blog/post-{i}</loc><lastmod>2025-{1 + i % 12:02d}-01</lastmod></url>'
+                      for i in range(count))
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>{entries}</urlset>'
+
+
+def measure(mode, url):
+    """Runs in the child process; prints one JSON line"""
+    import http_client
+    import sitemap
+    from bs4 import BeautifulSoup
+
+    http_client.get_session()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode == 'soup':
+        soup = BeautifulSoup(http_client.get(url).text, 'xml')
+        count = len(soup.find_all('loc'))
+        recent = len([tag.text for tag in soup.find_all('lastmod') if '2025' in tag.text])
+    else:
+        summary = sitemap.read_sitemaps(url, url_budget=10 ** 7)
+        count = summary['url_count']
+        recent = sum(n for month, n in summary['lastmod_by_month'].items() if month.startswith('2025'))
+    elapsed = time.perf_counter() - start
+    peak_mb = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) / 1024
+    print(json.dumps({'seconds': elapsed, 'count': count, 'recent': recent, 'peak_mb': peak_mb}))
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--measure':
+        measure(sys.argv[2], sys.argv[3])
+        return
+
+    counts = [int(n) for n in sys.argv[1:]] or [10000, 100000, 300000]
+    server = FixtureServer({f'/sitemap-{n}.xml': (200, {'Content-Type': 'application/xml'}, build_sitemap(n))
+                            for n in counts}).start()
+    try:
+        print(f'{"urls":>8} {"mode":<10} {"seconds":>8} {"peak MB":>8}')
+        for n in counts:
+            results = {}
+            for mode in ('soup', 'streaming'):
+                out = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure', mode,
+                                      f'{server.base_url}/sitemap-{n}.xml'],
+                                     capture_output=True, text=True, check=True).stdout
+                results[mode] = json.loads(out.strip().splitlines()[-1])
+                r = results[mode]
+                print(f'{n:>8} {mode:<10} {r["seconds"]:>8.2f} {r["peak_mb"]:>8.1f}')
+            assert results['soup']['count'] == results['streaming']['count'] == n
+            assert results['soup']['recent'] == results['streaming']['recent']
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
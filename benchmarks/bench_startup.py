@@ -0,0 +1,65 @@
+"""
+Benchmark: desktop cold start
+
+Launches `python app.py` (desktop mode, with the browser launch disabled
+through BROWSER) and polls until the UI page is served and until the
+first API request that needs the scraping blueprints is answered. The time
+counts from process spawn, so interpreter startup is included. Then runs
+`app.py --startup-report` for the per-module import costs.
+
+    python benchmarks/bench_startup.py [runs]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASE = 'http://127.0.0.1:5000'
+
+
+def until_ok(url, start, timeout=30):
+    """Seconds since start when url first answered 200"""
+    while time.perf_counter() - start < timeout:
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                if response.status == 200:
+                    return time.perf_counter() - start
+        except OSError:
+            time.sleep(0.005)
+    raise RuntimeError(f'{url} did not answer')
+
+
+def launch(env):
+    start = time.perf_counter()
+    app = subprocess.Popen([sys.executable, os.path.join(ROOT, 'app.py')], env=env,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        ui = until_ok(BASE + '/', start)
+        api = until_ok(BASE + '/api/cache/stats', start)
+    finally:
+        app.terminate()
+        app.wait(timeout=10)
+    return ui, api
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, LEADGEN_DATA_DIR=tmp, BROWSER='true')
+        launch(env)     # warm the OS file cache and .pyc files
+        results = [launch(env) for _ in range(runs)]
+        ui = statistics.median(r[0] for r in results)
+        api = statistics.median(r[1] for r in results)
+        print(f'{runs} launches (median): UI page served after {ui * 1000:.0f} ms, '
+              f'first API response after {api * 1000:.0f} ms')
+        print(subprocess.run([sys.executable, os.path.join(ROOT, 'app.py'), '--startup-report'], env=env,
+                             capture_output=True, text=True).stdout.split('Startup phases', 1)[-1][:3000])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: history storage, old per-request connections vs. storage.py
+
+Fills a temporary database with history rows, then compares the old
+/api/history/get (new connection per request, every row, ORDER BY id DESC)
+with one cursor-paginated page from the pooled storage layer, filtered and
+unfiltered. Also times a bulk insert against row-by-row inserts.
+
+    python benchmarks/bench_storage.py [rows]
+"""
+
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CATEGORIES = ['seo', 'leads', 'jobs', 'osint']
+
+
+def timed(fn, rounds=20):
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    import storage
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    items = [{'keyword': f'keyword {i % 20000}', 'category': CATEGORIES[i % 4]} for i in range(rows)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'database.db')
+        storage.configure(path)
+
+        start = time.perf_counter()
+        for i in range(0, rows, storage.MAX_BULK):
+            storage.add_many('history', items[i:i + storage.MAX_BULK])
+        bulk = time.perf_counter() - start
+
+        single_path = os.path.join(tmp, 'single.db')
+        storage.configure(single_path)
+        storage.init()
+        start = time.perf_counter()
+        for item in items[:1000]:
+            with sqlite3.connect(single_path) as conn:
+                conn.execute('INSERT INTO history(keyword, category) VALUES (?, ?)', (item['keyword'], item['category']))
+        single = (time.perf_counter() - start) * rows / 1000
+        storage.configure(path)
+
+        def old_get():
+            with sqlite3.connect(path) as conn:
+                result = conn.execute('SELECT id, keyword, category, timestamp FROM history ORDER BY id DESC').fetchall()
+            [{'id': r[0], 'keyword': r[1], 'category': r[2], 'timestamp': r[3]} for r in result]
+
+        _, cursor = storage.query('history', limit=100)
+        print(f'{rows} history rows')
+        print(f'{"insert, row by row (est.)":<34} {single:>9.2f} s')
+        print(f'{"insert, bulk":<34} {bulk:>9.2f} s')
+        print(f'{"old get (all rows)":<34} {timed(old_get, 5):>9.2f} ms')
+        print(f'{"first page (100)":<34} {timed(lambda: storage.query("history")):>9.2f} ms')
+        print(f'{"next page via cursor":<34} {timed(lambda: storage.query("history", cursor=cursor)):>9.2f} ms')
+        print(f'{"keyword filter":<34} {timed(lambda: storage.query("history", keyword="keyword 42")):>9.2f} ms')
+        print(f'{"category + substring filter":<34} '
+              f'{timed(lambda: storage.query("history", category="jobs", q="word 19")):>9.2f} ms')
+        storage.configure(None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Local stub DNS server for benchmarks (requires dnspython)
+Answers A and AAAA queries from a dict over UDP; every other name is
+NXDOMAIN with an SOA record, and queries are counted
+"""
+
+import socket
+import threading
+import time
+
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.rrset
+
+
+class StubDnsServer:
+    """UDP DNS server answering from records {name: [ipv4 or ipv6, ...]}
+
+    A name listed without addresses of the queried family gets an empty
+    answer (the name exists but has no such records).
+
+    `latency` seconds are slept before every answer to simulate a remote
+    resolver; each query is handled on its own thread.
+    """
+
+    def __init__(self, records=None, ttl=300, negative_ttl=60, latency=0.0, host='127.0.0.1'):
+        self.records = {name.rstrip('.').lower(): addresses for name, addresses in (records or {}).items()}
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.latency = latency
+        self.queries = 0
+        self._lock = threading.Lock()
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind((host, 0))
+        self._running = False
+
+    @property
+    def port(self):
+        return self._sock.getsockname()[1]
+
+    def _answer(self, data, addr):
+        query = dns.message.from_wire(data)
+        with self._lock:
+            self.queries += 1
+        if self.latency:
+            time.sleep(self.latency)
+        response = dns.message.make_response(query)
+        question = query.question[0]
+        name = question.name.to_text().rstrip('.').lower()
+        addresses = self.records.get(name)
+        rdtype = dns.rdatatype.to_text(question.rdtype)
+        matching = [a for a in addresses or () if (':' in a) == (rdtype == 'AAAA')]
+        if matching and rdtype in ('A', 'AAAA'):
+            response.answer.append(dns.rrset.from_text(question.name, self.ttl, 'IN', rdtype, *matching))
+        else:
+            # NXDOMAIN, or an empty answer for a name that exists; both carry the zone's SOA
+            if addresses is None:
+                response.set_rcode(dns.rcode.NXDOMAIN)
+            response.authority.append(dns.rrset.from_text(
+                name.split('.', 1)[-1] + '.', self.negative_ttl, 'IN', 'SOA',
+                f'ns.stub. admin.stub. 1 3600 600 86400 {self.negative_ttl}'))
+        try:
+            self._sock.sendto(response.to_wire(), addr)
+        except OSError:
+            pass    # stopped while this answer was delayed
+
+    def _serve(self):
+        while self._running:
+            try:
+                data, addr = self._sock.recvfrom(4096)
+            except OSError:
+                break
+            threading.Thread(target=self._answer, args=(data, addr), daemon=True).start()
+
+    def start(self):
+        self._running = True
+        threading.Thread(target=self._serve, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._sock.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,121 @@
+"""
+Local fixture web server for benchmarks
+Serves canned pages over HTTP/1.1 keep-alive and counts TCP connections
+"""
+
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class _QuietServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        pass  # clients dropping keep-alive connections is expected
+
+
+class FixtureServer:
+    """Threaded HTTP server serving a dict of path -> (status, headers, body)
+
+    routes values may also be callables taking the request handler and
+    returning (status, headers, body); a callable that raises drops the
+    connection without a response. `latency` seconds are slept before
+    every response to simulate a remote host. `hosts` maps Host header
+    names to their own routes dicts (virtual hosts); other hosts get routes.
+    """
+
+    def __init__(self, routes=None, latency=0.0, host='127.0.0.1', port=0, hosts=None):
+        self.routes = routes or {}
+        self.hosts = hosts or {}
+        self.latency = latency
+        self.connections = 0
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        self._httpd = _QuietServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._httpd.server_address[1]
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.port}'
+
+    def reset_counters(self):
+        with self._lock:
+            self.connections = 0
+            self.requests = 0
+            self.peak_in_flight = 0
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def _respond(self, send_body):
+                with server._lock:
+                    server.requests += 1
+                    server.in_flight += 1
+                    server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+                try:
+                    if server.latency:
+                        time.sleep(server.latency)
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+                path = self.path.split('?', 1)[0]
+                routes = server.routes
+                if server.hosts:
+                    routes = server.hosts.get((self.headers.get('Host') or '').split(':')[0].lower(), routes)
+                route = routes.get(path)
+                if route is None:
+                    status, headers, body = 404, {'Content-Type': 'text/plain'}, b'not found'
+                elif callable(route):
+                    status, headers, body = route(self)
+                else:
+                    status, headers, body = route
+                if isinstance(body, str):
+                    body = body.encode('utf-8')
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._respond(True)
+
+            def do_HEAD(self):
+                self._respond(False)
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
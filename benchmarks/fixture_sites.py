@@ -0,0 +1,270 @@
+"""
+Corpus of realistic fixture sites for the benchmark suite
+Builds virtual hosts for FixtureServer: company sites with landing pages
+of different sizes, sitemap indexes (plain and gzipped), RSS feeds,
+careers and press pages and live subdomains, plus the third-party pages
+the routes query (Google, GitHub, Facebook Ad Library, WHOIS API).
+Some sites have failure modes: slow responses, intermittent 503s,
+dropped connections, redirect chains and a domain that does not resolve.
+
+install() sends the shared HTTP client and the resolver to the fixture
+server, so every route runs offline against the corpus.
+"""
+
+import gzip
+import itertools
+import random
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+from requests.exceptions import ConnectionError
+
+import http_client
+
+HTML = {'Content-Type': 'text/html; charset=utf-8'}
+XML = {'Content-Type': 'application/xml'}
+GZIP = {'Content-Type': 'application/x-gzip'}
+RSS = {'Content-Type': 'application/rss+xml'}
+JSON = {'Content-Type': 'application/json'}
+
+WORDS = ('crm automation platform analytics enterprise integration api dashboard pipeline workflow '
+         'customers revenue growth marketing sales support security cloud data team product').split()
+JOBS = ['Senior Software Engineer', 'Frontend Developer (React)', 'Backend Developer (Python)',
+        'DevOps Engineer', 'Data Engineer', 'Machine Learning Engineer', 'QA Engineer',
+        'Account Executive', 'Product Designer (UI/UX)', 'Customer Success Manager']
+
+# name -> options; 'missing' sites are not served and do not resolve
+SITES = {
+    'acme-saas.test': {'page_kb': 60, 'tech': ['wordpress', 'react', 'gtag'], 'sitemap_urls': 5000,
+                       'subdomains': ['blog', 'app', 'docs', 'api'], 'careers': True, 'press': True},
+    'bigshop.test': {'page_kb': 2048, 'tech': ['shopify', 'jquery', 'hotjar'], 'sitemap_urls': 20000,
+                     'subdomains': ['shop'], 'careers': False, 'press': False},
+    'slowcorp.test': {'page_kb': 120, 'tech': ['vue', 'bootstrap'], 'sitemap_urls': 500, 'latency': 0.25,
+                      'subdomains': [], 'careers': True, 'press': True},
+    'flaky.test': {'page_kb': 40, 'tech': ['angular'], 'sitemap_urls': 200, 'flaky': True,
+                   'subdomains': ['status'], 'careers': True, 'press': False},
+    'redirecty.test': {'page_kb': 30, 'tech': ['next'], 'sitemap_urls': 100, 'redirects': 2,
+                       'subdomains': [], 'careers': False, 'press': True},
+    'ghost.test': {'missing': True},
+}
+
+
+def _text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def landing_page(name, options, rng):
+    """Company landing page of about page_kb KB with tech markers, contacts and internal links"""
+    scripts = {
+        'wordpress': '<script src="/wp-content/themes/acme/app.js"></script>',
+        'react': '<script src="/static/js/react.production.min.js"></script>',
+        'gtag': '<script async src="https://www.googletagmanager.com/gtag/js?id=G-1"></script>',
+        'shopify': '<script src="https://cdn.shopify.com/s/files/theme.js"></script>',
+        'jquery': '<script src="/assets/jquery-1.12.4.min.js"></script>',
+        'hotjar': '<script src="https://static.hotjar.com/c/hotjar-1.js"></script>',
+        'vue': '<script src="/js/vue.min.js"></script>',
+        'bootstrap': '<link rel="stylesheet" href="/css/bootstrap-3.4.1.min.css">',
+        'angular': '<script src="/js/angular.min.js"></script>',
+        'next': '<script src="/_next/static/chunks/main.js"></script>',
+    }
+    company = name.split('.')[0].replace('-', ' ').title()
+    head = (f'<!DOCTYPE html><html><head><title>{company} | Enterprise CRM platform</title>'
+            f'<meta name="description" content="{company} helps teams automate sales pipelines.">'
+            f'<meta name="keywords" content="crm, automation, analytics">'
+            f'<meta property="og:title" content="{company}"><meta name="twitter:card" content="summary">'
+            f'<link rel="alternate" type="application/rss+xml" href="https://{name}/feed">'
+            + ''.join(scripts[t] for t in options['tech']) + '</head><body>')
+    nav = ''.join(f'<a href="https://{name}{path}">{path}</a>'
+                  for path in ('/about', '/contact', '/careers', '/press', '/blog', '/pricing'))
+    footer = (f'<footer>Contact sales@{name} or support@{name}, call +1 (555) 010-{rng.randint(1000, 9999)}. '
+              f'<a href="https://www.linkedin.com/company/{company.lower().replace(" ", "-")}">LinkedIn</a> '
+              f'<a href="https://twitter.com/{company.lower().replace(" ", "")}">Twitter</a> '
+              f'<a href="https://github.com/{company.lower().replace(" ", "")}">GitHub</a>'
+              f'<a href="https://www.salesforce.com">Salesforce partner</a> <a href="https://stripe.com">Stripe</a>'
+              f'</footer></body></html>')
+    blocks = []
+    size = len(head) + len(nav) + len(footer)
+    while size < options['page_kb'] * 1024:
+        block = (f'<section class="card"><h2>{_text(rng, 4)}</h2><p>{_text(rng, 60)}</p>'
+                 f'<a href="https://{name}/blog/post-{rng.randint(1, 500)}">Read more</a>'
+                 f'<img src="/img/{rng.randint(1, 99)}.png" alt="{_text(rng, 3)}"></section>\n')
+        blocks.append(block)
+        size += len(block)
+    return head + nav + ''.join(blocks) + footer
+
+
+def sitemaps(name, count, rng):
+    """Sitemap index with a plain and a gzipped child holding count URLs in total"""
+    def urlset(start, stop):
+        entries = ''.join(
+            f'<url><loc>https://{name}/{rng.choice(("blog", "products", "docs", "news"))}/page-{i}</loc>'
+            f'<lastmod>20{rng.randint(22, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}</lastmod></url>'
+            for i in range(start, stop))
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">' + entries + '</urlset>')
+
+    half = count // 2
+    index = ('<?xml version="1.0" encoding="UTF-8"?>'
+             '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+             f'<sitemap><loc>https://{name}/sitemap-posts.xml</loc></sitemap>'
+             f'<sitemap><loc>https://{name}/sitemap-pages.xml.gz</loc></sitemap></sitemapindex>')
+    return {
+        '/sitemap.xml': (200, XML, index),
+        '/sitemap-posts.xml': (200, XML, urlset(0, half)),
+        '/sitemap-pages.xml.gz': (200, GZIP, gzip.compress(urlset(half, count).encode())),
+    }
+
+
+def feed(name, rng):
+    items = ''.join(f'<item><title>{_text(rng, 6)}</title><link>https://{name}/blog/post-{i}</link>'
+                    f'<pubDate>Mon, {rng.randint(1, 28):02d} Sep 2025 10:00:00 GMT</pubDate></item>'
+                    for i in range(20))
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>{name}</title>{items}</channel></rss>'
+
+
+def careers_page(name, rng):
+    jobs = ''.join(f'<li class="job"><h3>{title}</h3><p>{_text(rng, 30)}</p></li>'
+                   for title in rng.sample(JOBS, 6))
+    return (f'<html><head><title>Careers at {name}</title></head><body><h1>We\'re hiring! Join our team</h1>'
+            f'<p>Open positions: 6</p><ul>{jobs}</ul></body></html>')
+
+
+def press_page(name, rng):
+    posts = ''.join(f'<article><h2>Announcing {_text(rng, 3)}: new product launch</h2>'
+                    f'<time>2025-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}</time><p>{_text(rng, 40)}</p></article>'
+                    for _ in range(8))
+    return f'<html><head><title>Press | {name}</title></head><body>{posts}</body></html>'
+
+
+def _slow(route, seconds):
+    def slow(handler):
+        time.sleep(seconds)
+        return route(handler) if callable(route) else route
+    return slow
+
+
+def _flaky(route):
+    """Every other request fails with a 503; the first request of a pair succeeds"""
+    counter = itertools.count()
+
+    def flaky(handler):
+        if next(counter) % 2:
+            return 503, {'Content-Type': 'text/plain', 'Retry-After': '1'}, 'Service Unavailable'
+        return route(handler) if callable(route) else route
+    return flaky
+
+
+def _dropped(handler):
+    raise ConnectionResetError('fixture drops this connection')
+
+
+def site_routes(name, options, rng):
+    routes = {
+        '/': (200, HTML, landing_page(name, options, rng)),
+        '/about': (200, HTML, f'<html><body><h1>About</h1><p>{_text(rng, 200)}</p></body></html>'),
+        '/contact': (200, HTML, f'<html><body>Email hello@{name}, phone +44 20 7946 0{rng.randint(100, 999)}'
+                                f'</body></html>'),
+        '/robots.txt': (200, {'Content-Type': 'text/plain'}, f'User-agent: *\nSitemap: https://{name}/sitemap.xml\n'),
+        '/feed': (200, RSS, feed(name, rng)),
+        '/rss.xml': (200, RSS, feed(name, rng)),
+    }
+    routes.update(sitemaps(name, options['sitemap_urls'], rng))
+    if options['careers']:
+        routes['/careers'] = (200, HTML, careers_page(name, rng))
+        routes['/jobs'] = routes['/careers']
+    if options['press']:
+        routes['/press'] = (200, HTML, press_page(name, rng))
+        routes['/news'] = routes['/press']
+    if options.get('redirects'):
+        # / -> /home -> /index: a redirect chain before the landing page
+        routes['/index'] = routes['/']
+        routes['/home'] = (301, {'Location': f'https://{name}/index'}, '')
+        routes['/'] = (302, {'Location': f'https://{name}/home'}, '')
+    if options.get('flaky'):
+        routes = {path: _flaky(route) for path, route in routes.items()}
+        routes['/rss.xml'] = _dropped
+    if options.get('latency'):
+        routes = {path: _slow(route, options['latency']) for path, route in routes.items()}
+    return routes
+
+
+def service_routes(rng):
+    """Third-party pages the routes query, keyed by host"""
+    def google(handler):
+        results = ''.join(
+            f'<div class="g"><a href="https://example{i}.test/"><h3>{_text(rng, 5)}</h3></a>'
+            f'<div class="VwiC3b">{_text(rng, 25)}</div></div>' for i in range(10))
+        results += '<a href="https://www.linkedin.com/company/acme-saas">Acme SaaS | LinkedIn</a>'
+        return 200, HTML, f'<html><body><div id="search">{results}</div></body></html>'
+
+    github = ''.join(f'<div><a class="v-align-middle" href="/acme/repo-{i}">acme/repo-{i}</a>'
+                     f'<p>{_text(rng, 12)}</p><span>Python</span><a href="/acme/repo-{i}/stargazers">1{i}2</a></div>'
+                     for i in range(10))
+    ads = '<html><body>' + ''.join(f'<div class="ad">{_text(rng, 20)}</div>' for _ in range(15)) + '</body></html>'
+    whois = ('{"WhoisRecord": {"domainName": "acme-saas.test", "createdDate": "2015-03-01T00:00:00Z", '
+             '"registrarName": "Fixture Registrar", "registrant": {"organization": "Acme SaaS Inc"}}}')
+    return {
+        'www.google.com': {'/search': google},
+        'github.com': {'/search': (200, HTML, f'<html><body>{github}</body></html>')},
+        'www.facebook.com': {'/ads/library/': (200, HTML, ads)},
+        'www.whoisxmlapi.com': {'/whoisserver/WhoisService': (200, JSON, whois)},
+    }
+
+
+def build_hosts(seed=7):
+    """Host -> routes for every served site, subdomain and service"""
+    rng = random.Random(seed)
+    hosts = {}
+    for name, options in SITES.items():
+        if options.get('missing'):
+            continue
+        routes = site_routes(name, options, rng)
+        hosts[name] = routes
+        hosts['www.' + name] = routes
+        for sub in options['subdomains']:
+            hosts[f'{sub}.{name}'] = {'/': (200, HTML, f'<html><title>{sub}</title><body>{_text(rng, 50)}</body></html>')}
+    hosts.update(service_routes(rng))
+    return hosts
+
+
+class OfflineAdapter(http_client._TimedAdapter):
+    """Sends every request to the fixture server (as a virtual host) and refuses unknown hosts"""
+
+    def __init__(self, server, **kwargs):
+        self.server = server
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        host = (parts.hostname or '').lower()
+        if host not in self.server.hosts:
+            raise ConnectionError(f'offline: no fixture for {host}', request=request)
+        local = request.copy()
+        local.url = urlunsplit(('http', f'127.0.0.1:{self.server.port}', parts.path or '/', parts.query, ''))
+        local.headers['Host'] = host
+        response = super().send(local, **kwargs)
+        response.url = request.url
+        response.request = request
+        return response
+
+
+def install(server):
+    """Route http_client and the resolver to the fixture server; returns a function that undoes it"""
+    import resolver
+
+    def lookup(host, timeout):
+        if host in server.hosts:
+            return resolver.OK, ['127.0.0.1'], 300
+        return resolver.NXDOMAIN, [], 300
+
+    http_client.close()
+    session = http_client.get_session()
+    adapter = OfflineAdapter(server, pool_connections=16, pool_maxsize=32)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    resolver.configure(lookup=lookup)
+
+    def uninstall():
+        http_client.close()
+        resolver.configure()
+    return uninstall
@@ -0,0 +1,220 @@
+"""
+Offline benchmark suite: every scraping route against a local fixture web
+Starts the fixture server with the corpus from fixture_sites.py (company
+sites with sitemaps, feeds, careers and press pages, a 2 MB page, a slow
+host, a flaky host, a redirect chain, a domain that doesn't resolve and
+stand-ins for Google / GitHub / Facebook / WHOIS) and sends the shared HTTP
+client and the resolver to it. No request leaves the machine. Each route in
+scraper_core, scraper_osint and scraper is driven through the Flask test
+client:
+
+    cold        caches cleared before every request (page, probe, sitemap, DNS, HTTP)
+    warm        caches kept, after one priming request
+    throughput  warm requests from --concurrency threads at once
+    memory      tracemalloc peak of one cold request
+
+Latency p50 / p95 / mean, status codes, throughput and peak memory are
+written as JSON to --out and summarized as a table. Politeness is off
+unless --polite is given, so the numbers measure the code, not the limits.
+
+    python benchmarks/run_suite.py [--iterations 5] [--concurrency 8] [--out bench_results.json]
+                                   [--routes /api/tech/detect,...] [--polite]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import resource
+except ImportError:
+    resource = None     # Windows
+
+from fixture_server import FixtureServer
+import fixture_sites
+
+SITES = ['acme-saas.test', 'bigshop.test', 'slowcorp.test', 'flaky.test', 'redirecty.test', 'ghost.test']
+COMPANIES = [('Acme SaaS', 'acme-saas.test'), ('Big Shop', 'bigshop.test'), ('Slow Corp', 'slowcorp.test'),
+             ('Ghost', 'ghost.test')]
+
+
+def _url_cases(build):
+    return [(site, build(f'https://{site}')) for site in SITES]
+
+
+# (method, path, [(case name, JSON payload)])
+ROUTES = [
+    ('POST', '/api/scrape/contacts', _url_cases(lambda url: {'url': url})),
+    ('POST', '/api/scrape/contacts/crawl', _url_cases(lambda url: {'url': url, 'max_pages': 10, 'deadline': 10})),
+    ('POST', '/api/whois/lookup', [(site, {'domain': site}) for site in SITES]),
+    ('POST', '/api/tech/detect', _url_cases(lambda url: {'url': url})),
+    ('POST', '/api/sitemap/parse', _url_cases(lambda url: {'url': url})),
+    ('POST', '/api/metadata/extract', _url_cases(lambda url: {'url': url})),
+    ('GET', '/api/cache/stats', [('-', None)]),
+    ('POST', '/api/dork/search', [('contacts', {'query': 'site:linkedin.com/company "crm"'})]),
+    ('POST', '/api/osint/github', [(name, {'company': name}) for name, _ in COMPANIES]),
+    ('POST', '/api/osint/feeds', _url_cases(lambda url: {'url': url})),
+    ('POST', '/api/osint/competitors', _url_cases(lambda url: {'url': url})),
+    ('POST', '/api/osint/keywords', _url_cases(lambda url: {'url': url, 'keywords': ['crm', 'automation']})),
+    ('POST', '/api/osint/score', _url_cases(lambda url: {'url': url})),
+    ('POST', '/api/keywords/discover', [('crm', {'keyword': 'crm software'})]),
+    ('POST', '/api/growth/signals', _url_cases(lambda url: {'url': url})),
+    ('POST', '/api/profile/aggregate', [(domain, {'domain': domain, 'company_name': name})
+                                        for name, domain in COMPANIES]),
+    ('POST', '/api/tech/health', _url_cases(lambda url: {'url': url})),
+    ('POST', '/api/jobs/intelligence', [(domain, {'url': f'https://{domain}', 'company_name': name})
+                                        for name, domain in COMPANIES]),
+    ('POST', '/api/business/intelligence', [(domain, {'company_name': name, 'domain': domain})
+                                            for name, domain in COMPANIES]),
+]
+
+
+def clear_caches():
+    """Forget everything cached in memory and in the HTTP cache"""
+    import http_cache
+    import page_cache
+    import probe
+    import resolver
+    import sitemap
+
+    page_cache.cache.clear()
+    probe.outcomes.clear()
+    sitemap.summaries.clear()
+    resolver.get_resolver().cache.clear()
+    http_cache.clear()
+
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, round(q * (len(values) - 1))))
+    return values[index]
+
+
+def summarize(latencies):
+    return {
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'mean_ms': round(statistics.mean(latencies) * 1000, 2),
+        'samples': len(latencies),
+    }
+
+
+def call(client, method, path, payload):
+    start = time.perf_counter()
+    response = client.open(path, method=method, json=payload)
+    elapsed = time.perf_counter() - start
+    return elapsed, response.status_code, len(response.get_data())
+
+
+def bench_case(app, method, path, payload, iterations, concurrency):
+    client = app.test_client()
+    result = {}
+    statuses = Counter()
+
+    cold = []
+    for _ in range(iterations):
+        clear_caches()
+        elapsed, status, size = call(client, method, path, payload)
+        cold.append(elapsed)
+        statuses[status] += 1
+    result['cold'] = summarize(cold)
+    result['response_bytes'] = size
+
+    call(client, method, path, payload)
+    warm = []
+    for _ in range(iterations):
+        elapsed, status, _ = call(client, method, path, payload)
+        warm.append(elapsed)
+        statuses[status] += 1
+    result['warm'] = summarize(warm)
+
+    requests_total = iterations * concurrency
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(lambda _: call(app.test_client(), method, path, payload)[1],
+                                 range(requests_total)))
+    elapsed = time.perf_counter() - start
+    statuses.update(outcomes)
+    result['throughput_rps'] = round(requests_total / elapsed, 2)
+
+    clear_caches()
+    tracemalloc.start()
+    call(client, method, path, payload)
+    result['peak_memory_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    tracemalloc.stop()
+
+    result['status_codes'] = {str(code): count for code, count in sorted(statuses.items())}
+    result['errors'] = sum(count for code, count in statuses.items() if code >= 500)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--iterations', type=int, default=5, help='cold and warm requests per case')
+    parser.add_argument('--concurrency', type=int, default=8, help='threads in the throughput pass')
+    parser.add_argument('--out', default='bench_results.json', help='JSON report path')
+    parser.add_argument('--routes', help='comma separated route paths to run (default: all)')
+    parser.add_argument('--polite', action='store_true', help='keep per-host politeness limits on')
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ['APPDATA'] = tmp.name      # app.py keeps its database and HTTP cache there
+    import app as application
+    import parsing
+    import politeness
+
+    app = application.app
+    politeness.configure(enabled=args.polite)
+    routes = [r for r in ROUTES if not args.routes or r[1] in args.routes.split(',')]
+
+    results = []
+    with FixtureServer(hosts=fixture_sites.build_hosts()) as web:
+        uninstall = fixture_sites.install(web)
+        try:
+            for method, path, cases in routes:
+                for case, payload in cases:
+                    web.reset_counters()
+                    row = {'route': path, 'method': method, 'case': case}
+                    row.update(bench_case(app, method, path, payload, args.iterations, args.concurrency))
+                    row['upstream_requests'] = web.requests
+                    results.append(row)
+                    print(f"{path:<30} {case:<16} cold p50 {row['cold']['p50_ms']:8.1f} ms  "
+                          f"p95 {row['cold']['p95_ms']:8.1f}   warm p50 {row['warm']['p50_ms']:8.1f} ms  "
+                          f"p95 {row['warm']['p95_ms']:8.1f}   {row['throughput_rps']:8.1f} req/s  "
+                          f"peak {row['peak_memory_kb'] / 1024:6.1f} MB  {row['status_codes']}", flush=True)
+        finally:
+            uninstall()
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'parser_backend': parsing.backend(),
+            'iterations': args.iterations,
+            'concurrency': args.concurrency,
+            'polite': args.polite,
+            'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+        },
+        'results': results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'{len(results)} cases, report written to {args.out}')
+
+
+if __name__ == '__main__':
+    main()
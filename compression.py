@@ -0,0 +1,149 @@
+"""
+Response compression and the in-memory UI page
+index.html is read once (and again only when the file changes) and compressed
+right away in every encoding: gzip, and brotli when the brotli package is
+installed, so no request pays for compressing it.
+It is served with an ETag, so a browser that already has the page gets a
+304. JSON responses of MIN_SIZE bytes or more are compressed when the client
+accepts it. Streamed NDJSON (batch enrichment) is compressed chunk by chunk
+with a sync flush, so each result line still reaches the client as soon as
+it is ready.
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+import zlib
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MIN_SIZE = 1024             # smaller responses are sent as they are
+JSON_GZIP_LEVEL = 6
+JSON_BROTLI_QUALITY = 4     # fast enough per response; about the size of gzip -6
+STATIC_GZIP_LEVEL = 9
+STATIC_BROTLI_QUALITY = 9   # 11 takes ~200 ms on index.html, paid on every reload of the file
+COMPRESSIBLE = ('application/json', 'application/x-ndjson')
+
+
+def encodings():
+    """Supported encodings, preferred first"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encodings):
+    """Best encoding the client accepts (werkzeug Accept header), or None"""
+    best, best_quality = None, 0
+    for name in encodings():
+        quality = accept_encodings[name]
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def compress(data, encoding, static=False):
+    if encoding == 'br':
+        return brotli.compress(data, quality=STATIC_BROTLI_QUALITY if static else JSON_BROTLI_QUALITY)
+    return gzip.compress(data, STATIC_GZIP_LEVEL if static else JSON_GZIP_LEVEL, mtime=0)
+
+
+def _compress_stream(chunks, encoding):
+    """Compress an iterable of chunks, flushing after each so no line is held back"""
+    try:
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=JSON_BROTLI_QUALITY)
+            for chunk in chunks:
+                yield compressor.process(chunk.encode() if isinstance(chunk, str) else chunk) + compressor.flush()
+            yield compressor.finish()
+        else:
+            compressor = zlib.compressobj(JSON_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+            for chunk in chunks:
+                yield (compressor.compress(chunk.encode() if isinstance(chunk, str) else chunk) +
+                       compressor.flush(zlib.Z_SYNC_FLUSH))
+            yield compressor.flush()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()     # client went away: stop the producer too
+
+
+class StaticAsset:
+    """A file served from memory, with an ETag and one precompressed body per encoding"""
+
+    def __init__(self, path, mimetype):
+        self.path = path
+        self.mimetype = mimetype
+        self.etag = None
+        self._mtime = None
+        self._bodies = {}       # encoding (None for identity) -> bytes
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Read and compress the file if it is new or changed; False if it doesn't exist"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return False
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    with open(self.path, 'rb') as f:
+                        data = f.read()
+                    bodies = {None: data}
+                    for encoding in encodings():
+                        bodies[encoding] = compress(data, encoding, static=True)
+                    self._bodies = bodies
+                    self.etag = hashlib.blake2b(data, digest_size=12).hexdigest()
+                    self._mtime = mtime
+        return True
+
+    def body(self, encoding=None):
+        return self._bodies[encoding]
+
+    def response(self, req):
+        """Response for req (a werkzeug request): 304 when its ETag matches, else the best encoding; None if missing"""
+        if not self._load():
+            return None
+        if req.if_none_match.contains_weak(self.etag):
+            response = Response(status=304)
+        else:
+            encoding = choose_encoding(req.accept_encodings)
+            response = Response(self.body(encoding), mimetype=self.mimetype)
+            if encoding is not None:
+                response.headers['Content-Encoding'] = encoding
+        # One weak ETag for every encoding of the same content
+        response.set_etag(self.etag, weak=True)
+        response.headers['Cache-Control'] = 'no-cache'      # always revalidate: a new version shows at once
+        response.vary.add('Accept-Encoding')
+        return response
+
+
+def compress_response(response):
+    """after_request: compress JSON / NDJSON responses the client accepts compressed"""
+    if (response.mimetype not in COMPRESSIBLE or 'Content-Encoding' in response.headers
+            or response.status_code < 200 or response.status_code in (204, 304)):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < MIN_SIZE:
+            return response
+        response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_app(app):
+    """Compress responses; registered before other after_request hooks so it runs after them"""
+    app.after_request(compress_response)
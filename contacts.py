@@ -0,0 +1,99 @@
+"""
+Contact extraction shared by every endpoint
+Precompiled patterns; one scan of the visible text (emails, phones, social
+URLs) and one scan of the raw markup (mailto:/tel: hrefs, social links)
+"""
+
+import re
+import time
+from urllib.parse import unquote
+
+import metrics
+
+EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b'
+PHONE_PATTERN = r'(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
+SOCIAL_PATTERN = (r'https?://(?:www\.)?'
+                  r'(?:linkedin\.com/(?:company|in)/|(?:twitter|x)\.com/|facebook\.com/'
+                  r'|instagram\.com/|youtube\.com/|github\.com/)[^\s<>"]+')
+
+EMAIL_RE = re.compile(EMAIL_PATTERN)
+PHONE_RE = re.compile(PHONE_PATTERN)
+SOCIAL_RE = re.compile(SOCIAL_PATTERN)
+LINKEDIN_COMPANY_RE = re.compile(r'https?://(?:www\.)?linkedin\.com/company/[\w-]+')
+TWITTER_RE = re.compile(r'https?://(?:www\.)?twitter\.com/[\w]+')
+
+# Text scan: the first alternative that matches at a position wins, so digits
+# inside an email address or profile URL are never reported as a phone number
+TEXT_RE = re.compile(f'(?P<email>{EMAIL_PATTERN})|(?P<social>{SOCIAL_PATTERN})|(?P<phone>{PHONE_PATTERN})')
+MARKUP_RE = re.compile(r'''(?P<mailto>mailto:[^"'\s<>]+)|(?P<tel>tel:[^"'\s<>]+)|(?P<social>''' + SOCIAL_PATTERN + ')',
+                       re.IGNORECASE)
+
+SOCIAL_PLATFORMS = [
+    ('linkedin.com', 'LinkedIn'),
+    ('twitter.com', 'Twitter'),
+    ('x.com', 'Twitter'),
+    ('facebook.com', 'Facebook'),
+    ('instagram.com', 'Instagram'),
+    ('youtube.com', 'YouTube'),
+    ('github.com', 'GitHub'),
+]
+
+
+def social_platform(url):
+    """Platform name for a profile URL matched by SOCIAL_RE"""
+    host = url.split('/', 3)[2].lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    for domain, platform in SOCIAL_PLATFORMS:
+        if host == domain:
+            return platform
+    return None
+
+
+def extract_contacts(text, html=''):
+    """Emails, phones and the first profile per social platform
+
+    text is the page's visible text, html its raw markup. Results keep
+    first-seen order; text matches come before markup matches.
+    """
+    start = time.perf_counter()
+    emails = {}
+    phones = {}
+    social = {}
+
+    for match in TEXT_RE.finditer(text):
+        kind = match.lastgroup
+        value = match.group()
+        if kind == 'email':
+            emails.setdefault(value, None)
+        elif kind == 'phone':
+            phones.setdefault(value, None)
+        else:
+            social.setdefault(social_platform(value), value)
+
+    for match in MARKUP_RE.finditer(html):
+        kind = match.lastgroup
+        value = match.group()
+        if kind == 'mailto':
+            for address in unquote(value[7:].split('?', 1)[0]).split(','):
+                address = address.strip()
+                if EMAIL_RE.fullmatch(address):
+                    emails.setdefault(address, None)
+        elif kind == 'tel':
+            number = unquote(value[4:]).strip()
+            if number:
+                phones.setdefault(number, None)
+        else:
+            social.setdefault(social_platform(value), value)
+
+    metrics.phase('contacts', time.perf_counter() - start)
+    return {
+        'emails': list(emails),
+        'phones': list(phones),
+        'social_links': social,
+    }
+
+
+def find_emails(text):
+    """Unique email addresses in text, first-seen order"""
+    return list(dict.fromkeys(EMAIL_RE.findall(text)))
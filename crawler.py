@@ -0,0 +1,269 @@
+"""
+Bounded site crawler
+Crawls one site breadth-first up to a page budget, a depth and a deadline,
+fetching several pages at once through the shared page cache (and so
+through per-host politeness). Links are canonicalized before they are queued.
+The frontier is ordered so that contact-like pages (contact, about, team,
+careers) come first, then the rest by depth. The visited set is a plain
+set for normal budgets and a Bloom filter for large ones. crawl_contacts()
+merges the contacts found on every page into one deduplicated result.
+"""
+
+import hashlib
+import heapq
+import math
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+
+import contacts
+import http_client
+import page_cache
+import parsing
+import politeness
+
+DEFAULT_PAGES = 50
+MAX_PAGES = 500
+DEFAULT_DEPTH = 3
+MAX_DEPTH = 8
+DEFAULT_WORKERS = politeness.DEFAULT_CONCURRENCY
+DEFAULT_DEADLINE = 30       # seconds for the whole crawl
+PAGE_TIMEOUT = 10
+PAGE_READ = 1024 * 1024     # bytes read per page
+LINKS_PER_PAGE = 100        # links queued per page at most
+BLOOM_THRESHOLD = 200       # page budgets above this track visited URLs in a Bloom filter
+BLOOM_ERROR_RATE = 0.001
+MAX_CONTACTS = 50           # emails / phones in a merged result
+
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'msclkid', 'mc_cid', 'mc_eid', '_ga', '_hs')
+SKIP_EXTENSIONS = re.compile(
+    r'\.(?:jpe?g|png|gif|svg|webp|ico|bmp|pdf|zip|gz|rar|7z|mp[34]|mov|avi|webm|woff2?|ttf|eot|'
+    r'css|js|json|xml|rss|txt|csv|xlsx?|docx?|pptx?|dmg|exe|apk)$', re.IGNORECASE)
+
+# Path patterns and their priority; the first match wins
+PRIORITY_PATTERNS = [
+    (re.compile(r'contact|kontakt|contacto|get-in-touch|reach-us|enquir|inquir'), 100),
+    (re.compile(r'about|impressum|imprint|who-we-are|company'), 60),
+    (re.compile(r'team|people|staff|leadership|management|founders'), 50),
+    (re.compile(r'careers?|jobs|hiring|join-us'), 30),
+    (re.compile(r'support|help|locations?|offices?|legal|privacy'), 10),
+    (re.compile(r'blog|news|tags?/|category|categories|/page/\d|products?/|shop|cart|login|signin|search'), -20),
+]
+
+
+class BloomFilter:
+    """Fixed-size set of strings with a false positive rate of about error_rate at capacity
+
+    A false positive makes the crawler skip a URL it has not seen, which
+    costs a page of coverage and nothing else.
+    """
+
+    def __init__(self, capacity, error_rate=BLOOM_ERROR_RATE):
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        """Add item; returns False if it was (probably) already present"""
+        new = False
+        for pos in self._positions(item):
+            mask = 1 << (pos & 7)
+            if not self.bits[pos >> 3] & mask:
+                self.bits[pos >> 3] |= mask
+                new = True
+        self.count += new
+        return new
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def __len__(self):
+        return self.count
+
+
+class _Visited(set):
+    def add(self, item):
+        if item in self:
+            return False
+        super().add(item)
+        return True
+
+
+def visited_set(max_pages):
+    """Exact set for normal budgets, Bloom filter sized for the links of max_pages pages beyond that"""
+    if max_pages <= BLOOM_THRESHOLD:
+        return _Visited()
+    return BloomFilter(max_pages * LINKS_PER_PAGE)
+
+
+def canonicalize(url, base=None):
+    """Canonical form of a (possibly relative) link, or None for non-web links and files
+
+    Resolves against base, drops the fragment and tracking parameters,
+    collapses repeated slashes and normalizes case, port and query order.
+    """
+    url = url.strip()
+    if base is not None:
+        url = urljoin(base, url)
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        return None
+    path = re.sub(r'/{2,}', '/', parts.path) or '/'
+    if SKIP_EXTENSIONS.search(path):
+        return None
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if not k.lower().startswith(TRACKING_PARAMS)])
+    return page_cache.normalize_url(urlunsplit((parts.scheme, parts.netloc, path, query, '')))
+
+
+def site_key(host):
+    """Hosts that belong to the same site (example.com and www.example.com)"""
+    host = (host or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def priority(url):
+    """Crawl priority of a URL from its path; higher is fetched sooner"""
+    path = urlsplit(url).path.lower()
+    for pattern, score in PRIORITY_PATTERNS:
+        if pattern.search(path):
+            return score
+    return 0
+
+
+def _fetch(url, extract):
+    """Worker: fetch and parse one page; returns (page, links, extracted)"""
+    page = page_cache.fetch_page(url, timeout=PAGE_TIMEOUT, max_bytes=PAGE_READ)
+    if page.status_code >= 400 or 'html' not in page.headers.get('Content-Type', 'text/html'):
+        return page, [], None
+    doc = parsing.parse_fast(page.text)
+    return page, parsing.links(doc), extract(page.url, page, doc) if extract else None
+
+
+def crawl(start_url, extract=None, max_pages=DEFAULT_PAGES, max_depth=DEFAULT_DEPTH,
+          workers=DEFAULT_WORKERS, deadline=DEFAULT_DEADLINE):
+    """Crawl start_url's site; extract(url, page, doc) runs on every HTML page in a worker
+
+    Returns {'pages': [...], 'results': [(url, extracted), ...], 'stopped': reason, 'elapsed': s}.
+    stopped is 'done' (frontier exhausted), 'max_pages' or 'deadline'.
+    """
+    start = time.monotonic()
+    max_pages = max(1, min(int(max_pages), MAX_PAGES))
+    max_depth = max(0, min(int(max_depth), MAX_DEPTH))
+    start_url = canonicalize(start_url)
+    if start_url is None:
+        raise ValueError('Invalid URL')
+    parts = urlsplit(start_url)
+    sites = {site_key(parts.hostname)}
+
+    try:
+        rules = politeness.robots_rules(f'{parts.scheme}://{parts.netloc}')
+    except Exception:
+        rules = None
+    agent = http_client.get_headers()['User-Agent']
+
+    seen = visited_set(max_pages)
+    frontier = []
+    sequence = 0
+
+    def push(url, depth):
+        nonlocal sequence
+        if rules is not None and not rules.can_fetch(agent, url):
+            return
+        if seen.add(url):
+            sequence += 1
+            heapq.heappush(frontier, (-priority(url), depth, sequence, url))
+
+    push(start_url, 0)
+    pages, results = [], []
+    in_flight = {}
+    stopped = 'done'
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='crawl')
+    try:
+        while frontier or in_flight:
+            while frontier and len(in_flight) < workers and len(pages) + len(in_flight) < max_pages:
+                _, depth, _, url = heapq.heappop(frontier)
+                in_flight[executor.submit(_fetch, url, extract)] = (url, depth)
+            if not in_flight:
+                stopped = 'max_pages'
+                break
+            remaining = deadline - (time.monotonic() - start)
+            done, _ = wait(in_flight, timeout=max(0, remaining), return_when=FIRST_COMPLETED)
+            if not done:
+                stopped = 'deadline'
+                break
+
+            for future in done:
+                url, depth = in_flight.pop(future)
+                try:
+                    page, links, extracted = future.result()
+                except Exception as e:
+                    pages.append({'url': url, 'depth': depth, 'status': None, 'error': str(e)})
+                    continue
+                pages.append({'url': url, 'depth': depth, 'status': page.status_code})
+                if extracted is not None:
+                    results.append((url, extracted))
+
+                final = canonicalize(page.url) or url
+                if depth == 0:
+                    sites.add(site_key(urlsplit(final).hostname))    # follow the start page's redirect
+                seen.add(final)
+                if depth >= max_depth:
+                    continue
+                for link in links[:LINKS_PER_PAGE]:
+                    link = canonicalize(link, final)
+                    if link is not None and site_key(urlsplit(link).hostname) in sites:
+                        push(link, depth + 1)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return {'pages': pages, 'results': results, 'stopped': stopped,
+            'elapsed': round(time.monotonic() - start, 3)}
+
+
+def merge_contacts(results):
+    """One contact result from per-page contacts, with the pages each email / phone was found on"""
+    emails, phones, social, found_on = {}, {}, {}, {}
+    for url, found in results:
+        for email in found['emails']:
+            value = emails.setdefault(email.lower(), email)
+            found_on.setdefault(value, []).append(url)
+        for phone in found['phones']:
+            value = phones.setdefault(re.sub(r'\D', '', phone), phone)
+            found_on.setdefault(value, []).append(url)
+        for platform, link in found['social_links'].items():
+            social.setdefault(platform, link)
+    emails = list(emails.values())[:MAX_CONTACTS]
+    phones = list(phones.values())[:MAX_CONTACTS]
+    return {
+        'emails': emails,
+        'phones': phones,
+        'social_links': social,
+        'found_on': {value: sorted(set(found_on[value])) for value in emails + phones},
+    }
+
+
+def _page_contacts(url, page, doc):
+    return contacts.extract_contacts(parsing.text_content(doc), page.text)
+
+
+def crawl_contacts(url, max_pages=DEFAULT_PAGES, max_depth=DEFAULT_DEPTH, deadline=DEFAULT_DEADLINE):
+    """Crawl a site and merge the contacts of every page it reached"""
+    result = crawl(url, _page_contacts, max_pages=max_pages, max_depth=max_depth, deadline=deadline)
+    merged = merge_contacts(result['results'])
+    merged.update({
+        'url': url,
+        'pages_crawled': len(result['pages']),
+        'pages': result['pages'],
+        'stopped': result['stopped'],
+        'elapsed': result['elapsed'],
+    })
+    return merged
@@ -0,0 +1,225 @@
+"""
+Content fingerprints and change detection for re-scans
+Every page analysis (/api/analyze/full and the single-page contact, tech
+and metadata endpoints) stores a fingerprint of the page: a hash of its
+markup with volatile parts removed (comments, nonces, CSRF tokens,
+whitespace) plus the response headers that tech detection reads. The
+analysis result is stored with it. A re-scan still fetches the page, which
+is usually a 304 revalidation through http_cache. When the fingerprint is
+unchanged, the stored result is returned without parsing or extracting.
+
+Each scan also keeps the page's tech stack and contacts. When a later scan
+finds the page, its tech or its contacts different, a change row records
+what was added and removed. /api/changes reports these changes.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+import parsing
+import signatures
+import storage
+
+RETENTION = 180 * 86400     # cached analyses not rescanned for this long are dropped
+PRUNE_EVERY = 1000          # scans between retention sweeps
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+KINDS = ('page', 'tech', 'contacts')
+
+# Headers whose value can change a result; other headers signatures read only count as present / absent
+VALUE_HEADERS = ('server', 'x-powered-by', 'x-generator')
+
+# Volatile markup; separate patterns with literal prefixes scan far faster than one alternation
+VOLATILE_PATTERNS = [
+    re.compile(r'<!--.*?-->', re.DOTALL),       # comments (build ids, timings)
+    re.compile(r'nonce="[^"]*"'),               # CSP nonces
+    re.compile(r'<(?:input|meta)\b[^>]*(?:csrf|token|authenticity)[^>]*>', re.IGNORECASE),     # per-request tokens
+]
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS analysis_cache (
+            url TEXT, variant TEXT, content_hash TEXT, result TEXT, scanned_at REAL,
+            PRIMARY KEY (url, variant))""",
+    'CREATE INDEX IF NOT EXISTS idx_analysis_cache_scanned ON analysis_cache(scanned_at)',
+    """CREATE TABLE IF NOT EXISTS page_state (
+            url TEXT PRIMARY KEY, content_hash TEXT, tech TEXT, contacts TEXT,
+            first_seen REAL, scanned_at REAL, changed_at REAL)""",
+    """CREATE TABLE IF NOT EXISTS changes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT, kind TEXT, added TEXT, removed TEXT,
+            detected_at REAL)""",
+    'CREATE INDEX IF NOT EXISTS idx_changes_detected ON changes(detected_at)',
+    'CREATE INDEX IF NOT EXISTS idx_changes_url ON changes(url)',
+]
+
+storage.register_schema(SCHEMA)
+
+_scans = 0
+_lookups = {'hits': 0, 'misses': 0}
+_counter_lock = threading.Lock()     # guards _scans and _lookups
+
+
+def normalize(html):
+    """Markup with volatile parts removed and whitespace collapsed"""
+    for pattern in VOLATILE_PATTERNS:
+        html = pattern.sub('', html)
+    return ' '.join(html.split())
+
+
+def content_hash(page):
+    """Fingerprint of a fetched page: normalized body plus the headers tech detection depends on"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(page.status_code).encode())
+    for name in VALUE_HEADERS:
+        digest.update(f'\n{name}:{page.headers.get(name, "")}'.encode('utf-8', errors='replace'))
+    for name in signatures.get_engine().header_names:
+        digest.update(f'\n{name}?{name in page.headers}'.encode())
+    digest.update(b'\n\n')
+    digest.update(normalize(page.text).encode('utf-8', errors='replace'))
+    return digest.hexdigest()
+
+
+def variant(sections, options):
+    """Key for what was extracted: sections, options, signature rules and parser backend"""
+    return json.dumps([sorted(sections), options, signatures.get_engine().digest, parsing.backend()],
+                      sort_keys=True)
+
+
+def cached_analysis(url, variant_key, fingerprint):
+    """Stored result for url when its fingerprint is unchanged, else None; a hit counts as a scan"""
+    if not storage.configured():
+        return None
+    with storage.connection() as conn:
+        row = conn.execute('SELECT result FROM analysis_cache WHERE url=? AND variant=? AND content_hash=?',
+                           (url, variant_key, fingerprint)).fetchone()
+        with _counter_lock:
+            _lookups['misses' if row is None else 'hits'] += 1
+        if row is None:
+            return None
+        now = time.time()
+        conn.execute('UPDATE analysis_cache SET scanned_at=? WHERE url=? AND variant=?', (now, url, variant_key))
+        conn.execute('UPDATE page_state SET scanned_at=? WHERE url=?', (now, url))
+    return json.loads(row[0])
+
+
+def _tech(result):
+    tech = result.get('tech')
+    if not isinstance(tech, dict):
+        return None
+    return sorted({name for names in tech.get('technologies', {}).values() for name in names})
+
+
+def _contacts(result):
+    found = result.get('contacts')
+    if not isinstance(found, dict):
+        return None
+    return sorted({e.lower() for e in found.get('emails', [])} |
+                  {re.sub(r'\D', '', p) for p in found.get('phones', [])} |
+                  set(found.get('social_links', {}).values()))
+
+
+def record(url, variant_key, fingerprint, result):
+    """Store a fresh analysis and log what changed since the page's previous scan"""
+    global _scans
+    if not storage.configured():
+        return
+    now = time.time()
+    tech, found = _tech(result), _contacts(result)
+    # A capped read that was cut short fingerprints only part of the page; it can't show a page change
+    page_hash = None if result.get('truncated') else fingerprint
+    with storage.connection() as conn:
+        conn.execute('INSERT OR REPLACE INTO analysis_cache(url, variant, content_hash, result, scanned_at) '
+                     'VALUES (?, ?, ?, ?, ?)', (url, variant_key, fingerprint, json.dumps(result), now))
+        row = conn.execute('SELECT content_hash, tech, contacts FROM page_state WHERE url=?', (url,)).fetchone()
+        if row is None:
+            conn.execute('INSERT INTO page_state(url, content_hash, tech, contacts, first_seen, scanned_at) '
+                         'VALUES (?, ?, ?, ?, ?, ?)',
+                         (url, page_hash, json.dumps(tech), json.dumps(found), now, now))
+        else:
+            changes = []
+            if page_hash is not None and row[0] is not None and row[0] != page_hash:
+                changes.append(('page', [], []))
+            for kind, old, new in (('tech', row[1], tech), ('contacts', row[2], found)):
+                old = json.loads(old) if old else None
+                if new is None:
+                    continue
+                if old is not None and old != new:
+                    changes.append((kind, sorted(set(new) - set(old)), sorted(set(old) - set(new))))
+            conn.executemany('INSERT INTO changes(url, kind, added, removed, detected_at) VALUES (?, ?, ?, ?, ?)',
+                             [(url, kind, json.dumps(added), json.dumps(removed), now)
+                              for kind, added, removed in changes])
+            # A section that was not extracted this time keeps its last known value
+            conn.execute('UPDATE page_state SET content_hash=COALESCE(?, content_hash), tech=COALESCE(?, tech), '
+                         'contacts=COALESCE(?, contacts), scanned_at=?, changed_at=COALESCE(?, changed_at) '
+                         'WHERE url=?',
+                         (page_hash, None if tech is None else json.dumps(tech),
+                          None if found is None else json.dumps(found), now,
+                          now if changes else None, url))
+        with _counter_lock:
+            _scans += 1
+            prune = _scans % PRUNE_EVERY == 0
+        if prune:
+            conn.execute('DELETE FROM analysis_cache WHERE scanned_at < ?', (now - RETENTION,))
+
+
+def parse_time(value):
+    """Epoch seconds from a number or 'YYYY-MM-DD[ HH:MM:SS]' (UTC)"""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp()
+
+
+def changes(since=None, kind=None, url=None, limit=DEFAULT_LIMIT, cursor=None):
+    """Changes newest first and the cursor for the next page
+
+    Without since, only the changes found by each page's latest scan are
+    listed (what changed since the scan before it).
+    """
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    where, params = [], []
+    if since is not None:
+        where.append('c.detected_at > ?')
+        params.append(parse_time(since))
+    else:
+        where.append('c.detected_at = s.scanned_at')
+    if kind:
+        if kind not in KINDS:
+            raise ValueError(f'Unknown kind {kind!r}, expected one of {", ".join(KINDS)}')
+        where.append('c.kind = ?')
+        params.append(kind)
+    if url:
+        where.append('c.url = ?')
+        params.append(url)
+    if cursor:
+        where.append('c.id < ?')
+        params.append(int(cursor))
+    sql = ('SELECT c.id, c.url, c.kind, c.added, c.removed, c.detected_at, s.scanned_at '
+           'FROM changes c JOIN page_state s ON s.url = c.url WHERE ' + ' AND '.join(where) +
+           ' ORDER BY c.id DESC LIMIT ?')
+    with storage.connection() as conn:
+        rows = conn.execute(sql, params + [limit + 1]).fetchall()
+    items = [{'id': r[0], 'url': r[1], 'kind': r[2], 'added': json.loads(r[3]), 'removed': json.loads(r[4]),
+              'detected_at': r[5], 'last_scanned_at': r[6]} for r in rows[:limit]]
+    next_cursor = items[-1]['id'] if len(rows) > limit else None
+    return items, next_cursor
+
+
+def cache_stats():
+    """Stored-analysis lookups since start: hits (page unchanged) and misses"""
+    with _counter_lock:
+        return dict(_lookups)
+
+
+def stats():
+    if not storage.configured():
+        return {'enabled': False}
+    with storage.connection() as conn:
+        pages, changed = conn.execute('SELECT COUNT(*), COUNT(changed_at) FROM page_state').fetchone()
+        cached = conn.execute('SELECT COUNT(*) FROM analysis_cache').fetchone()[0]
+        by_kind = dict(conn.execute('SELECT kind, COUNT(*) FROM changes GROUP BY kind').fetchall())
+    return {'enabled': True, 'pages': pages, 'pages_changed': changed, 'cached_analyses': cached,
+            'changes': by_kind}
@@ -0,0 +1,312 @@
+"""
+Persistent HTTP response cache (SQLite)
+Stores bodies, headers and validators on disk so they survive restarts
+(for sitemaps, the parsed summary of the body in place of the body).
+Entries younger than their policy's freshness are served without a request;
+older ones are revalidated with If-None-Match / If-Modified-Since so
+unchanged resources come back as a cheap 304. The origin's Cache-Control
+is honoured: no-store and private responses are not kept, no-cache ones
+are revalidated every time and max-age / s-maxage shorten the policy's
+freshness. Bounded by total bytes (LRU); triggers keep the running total.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+
+from requests.structures import CaseInsensitiveDict
+
+import http_client
+import page_cache
+import storage
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024   # 256 MB of bodies on disk
+
+# Seconds an entry is served without contacting the origin, per kind of fetch.
+# Past that it is revalidated (or refetched when the origin gave no validators).
+POLICIES = {
+    'page': 900,
+    'sitemap': 6 * 3600,
+    'robots': 24 * 3600,
+}
+
+_config = {'max_bytes': DEFAULT_MAX_BYTES}
+
+_stats = {'fresh_hits': 0, 'revalidated': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+_lock = threading.Lock()
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY, url TEXT, status_code INTEGER, headers TEXT, body TEXT,
+            etag TEXT, last_modified TEXT, size INTEGER, stored_at REAL, accessed_at REAL)""",
+    'CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)',
+    'CREATE TABLE IF NOT EXISTS cache_size (id INTEGER PRIMARY KEY CHECK (id = 0), total INTEGER)',
+    'INSERT OR IGNORE INTO cache_size SELECT 0, COALESCE(SUM(size), 0) FROM responses',
+    """CREATE TRIGGER IF NOT EXISTS responses_size_ai AFTER INSERT ON responses BEGIN
+            UPDATE cache_size SET total = total + new.size;
+        END""",
+    """CREATE TRIGGER IF NOT EXISTS responses_size_ad AFTER DELETE ON responses BEGIN
+            UPDATE cache_size SET total = total - old.size;
+        END""",
+    """CREATE TRIGGER IF NOT EXISTS responses_size_au AFTER UPDATE OF size ON responses BEGIN
+            UPDATE cache_size SET total = total - old.size + new.size;
+        END""",
+]
+
+# Replaces in place (an UPDATE), so the size triggers see the old row go
+UPSERT = """INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(key) DO UPDATE SET url=excluded.url, status_code=excluded.status_code,
+        headers=excluded.headers, body=excluded.body, etag=excluded.etag,
+        last_modified=excluded.last_modified, size=excluded.size, stored_at=excluded.stored_at,
+        accessed_at=excluded.accessed_at"""
+
+# Response headers kept with a parsed value: the validators and what decides its freshness
+PARSED_HEADERS = ('ETag', 'Last-Modified', 'Cache-Control')
+
+CACHE_CONTROL = re.compile(r'([a-z-]+)\s*(?:=\s*"?(\d+))?')
+
+
+def _init(conn):
+    for statement in SCHEMA:
+        conn.execute(statement)
+    conn.commit()
+
+
+# Pooled connections, as for the database; disabled until configure(path=...) is called
+_db = storage.Pool(_init)
+
+
+def configure(path=None, max_bytes=None, policies=None):
+    """Enable the cache at path (a SQLite file) and/or change its limits"""
+    if path is not None:
+        _db.configure(path)
+    with _lock:
+        if max_bytes is not None:
+            _config['max_bytes'] = max_bytes
+        if policies:
+            POLICIES.update(policies)
+
+
+def enabled():
+    return _db.path is not None
+
+
+def close():
+    """Close pooled connections (shutdown); later use opens new ones"""
+    _db.close()
+
+
+def _count(name, n=1):
+    with _lock:
+        _stats[name] += n
+
+
+def _load(key):
+    with _db.connection() as conn:
+        return conn.execute(
+            'SELECT url, status_code, headers, body, etag, last_modified, stored_at FROM responses WHERE key=?',
+            (key,)).fetchone()
+
+
+def _to_page(row):
+    url, status_code, headers, body, _, _, _ = row
+    headers = CaseInsensitiveDict(json.loads(headers))
+    size = len(body) + sum(len(k) + len(v) for k, v in headers.items())
+    return page_cache.Page(url, status_code, headers, body, size)
+
+
+def _store(key, page):
+    size = page.size
+    if size > _config['max_bytes']:
+        return
+    now = time.time()
+    with _db.connection() as conn:
+        conn.execute(
+            UPSERT,
+            (key, page.url, page.status_code, json.dumps(dict(page.headers)), page.text,
+             page.headers.get('ETag'), page.headers.get('Last-Modified'), size, now, now))
+        _count('stores')
+        _evict(conn)
+
+
+def _evict(conn):
+    """Drop least recently used entries until the total fits max_bytes"""
+    total = conn.execute('SELECT total FROM cache_size').fetchone()[0]
+    excess = total - _config['max_bytes']
+    if excess <= 0:
+        return
+    victims = []
+    for key, size in conn.execute('SELECT key, size FROM responses ORDER BY accessed_at'):
+        victims.append((key,))
+        excess -= size
+        if excess <= 0:
+            break
+    conn.executemany('DELETE FROM responses WHERE key=?', victims)
+    _count('evictions', len(victims))
+
+
+def _touch(key, revalidated=False):
+    """Mark an entry used (and fresh again after a 304); a failed write only costs LRU order"""
+    now = time.time()
+    try:
+        with _db.connection() as conn:
+            if revalidated:
+                conn.execute('UPDATE responses SET stored_at=?, accessed_at=? WHERE key=?', (now, now, key))
+            else:
+                conn.execute('UPDATE responses SET accessed_at=? WHERE key=?', (now, key))
+    except sqlite3.Error:
+        pass
+
+
+def _cache_control(headers):
+    """Cache-Control directives -> their seconds value (None for directives without one)"""
+    return {name: int(value) if value else None
+            for name, value in CACHE_CONTROL.findall(headers.get('Cache-Control', '').lower())}
+
+
+def _storable(response):
+    """2xx responses the origin lets a shared cache keep"""
+    directives = _cache_control(response.headers)
+    return (200 <= response.status_code < 300 and
+            'no-store' not in directives and 'private' not in directives)
+
+
+def _fresh(row, policy):
+    """True while a stored entry may be served without a request
+
+    The policy's freshness, cut to the origin's s-maxage / max-age; no-cache
+    entries are always revalidated.
+    """
+    lifetime = POLICIES.get(policy, 0)
+    directives = _cache_control(CaseInsensitiveDict(json.loads(row[2])))
+    if 'no-cache' in directives:
+        return False
+    max_age = directives.get('s-maxage', directives.get('max-age'))
+    if max_age is not None:
+        lifetime = min(lifetime, max_age)
+    return time.time() - row[6] < lifetime
+
+
+def _get(url, timeout, max_bytes, stop_at, headers=None):
+    if max_bytes or stop_at:
+        return http_client.get_streamed(url, max_bytes=max_bytes, stop_at=stop_at, timeout=timeout, headers=headers)
+    return http_client.get(url, timeout=timeout, headers=headers)
+
+
+def _conditional(row):
+    """If-None-Match / If-Modified-Since headers revalidating a stored entry"""
+    headers = {}
+    if row is not None:
+        etag, last_modified = row[4], row[5]
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+    return headers
+
+
+def fetch(url, policy='page', timeout=None, max_bytes=None, stop_at=None):
+    """GET url through the persistent cache and return a page_cache.Page
+
+    policy names an entry in POLICIES (freshness in seconds). max_bytes /
+    stop_at cap the read (http_client.get_streamed); truncated bodies are
+    never stored. Without a configured path this is a plain GET.
+    """
+    if not enabled():
+        return page_cache.Page.from_response(_get(url, timeout, max_bytes, stop_at))
+
+    key = page_cache.normalize_url(url)
+    try:
+        row = _load(key)
+    except sqlite3.Error:
+        row = None
+
+    if row is not None and _fresh(row, policy):
+        _count('fresh_hits')
+        _touch(key)
+        return _to_page(row)
+
+    headers = _conditional(row)
+    response = _get(url, timeout, max_bytes, stop_at, headers)
+
+    if row is not None and headers and response.status_code == 304:
+        _count('revalidated')
+        _touch(key, revalidated=True)
+        return _to_page(row)
+
+    _count('misses')
+    page = page_cache.Page.from_response(response)
+    if _storable(response) and not page.truncated:
+        try:
+            _store(key, page)
+        except sqlite3.Error:
+            pass
+    return page
+
+
+def fetch_parsed(url, parse, policy, timeout=None):
+    """Streamed GET of url reduced by parse, through the persistent cache; returns (status_code, value)
+
+    For resources too large to keep (sitemaps): parse(response) reads the
+    streamed body and returns (value, complete), value being JSON-serializable.
+    The cache stores the value with the response's validators and
+    Cache-Control instead of the body, so a fresh entry costs no request and
+    an expired one a conditional GET whose 304 reuses the stored value. Values of incomplete reads and
+    responses other than 2xx are not stored; for those, value is None.
+    """
+    key = page_cache.normalize_url(url) + ' [parsed]'
+    row = None
+    if enabled():
+        try:
+            row = _load(key)
+        except sqlite3.Error:
+            row = None
+        if row is not None and _fresh(row, policy):
+            _count('fresh_hits')
+            _touch(key)
+            return row[1], json.loads(row[3])
+
+    headers = _conditional(row)
+    response = http_client.get(url, timeout=timeout, headers=headers, stream=True)
+    try:
+        if row is not None and headers and response.status_code == 304:
+            _count('revalidated')
+            _touch(key, revalidated=True)
+            return row[1], json.loads(row[3])
+        if not 200 <= response.status_code < 300:
+            return response.status_code, None
+        value, complete = parse(response)
+    finally:
+        response.close()
+
+    if enabled():
+        _count('misses')
+        if complete and _storable(response):
+            text = json.dumps(value)
+            headers = CaseInsensitiveDict({name: response.headers[name] for name in PARSED_HEADERS
+                                           if name in response.headers})
+            try:
+                _store(key, page_cache.Page(response.url, response.status_code, headers, text, len(text)))
+            except sqlite3.Error:
+                pass
+    return response.status_code, value
+
+
+def clear():
+    if enabled():
+        with _db.connection() as conn:
+            conn.execute('DELETE FROM responses')
+
+
+def stats():
+    with _lock:
+        result = dict(_stats)
+    result.update({'enabled': enabled(), 'max_bytes': _config['max_bytes'], 'policies': dict(POLICIES)})
+    if enabled():
+        with _db.connection() as conn:
+            entries = conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            size = conn.execute('SELECT total FROM cache_size').fetchone()[0]
+        result.update({'entries': entries, 'bytes': size})
+    return result
@@ -0,0 +1,217 @@
+"""
+Shared HTTP client used by every blueprint
+Pooled keep-alive sessions, default headers and timeouts; every request
+waits for its host's politeness budget (politeness.py) and is timed by
+phase (connect / wait / download) and counted per host (metrics.py)
+"""
+
+import threading
+import time
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import metrics
+import politeness
+
+# Defaults (override with configure() at startup)
+DEFAULT_TIMEOUT = 15
+POOL_CONNECTIONS = 64   # number of per-host pools kept alive
+POOL_MAXSIZE = 10       # keep-alive connections kept per host
+READ_CHUNK = 16 * 1024  # bytes per read for streamed bodies
+
+_config = {
+    'timeout': DEFAULT_TIMEOUT,
+    'pool_connections': POOL_CONNECTIONS,
+    'pool_maxsize': POOL_MAXSIZE,
+    'headers': None,
+}
+
+_session = None
+_session_lock = threading.Lock()
+_local = threading.local()     # connect time spent by the current thread's request
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        elapsed = time.perf_counter() - start
+        _local.connect = getattr(_local, 'connect', 0.0) + elapsed
+        metrics.phase('connect', elapsed)
+
+
+class _TimedHTTPSConnection(_TimedHTTPConnection, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools time every new connection"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': _TimedHTTPConnectionPool,
+                                                   'https': _TimedHTTPSConnectionPool}
+
+
+def get_headers():
+    return {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Accept-Encoding': 'gzip, deflate',
+        'DNT': '1',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1'
+    }
+
+
+def configure(timeout=None, pool_connections=None, pool_maxsize=None, headers=None):
+    """Change client defaults. Existing pools are closed and rebuilt lazily."""
+    global _session
+    with _session_lock:
+        if timeout is not None:
+            _config['timeout'] = timeout
+        if pool_connections is not None:
+            _config['pool_connections'] = pool_connections
+        if pool_maxsize is not None:
+            _config['pool_maxsize'] = pool_maxsize
+        if headers is not None:
+            _config['headers'] = dict(headers)
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def _build_session():
+    session = requests.Session()
+    adapter = _TimedAdapter(
+        pool_connections=_config['pool_connections'],
+        pool_maxsize=_config['pool_maxsize'],
+        pool_block=False,
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.clear()
+    session.headers.update(_config['headers'] or get_headers())
+    return session
+
+
+def get_session():
+    """Return the process-wide session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def _redirect_hop(response, *args, **kwargs):
+    """Response hook: the next hop of a redirect waits for its own host's politeness token"""
+    if response.is_redirect:
+        politeness.wait(urljoin(response.url, response.headers['Location']))
+
+
+def request(method, url, timeout=None, **kwargs):
+    """Send a request through the shared pool using the default timeout"""
+    if timeout is None:
+        timeout = _config['timeout']
+    if kwargs.get('allow_redirects', True):
+        kwargs.setdefault('hooks', {'response': [_redirect_hop]})
+    with politeness.slot(url):
+        _local.connect = 0.0
+        start = time.perf_counter()
+        try:
+            response = get_session().request(method, url, timeout=timeout, **kwargs)
+        except Exception as e:
+            metrics.outbound(url, error=e)
+            raise
+    total = time.perf_counter() - start
+    metrics.outbound(url, response.status_code)
+    # elapsed runs from sending each hop to its headers; the rest of a non-streamed request is body reading
+    headers = sum(hop.elapsed.total_seconds() for hop in response.history) + response.elapsed.total_seconds()
+    metrics.phase('wait', max(0.0, headers - _local.connect))
+    if not kwargs.get('stream'):
+        metrics.phase('download', max(0.0, total - headers))
+    return response
+
+
+def get(url, timeout=None, **kwargs):
+    kwargs.setdefault('allow_redirects', True)
+    return request('GET', url, timeout=timeout, **kwargs)
+
+
+def _fully_read(response):
+    length = response.headers.get('Content-Length')
+    try:
+        return length is not None and response.raw.tell() >= int(length)
+    except (TypeError, ValueError):
+        return False
+
+
+def get_streamed(url, max_bytes=None, stop_at=None, timeout=None, **kwargs):
+    """GET that reads the body incrementally and can stop early
+
+    Reading ends after max_bytes of (decoded) body, or once stop_at (bytes,
+    matched case-insensitively, e.g. b'</head>') has been read. The response's
+    content is what was read; response.truncated is True when reading
+    stopped before the end of the body.
+    """
+    kwargs.setdefault('allow_redirects', True)
+    response = request('GET', url, timeout=timeout, stream=True, **kwargs)
+    marker = stop_at.lower() if stop_at else None
+    body = bytearray()
+    truncated = False
+    start = time.perf_counter()
+    try:
+        for chunk in response.iter_content(chunk_size=READ_CHUNK):
+            # Re-check the tail of the previous chunk so a marker split across chunks is found
+            scan_from = max(0, len(body) - len(marker) + 1) if marker else 0
+            body += chunk
+            if max_bytes is not None and len(body) >= max_bytes:
+                del body[max_bytes:]
+                truncated = True
+                break
+            if marker and bytes(body[scan_from:]).lower().find(marker) != -1:
+                truncated = True
+                break
+    except Exception:
+        response.close()
+        raise
+    metrics.phase('download', time.perf_counter() - start)
+
+    if truncated and max_bytes is None and _fully_read(response):
+        truncated = False       # the marker was in the last chunk
+    if not truncated:
+        response._content_consumed = True   # body fully read: close() hands the connection back to the pool
+    response.close()            # otherwise the unread body is dropped with its connection
+    response._content = bytes(body)
+    response._content_consumed = True
+    response.truncated = truncated
+    return response
+
+
+def head(url, timeout=None, **kwargs):
+    kwargs.setdefault('allow_redirects', False)
+    return request('HEAD', url, timeout=timeout, **kwargs)
+
+
+def close():
+    """Close all pooled connections"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,328 @@
+"""
+Background job queue for long-running enrichments
+Any analysis the batch endpoint knows (growth, profile, business, ...) can be
+submitted as a job: it runs on a fixed pool of worker threads, and the caller
+polls for the result instead of holding an HTTP request open. Jobs are kept
+in SQLite, so queued and interrupted jobs resume after a restart. Jobs can be
+cancelled and each one has a timeout.
+
+A route cannot be interrupted mid-request, so a cancelled or timed-out job
+frees its worker right away and its late result is discarded. The timeout
+counts from when the route starts. Routes run on workers + MAX_ABANDONED
+threads: that many abandoned routes take no capacity from the workers, and
+past that a worker waits for one to return before starting another job. The
+thread count stays bounded, and queued jobs wait without their timeout
+running. Cancellation and long polls go through the jobs table and work
+from any server process.
+"""
+
+import json
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import storage
+from scraper_batch import PAGE_ANALYSES, ROUTE_ANALYSES, build_tasks, run_route
+
+WORKERS = 4
+DEFAULT_TIMEOUT = 120       # seconds a job may run
+MAX_TIMEOUT = 900
+MAX_WAIT = 30               # longest long-poll on a job's status
+RETENTION = 7 * 86400       # finished jobs are kept this long
+POLL_INTERVAL = 0.25        # how often a worker checks for cancellation
+MAX_ABANDONED = 4           # timed-out / cancelled routes allowed to keep running
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED, TIMEOUT = 'queued', 'running', 'done', 'failed', 'cancelled', 'timeout'
+FINISHED = (DONE, FAILED, CANCELLED, TIMEOUT)
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY, analysis TEXT, target TEXT, path TEXT, payload TEXT, status TEXT,
+            status_code INTEGER, result TEXT, error TEXT, timeout REAL,
+            created_at REAL, started_at REAL, finished_at REAL)""",
+    'CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)',
+    'CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at)',
+]
+
+COLUMNS = ('id, analysis, target, status, status_code, result, error, timeout, '
+           'created_at, started_at, finished_at')
+
+storage.register_schema(SCHEMA)
+
+
+def _job(r, with_result=True):
+    job = {'id': r[0], 'analysis': r[1], 'target': r[2], 'status': r[3], 'status_code': r[4],
+           'error': r[6], 'timeout': r[7], 'created_at': r[8], 'started_at': r[9], 'finished_at': r[10]}
+    if r[9]:
+        job['elapsed'] = round((r[10] or time.time()) - r[9], 3)
+    if with_result:
+        job['result'] = json.loads(r[5]) if r[5] else None
+    return job
+
+
+def _status(job_id):
+    with storage.connection() as conn:
+        row = conn.execute('SELECT status FROM jobs WHERE id=?', (job_id,)).fetchone()
+    return row[0] if row else None
+
+
+def _update(job_id, only_if=None, **fields):
+    """Set fields on a job; with only_if, only while its status is one of those. Returns True if updated"""
+    sql = 'UPDATE jobs SET ' + ', '.join(f'{name}=?' for name in fields) + ' WHERE id=?'
+    params = list(fields.values()) + [job_id]
+    if only_if:
+        sql += f' AND status IN ({", ".join("?" for _ in only_if)})'
+        params.extend(only_if)
+    with storage.connection() as conn:
+        return conn.execute(sql, params).rowcount > 0
+
+
+class JobManager:
+    def __init__(self, workers=WORKERS, max_abandoned=MAX_ABANDONED):
+        self.workers = workers
+        self.app = None
+        self._queue = queue.Queue()
+        self._threads = []
+        # Routes run here so a worker can stop waiting on one (timeout / cancel).
+        # A slot is held from just before a job starts until its route returns,
+        # so a worker that gets a slot always finds a free runner thread.
+        self._runner = ThreadPoolExecutor(max_workers=workers + max_abandoned, thread_name_prefix='job-run')
+        self._slots = threading.BoundedSemaphore(workers + max_abandoned)
+        self._lock = threading.Lock()
+        self._finished = {}     # job id -> Event set when it finishes here (long polls)
+        self._running = set()
+        self._abandoned = 0     # routes of timed-out / cancelled jobs still running
+        self._closed = False
+
+    def recover(self):
+        """Drop expired jobs and requeue the ones a stopped process left running"""
+        with storage.connection() as conn:
+            conn.execute('DELETE FROM jobs WHERE finished_at < ?', (time.time() - RETENTION,))
+            # Jobs that were running when the process stopped start again from the beginning
+            conn.execute('UPDATE jobs SET status=?, started_at=NULL WHERE status=?', (QUEUED, RUNNING))
+
+    def init_app(self, app, recover=True):
+        """Attach the Flask app jobs dispatch to and resume jobs left over from the last run
+
+        With several server processes, recovery runs once before they start
+        (recover=False in each): a process starting later must not requeue
+        jobs its siblings are running. Queued jobs are claimed atomically, so
+        every process may enqueue all of them.
+        """
+        self.app = app
+        if recover:
+            self.recover()
+        with storage.connection() as conn:
+            pending = [r[0] for r in conn.execute(
+                'SELECT id FROM jobs WHERE status=? ORDER BY created_at', (QUEUED,))]
+        for job_id in pending:
+            self._enqueue(job_id)
+
+    def shutdown(self):
+        """Stop taking jobs; jobs this process was running go back to the queue for the next start"""
+        with self._lock:
+            self._closed = True
+            running = list(self._running)
+            threads = len(self._threads)
+        for _ in range(threads):
+            self._queue.put(None)
+        for job_id in running:
+            _update(job_id, only_if=(RUNNING,), status=QUEUED, started_at=None)
+            self._notify(job_id)
+        self._runner.shutdown(wait=False, cancel_futures=True)
+
+    def _start(self):
+        with self._lock:
+            while not self._closed and len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f'job-worker-{len(self._threads)}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _enqueue(self, job_id):
+        with self._lock:
+            self._finished.setdefault(job_id, threading.Event())
+        self._start()
+        self._queue.put(job_id)
+
+    def submit(self, analysis, target, options=None, timeout=DEFAULT_TIMEOUT):
+        """Queue one analysis of target; returns the job (without result)"""
+        if analysis not in PAGE_ANALYSES and analysis not in ROUTE_ANALYSES:
+            raise ValueError(f'Unknown analysis: {analysis}')
+        timeout = max(1.0, min(float(timeout), MAX_TIMEOUT))
+        _, path, payload = build_tasks(target, [analysis], options or {})[0]
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with storage.connection() as conn:
+            conn.execute('INSERT INTO jobs(id, analysis, target, path, payload, status, timeout, created_at) '
+                         'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                         (job_id, analysis, target, path, json.dumps(payload), QUEUED, timeout, now))
+        self._enqueue(job_id)
+        return self.get(job_id, with_result=False)
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None or self._closed:
+                return      # shutdown; queued jobs stay queued in the database
+            try:
+                self._run(job_id)
+            except Exception:
+                pass
+            finally:
+                self._queue.task_done()
+
+    def _acquire_slot(self):
+        """Wait for a free route slot; False on shutdown"""
+        while not self._slots.acquire(timeout=POLL_INTERVAL):
+            if self._closed:
+                return False
+        return True
+
+    def _release_when_done(self, future, abandoned=False):
+        """Free the job's route slot once its route returns (abandoned: the job no longer waits for it)"""
+        if abandoned:
+            with self._lock:
+                self._abandoned += 1
+        future.add_done_callback(lambda _: self._route_done(abandoned))
+
+    def _route_done(self, abandoned):
+        if abandoned:
+            with self._lock:
+                self._abandoned -= 1
+        self._slots.release()
+
+    def _claim(self, job_id):
+        """(path, payload, timeout) of a queued job, now marked running; None if it isn't queued"""
+        with storage.connection() as conn:
+            row = conn.execute('SELECT path, payload, timeout FROM jobs WHERE id=? AND status=?',
+                               (job_id, QUEUED)).fetchone()
+        if row is None or not _update(job_id, only_if=(QUEUED,), status=RUNNING, started_at=time.time()):
+            return None
+        return row
+
+    def _run(self, job_id):
+        if not self._acquire_slot():
+            return
+        try:
+            row = self._claim(job_id)
+        except Exception:
+            self._slots.release()
+            raise
+        if row is None:
+            self._slots.release()
+            self._notify(job_id)        # cancelled while queued, or claimed by another process
+            return
+        path, payload, timeout = row
+        with self._lock:
+            self._running.add(job_id)
+        started = []
+
+        def call():
+            started.append(time.time())
+            return run_route(self.app, path, json.loads(payload))
+
+        future = self._runner.submit(call)
+        deadline = None
+
+        while True:
+            if self._closed:
+                self._release_when_done(future)
+                return      # requeued by shutdown()
+            if _status(job_id) != RUNNING:
+                self._release_when_done(future, abandoned=not future.done())
+                self._notify(job_id)    # cancelled, possibly through another process
+                return
+            if deadline is None and started:
+                deadline = started[0] + timeout
+            remaining = deadline - time.time() if deadline is not None else POLL_INTERVAL
+            if remaining <= 0:
+                self._release_when_done(future, abandoned=not future.cancel() and not future.done())
+                self._finish(job_id, TIMEOUT, error=f'Timed out after {timeout:g}s')
+                return
+            try:
+                status_code, body = future.result(timeout=min(POLL_INTERVAL, remaining))
+                break
+            except FutureTimeout:
+                continue
+            except Exception as e:
+                self._release_when_done(future)
+                self._finish(job_id, FAILED, error=str(e))
+                return
+        self._release_when_done(future)
+
+        error = body.get('error') if isinstance(body, dict) and status_code >= 400 else None
+        self._finish(job_id, DONE if status_code < 400 else FAILED, status_code=status_code,
+                     result=json.dumps(body), error=error)
+
+    def _finish(self, job_id, status, **fields):
+        _update(job_id, only_if=(RUNNING,), status=status, finished_at=time.time(), **fields)
+        self._notify(job_id)
+
+    def _notify(self, job_id):
+        with self._lock:
+            self._running.discard(job_id)
+            event = self._finished.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job; returns the job, or None if unknown
+
+        The job is marked cancelled in the database at once; the process
+        running it notices within POLL_INTERVAL and stops waiting on it.
+        """
+        if _update(job_id, only_if=(QUEUED, RUNNING), status=CANCELLED, finished_at=time.time(), error='Cancelled'):
+            self._notify(job_id)
+        return self.get(job_id, with_result=False)
+
+    def get(self, job_id, wait=0, with_result=True):
+        """Job status (and result once finished); wait > 0 long-polls until it finishes
+
+        A job finishing in this process wakes the poll at once; one run by
+        another server process is seen within POLL_INTERVAL.
+        """
+        deadline = time.time() + min(wait, MAX_WAIT)
+        while True:
+            with storage.connection() as conn:
+                r = conn.execute(f'SELECT {COLUMNS} FROM jobs WHERE id=?', (job_id,)).fetchone()
+            remaining = deadline - time.time()
+            if r is None or r[3] in FINISHED or remaining <= 0:
+                break
+            with self._lock:
+                event = self._finished.get(job_id)
+            if event is not None:
+                event.wait(min(remaining, POLL_INTERVAL))
+            else:
+                time.sleep(min(remaining, POLL_INTERVAL))
+        return _job(r, with_result) if r is not None else None
+
+    def list(self, status=None, limit=50, cursor=None):
+        """Jobs newest first (without results) and the cursor for the next page"""
+        limit = max(1, min(int(limit), 500))
+        where, params = [], []
+        if status:
+            where.append('status = ?')
+            params.append(status)
+        if cursor:
+            where.append('created_at < ?')
+            params.append(float(cursor))
+        sql = f'SELECT {COLUMNS} FROM jobs'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY created_at DESC LIMIT ?'
+        with storage.connection() as conn:
+            rows = conn.execute(sql, params + [limit + 1]).fetchall()
+        next_cursor = repr(rows[limit - 1][8]) if len(rows) > limit else None
+        return [_job(r, with_result=False) for r in rows[:limit]], next_cursor
+
+    def stats(self):
+        with storage.connection() as conn:
+            counts = dict(conn.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+        with self._lock:
+            abandoned = self._abandoned
+        return {'workers': self.workers, 'queue': self._queue.qsize(), 'abandoned_routes': abandoned, 'jobs': counts}
+
+
+manager = JobManager()
@@ -0,0 +1,354 @@
+"""
+Server-side lead store with full-text search
+Every successful enrichment response is kept in SQLite (one row per endpoint
++ URL, refreshed on rescans) next to history and saved searches. Page title,
+description, keywords and detected tech are indexed with FTS5, so tens of
+thousands of stored leads can be searched in milliseconds.
+
+Responses are recorded by an after_request hook and written by a background
+thread in batches, so recording adds no database work to the request.
+"""
+
+import json
+import queue
+import threading
+from urllib.parse import urlsplit
+
+from flask import request
+
+import storage
+
+MAX_LEADS = 50000           # auto-recorded leads kept (oldest dropped); saved ones are never pruned
+BATCH_SIZE = 500            # leads per write transaction
+MAX_FIELD_CHARS = 4000      # text kept per indexed field
+MAX_DEPTH = 6               # JSON nesting searched for indexed fields
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+RANK_MAX_MATCHES = 5000     # above this many matches, 'auto' order lists newest first instead of scoring all
+
+# Response paths that are not enrichment results
+EXCLUDED_PREFIXES = ('/api/leads', '/api/history', '/api/saved', '/api/batch', '/api/jobs', '/api/cache',
+                     '/api/changes', '/api/profiles', '/api/startup',
+                     '/shutdown')
+
+# JSON keys whose values feed each indexed column (searched at any depth)
+FIELD_KEYS = {
+    'title': ('title', 'og:title', 'twitter:title', 'company_name'),
+    'description': ('description', 'og:description', 'twitter:description', 'summary'),
+    'keywords': ('keywords', 'keywords_found', 'top_keywords', 'industry_keywords'),
+    'tech': ('technologies', 'tech_stack', 'integrations', 'cms', 'frameworks', 'analytics', 'hosting',
+             'libraries', 'outdated_tech'),
+}
+_KEY_FIELD = {key: field for field, keys in FIELD_KEYS.items() for key in keys}
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS leads (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, source TEXT, url TEXT, domain TEXT,
+            title TEXT, description TEXT, keywords TEXT, tech TEXT, result TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP, updated_at DATETIME DEFAULT CURRENT_TIMESTAMP)""",
+    'CREATE UNIQUE INDEX IF NOT EXISTS idx_leads_source_url ON leads(source, url)',
+    'CREATE INDEX IF NOT EXISTS idx_leads_domain ON leads(domain)',
+    'CREATE INDEX IF NOT EXISTS idx_leads_updated ON leads(updated_at)',
+    """CREATE VIRTUAL TABLE IF NOT EXISTS leads_fts USING fts5(
+            title, description, keywords, tech, content='leads', content_rowid='id')""",
+    """CREATE TRIGGER IF NOT EXISTS leads_ai AFTER INSERT ON leads BEGIN
+            INSERT INTO leads_fts(rowid, title, description, keywords, tech)
+            VALUES (new.id, new.title, new.description, new.keywords, new.tech);
+        END""",
+    """CREATE TRIGGER IF NOT EXISTS leads_ad AFTER DELETE ON leads BEGIN
+            INSERT INTO leads_fts(leads_fts, rowid, title, description, keywords, tech)
+            VALUES ('delete', old.id, old.title, old.description, old.keywords, old.tech);
+        END""",
+    """CREATE TRIGGER IF NOT EXISTS leads_au AFTER UPDATE ON leads BEGIN
+            INSERT INTO leads_fts(leads_fts, rowid, title, description, keywords, tech)
+            VALUES ('delete', old.id, old.title, old.description, old.keywords, old.tech);
+            INSERT INTO leads_fts(rowid, title, description, keywords, tech)
+            VALUES (new.id, new.title, new.description, new.keywords, new.tech);
+        END""",
+]
+
+UPSERT = """INSERT INTO leads(source, url, domain, title, description, keywords, tech, result)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(source, url) DO UPDATE SET domain=excluded.domain, title=excluded.title,
+        description=excluded.description, keywords=excluded.keywords, tech=excluded.tech,
+        result=excluded.result, updated_at=CURRENT_TIMESTAMP"""
+
+COLUMNS = 'id, source, url, domain, title, description, keywords, tech, created_at, updated_at'
+LEAD_COLUMNS = ', '.join('l.' + column for column in COLUMNS.split(', '))
+
+storage.register_schema(SCHEMA)
+
+
+def _collect(value, out):
+    """Append every string inside value (lists, dict values) to out"""
+    if isinstance(value, str):
+        if value:
+            out.append(value)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        return
+    elif isinstance(value, dict):
+        for item in value.values():
+            _collect(item, out)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _collect(item, out)
+
+
+def extract_fields(result):
+    """{'title', 'description', 'keywords', 'tech'} text from any endpoint's JSON result"""
+    found = {field: [] for field in FIELD_KEYS}
+
+    def walk(node, depth):
+        if depth > MAX_DEPTH:
+            return
+        if isinstance(node, dict):
+            for key, value in node.items():
+                field = _KEY_FIELD.get(key) if isinstance(key, str) else None
+                if field is not None:
+                    _collect(value, found[field])
+                elif isinstance(value, (dict, list)):
+                    walk(value, depth + 1)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item, depth + 1)
+
+    walk(result, 0)
+    fields = {}
+    for field, values in found.items():
+        # Keep first-seen order, drop repeats (the same tech is often listed by several sections)
+        text = ' '.join(dict.fromkeys(v.strip() for v in values if v.strip()))
+        fields[field] = text[:MAX_FIELD_CHARS]
+    return fields
+
+
+def _domain(url):
+    url = (url or '').strip()
+    return (urlsplit(url if '://' in url else '//' + url).hostname or '').lower()
+
+
+def _row(source, url, result):
+    fields = extract_fields(result)
+    return (source, url, _domain(url), fields['title'], fields['description'], fields['keywords'],
+            fields['tech'], json.dumps(result))
+
+
+def save(source, url, result):
+    """Store (or refresh) one lead synchronously; returns its id"""
+    with storage.connection() as conn:
+        return conn.execute(UPSERT + ' RETURNING id', _row(source, url, result)).fetchone()[0]
+
+
+class LeadWriter:
+    """Background thread that stores queued results in batched transactions"""
+
+    def __init__(self, max_queue=10000):
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def submit(self, source, url, result):
+        self._start()
+        try:
+            self._queue.put_nowait((source, url, result))
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='lead-writer', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception:
+                self.errors += len(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        with storage.connection() as conn:
+            conn.executemany(UPSERT, [_row(*item) for item in batch])
+            self.written += len(batch)
+            _prune(conn)
+
+    def flush(self):
+        """Block until everything queued so far is written"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def stats(self):
+        return {'queued': self._queue.qsize(), 'written': self.written, 'dropped': self.dropped,
+                'errors': self.errors}
+
+
+writer = LeadWriter()
+
+
+def _prune(conn):
+    excess = conn.execute("SELECT COUNT(*) FROM leads WHERE source NOT LIKE 'saved/%'").fetchone()[0] - MAX_LEADS
+    if excess > 0:
+        conn.execute("""DELETE FROM leads WHERE id IN (
+                SELECT id FROM leads WHERE source NOT LIKE 'saved/%' ORDER BY updated_at, id LIMIT ?)""", (excess,))
+
+
+def request_url(payload, result):
+    """Target of an enrichment call: the request's url/domain, else the result's"""
+    for source in (payload, result):
+        if isinstance(source, dict):
+            for key in ('url', 'domain', 'company', 'query'):
+                value = source.get(key)
+                if isinstance(value, str) and value.strip():
+                    return value.strip()
+    return ''
+
+
+def record_response(response):
+    """after_request hook: queue successful JSON results of POST /api/... endpoints"""
+    try:
+        if (request.method != 'POST' or response.status_code != 200 or response.is_streamed
+                or response.mimetype != 'application/json' or not request.path.startswith('/api/')
+                or request.path.startswith(EXCLUDED_PREFIXES) or not storage.configured()):
+            return response
+        result = response.get_json(silent=True)
+        if not isinstance(result, dict) or result.get('error'):
+            return response
+        url = request_url(request.get_json(silent=True), result)
+        if url:
+            writer.submit(request.path, url, result)
+    except Exception:
+        pass
+    return response
+
+
+def fts_query(text):
+    """FTS5 query from free text: each term is quoted (so punctuation is literal) and all must match
+
+    'term*' keeps its prefix star, 'column:term' restricts a term to title,
+    description, keywords or tech, and OR / NOT pass through.
+    """
+    parts = []
+    for token in text.split():
+        if token in ('OR', 'NOT', 'AND'):
+            parts.append(token)
+            continue
+        column = ''
+        if ':' in token:
+            name, rest = token.split(':', 1)
+            if name in FIELD_KEYS and rest:
+                column, token = name + ' : ', rest
+        star = token.endswith('*')
+        token = token.rstrip('*').replace('"', '""')
+        if token:
+            parts.append(f'{column}"{token}"' + ('*' if star else ''))
+    while parts and parts[-1] in ('OR', 'NOT', 'AND'):
+        parts.pop()
+    while parts and parts[0] in ('OR', 'NOT', 'AND'):
+        parts.pop(0)
+    return ' '.join(parts)
+
+
+def _lead(r, snippet=None):
+    lead = {'id': r[0], 'source': r[1], 'url': r[2], 'domain': r[3], 'title': r[4], 'description': r[5],
+            'keywords': r[6], 'tech': r[7], 'created_at': r[8], 'updated_at': r[9]}
+    if snippet is not None:
+        lead['snippet'] = snippet
+    return lead
+
+
+def search(q=None, source=None, domain=None, limit=DEFAULT_LIMIT, cursor=None, order='auto'):
+    """One page of leads: {'leads', 'next_cursor', 'total', 'order'}
+
+    With q, matches are ranked by relevance (bm25) when there are at most
+    RANK_MAX_MATCHES of them (order='auto'); broader queries, and order='recent',
+    list matches newest first, which never has to score every match. Without q,
+    leads are listed most recently updated first. cursor is the previous
+    page's next_cursor (opaque).
+    """
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    cursor = str(cursor or '')
+    where, params = [], []
+    if source:
+        where.append('l.source = ?')
+        params.append(source)
+    if domain:
+        where.append('l.domain = ?')
+        params.append(_domain(domain))
+
+    with storage.connection() as conn:
+        if not q:
+            if cursor:
+                updated_at, _, last_id = cursor.rpartition('|')
+                where.append('(l.updated_at, l.id) < (?, ?)')
+                params.extend([updated_at, int(last_id)])
+            sql = f'SELECT {LEAD_COLUMNS} FROM leads l'
+            if where:
+                sql += ' WHERE ' + ' AND '.join(where)
+            sql += ' ORDER BY l.updated_at DESC, l.id DESC LIMIT ?'
+            rows = conn.execute(sql, params + [limit + 1]).fetchall()
+            next_cursor = f'{rows[limit - 1][9]}|{rows[limit - 1][0]}' if len(rows) > limit else None
+            return {'leads': [_lead(r) for r in rows[:limit]], 'next_cursor': next_cursor, 'order': 'updated'}
+
+        match = fts_query(q)
+        if not match:
+            return {'leads': [], 'next_cursor': None, 'total': 0, 'order': 'rank'}
+        total = conn.execute('SELECT COUNT(*) FROM leads_fts WHERE leads_fts MATCH ?', (match,)).fetchone()[0]
+        if cursor:
+            order = 'rank' if cursor[0] == 'r' else 'recent'
+        elif order == 'auto':
+            order = 'rank' if total <= RANK_MAX_MATCHES else 'recent'
+
+        sql = (f"SELECT {LEAD_COLUMNS}, snippet(leads_fts, -1, '[', ']', '...', 12) "
+               'FROM leads_fts JOIN leads l ON l.id = leads_fts.rowid WHERE leads_fts MATCH ?')
+        sql += ''.join(' AND ' + w for w in where)
+        if order == 'rank':
+            offset = int(cursor[1:] or 0)
+            sql += ' ORDER BY leads_fts.rank LIMIT ? OFFSET ?'
+            rows = conn.execute(sql, [match] + params + [limit + 1, offset]).fetchall()
+            next_cursor = f'r{offset + limit}' if len(rows) > limit else None
+        else:
+            if cursor:
+                sql += ' AND leads_fts.rowid < ?'
+                params.append(int(cursor[1:]))
+            sql += ' ORDER BY leads_fts.rowid DESC LIMIT ?'
+            rows = conn.execute(sql, [match] + params + [limit + 1]).fetchall()
+            next_cursor = f'i{rows[limit - 1][0]}' if len(rows) > limit else None
+    return {'leads': [_lead(r, r[10]) for r in rows[:limit]], 'next_cursor': next_cursor,
+            'total': total, 'order': order}
+
+
+def get(lead_id):
+    """Full stored lead including the endpoint's JSON result, or None"""
+    with storage.connection() as conn:
+        r = conn.execute(f'SELECT {COLUMNS}, result FROM leads WHERE id=?', (lead_id,)).fetchone()
+    if r is None:
+        return None
+    lead = _lead(r)
+    lead['result'] = json.loads(r[10])
+    return lead
+
+
+def delete(lead_id):
+    with storage.connection() as conn:
+        conn.execute('DELETE FROM leads WHERE id=?', (lead_id,))
+
+
+def stats():
+    with storage.connection() as conn:
+        count = conn.execute('SELECT COUNT(*) FROM leads').fetchone()[0]
+    result = {'leads': count}
+    result.update(writer.stats())
+    return result
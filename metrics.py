@@ -0,0 +1,218 @@
+"""
+Request and phase metrics in Prometheus text format
+Every endpoint's latency goes into a histogram by route. Time spent inside a
+request is also recorded by phase:
+    dns        resolver.py lookups (probes, WHOIS, batch prefetch) and the async engine's
+    connect    new outbound connections: TCP + TLS, including the system DNS lookup
+    wait       request sent until the response headers arrive
+    download   reading the response body
+    parse      HTML parsing (parsing.py)
+    contacts   contact regex extraction
+    tech       signature matching
+Outbound requests and failures are counted per host. Cache hit ratios are
+read from the caches' own counters when /metrics is scraped.
+
+Recording costs a bisect and a short lock per observation.
+"""
+
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from flask import g, request
+
+PREFIX = 'leadgen'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+MAX_HOSTS = 500             # distinct host labels; further hosts are counted as 'other'
+
+# cache name -> (module, how to read its stats, hit keys, miss keys)
+CACHES = {
+    'page': ('page_cache', lambda m: m.cache.stats(), ('hits',), ('misses',)),
+    'http': ('http_cache', lambda m: m.stats(), ('fresh_hits', 'revalidated'), ('misses',)),
+    'probe': ('probe', lambda m: m.outcomes.stats(), ('hits',), ('misses',)),
+    'sitemap': ('sitemap', lambda m: m.summaries.stats(), ('hits',), ('misses',)),
+    'dns': ('resolver', lambda m: m.stats(), ('hits',), ('misses',)),
+    'analysis': ('fingerprints', lambda m: m.cache_stats(), ('hits',), ('misses',)),
+}
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = f'{PREFIX}_{name}'
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} counter'
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in sorted(values):
+            yield f'{self.name}{_labels(self.labels, labels)} {value}'
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=BUCKETS):
+        self.name = f'{PREFIX}_{name}'
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}       # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} histogram'
+        with self._lock:
+            series = [(labels, list(values)) for labels, values in self._series.items()]
+        names = self.labels + ('le',)
+        for labels, values in sorted(series):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), values):
+                cumulative += count
+                yield f'{self.name}_bucket{_labels(names, labels + (bound,))} {cumulative}'
+            yield f'{self.name}_sum{_labels(self.labels, labels)} {values[-1]:.6f}'
+            yield f'{self.name}_count{_labels(self.labels, labels)} {cumulative}'
+
+
+REQUEST_SECONDS = Histogram('request_duration_seconds', 'Endpoint latency until the response is returned',
+                            ('endpoint', 'method'))
+REQUESTS = Counter('requests_total', 'Requests served', ('endpoint', 'method', 'status'))
+PHASE_SECONDS = Histogram('phase_duration_seconds', 'Time spent per phase of request handling', ('phase',))
+OUTBOUND = Counter('outbound_requests_total', 'Outbound HTTP requests by host and status class',
+                   ('host', 'status'))
+OUTBOUND_FAILURES = Counter('outbound_failures_total',
+                            'Outbound HTTP requests that raised or returned 429/5xx, by host and reason',
+                            ('host', 'reason'))
+
+REGISTRY = [REQUEST_SECONDS, REQUESTS, PHASE_SECONDS, OUTBOUND, OUTBOUND_FAILURES]
+
+_hosts = set()
+_hosts_lock = threading.Lock()
+
+
+def phase(name, seconds):
+    PHASE_SECONDS.observe(seconds, name)
+
+
+@contextmanager
+def timed(name):
+    """Record the time spent in the with block as phase name"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PHASE_SECONDS.observe(time.perf_counter() - start, name)
+
+
+def _host_label(url):
+    host = (urlsplit(url).hostname or '').lower()
+    if host in _hosts:
+        return host
+    with _hosts_lock:
+        if len(_hosts) < MAX_HOSTS:
+            _hosts.add(host)
+            return host
+    return 'other'
+
+
+def outbound(url, status=None, error=None):
+    """Count one outbound request: its status code, or the exception it raised"""
+    host = _host_label(url)
+    if error is not None:
+        OUTBOUND.inc(host, 'error')
+        OUTBOUND_FAILURES.inc(host, type(error).__name__)
+        return
+    OUTBOUND.inc(host, f'{status // 100}xx')
+    if status == 429 or status >= 500:
+        OUTBOUND_FAILURES.inc(host, f'http_{status}')
+
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+
+
+def _after_request(response):
+    start = getattr(g, 'metrics_start', None)
+    if start is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else '(unmatched)'
+        REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint, request.method)
+        REQUESTS.inc(endpoint, request.method, str(response.status_code))
+    return response
+
+
+def init_app(app):
+    """Time every request the app serves"""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+
+def _cache_lines():
+    hits, misses, ratios = [], [], []
+    for cache, (module_name, read, hit_keys, miss_keys) in CACHES.items():
+        module = sys.modules.get(module_name)
+        if module is None:
+            continue        # not loaded, nothing cached
+        try:
+            stats = read(module)
+        except Exception:
+            continue
+        hit = sum(stats.get(key, 0) for key in hit_keys)
+        miss = sum(stats.get(key, 0) for key in miss_keys)
+        label = _labels(('cache',), (cache,))
+        hits.append(f'{PREFIX}_cache_hits_total{label} {hit}')
+        misses.append(f'{PREFIX}_cache_misses_total{label} {miss}')
+        ratios.append(f'{PREFIX}_cache_hit_ratio{label} {hit / (hit + miss) if hit + miss else 0:.4f}')
+    return [f'# HELP {PREFIX}_cache_hits_total Cache lookups answered from the cache',
+            f'# TYPE {PREFIX}_cache_hits_total counter', *hits,
+            f'# HELP {PREFIX}_cache_misses_total Cache lookups that had to fetch or compute',
+            f'# TYPE {PREFIX}_cache_misses_total counter', *misses,
+            f'# HELP {PREFIX}_cache_hit_ratio Hits / lookups since start',
+            f'# TYPE {PREFIX}_cache_hit_ratio gauge', *ratios]
+
+
+def render():
+    """All metrics in Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(_cache_lines())
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    """Clear every recorded series (benchmarks)"""
+    for metric in REGISTRY:
+        with metric._lock:
+            getattr(metric, '_values', getattr(metric, '_series', {})).clear()
+    with _hosts_lock:
+        _hosts.clear()
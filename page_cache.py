@@ -0,0 +1,172 @@
+"""
+In-process page cache shared by the single-page analysis endpoints
+Keyed by normalized URL, bounded by entry count and total bytes, TTL + LRU
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from flask import g
+from requests.structures import CaseInsensitiveDict
+
+import http_cache
+
+DEFAULT_TTL = 300                       # seconds a fetched page stays fresh
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024    # 64 MB of page bodies
+
+
+def normalize_url(url):
+    """Canonical cache key: lowercase scheme/host, no default port, no fragment, sorted query"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or 'https'
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f'{host}:{port}'
+    path = parts.path or '/'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+class Page:
+    """Response snapshot with the attributes the endpoints read from requests.Response"""
+
+    __slots__ = ('url', 'status_code', 'headers', 'text', 'size', 'fetched_at', 'truncated')
+
+    def __init__(self, url, status_code, headers, text, size, truncated=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+        self.size = size
+        self.fetched_at = time.time()
+        self.truncated = truncated      # body cut short by a capped read
+
+    @classmethod
+    def from_response(cls, response):
+        headers = CaseInsensitiveDict(response.headers)
+        size = len(response.content) + sum(len(k) + len(v) for k, v in headers.items())
+        return cls(response.url, response.status_code, headers, response.text, size,
+                   getattr(response, 'truncated', False))
+
+
+class PageCache:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, *fallbacks):
+        """Fresh page for key, else for the first fallback key that has one; counts one hit or miss"""
+        with self._lock:
+            for k in (key,) + fallbacks:
+                page = self._entries.get(k)
+                if page is None:
+                    continue
+                if time.time() - page.fetched_at > self.ttl:
+                    self._remove(k)
+                    self.expirations += 1
+                    continue
+                self._entries.move_to_end(k)
+                self.hits += 1
+                return page
+            self.misses += 1
+            return None
+
+    def put(self, key, page):
+        if page.size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = page
+            self._bytes += page.size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key):
+        page = self._entries.pop(key)
+        self._bytes -= page.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+cache = PageCache()
+
+
+def configure(max_entries=None, max_bytes=None, ttl=None):
+    if max_entries is not None:
+        cache.max_entries = max_entries
+    if max_bytes is not None:
+        cache.max_bytes = max_bytes
+    if ttl is not None:
+        cache.ttl = ttl
+
+
+def _mark(status):
+    """Remember per request whether every page came from cache"""
+    try:
+        if getattr(g, 'page_cache_status', None) != 'MISS':
+            g.page_cache_status = status
+    except RuntimeError:
+        pass  # outside an app context (batch workers, scripts)
+
+
+def fetch_page(url, timeout=15, max_bytes=None, stop_at=None):
+    """Fetch a page through the in-memory cache (backed by the persistent http_cache).
+    Only successful responses are cached.
+
+    max_bytes / stop_at request a capped streamed read (see http_client.get_streamed).
+    A full cached copy is still preferred; a truncated page is cached only under
+    its own read limits, so it never stands in for the full page.
+    """
+    key = normalize_url(url)
+    capped_key = f'{key} [{max_bytes}:{stop_at!r}]' if max_bytes or stop_at else None
+    page = cache.get(key, capped_key) if capped_key else cache.get(key)
+    if page is not None:
+        _mark('HIT')
+        return page
+    _mark('MISS')
+    page = http_cache.fetch(url, policy='page', timeout=timeout, max_bytes=max_bytes, stop_at=stop_at)
+    if 200 <= page.status_code < 300:
+        cache.put(capped_key if page.truncated else key, page)
+    return page
+
+
+def add_cache_header(response):
+    """after_request hook: expose X-Cache: HIT/MISS on endpoints that used the cache"""
+    status = getattr(g, 'page_cache_status', None)
+    if status:
+        response.headers['X-Cache'] = status
+    return response
@@ -0,0 +1,105 @@
+"""
+Central HTML parsing with a pluggable backend
+Every endpoint parses through here, so the backend is chosen once at startup:
+    'html.parser'  BeautifulSoup with Python's built-in parser
+    'lxml'         BeautifulSoup with the lxml tree builder (default when lxml is installed)
+    'lxml.html'    raw lxml.html trees for the hot extractors (contacts, tech,
+                   metadata); BeautifulSoup + lxml for everything else
+The hot extractors read documents through the accessors at the bottom, which
+accept either a soup or an lxml tree.
+"""
+
+from bs4 import BeautifulSoup
+
+import metrics
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+
+BACKENDS = ('html.parser', 'lxml', 'lxml.html')
+
+_config = {
+    'backend': 'lxml' if lxml is not None else 'html.parser',
+}
+
+
+def configure(backend=None):
+    """Select the parser backend (one of BACKENDS)"""
+    if backend is not None:
+        if backend not in BACKENDS:
+            raise ValueError(f'Unknown parser backend {backend!r}, expected one of {", ".join(BACKENDS)}')
+        if backend != 'html.parser' and lxml is None:
+            raise ValueError(f'Parser backend {backend!r} requires lxml')
+        _config['backend'] = backend
+
+
+def backend():
+    return _config['backend']
+
+
+def parse(html):
+    """BeautifulSoup document for extractors that need the full soup API"""
+    with metrics.timed('parse'):
+        return BeautifulSoup(html, 'html.parser' if _config['backend'] == 'html.parser' else 'lxml')
+
+
+def parse_fast(html):
+    """Document for the hot extractors: a raw lxml tree when configured, else a soup"""
+    if _config['backend'] == 'lxml.html':
+        return parse_tree(html)
+    return parse(html)
+
+
+def parse_tree(html):
+    """lxml.html document; an empty <html> element for empty input"""
+    # Parse bytes so pages with an XML encoding declaration are accepted
+    parser = lxml.html.HTMLParser(encoding='utf-8')
+    try:
+        with metrics.timed('parse'):
+            return lxml.html.document_fromstring(html.encode('utf-8', errors='replace'), parser=parser)
+    except etree.ParserError:
+        return lxml.html.Element('html')
+
+
+def is_tree(doc):
+    return lxml is not None and isinstance(doc, etree._Element)
+
+
+def text_content(doc):
+    """All text of the document, like soup.get_text()"""
+    if is_tree(doc):
+        return doc.text_content()
+    return doc.get_text()
+
+
+def title(doc):
+    """Text of the first <title>, or None"""
+    if is_tree(doc):
+        tag = doc.find('.//title')
+        return tag.text_content() if tag is not None else None
+    tag = doc.find('title')
+    return tag.text if tag else None
+
+
+def meta_tags(doc):
+    """Attribute dicts of every <meta> tag in document order"""
+    if is_tree(doc):
+        return [dict(tag.attrib) for tag in doc.iter('meta')]
+    return [tag.attrs for tag in doc.find_all('meta')]
+
+
+def script_sources(doc):
+    """src of every external <script>"""
+    if is_tree(doc):
+        return [str(src) for src in doc.xpath('//script/@src')]
+    return [tag['src'] for tag in doc.find_all('script', src=True)]
+
+
+def links(doc):
+    """href of every <a> in document order"""
+    if is_tree(doc):
+        return [str(href) for href in doc.xpath('//a/@href')]
+    return [tag['href'] for tag in doc.find_all('a', href=True)]
@@ -0,0 +1,42 @@
+"""
+Data and resource locations on each platform
+The database, HTTP cache and other persistent files live in a per-user data
+folder:
+    Windows     %APPDATA%/LeadDork
+    macOS       ~/Library/Application Support/LeadDork
+    Linux       $XDG_DATA_HOME/LeadDork (default ~/.local/share/LeadDork)
+LEADGEN_DATA_DIR overrides the folder (servers, containers). APPDATA is
+honored on every platform, as earlier versions required it.
+"""
+
+import os
+import sys
+
+APP_NAME = 'LeadDork'
+DATA_DIR_ENV = 'LEADGEN_DATA_DIR'
+
+
+def data_dir(create=True):
+    """Folder for the app's persistent files"""
+    folder = os.getenv(DATA_DIR_ENV)
+    if not folder:
+        base = os.getenv('APPDATA')
+        if not base:
+            if sys.platform == 'darwin':
+                base = os.path.join(os.path.expanduser('~'), 'Library', 'Application Support')
+            else:
+                base = os.getenv('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+        folder = os.path.join(base, APP_NAME)
+    if create:
+        os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+def db_path():
+    return os.path.join(data_dir(), 'database.db')
+
+
+def resource_path(relative_path):
+    """Path to a file shipped with the app (inside the exe when frozen with PyInstaller)"""
+    base_path = getattr(sys, '_MEIPASS', None) or os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_path, relative_path)
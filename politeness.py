@@ -0,0 +1,420 @@
+"""
+Per-host politeness scheduler
+Every outbound request (http_client and the async engine) first takes a
+token from its host's bucket. Each bucket has a steady rate and a burst size,
+and a per-host concurrency cap also applies, to threads and coroutines alike.
+Redirect hops take a token from their own host's bucket. A request that would
+wait longer than max_wait fails fast with HostBusy instead of tying up a worker. A host's robots.txt Crawl-delay
+(fetched in the background on first contact, cached through http_cache's
+'robots' policy) slows its bucket down further. Hosts that are known to
+throttle (search engines, GitHub) get tighter limits. interleave() orders
+multi-host work so that the hosts with budget left are served first.
+"""
+
+import asyncio
+import threading
+import time
+import urllib.robotparser
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import urlsplit
+
+DEFAULT_RATE = 4.0          # requests per second per host (steady state)
+DEFAULT_BURST = 8           # requests a host can take back to back
+DEFAULT_CONCURRENCY = 6     # requests in flight per host
+MAX_CRAWL_DELAY = 30        # larger robots.txt delays are clamped to this
+ROBOTS_TIMEOUT = 5
+MAX_HOSTS = 4096            # host buckets kept (LRU; buckets in use or still refilling are never dropped)
+MAX_WAIT = 10               # seconds a request may wait for its host before HostBusy is raised
+SLOT_POLL = 0.02            # seconds between slot checks for coroutines waiting on a busy host
+INTERLEAVE_WINDOW = 256     # work items looked ahead when interleaving hosts
+
+# (rate, burst, concurrency) for hosts that throttle scrapers; subdomains inherit
+HOST_LIMITS = {
+    'google.com': (0.5, 2, 1),
+    'bing.com': (0.5, 2, 1),
+    'duckduckgo.com': (0.5, 2, 1),
+    'github.com': (1.0, 3, 2),
+    'linkedin.com': (0.5, 2, 1),
+}
+
+_config = {
+    'enabled': True,
+    'rate': DEFAULT_RATE,
+    'burst': DEFAULT_BURST,
+    'concurrency': DEFAULT_CONCURRENCY,
+    'respect_robots': True,
+    'max_wait': MAX_WAIT,                           # None waits as long as it takes
+    'exempt': {'localhost', '127.0.0.1', '::1'},    # never limited (local services)
+}
+
+
+class HostBusy(OSError):
+    """The host's rate or concurrency limit would keep this request waiting longer than max_wait"""
+
+
+class HostBucket:
+    """Token bucket plus concurrency cap for one host
+
+    reserve() hands out tokens in order and returns how long the caller must
+    wait for its token, so waiting happens outside the lock and both threads
+    and coroutines can share the bucket. users counts callers holding the
+    bucket (waiting or in flight); the LRU never drops a bucket in use.
+    """
+
+    def __init__(self, host, rate, burst, concurrency):
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.concurrency = concurrency
+        self.in_flight = 0
+        self.users = 0
+        self.requests = 0
+        self.refused = 0
+        self.waited = 0.0
+        self.crawl_delay = None
+        self.robots_state = None        # None, 'pending' or 'done'
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, max_wait=None):
+        """Take a token; returns seconds until it may be used
+
+        Raises HostBusy, without taking the token, when that is more than max_wait.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            delay = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+            if max_wait is not None and delay > max_wait:
+                self.refused += 1
+                raise HostBusy(f'{self.host}: next request allowed in {delay:.1f}s (max wait {max_wait}s)')
+            self.tokens -= 1
+            self.requests += 1
+            self.waited += delay
+            return delay
+
+    def acquire(self, timeout=None):
+        """Take a concurrency slot, waiting at most timeout seconds (HostBusy after that)"""
+        if not self.slots.acquire(timeout=timeout):
+            with self._lock:
+                self.refused += 1
+            raise HostBusy(f'{self.host}: {self.concurrency} requests already in flight')
+        with self._lock:
+            self.in_flight += 1
+
+    async def acquire_async(self, timeout=None):
+        """acquire() for coroutines: polls the slot so the event loop keeps running"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.slots.acquire(blocking=False):
+            if deadline is not None and time.monotonic() >= deadline:
+                with self._lock:
+                    self.refused += 1
+                raise HostBusy(f'{self.host}: {self.concurrency} requests already in flight')
+            await asyncio.sleep(SLOT_POLL)
+        with self._lock:
+            self.in_flight += 1
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self.slots.release()
+
+    def idle(self):
+        """True when nobody uses the bucket and it has refilled, so a fresh one would behave the same"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self.users == 0 and self.tokens >= self.burst
+
+    def ready_in(self):
+        """Seconds until a new reservation would get its token"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def slow_down(self, crawl_delay):
+        """Apply a robots.txt Crawl-delay: at most one request per crawl_delay seconds"""
+        crawl_delay = min(float(crawl_delay), MAX_CRAWL_DELAY)
+        with self._lock:
+            self.crawl_delay = crawl_delay
+            if crawl_delay > 0 and 1 / crawl_delay < self.rate:
+                self.rate = 1 / crawl_delay
+                self.burst = 1
+                self.tokens = min(self.tokens, 1)
+
+    def stats(self):
+        with self._lock:
+            return {'rate': round(self.rate, 3), 'burst': self.burst, 'concurrency': self.concurrency,
+                    'in_flight': self.in_flight, 'requests': self.requests, 'refused': self.refused,
+                    'waited': round(self.waited, 3), 'crawl_delay': self.crawl_delay}
+
+
+def _limits(host):
+    parts = host.split('.')
+    for i in range(len(parts) - 1):
+        limits = HOST_LIMITS.get('.'.join(parts[i:]))
+        if limits:
+            return limits
+    return _config['rate'], _config['burst'], _config['concurrency']
+
+
+class Politeness:
+    def __init__(self, max_hosts=MAX_HOSTS):
+        self.max_hosts = max_hosts
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self._robots = ThreadPoolExecutor(max_workers=4, thread_name_prefix='robots')
+
+    def bucket(self, host, use=False):
+        """Bucket for host; use=True also counts the caller as a user (release with _leave())"""
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = HostBucket(host, *_limits(host))
+                self._buckets[host] = bucket
+                self._evict()
+            else:
+                self._buckets.move_to_end(host)
+            if use:
+                bucket.users += 1
+            return bucket
+
+    def _evict(self):
+        """Drop the least recently used idle buckets beyond max_hosts (lock held)"""
+        excess = len(self._buckets) - self.max_hosts
+        if excess > 0:
+            idle = list(islice((host for host, bucket in self._buckets.items() if bucket.idle()), excess))
+            for host in idle:
+                del self._buckets[host]
+
+    def _leave(self, bucket):
+        with self._lock:
+            bucket.users -= 1
+
+    def _check_robots(self, bucket, origin):
+        """Fetch the host's robots.txt once, in the background; its Crawl-delay applies from then on"""
+        if bucket.robots_state is not None or not _config['respect_robots']:
+            return
+        with bucket._lock:
+            if bucket.robots_state is not None:
+                return
+            bucket.robots_state = 'pending'
+        self._robots.submit(self._load_robots, bucket, origin)
+
+    def _load_robots(self, bucket, origin):
+        delay = None
+        try:
+            delay = robots_crawl_delay(origin)
+        except Exception:
+            pass
+        if delay:
+            bucket.slow_down(delay)
+        bucket.robots_state = 'done'
+
+    def _enter(self, url):
+        """Bucket for url (counted as in use) with robots checking started, or None when politeness doesn't apply"""
+        if not _config['enabled']:
+            return None
+        parts = urlsplit(url)
+        host = (parts.hostname or '').lower()
+        if not host or host in _config['exempt']:
+            return None
+        bucket = self.bucket(host, use=True)
+        if parts.path != '/robots.txt':
+            self._check_robots(bucket, f"{parts.scheme or 'https'}://{parts.netloc.rpartition('@')[2]}")
+        return bucket
+
+    @contextmanager
+    def slot(self, url):
+        """Wait for url's host to have a token and a free concurrency slot, and hold the slot"""
+        bucket = self._enter(url)
+        if bucket is None:
+            yield
+            return
+        try:
+            max_wait = _config['max_wait']
+            delay = bucket.reserve(max_wait)
+            if delay:
+                time.sleep(delay)
+            bucket.acquire(None if max_wait is None else max_wait - delay)
+            try:
+                yield
+            finally:
+                bucket.release()
+        finally:
+            self._leave(bucket)
+
+    @asynccontextmanager
+    async def slot_async(self, url):
+        """slot() for coroutines"""
+        bucket = self._enter(url)
+        if bucket is None:
+            yield
+            return
+        try:
+            max_wait = _config['max_wait']
+            delay = bucket.reserve(max_wait)
+            if delay:
+                await asyncio.sleep(delay)
+            await bucket.acquire_async(None if max_wait is None else max_wait - delay)
+            try:
+                yield
+            finally:
+                bucket.release()
+        finally:
+            self._leave(bucket)
+
+    def wait(self, url):
+        """Wait for a token only (redirect hops, whose request already holds a slot)"""
+        bucket = self._enter(url)
+        if bucket is not None:
+            try:
+                delay = bucket.reserve(_config['max_wait'])
+                if delay:
+                    time.sleep(delay)
+            finally:
+                self._leave(bucket)
+
+    async def wait_async(self, url):
+        """wait() for coroutines"""
+        bucket = self._enter(url)
+        if bucket is not None:
+            try:
+                delay = bucket.reserve(_config['max_wait'])
+                if delay:
+                    await asyncio.sleep(delay)
+            finally:
+                self._leave(bucket)
+
+    def ready_in(self, host):
+        with self._lock:
+            bucket = self._buckets.get(host)
+        return bucket.ready_in() if bucket is not None else 0.0
+
+    def in_flight(self, host):
+        with self._lock:
+            bucket = self._buckets.get(host)
+        return bucket.in_flight if bucket is not None else 0
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self, top=20):
+        with self._lock:
+            buckets = list(self._buckets.values())
+        busiest = sorted(buckets, key=lambda b: b.requests, reverse=True)[:top]
+        return {
+            'enabled': _config['enabled'],
+            'hosts': len(buckets),
+            'requests': sum(b.requests for b in buckets),
+            'refused': sum(b.refused for b in buckets),
+            'waited': round(sum(b.waited for b in buckets), 3),
+            'busiest': {b.host: b.stats() for b in busiest},
+        }
+
+
+def robots_rules(base_url):
+    """Parsed robots.txt for a site (RobotFileParser), or None when it has none"""
+    import http_cache
+
+    page = http_cache.fetch(base_url + '/robots.txt', policy='robots', timeout=ROBOTS_TIMEOUT)
+    if page.status_code != 200:
+        return None
+    parser = urllib.robotparser.RobotFileParser()
+    parser.parse(page.text.splitlines())
+    return parser
+
+
+def robots_crawl_delay(base_url):
+    """Crawl-delay (or 1 / Request-rate) robots.txt asks of us, or None"""
+    import http_client
+
+    parser = robots_rules(base_url)
+    if parser is None:
+        return None
+    agent = http_client.get_headers()['User-Agent']
+    delay = parser.crawl_delay(agent)
+    rate = parser.request_rate(agent)
+    if rate is not None and rate.requests:
+        delay = max(delay or 0, rate.seconds / rate.requests)
+    return float(delay) if delay else None
+
+
+limiter = Politeness()
+
+
+def configure(enabled=None, rate=None, burst=None, concurrency=None, respect_robots=None, host_limits=None,
+              exempt=None, max_wait=False):
+    """Change limits; existing host buckets are dropped and rebuilt on next use (max_wait=None: no limit)"""
+    for name, value in (('enabled', enabled), ('rate', rate), ('burst', burst), ('concurrency', concurrency),
+                        ('respect_robots', respect_robots), ('exempt', exempt and set(exempt))):
+        if value is not None:
+            _config[name] = value
+    if max_wait is not False:
+        _config['max_wait'] = max_wait
+    if host_limits:
+        HOST_LIMITS.update(host_limits)
+    limiter.clear()
+
+
+def slot(url):
+    return limiter.slot(url)
+
+
+def slot_async(url):
+    return limiter.slot_async(url)
+
+
+def wait(url):
+    return limiter.wait(url)
+
+
+def wait_async(url):
+    return limiter.wait_async(url)
+
+
+def stats():
+    return limiter.stats()
+
+
+def interleave(items, host_of, window=INTERLEAVE_WINDOW):
+    """Reorder work items across hosts
+
+    Looks up to window items ahead. Each next item comes from the host that
+    can be served soonest (token ready, fewest requests in flight), and ties
+    go round-robin, so one host's items never queue behind another host's
+    rate limit.
+    """
+    queues = OrderedDict()
+    buffered = 0
+    items = iter(items)
+    exhausted = False
+    while True:
+        while not exhausted and buffered < window:
+            try:
+                item = next(items)
+            except StopIteration:
+                exhausted = True
+                break
+            queues.setdefault(host_of(item), deque()).append(item)
+            buffered += 1
+        if not queues:
+            return
+        host = min(queues, key=lambda h: (limiter.ready_in(h), limiter.in_flight(h)))
+        pending = queues[host]
+        item = pending.popleft()
+        buffered -= 1
+        if pending:
+            queues.move_to_end(host)
+        else:
+            del queues[host]
+        yield item
@@ -0,0 +1,191 @@
+"""
+Concurrent path/subdomain probe engine
+Runs HEAD/GET existence checks in parallel under one overall deadline,
+optionally stopping at the first match, and caches outcomes per domain.
+Hosts that DNS reports as nonexistent are answered without an HTTP attempt.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlsplit
+
+import http_client
+import page_cache
+import resolver
+
+MAX_WORKERS = 32
+OUTCOME_TTL = 600        # seconds a probe outcome is reused
+ERROR_TTL = 30           # no answer (DNS, connect, timeout), 429 and 5xx are retried soon
+MAX_DOMAINS = 2048       # per-domain outcome tables kept (LRU)
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='probe')
+
+
+class ProbeResult:
+    __slots__ = ('url', 'status_code', 'cached')
+
+    def __init__(self, url, status_code, cached=False):
+        self.url = url
+        self.status_code = status_code      # None when the request failed or timed out
+        self.cached = cached
+
+    @property
+    def ok(self):
+        return self.status_code == 200
+
+    def to_dict(self):
+        return {'url': self.url, 'status_code': self.status_code, 'cached': self.cached}
+
+
+class OutcomeCache:
+    """host -> {(method, url, allow_redirects): (status_code, expires)}"""
+
+    def __init__(self, ttl=OUTCOME_TTL, error_ttl=ERROR_TTL, max_domains=MAX_DOMAINS):
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.max_domains = max_domains
+        self._domains = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        host = urlsplit(key[1]).netloc.lower()
+        with self._lock:
+            table = self._domains.get(host)
+            entry = table.get(key) if table else None
+            if entry is None or entry[1] < time.time():
+                self.misses += 1
+                return None
+            self._domains.move_to_end(host)
+            self.hits += 1
+            return entry
+
+    def put(self, key, status_code):
+        """Record an outcome; transient failures expire after error_ttl instead of ttl"""
+        host = urlsplit(key[1]).netloc.lower()
+        transient = status_code is None or status_code == 429 or status_code >= 500
+        with self._lock:
+            table = self._domains.setdefault(host, {})
+            table[key] = (status_code, time.time() + (self.error_ttl if transient else self.ttl))
+            self._domains.move_to_end(host)
+            while len(self._domains) > self.max_domains:
+                self._domains.popitem(last=False)
+
+    def domain(self, host):
+        """Fresh outcomes recorded for one host"""
+        now = time.time()
+        with self._lock:
+            table = dict(self._domains.get(host.lower(), {}))
+        return [{'method': k[0], 'url': k[1], 'status_code': v[0]} for k, v in table.items() if v[1] >= now]
+
+    def clear(self):
+        with self._lock:
+            self._domains.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'domains': len(self._domains),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+outcomes = OutcomeCache()
+
+
+def _probe_one(method, url, timeout, allow_redirects):
+    try:
+        if method == 'GET':
+            # Bodies go through the page cache so the caller can read the matched page for free
+            return page_cache.fetch_page(url, timeout=timeout).status_code
+        return http_client.head(url, timeout=timeout, allow_redirects=allow_redirects).status_code
+    except Exception:
+        return None
+
+
+def _run(key, timeout):
+    method, url, allow_redirects = key
+    status = _probe_one(method, url, timeout, allow_redirects)
+    outcomes.put(key, status)
+    return status
+
+
+def probe(urls, method='HEAD', timeout=5, deadline=10, first_match=False, allow_redirects=False):
+    """Probe urls concurrently and return [ProbeResult] in input order
+
+    deadline bounds the whole call; probes still pending at the deadline are
+    reported with status_code None. With first_match the call returns as soon
+    as the earliest-listed URL that answers 200 is known (list order is the
+    priority order), and only results up to that match are returned. URLs on
+    hosts without DNS records are reported with status_code None straight away.
+    """
+    method = method.upper()
+    urls = list(urls)
+    results = [None] * len(urls)
+    pending = {}
+    stop_at = time.time() + deadline
+
+    uncached = []
+    for i, url in enumerate(urls):
+        cached = outcomes.get((method, url, allow_redirects))
+        if cached is not None:
+            results[i] = ProbeResult(url, cached[0], cached=True)
+        else:
+            uncached.append(i)
+
+    missing = resolver.missing_hosts([urls[i] for i in uncached], timeout=min(timeout, deadline)) if uncached else ()
+    for i in uncached:
+        if urlsplit(urls[i]).hostname in missing:
+            results[i] = ProbeResult(urls[i], None)
+        else:
+            key = (method, urls[i], allow_redirects)
+            pending[_executor.submit(_run, key, max(0.1, min(timeout, stop_at - time.time())))] = i
+
+    def settled_match():
+        for result in results:
+            if result is None:
+                return None
+            if result.ok:
+                return result
+        return None
+
+    while pending:
+        if first_match and settled_match():
+            break
+        remaining = stop_at - time.time()
+        if remaining <= 0:
+            break
+        done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            i = pending.pop(future)
+            results[i] = ProbeResult(urls[i], future.result())
+
+    # Anything still running finishes in the background and lands in the outcome cache
+    for future, i in pending.items():
+        future.cancel()
+        results[i] = ProbeResult(urls[i], None)
+
+    if first_match:
+        match = settled_match()
+        if match is not None:
+            return results[:results.index(match) + 1]
+    return results
+
+
+def first_ok(urls, **kwargs):
+    """URL of the highest-priority probe answering 200, or None"""
+    for result in probe(urls, first_match=True, **kwargs):
+        if result.ok:
+            return result.url
+    return None
+
+
+def all_ok(urls, **kwargs):
+    """URLs answering 200, in input order"""
+    return [result.url for result in probe(urls, **kwargs) if result.ok]
@@ -0,0 +1,184 @@
+"""
+On-demand request profiling
+When profiling is enabled in config, a request that carries ?profile=1 or an
+X-Profile: 1 header runs under cProfile. The slowest functions by cumulative
+and by own time are kept with the request (latest MAX_PROFILES requests), and
+the response gets an X-Profile-Id header to look them up on /api/profiles.
+With ?profile=inline (or X-Profile: inline), a JSON object response also
+carries the profile under '_profile'.
+
+cProfile sees the request's own thread only. Work handed to pools (crawler
+workers, probes, DNS, async views) appears as time spent waiting on them.
+One request is profiled at a time; while one runs, other flagged requests
+are served unprofiled with X-Profile: busy.
+"""
+
+import cProfile
+import itertools
+import os
+import pstats
+import threading
+import time
+from collections import deque
+
+from flask import g, request
+
+MAX_PROFILES = 100          # profiled requests kept (most recent)
+TOP_FUNCTIONS = 25          # functions kept per profile and ordering
+HEADER = 'X-Profile'
+PARAM = 'profile'
+
+_config = {
+    'enabled': False,       # profiling costs 2-5x a request's time; opt in per deployment
+}
+
+_profiles = deque(maxlen=MAX_PROFILES)
+_profiles_lock = threading.Lock()
+_active = threading.Lock()  # cProfile can only run one profiler per process on 3.12+
+_ids = itertools.count(1)
+_root = os.path.dirname(os.path.abspath(__file__))
+
+
+def configure(enabled=None):
+    if enabled is not None:
+        _config['enabled'] = bool(enabled)
+
+
+def enabled():
+    return _config['enabled']
+
+
+def _requested():
+    """None, 'store' or 'inline' from the query flag or header"""
+    value = (request.args.get(PARAM) or request.headers.get(HEADER) or '').strip().lower()
+    if not value or value in ('0', 'false', 'no', 'off'):
+        return None
+    return 'inline' if value == 'inline' else 'store'
+
+
+def _label(func):
+    filename, line, name = func
+    if filename == '~':
+        return name         # builtins, e.g. <method 'read' of '_ssl._SSLSocket' objects>
+    if filename.startswith(_root + os.sep):
+        filename = os.path.relpath(filename, _root)
+    else:
+        filename = os.sep.join(filename.split(os.sep)[-2:])
+    return f'{filename}:{line}({name})'
+
+
+def _top(stats, key):
+    index = {'cumulative': 3, 'internal': 2}[key]
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][index], reverse=True)[:TOP_FUNCTIONS]
+    return [{'function': _label(func), 'calls': calls, 'primitive_calls': primitive,
+             'own_s': round(own, 6), 'cumulative_s': round(cumulative, 6)}
+            for func, (primitive, calls, own, cumulative, _) in rows]
+
+
+def summarize(profiler):
+    """Top functions by cumulative and by own time from a finished profiler"""
+    stats = pstats.Stats(profiler)
+    return {
+        'total_calls': stats.total_calls,
+        'cumulative': _top(stats, 'cumulative'),
+        'internal': _top(stats, 'internal'),
+    }
+
+
+def _before_request():
+    if not _config['enabled']:
+        return
+    mode = _requested()
+    if mode is None:
+        return
+    if not _active.acquire(blocking=False):
+        g.profile_busy = True
+        return
+    profiler = cProfile.Profile()
+    g.profile = (profiler, mode, time.time(), time.perf_counter())
+    profiler.enable()
+
+
+def _stop():
+    """Stop this request's profiler; returns its state or None"""
+    state = g.pop('profile', None)
+    if state is not None:
+        state[0].disable()
+        _active.release()
+    return state
+
+
+def _after_request(response):
+    if g.pop('profile_busy', False):
+        response.headers[HEADER] = 'busy'
+        return response
+    state = _stop()
+    if state is None:
+        return response
+    profiler, mode, started_at, start = state
+    profile = {
+        'id': next(_ids),
+        'method': request.method,
+        'path': request.path,
+        'query': {k: v for k, v in request.args.items() if k != PARAM},
+        'endpoint': request.url_rule.rule if request.url_rule is not None else None,
+        'status': response.status_code,
+        'duration': round(time.perf_counter() - start, 4),
+        'started_at': started_at,
+    }
+    profile.update(summarize(profiler))
+    with _profiles_lock:
+        _profiles.append(profile)
+    response.headers[HEADER + '-Id'] = str(profile['id'])
+    if mode == 'inline' and response.is_json and not response.is_streamed:
+        body = response.get_json(silent=True)
+        if isinstance(body, dict):
+            body['_profile'] = profile
+            response.set_data(response.json_module.dumps(body))
+    return response
+
+
+def _teardown_request(exc):
+    _stop()     # the request failed before after_request ran
+
+
+def init_app(app):
+    """Profile flagged requests (no-op per request while disabled)"""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+
+
+def _summary(profile):
+    summary = {key: profile[key] for key in ('id', 'method', 'path', 'query', 'endpoint', 'status', 'duration',
+                                             'started_at', 'total_calls')}
+    summary['top'] = [row['function'] for row in profile['cumulative'][:5]]
+    return summary
+
+
+def recent(limit=20, path=None, order='slowest'):
+    """Summaries of kept profiles, slowest first (order='slowest') or newest first ('recent')"""
+    if order not in ('slowest', 'recent'):
+        raise ValueError(f"Unknown order {order!r}, expected 'slowest' or 'recent'")
+    with _profiles_lock:
+        profiles = list(_profiles)
+    if path:
+        profiles = [p for p in profiles if p['path'] == path or p['endpoint'] == path]
+    if order == 'slowest':
+        profiles.sort(key=lambda p: p['duration'], reverse=True)
+    else:
+        profiles.reverse()
+    return [_summary(p) for p in profiles[:max(1, int(limit))]]
+
+
+def get(profile_id):
+    with _profiles_lock:
+        for profile in _profiles:
+            if profile['id'] == profile_id:
+                return profile
+    return None
+
+
+def clear():
+    with _profiles_lock:
+        _profiles.clear()
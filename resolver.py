@@ -0,0 +1,314 @@
+"""
+Caching DNS resolver
+Resolves hostnames on a small thread pool and caches answers for their DNS
+TTL, including negative answers (NXDOMAIN / no address records) for the
+zone's SOA minimum, so probes can skip hosts that cannot exist without
+making an HTTP attempt. prefetch() warms the cache for a batch of domains
+ahead of fetching.
+
+Uses dnspython when installed (real TTLs, configurable nameservers, e.g. a
+local stub resolver on another port); otherwise falls back to the system
+resolver (socket.getaddrinfo) with fixed TTLs. A custom lookup function can
+also be injected with configure(lookup=...).
+"""
+
+import ipaddress
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+import metrics
+
+try:
+    import dns.exception
+    import dns.rdatatype
+    import dns.resolver
+except ImportError:
+    dns = None
+
+MAX_WORKERS = 16
+LOOKUP_TIMEOUT = 3          # seconds per query; a lookup may need two (A, then AAAA)
+DEFAULT_TTL = 300           # used when the answer carries no TTL (system resolver)
+NEGATIVE_TTL = 300          # NXDOMAIN without an SOA record
+ERROR_TTL = 30              # timeouts / SERVFAIL are retried soon
+MIN_TTL = 30
+MAX_TTL = 3600
+MAX_ENTRIES = 10000         # hosts kept in the cache (LRU)
+
+OK = 'ok'
+NXDOMAIN = 'nxdomain'       # the name does not exist
+NO_ADDRESS = 'no_address'   # the name exists but has no A/AAAA records
+ERROR = 'error'             # timeout, SERVFAIL, refused...
+
+
+class Resolution:
+    __slots__ = ('host', 'status', 'addresses', 'ttl', 'cached')
+
+    def __init__(self, host, status, addresses=(), ttl=0, cached=False):
+        self.host = host
+        self.status = status
+        self.addresses = list(addresses)
+        self.ttl = ttl
+        self.cached = cached
+
+    @property
+    def ok(self):
+        return self.status == OK
+
+    @property
+    def ipv4(self):
+        """First IPv4 address, or None"""
+        return next((address for address in self.addresses if ':' not in address), None)
+
+    @property
+    def missing(self):
+        """True when DNS says definitively that the host has no address"""
+        return self.status in (NXDOMAIN, NO_ADDRESS)
+
+    def to_dict(self):
+        return {'host': self.host, 'status': self.status, 'addresses': self.addresses,
+                'ttl': self.ttl, 'cached': self.cached}
+
+
+class ResolutionCache:
+    """host -> (Resolution, expires), LRU-bounded"""
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, host):
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is None or entry[1] < time.time():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(host)
+            self.hits += 1
+            result = entry[0]
+        return Resolution(result.host, result.status, result.addresses,
+                          max(0, int(entry[1] - time.time())), cached=True)
+
+    def put(self, result):
+        with self._lock:
+            self._entries[result.host] = (result, time.time() + result.ttl)
+            self._entries.move_to_end(result.host)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            negative = sum(1 for result, _ in self._entries.values() if result.missing)
+            return {
+                'hosts': len(self._entries),
+                'negative': negative,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def _clamp(ttl):
+    return max(MIN_TTL, min(MAX_TTL, int(ttl)))
+
+
+def _negative_ttl(response):
+    """SOA minimum from the authority section of a negative answer (RFC 2308)"""
+    if response is not None:
+        for rrset in response.authority:
+            if rrset.rdtype == dns.rdatatype.SOA:
+                return _clamp(min(rrset.ttl, rrset[0].minimum))
+    return NEGATIVE_TTL
+
+
+def system_lookup(host, timeout):
+    """Lookup through getaddrinfo (hosts file + system resolver); returns (status, addresses, ttl)"""
+    try:
+        infos = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)
+    except socket.gaierror as e:
+        if e.errno == socket.EAI_NONAME:
+            return NXDOMAIN, [], NEGATIVE_TTL
+        if e.errno == getattr(socket, 'EAI_NODATA', None):
+            return NO_ADDRESS, [], NEGATIVE_TTL
+        return ERROR, [], ERROR_TTL
+    addresses = list(dict.fromkeys(info[4][0] for info in infos))
+    return OK, addresses, DEFAULT_TTL
+
+
+class DnsLookup:
+    """dnspython lookup: A, then AAAA, with TTLs taken from the answers"""
+
+    def __init__(self, nameservers=None, port=53):
+        self.system = not nameservers
+        self._resolver = dns.resolver.Resolver(configure=self.system)
+        if nameservers:
+            self._resolver.nameservers = list(nameservers)
+        self._resolver.port = port
+
+    def __call__(self, host, timeout):
+        negative = None
+        for rdtype in ('A', 'AAAA'):
+            try:
+                answer = self._resolver.resolve(host, rdtype, lifetime=timeout, search=False)
+            except dns.resolver.NXDOMAIN as e:
+                negative = (NXDOMAIN, [], _negative_ttl(e.responses().get(e.qnames()[0])))
+                break
+            except dns.resolver.NoAnswer as e:
+                negative = (NO_ADDRESS, [], _negative_ttl(e.kwargs.get('response')))
+                continue
+            except (dns.exception.DNSException, OSError):
+                return ERROR, [], ERROR_TTL
+            return OK, [record.address for record in answer], _clamp(answer.rrset.ttl)
+        if self.system:
+            # Names from the hosts file (localhost, intranet aliases) are invisible to DNS
+            status, addresses, ttl = system_lookup(host, timeout)
+            if status == OK:
+                return status, addresses, ttl
+        return negative
+
+
+class Resolver:
+    def __init__(self, lookup=None, max_workers=MAX_WORKERS, timeout=LOOKUP_TIMEOUT):
+        if lookup is None:
+            lookup = DnsLookup() if dns is not None else system_lookup
+        self.lookup = lookup
+        self.timeout = timeout
+        self.cache = ResolutionCache()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='dns')
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def _run(self, host):
+        try:
+            with metrics.timed('dns'):
+                status, addresses, ttl = self.lookup(host, self.timeout)
+        except Exception:
+            status, addresses, ttl = ERROR, [], ERROR_TTL
+        result = Resolution(host, status, addresses, ttl)
+        self.cache.put(result)
+        with self._lock:
+            self._in_flight.pop(host, None)
+        return result
+
+    def submit(self, host):
+        """Future for host's Resolution; concurrent callers share one lookup"""
+        with self._lock:
+            future = self._in_flight.get(host)
+            if future is None:
+                future = self._executor.submit(self._run, host)
+                self._in_flight[host] = future
+            return future
+
+    def resolve_many(self, hosts, timeout=None):
+        """{host: Resolution} for hosts, looked up concurrently; unanswered ones come back as ERROR"""
+        results = {}
+        futures = {}
+        for host in dict.fromkeys(normalize_host(h) for h in hosts):
+            if not host:
+                continue
+            literal = _literal(host)
+            cached = literal or self.cache.get(host)
+            if cached is not None:
+                results[host] = cached
+            else:
+                futures[self.submit(host)] = host
+        if futures:
+            # Long enough for an A query and an AAAA query, so slow IPv6-only hosts aren't reported as errors
+            done, _ = wait(futures, timeout=2 * self.timeout + 1 if timeout is None else timeout)
+            for future, host in futures.items():
+                results[host] = future.result() if future in done else Resolution(host, ERROR)
+        return results
+
+    def resolve(self, host, timeout=None):
+        host = normalize_host(host)
+        return self.resolve_many([host], timeout).get(host) or Resolution(host, ERROR)
+
+    def prefetch(self, hosts):
+        """Start lookups for hosts not already cached, without waiting for them"""
+        for host in dict.fromkeys(normalize_host(h) for h in hosts):
+            if host and not _literal(host) and self.cache.get(host) is None:
+                self.submit(host)
+
+
+def normalize_host(value):
+    """Hostname of a URL, 'host:port' or bare domain, lowercased"""
+    value = (value or '').strip()
+    if not value:
+        return ''
+    return (urlsplit(value if '://' in value else '//' + value).hostname or '').rstrip('.')
+
+
+def _literal(host):
+    """Resolution for an IP address literal, or None for a name"""
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return None
+    return Resolution(host, OK, [host], MAX_TTL, cached=True)
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_resolver():
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = Resolver()
+    return _resolver
+
+
+def configure(nameservers=None, port=53, lookup=None, timeout=None, max_workers=None):
+    """Replace the shared resolver, e.g. configure(nameservers=['127.0.0.1'], port=5353) or configure(lookup=fn)
+
+    lookup is called as lookup(host, timeout) and returns (status, addresses, ttl).
+    """
+    global _resolver
+    if lookup is None and nameservers:
+        if dns is None:
+            raise RuntimeError('nameservers require dnspython (pip install dnspython)')
+        lookup = DnsLookup(nameservers, port)
+    resolver = Resolver(lookup, max_workers or MAX_WORKERS, timeout or LOOKUP_TIMEOUT)
+    with _resolver_lock:
+        _resolver = resolver
+
+
+def resolve(host, timeout=None):
+    return get_resolver().resolve(host, timeout)
+
+
+def resolve_many(hosts, timeout=None):
+    return get_resolver().resolve_many(hosts, timeout)
+
+
+def prefetch(hosts):
+    get_resolver().prefetch(hosts)
+
+
+def missing_hosts(urls, timeout=None):
+    """Hosts among urls that DNS says do not exist (requests to them would only burn a timeout)"""
+    results = resolve_many([urlsplit(url).hostname or '' for url in urls], timeout)
+    return {host for host, result in results.items() if result.missing}
+
+
+def stats():
+    resolver = get_resolver()
+    result = resolver.cache.stats()
+    if isinstance(resolver.lookup, DnsLookup):
+        result['backend'] = 'dnspython'
+    else:
+        result['backend'] = 'system' if resolver.lookup is system_lookup else 'custom'
+    return result
@@ -8,24 +8,41 @@ OSINT endpoints (dorking, github, feeds) are in scraper_osint.py
 
 from flask import Blueprint, request, jsonify
 import requests
-from bs4 import BeautifulSoup
+import contacts
+import http_client
+import page_cache
+import parsing
+import probe
+import signatures
+import sitemap
+from bs4 import NavigableString, CData
 import re
 from urllib.parse import urlparse, urljoin
 import socket
+import time
 
 scraper_bp = Blueprint('scraper', __name__)
+scraper_bp.after_request(page_cache.add_cache_header)
 
-def get_headers():
+def competitors_from_page(response, soup):
+    """Integrations and partner logos found on an already parsed page"""
+    # Tech integrations (signatures.json, group "integration")
+    integrations = signatures.match(response.text).names('integration')
+    partners = []
+    
+    # Find logo images (potential partners)
+    for img in soup.find_all('img', alt=True):
+        alt_text = img.get('alt', '').lower()
+        if any(word in alt_text for word in ['partner', 'client', 'customer', 'logo']):
+            partners.append(alt_text)
+    
     return {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate',
-        'DNT': '1',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1'
+        'integrations': integrations[:10],
+        'potential_partners': partners[:10],
+        'integration_count': len(integrations)
     }
 
+
 @scraper_bp.route('/api/osint/competitors', methods=['POST'])
 def analyze_competitors():
     """Find competitor mentions and integrations"""
@@ -39,47 +56,58 @@ def analyze_competitors():
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
         
-        response = requests.get(url, headers=get_headers(), timeout=15)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        text = response.text.lower()
-        
-        # Common competitor/partner keywords
-        integrations = []
-        partners = []
-        
-        # Tech integrations
-        tech_keywords = {
-            'Salesforce': r'salesforce',
-            'HubSpot': r'hubspot',
-            'Slack': r'slack',
-            'Zoom': r'zoom',
-            'Microsoft Teams': r'teams\.microsoft',
-            'Google Workspace': r'workspace\.google',
-            'Stripe': r'stripe',
-            'PayPal': r'paypal'
-        }
-        
-        for tech, pattern in tech_keywords.items():
-            if re.search(pattern, text):
-                integrations.append(tech)
+        response = page_cache.fetch_page(url, timeout=15)
+        soup = parsing.parse(response.text)
         
-        # Find logo images (potential partners)
-        for img in soup.find_all('img', alt=True):
-            alt_text = img.get('alt', '').lower()
-            if any(word in alt_text for word in ['partner', 'client', 'customer', 'logo']):
-                partners.append(alt_text)
-        
-        return jsonify({
-            'integrations': integrations[:10],
-            'potential_partners': partners[:10],
-            'integration_count': len(integrations)
-        })
+        return jsonify(competitors_from_page(response, soup))
         
     except Exception as e:
         return jsonify({'error': f'Competitor analysis failed: {str(e)}'}), 500
 
 
 # ============== KEYWORD INTELLIGENCE ==============
+DEFAULT_KEYWORDS = ['automation', 'AI', 'CRM', 'analytics', 'enterprise', 'SaaS']
+
+
+def visible_text(soup):
+    """soup.get_text() without script/style content, leaving the soup intact for other extractors"""
+    return ''.join(
+        s for s in soup.find_all(string=True)
+        if type(s) in (NavigableString, CData) and s.parent.name not in ('script', 'style')
+    )
+
+
+def keywords_from_page(url, response, soup, keywords):
+    """Keyword counts and density for an already parsed page"""
+    text = visible_text(soup).lower()
+    words = text.split()
+    total_words = len(words)
+    
+    keyword_scores = {}
+    matches = []
+    
+    for keyword in keywords:
+        count = text.count(keyword.lower())
+        if count > 0:
+            density = (count / total_words) * 100 if total_words > 0 else 0
+            keyword_scores[keyword] = {
+                'count': count,
+                'density': round(density, 2)
+            }
+            matches.append(keyword)
+    
+    # Calculate relevance score
+    relevance_score = min(100, len(matches) * 15 + sum([kw['count'] for kw in keyword_scores.values()]))
+    
+    return {
+        'url': url,
+        'keywords_found': matches,
+        'keyword_details': keyword_scores,
+        'relevance_score': relevance_score,
+        'total_words': total_words
+    }
+
+
 @scraper_bp.route('/api/osint/keywords', methods=['POST'])
 def keyword_analysis():
     """Analyze page for specific keywords and score relevance"""
@@ -92,51 +120,83 @@ def keyword_analysis():
             return jsonify({'error': 'URL is required'}), 400
         
         if not keywords:
-            keywords = ['automation', 'AI', 'CRM', 'analytics', 'enterprise', 'SaaS']
+            keywords = DEFAULT_KEYWORDS
         
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
         
-        response = requests.get(url, headers=get_headers(), timeout=15)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(['script', 'style']):
-            script.decompose()
-        
-        text = soup.get_text().lower()
-        words = text.split()
-        total_words = len(words)
-        
-        keyword_scores = {}
-        matches = []
-        
-        for keyword in keywords:
-            count = text.count(keyword.lower())
-            if count > 0:
-                density = (count / total_words) * 100 if total_words > 0 else 0
-                keyword_scores[keyword] = {
-                    'count': count,
-                    'density': round(density, 2)
-                }
-                matches.append(keyword)
+        response = page_cache.fetch_page(url, timeout=15)
+        soup = parsing.parse(response.text)
         
-        # Calculate relevance score
-        relevance_score = min(100, len(matches) * 15 + sum([kw['count'] for kw in keyword_scores.values()]))
-        
-        return jsonify({
-            'url': url,
-            'keywords_found': matches,
-            'keyword_details': keyword_scores,
-            'relevance_score': relevance_score,
-            'total_words': total_words
-        })
+        return jsonify(keywords_from_page(url, response, soup, keywords))
         
     except Exception as e:
         return jsonify({'error': f'Keyword analysis failed: {str(e)}'}), 500
 
 
 # ============== LEAD SCORING ==============
+def score_from_page(response, soup):
+    """Lead score and buying signals for an already parsed page"""
+    score = 0
+    signals = []
+    text = response.text.lower()
+    found = signatures.match(response.text)
+    
+    # 1. Job postings detected (+20 points)
+    if found.names('lead_hiring'):
+        score += 20
+        signals.append('Active hiring detected')
+    
+    # 2. Recent blog posts (+15 points)
+    if soup.find('time') or soup.find('span', class_=re.compile('date|time')):
+        score += 15
+        signals.append('Active blog/content')
+    
+    # 3. Social media presence (+10 points)
+    social_count = len(re.findall(r'(linkedin|twitter|facebook|instagram)\.com', text))
+    if social_count >= 3:
+        score += 10
+        signals.append(f'{social_count} social profiles found')
+    
+    # 4. Contact forms (+10 points)
+    if soup.find('form') or found.names('lead_contact'):
+        score += 10
+        signals.append('Contact form available')
+    
+    # 5. Email addresses (+10 points)
+    emails = contacts.EMAIL_RE.findall(text)
+    if len(emails) > 2:
+        score += 10
+        signals.append(f'{len(emails)} email addresses found')
+    
+    # 6. Tech stack indicators (+15 points)
+    tech_count = len(found.names('lead_tech'))
+    if tech_count >= 3:
+        score += 15
+        signals.append(f'Advanced tech stack ({tech_count} indicators)')
+    
+    # 7. Premium keywords (+20 points)
+    premium_count = len(found.names('lead_premium'))
+    if premium_count >= 2:
+        score += 20
+        signals.append('Premium/enterprise positioning')
+    
+    # Intent level
+    if score >= 70:
+        intent = 'High - Strong buying signals'
+    elif score >= 40:
+        intent = 'Medium - Some engagement potential'
+    else:
+        intent = 'Low - Early stage'
+    
+    return {
+        'score': min(100, score),
+        'intent_level': intent,
+        'signals': signals,
+        'recommendation': 'Priority lead' if score >= 70 else 'Monitor' if score >= 40 else 'Nurture'
+    }
+
+
 @scraper_bp.route('/api/osint/score', methods=['POST'])
 def lead_scoring():
     """Comprehensive lead intelligence scoring"""
@@ -150,68 +210,10 @@ def lead_scoring():
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
         
-        score = 0
-        signals = []
-        
-        response = requests.get(url, headers=get_headers(), timeout=20)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        text = response.text.lower()
-        
-        # 1. Job postings detected (+20 points)
-        if any(word in text for word in ['careers', 'jobs', 'hiring', 'join our team', 'open positions']):
-            score += 20
-            signals.append('Active hiring detected')
-        
-        # 2. Recent blog posts (+15 points)
-        if soup.find('time') or soup.find('span', class_=re.compile('date|time')):
-            score += 15
-            signals.append('Active blog/content')
-        
-        # 3. Social media presence (+10 points)
-        social_count = len(re.findall(r'(linkedin|twitter|facebook|instagram)\.com', text))
-        if social_count >= 3:
-            score += 10
-            signals.append(f'{social_count} social profiles found')
-        
-        # 4. Contact forms (+10 points)
-        if soup.find('form') or 'contact' in text:
-            score += 10
-            signals.append('Contact form available')
-        
-        # 5. Email addresses (+10 points)
-        emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)
-        if len(emails) > 2:
-            score += 10
-            signals.append(f'{len(emails)} email addresses found')
-        
-        # 6. Tech stack indicators (+15 points)
-        tech_indicators = ['react', 'angular', 'vue', 'api', 'integration', 'platform']
-        tech_count = sum(1 for tech in tech_indicators if tech in text)
-        if tech_count >= 3:
-            score += 15
-            signals.append(f'Advanced tech stack ({tech_count} indicators)')
-        
-        # 7. Premium keywords (+20 points)
-        premium_keywords = ['enterprise', 'professional', 'premium', 'custom', 'dedicated']
-        premium_count = sum(1 for kw in premium_keywords if kw in text)
-        if premium_count >= 2:
-            score += 20
-            signals.append('Premium/enterprise positioning')
-        
-        # Intent level
-        if score >= 70:
-            intent = 'High - Strong buying signals'
-        elif score >= 40:
-            intent = 'Medium - Some engagement potential'
-        else:
-            intent = 'Low - Early stage'
+        response = page_cache.fetch_page(url, timeout=20)
+        soup = parsing.parse(response.text)
         
-        return jsonify({
-            'score': min(100, score),
-            'intent_level': intent,
-            'signals': signals,
-            'recommendation': 'Priority lead' if score >= 70 else 'Monitor' if score >= 40 else 'Nurture'
-        })
+        return jsonify(score_from_page(response, soup))
         
     except Exception as e:
         return jsonify({'error': f'Lead scoring failed: {str(e)}'}), 500
@@ -294,6 +296,72 @@ def discover_keywords():
 
 
 # ============== COMPANY GROWTH SIGNALS ==============
+GROWTH_SUBDOMAINS = ['blog', 'app', 'api', 'dev', 'staging', 'docs', 'support', 'shop', 'portal']
+GROWTH_CAREERS_PATHS = ['/careers', '/jobs', '/join-us', '/about/careers']
+
+
+def growth_from_results(url, active_subdomains, page_html, hiring_found, sitemap_summary):
+    """Growth score from already gathered subdomain probes, landing page, careers probe and sitemap"""
+    signals = []
+    growth_score = 0
+    
+    # 1. Check for subdomains (indicating expansion)
+    growth_score += 5 * len(active_subdomains)
+    if active_subdomains:
+        signals.append(f'Found {len(active_subdomains)} active subdomains: {", ".join(active_subdomains[:5])}')
+    
+    # 2. SSL Certificate check
+    if url.startswith('https://'):
+        growth_score += 10
+        signals.append('SSL Certificate active (security priority)')
+    
+    # 3. Check for blog/news (content activity)
+    text = page_html.lower()
+    
+    if any(word in text for word in ['blog', 'news', 'press', 'updates', 'announcements']):
+        growth_score += 15
+        signals.append('Active content publication (blog/news/press)')
+    
+    # 4. Job postings (hiring = growth)
+    if hiring_found or 'careers' in text or 'we\'re hiring' in text:
+        growth_score += 20
+        signals.append('Active hiring detected (company expansion)')
+    
+    # 5. New sitemap pages (frequent updates)
+    if sitemap_summary and sitemap_summary['url_count'] > 50:
+        growth_score += 10
+        signals.append(f'Large sitemap ({sitemap_summary["url_count"]} pages) - content-rich site')
+    
+    # 6. Social media presence (marketing investment)
+    social_count = len(re.findall(r'(linkedin|twitter|facebook|instagram|youtube)\.com', text))
+    if social_count >= 3:
+        growth_score += 10
+        signals.append(f'Strong social media presence ({social_count} platforms)')
+    
+    # 7. Recent dates detected (active maintenance)
+    current_year = '2025'
+    recent_year = '2024'
+    if current_year in text or recent_year in text:
+        growth_score += 10
+        signals.append('Recent content detected (2024-2025)')
+    
+    # Growth classification
+    if growth_score >= 60:
+        growth_level = 'High Growth - Scaling rapidly'
+    elif growth_score >= 30:
+        growth_level = 'Moderate Growth - Steady expansion'
+    else:
+        growth_level = 'Early Stage - Building foundation'
+    
+    return {
+        'growth_score': min(100, growth_score),
+        'growth_level': growth_level,
+        'signals': signals,
+        'active_subdomains': active_subdomains,
+        'recommendation': 'Priority outreach' if growth_score >= 60 else 'Monitor for changes' if growth_score >= 30 else 'Early stage nurture'
+    }
+
+
 @scraper_bp.route('/api/growth/signals', methods=['POST'])
 def growth_signals():
     """Detect company growth indicators"""
@@ -311,108 +379,121 @@ def growth_signals():
         domain = parsed_url.netloc
         base_url = f"{parsed_url.scheme}://{domain}"
         
-        signals = []
-        growth_score = 0
-        
-        # 1. Check for subdomains (indicating expansion)
-        common_subdomains = ['blog', 'app', 'api', 'dev', 'staging', 'docs', 'support', 'shop', 'portal']
-        active_subdomains = []
-        
-        for subdomain in common_subdomains:
-            try:
-                sub_url = f"https://{subdomain}.{domain}"
-                response = requests.head(sub_url, timeout=3, allow_redirects=True)
-                if response.status_code == 200:
-                    active_subdomains.append(subdomain)
-                    growth_score += 5
-            except:
-                pass
-        
-        if active_subdomains:
-            signals.append(f'Found {len(active_subdomains)} active subdomains: {", ".join(active_subdomains[:5])}')
-        
-        # 2. SSL Certificate check
-        try:
-            if url.startswith('https://'):
-                growth_score += 10
-                signals.append('SSL Certificate active (security priority)')
-        except:
-            pass
-        
-        # 3. Check for blog/news (content activity)
-        response = requests.get(url, headers=get_headers(), timeout=15)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        text = response.text.lower()
+        sub_results = probe.probe([f"https://{subdomain}.{domain}" for subdomain in GROWTH_SUBDOMAINS],
+                                  timeout=3, deadline=5, allow_redirects=True)
+        active_subdomains = [sub for sub, result in zip(GROWTH_SUBDOMAINS, sub_results) if result.ok]
         
-        if any(word in text for word in ['blog', 'news', 'press', 'updates', 'announcements']):
-            growth_score += 15
-            signals.append('Active content publication (blog/news/press)')
+        response = http_client.get(url, timeout=15)
         
-        # 4. Job postings (hiring = growth)
-        careers_paths = ['/careers', '/jobs', '/join-us', '/about/careers']
-        hiring_found = False
+        hiring_found = probe.first_ok([base_url + path for path in GROWTH_CAREERS_PATHS],
+                                      timeout=5, deadline=6) is not None
         
-        for path in careers_paths:
-            try:
-                career_url = base_url + path
-                response = requests.head(career_url, timeout=5)
-                if response.status_code == 200:
-                    hiring_found = True
-                    break
-            except:
-                pass
-        
-        if hiring_found or 'careers' in text or 'we\'re hiring' in text:
-            growth_score += 20
-            signals.append('Active hiring detected (company expansion)')
-        
-        # 5. New sitemap pages (frequent updates)
+        sitemap_summary = None
         try:
-            sitemap_url = base_url + '/sitemap.xml'
-            sitemap_response = requests.get(sitemap_url, timeout=10)
-            if sitemap_response.status_code == 200:
-                soup_sitemap = BeautifulSoup(sitemap_response.text, 'xml')
-                urls = soup_sitemap.find_all('loc')
-                if len(urls) > 50:
-                    growth_score += 10
-                    signals.append(f'Large sitemap ({len(urls)} pages) - content-rich site')
+            sitemap_summary = sitemap.summarize(base_url, timeout=10)
         except:
             pass
         
-        # 6. Social media presence (marketing investment)
-        social_count = len(re.findall(r'(linkedin|twitter|facebook|instagram|youtube)\.com', text))
-        if social_count >= 3:
-            growth_score += 10
-            signals.append(f'Strong social media presence ({social_count} platforms)')
-        
-        # 7. Recent dates detected (active maintenance)
-        current_year = '2025'
-        recent_year = '2024'
-        if current_year in text or recent_year in text:
-            growth_score += 10
-            signals.append('Recent content detected (2024-2025)')
-        
-        # Growth classification
-        if growth_score >= 60:
-            growth_level = 'High Growth - Scaling rapidly'
-        elif growth_score >= 30:
-            growth_level = 'Moderate Growth - Steady expansion'
-        else:
-            growth_level = 'Early Stage - Building foundation'
-        
-        return jsonify({
-            'growth_score': min(100, growth_score),
-            'growth_level': growth_level,
-            'signals': signals,
-            'active_subdomains': active_subdomains,
-            'recommendation': 'Priority outreach' if growth_score >= 60 else 'Monitor for changes' if growth_score >= 30 else 'Early stage nurture'
-        })
+        return jsonify(growth_from_results(url, active_subdomains, response.text, hiring_found, sitemap_summary))
         
     except Exception as e:
         return jsonify({'error': f'Growth signals detection failed: {str(e)}'}), 500
 
 
 # ============== MULTI-SITE AGGREGATED PROFILE ==============
+PROFILE_CAREERS_PATHS = ['/careers', '/jobs', '/about/careers', '/company/careers']
+PROFILE_PRESS_PATHS = ['/press', '/news', '/media', '/newsroom', '/blog']
+
+
+def linkedin_search_url(company_name):
+    return f"https://www.google.com/search?q=site:linkedin.com/company+{requests.utils.quote(company_name)}"
+
+
+def github_search_url(query):
+    return f"https://github.com/search?q={requests.utils.quote(query)}&type=repositories"
+
+
+def website_source(domain, page_html):
+    """Emails and social links from the company's landing page"""
+    text = page_html.lower()
+    
+    # Extract emails
+    emails = [e for e in contacts.find_emails(text) if domain in e.lower()][:5]
+    
+    # Social links
+    linkedin = contacts.LINKEDIN_COMPANY_RE.findall(text)
+    twitter = contacts.TWITTER_RE.findall(text)
+    
+    return {
+        'status': 'success',
+        'emails': emails,
+        'linkedin': linkedin[0] if linkedin else None,
+        'twitter': twitter[0] if twitter else None
+    }
+
+
+def linkedin_source(search_html):
+    """LinkedIn company page from a Google site: search result page"""
+    soup = parsing.parse(search_html)
+    
+    linkedin_links = []
+    for link in soup.find_all('a', href=True):
+        href = link['href']
+        if 'linkedin.com/company/' in href:
+            linkedin_links.append(href)
+    
+    return {
+        'status': 'found' if linkedin_links else 'not_found',
+        'url': linkedin_links[0] if linkedin_links else None
+    }
+
+
+def github_source(search_html):
+    """Top repositories from a GitHub search result page"""
+    soup = parsing.parse(search_html)
+    
+    repos = []
+    for repo_link in soup.find_all('a', class_='v-align-middle')[:3]:
+        repos.append({
+            'name': repo_link.get_text().strip(),
+            'url': f"https://github.com{repo_link.get('href', '')}"
+        })
+    
+    return {
+        'status': 'found' if repos else 'not_found',
+        'repos': repos
+    }
+
+
+def page_source(page_url):
+    """Careers/press entry from the first probed URL that answered, or None"""
+    if page_url:
+        return {'status': 'found', 'url': page_url}
+    return {'status': 'not_found'}
+
+
+def profile_summary(sources):
+    """Enriched summary over the gathered sources"""
+    return {
+        'total_emails': len(sources.get('website', {}).get('emails', [])),
+        'linkedin_found': sources.get('linkedin', {}).get('status') == 'found',
+        'github_repos': len(sources.get('github', {}).get('repos', [])),
+        'has_careers_page': sources.get('careers', {}).get('status') == 'found',
+        'has_press_page': sources.get('press', {}).get('status') == 'found',
+        'completeness': sum([
+            1 if sources.get('website', {}).get('status') == 'success' else 0,
+            1 if sources.get('linkedin', {}).get('status') == 'found' else 0,
+            1 if sources.get('github', {}).get('status') == 'found' else 0,
+            1 if sources.get('careers', {}).get('status') == 'found' else 0,
+            1 if sources.get('press', {}).get('status') == 'found' else 0
+        ]) * 20
+    }
+
+
+def normalize_profile_domain(domain):
+    return domain.replace('http://', '').replace('https://', '').replace('www.', '').split('/')[0]
+
+
 @scraper_bp.route('/api/profile/aggregate', methods=['POST'])
 def aggregate_profile():
     """Create enriched company profile from multiple sources"""
@@ -424,7 +505,7 @@ def aggregate_profile():
         if not domain:
             return jsonify({'error': 'Domain is required'}), 400
         
-        domain = domain.replace('http://', '').replace('https://', '').replace('www.', '').split('/')[0]
+        domain = normalize_profile_domain(domain)
         url = f'https://{domain}'
         
         profile = {
@@ -436,124 +517,36 @@ def aggregate_profile():
         
         # 1. Website data
         try:
-            response = requests.get(url, headers=get_headers(), timeout=15)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            text = response.text.lower()
-            
-            # Extract emails
-            emails = list(set(re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)))
-            emails = [e for e in emails if domain in e.lower()][:5]
-            
-            # Social links
-            linkedin = re.findall(r'https?://(?:www\.)?linkedin\.com/company/[\w-]+', text)
-            twitter = re.findall(r'https?://(?:www\.)?twitter\.com/[\w]+', text)
-            
-            profile['sources']['website'] = {
-                'status': 'success',
-                'emails': emails,
-                'linkedin': linkedin[0] if linkedin else None,
-                'twitter': twitter[0] if twitter else None
-            }
+            response = http_client.get(url, timeout=15)
+            profile['sources']['website'] = website_source(domain, response.text)
         except Exception as e:
             profile['sources']['website'] = {'status': 'failed', 'error': str(e)}
         
         # 2. LinkedIn preview (public)
         if company_name:
             try:
-                linkedin_search = f"https://www.google.com/search?q=site:linkedin.com/company+{requests.utils.quote(company_name)}"
-                response = requests.get(linkedin_search, headers=get_headers(), timeout=10)
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                linkedin_links = []
-                for link in soup.find_all('a', href=True):
-                    href = link['href']
-                    if 'linkedin.com/company/' in href:
-                        linkedin_links.append(href)
-                
-                profile['sources']['linkedin'] = {
-                    'status': 'found' if linkedin_links else 'not_found',
-                    'url': linkedin_links[0] if linkedin_links else None
-                }
+                response = http_client.get(linkedin_search_url(company_name), timeout=10)
+                profile['sources']['linkedin'] = linkedin_source(response.text)
             except:
                 profile['sources']['linkedin'] = {'status': 'error'}
         
         # 3. GitHub presence
         try:
-            github_search = f"https://github.com/search?q={requests.utils.quote(company_name or domain)}&type=repositories"
-            response = requests.get(github_search, headers=get_headers(), timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            repos = []
-            for repo_link in soup.find_all('a', class_='v-align-middle')[:3]:
-                repos.append({
-                    'name': repo_link.get_text().strip(),
-                    'url': f"https://github.com{repo_link.get('href', '')}"
-                })
-            
-            profile['sources']['github'] = {
-                'status': 'found' if repos else 'not_found',
-                'repos': repos
-            }
+            response = http_client.get(github_search_url(company_name or domain), timeout=10)
+            profile['sources']['github'] = github_source(response.text)
         except:
             profile['sources']['github'] = {'status': 'error'}
         
         # 4. Careers page
-        careers_paths = ['/careers', '/jobs', '/about/careers', '/company/careers']
-        careers_found = False
-        
-        for path in careers_paths:
-            try:
-                career_url = url + path
-                response = requests.head(career_url, timeout=5)
-                if response.status_code == 200:
-                    careers_found = True
-                    profile['sources']['careers'] = {
-                        'status': 'found',
-                        'url': career_url
-                    }
-                    break
-            except:
-                pass
-        
-        if not careers_found:
-            profile['sources']['careers'] = {'status': 'not_found'}
+        profile['sources']['careers'] = page_source(
+            probe.first_ok([url + path for path in PROFILE_CAREERS_PATHS], timeout=5, deadline=6))
         
         # 5. Press/News page
-        press_paths = ['/press', '/news', '/media', '/newsroom', '/blog']
-        press_found = False
-        
-        for path in press_paths:
-            try:
-                press_url = url + path
-                response = requests.head(press_url, timeout=5)
-                if response.status_code == 200:
-                    press_found = True
-                    profile['sources']['press'] = {
-                        'status': 'found',
-                        'url': press_url
-                    }
-                    break
-            except:
-                pass
-        
-        if not press_found:
-            profile['sources']['press'] = {'status': 'not_found'}
+        profile['sources']['press'] = page_source(
+            probe.first_ok([url + path for path in PROFILE_PRESS_PATHS], timeout=5, deadline=6))
         
         # Enriched summary
-        profile['enriched_data'] = {
-            'total_emails': len(profile['sources'].get('website', {}).get('emails', [])),
-            'linkedin_found': profile['sources'].get('linkedin', {}).get('status') == 'found',
-            'github_repos': len(profile['sources'].get('github', {}).get('repos', [])),
-            'has_careers_page': profile['sources'].get('careers', {}).get('status') == 'found',
-            'has_press_page': profile['sources'].get('press', {}).get('status') == 'found',
-            'completeness': sum([
-                1 if profile['sources'].get('website', {}).get('status') == 'success' else 0,
-                1 if profile['sources'].get('linkedin', {}).get('status') == 'found' else 0,
-                1 if profile['sources'].get('github', {}).get('status') == 'found' else 0,
-                1 if profile['sources'].get('careers', {}).get('status') == 'found' else 0,
-                1 if profile['sources'].get('press', {}).get('status') == 'found' else 0
-            ]) * 20
-        }
+        profile['enriched_data'] = profile_summary(profile['sources'])
         
         return jsonify(profile)
         
@@ -585,10 +578,9 @@ def tech_health():
             issues.append('No SSL certificate - Security risk')
         
         # 2. Load time check
-        import time
         start_time = time.time()
         try:
-            response = requests.get(url, headers=get_headers(), timeout=30)
+            response = http_client.get(url, timeout=30)
             load_time = time.time() - start_time
             
             if load_time > 5:
@@ -598,7 +590,7 @@ def tech_health():
                 health_score -= 5
                 warnings.append(f'Moderate load time ({round(load_time, 2)}s)')
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = parsing.parse(response.text)
             html = response.text
             
             # 3. Mobile optimization
@@ -614,19 +606,7 @@ def tech_health():
                 warnings.append(f'{script_errors} empty script tags detected')
             
             # 5. Outdated CMS/Framework detection
-            outdated_tech = []
-            
-            if 'jquery/1.' in html.lower() or 'jquery-1.' in html.lower():
-                outdated_tech.append('jQuery 1.x (outdated)')
-            
-            if 'bootstrap/3.' in html.lower() or 'bootstrap-3.' in html.lower():
-                outdated_tech.append('Bootstrap 3 (outdated)')
-            
-            if 'angularjs' in html.lower() or 'angular.js' in html.lower():
-                outdated_tech.append('AngularJS (legacy)')
-            
-            if '/wp-content/' in html and re.search(r'WordPress [1-4]\.',html):
-                outdated_tech.append('Old WordPress version')
+            outdated_tech = signatures.match(html).names('outdated')
             
             if outdated_tech:
                 health_score -= 20
@@ -706,44 +686,30 @@ def job_intelligence():
         careers_paths = ['/careers', '/jobs', '/join-us', '/about/careers', '/company/careers']
         careers_html = None
         
-        for path in careers_paths:
+        career_url = probe.first_ok([base_url + path for path in careers_paths],
+                                    method='GET', timeout=10, deadline=12)
+        if career_url:
             try:
-                career_url = base_url + path
-                response = requests.get(career_url, headers=get_headers(), timeout=10)
-                if response.status_code == 200:
-                    careers_html = response.text.lower()
-                    job_data['careers_url'] = career_url
-                    break
+                careers_html = page_cache.fetch_page(career_url, timeout=10).text.lower()
+                job_data['careers_url'] = career_url
             except:
                 pass
         
         # If no careers page, check main site
         if not careers_html:
             try:
-                response = requests.get(url, headers=get_headers(), timeout=10)
+                response = http_client.get(url, timeout=10)
                 careers_html = response.text.lower()
             except:
                 pass
         
         if careers_html:
-            # Detect tech roles
-            tech_roles_patterns = {
-                'Full Stack Developer': r'full[- ]?stack|fullstack',
-                'Frontend Developer': r'front[- ]?end|react|vue|angular developer',
-                'Backend Developer': r'back[- ]?end|node\.?js|python|java developer',
-                'Mobile Developer': r'mobile|ios|android|react native|flutter developer',
-                'DevOps Engineer': r'devops|site reliability|sre',
-                'UI/UX Designer': r'ui/ux|user experience|product designer',
-                'QA Engineer': r'qa|quality assurance|test engineer',
-                'Data Engineer': r'data engineer|etl|data pipeline',
-                'Machine Learning': r'ml engineer|machine learning|ai engineer',
-                'Software Engineer': r'software engineer'
-            }
+            found = signatures.match(careers_html)
             
-            for role, pattern in tech_roles_patterns.items():
-                if re.search(pattern, careers_html):
-                    job_data['tech_roles'].append(role)
-                    job_data['opportunity_score'] += 10
+            # Detect tech roles
+            for role in found.group('job_role'):
+                job_data['tech_roles'].append(role['name'])
+                job_data['opportunity_score'] += role['score']
             
             # Count total job mentions
             job_keywords = ['position', 'opening', 'opportunity', 'role', 'job']
@@ -755,17 +721,9 @@ def job_intelligence():
                 job_data['hiring_signals'].append(f'Hiring for {len(job_data["tech_roles"])} tech roles')
             
             # Additional signals
-            if 'we\'re hiring' in careers_html or 'join our team' in careers_html:
-                job_data['hiring_signals'].append('Active recruitment campaign')
-                job_data['opportunity_score'] += 15
-            
-            if 'remote' in careers_html or 'work from home' in careers_html:
-                job_data['hiring_signals'].append('Offers remote positions')
-                job_data['opportunity_score'] += 5
-            
-            if any(word in careers_html for word in ['startup', 'fast-growing', 'scaling']):
-                job_data['hiring_signals'].append('Growth-stage company')
-                job_data['opportunity_score'] += 10
+            for signal in found.group('job_signal'):
+                job_data['hiring_signals'].append(signal['name'])
+                job_data['opportunity_score'] += signal['score']
         
         # Classification
         if job_data['opportunity_score'] >= 40:
@@ -785,6 +743,115 @@ def job_intelligence():
 
 
 # ============== BUSINESS INTELLIGENCE (Funding, Ads, Product Launches) ==============
+BUSINESS_PRESS_PATHS = ['/press', '/news', '/newsroom', '/blog']
+
+
+def funding_search_url(company_name):
+    funding_query = f'{company_name} funding raised investment'
+    return f"https://www.google.com/search?q={requests.utils.quote(funding_query)}&num=10"
+
+
+def ad_library_url(company_name):
+    # Facebook Ad Library is public
+    return f"https://www.facebook.com/ads/library/?active_status=all&ad_type=all&country=ALL&q={requests.utils.quote(company_name)}"
+
+
+def new_business_intel():
+    return {
+        'funding': {'status': 'not_found', 'signals': []},
+        'product_launches': {'status': 'not_found', 'signals': []},
+        'ad_presence': {'status': 'not_found', 'signals': []},
+        'business_score': 0
+    }
+
+
+def add_funding_signals(intel, search_html):
+    """Funding mentions and amounts from a news search result page"""
+    soup = parsing.parse(search_html)
+    text = soup.get_text().lower()
+    
+    funding_keywords = ['raised', 'funding', 'investment', 'series a', 'series b', 'seed round', 'venture capital']
+    funding_found = sum(1 for kw in funding_keywords if kw in text)
+    
+    if funding_found >= 3:
+        intel['funding']['status'] = 'likely_funded'
+        intel['funding']['signals'].append(f'Funding mentions detected ({funding_found} keywords)')
+        intel['business_score'] += 30
+        
+        # Check for specific amounts
+        amounts = re.findall(r'\$[\d.]+[MBK]', text)
+        if amounts:
+            intel['funding']['signals'].append(f'Amounts found: {", ".join(amounts[:3])}')
+
+
+def add_launch_signals(intel, press_html):
+    """Product launch mentions on the press/news page"""
+    text = press_html.lower()
+    
+    launch_keywords = ['launch', 'announcement', 'new product', 'introducing', 'released']
+    launches = sum(1 for kw in launch_keywords if kw in text)
+    
+    if launches >= 2:
+        intel['product_launches']['status'] = 'active'
+        intel['product_launches']['signals'].append(f'Press/news page with {launches} launch mentions')
+        intel['business_score'] += 20
+
+
+def add_sitemap_signals(intel, sitemap_summary):
+    """Recently updated pages from the sitemap's lastmod distribution (this year and last)"""
+    recent = sitemap.recent_lastmods(sitemap_summary)
+    if recent:
+        intel['product_launches']['signals'].append(f'{recent} pages updated recently')
+        intel['business_score'] += 10
+
+
+def add_ad_signals(intel, company_name, ad_library_html):
+    """Ad Library presence; returns True when ads were detected"""
+    text = ad_library_html.lower()
+    if 'ad' in text and company_name.lower() in text:
+        intel['ad_presence']['status'] = 'detected'
+        intel['ad_presence']['signals'].append('Facebook ads found')
+        intel['business_score'] += 15
+        return True
+    return False
+
+
+def add_landing_page_signals(intel, load_time, page_html):
+    """Landing page speed and tracking setup for detected advertisers"""
+    if load_time > 4:
+        intel['ad_presence']['signals'].append(f'Landing page slow ({round(load_time, 1)}s) - optimization needed')
+    
+    # Check for tracking
+    text = page_html.lower()
+    has_analytics = 'google-analytics' in text or 'gtag' in text
+    has_pixel = 'facebook.com/tr' in text
+    
+    if not has_analytics and not has_pixel:
+        intel['ad_presence']['signals'].append('No tracking detected - analytics setup needed')
+
+
+def finish_business_intel(intel):
+    """Business classification and pitch recommendations"""
+    if intel['business_score'] >= 50:
+        intel['business_level'] = 'High Activity - Strong growth signals'
+    elif intel['business_score'] >= 25:
+        intel['business_level'] = 'Moderate Activity - Some opportunities'
+    else:
+        intel['business_level'] = 'Low Activity - Early stage or limited public presence'
+    
+    # Opportunity recommendations
+    opportunities = []
+    if intel['funding']['status'] == 'likely_funded':
+        opportunities.append('Pitch: Web/mobile app development, automation, cloud services')
+    if intel['product_launches']['status'] == 'active':
+        opportunities.append('Pitch: App enhancements, maintenance, analytics dashboards')
+    if intel['ad_presence']['status'] == 'detected':
+        opportunities.append('Pitch: Landing page optimization, CRO, tracking setup')
+    
+    intel['opportunities'] = opportunities
+    return intel
+
+
 @scraper_bp.route('/api/business/intelligence', methods=['POST'])
 def business_intelligence():
     """Comprehensive business intelligence - funding, ads, product launches"""
@@ -796,137 +863,53 @@ def business_intelligence():
         if not company_name and not domain:
             return jsonify({'error': 'Company name or domain is required'}), 400
         
-        intel = {
-            'funding': {'status': 'not_found', 'signals': []},
-            'product_launches': {'status': 'not_found', 'signals': []},
-            'ad_presence': {'status': 'not_found', 'signals': []},
-            'business_score': 0
-        }
+        intel = new_business_intel()
+        url = (f'https://{domain}' if not domain.startswith('http') else domain) if domain else None
         
         # 1. Funding signals (via news search)
         if company_name:
             try:
-                funding_query = f'{company_name} funding raised investment'
-                search_url = f"https://www.google.com/search?q={requests.utils.quote(funding_query)}&num=10"
-                response = requests.get(search_url, headers=get_headers(), timeout=10)
-                soup = BeautifulSoup(response.text, 'html.parser')
-                text = soup.get_text().lower()
-                
-                funding_keywords = ['raised', 'funding', 'investment', 'series a', 'series b', 'seed round', 'venture capital']
-                funding_found = sum(1 for kw in funding_keywords if kw in text)
-                
-                if funding_found >= 3:
-                    intel['funding']['status'] = 'likely_funded'
-                    intel['funding']['signals'].append(f'Funding mentions detected ({funding_found} keywords)')
-                    intel['business_score'] += 30
-                    
-                    # Check for specific amounts
-                    amounts = re.findall(r'\$[\d.]+[MBK]', text)
-                    if amounts:
-                        intel['funding']['signals'].append(f'Amounts found: {", ".join(amounts[:3])}')
+                response = http_client.get(funding_search_url(company_name), timeout=10)
+                add_funding_signals(intel, response.text)
             except:
                 pass
         
         # 2. Product launch signals
-        if domain:
-            try:
-                url = f'https://{domain}' if not domain.startswith('http') else domain
-                
-                # Check press/news page
-                press_paths = ['/press', '/news', '/newsroom', '/blog']
-                for path in press_paths:
-                    try:
-                        press_url = url + path
-                        response = requests.get(press_url, headers=get_headers(), timeout=8)
-                        if response.status_code == 200:
-                            text = response.text.lower()
-                            
-                            launch_keywords = ['launch', 'announcement', 'new product', 'introducing', 'released']
-                            launches = sum(1 for kw in launch_keywords if kw in text)
-                            
-                            if launches >= 2:
-                                intel['product_launches']['status'] = 'active'
-                                intel['product_launches']['signals'].append(f'Press/news page with {launches} launch mentions')
-                                intel['business_score'] += 20
-                            break
-                    except:
-                        pass
-                
-                # Check sitemap for new pages
+        if url:
+            # Check press/news page
+            press_url = probe.first_ok([url + path for path in BUSINESS_PRESS_PATHS],
+                                       method='GET', timeout=8, deadline=10)
+            if press_url:
                 try:
-                    sitemap_url = url + '/sitemap.xml'
-                    response = requests.get(sitemap_url, timeout=8)
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.text, 'xml')
-                        lastmod_tags = soup.find_all('lastmod')
-                        
-                        if lastmod_tags:
-                            recent_dates = [tag.text for tag in lastmod_tags if '2025' in tag.text or '2024' in tag.text]
-                            if recent_dates:
-                                intel['product_launches']['signals'].append(f'{len(recent_dates)} pages updated recently')
-                                intel['business_score'] += 10
+                    add_launch_signals(intel, page_cache.fetch_page(press_url, timeout=8).text)
                 except:
                     pass
+            
+            # Check sitemap for new pages
+            try:
+                sitemap_summary = sitemap.summarize(url, timeout=8)
+                if sitemap_summary:
+                    add_sitemap_signals(intel, sitemap_summary)
             except:
                 pass
         
         # 3. Ad presence (Facebook Ad Library check)
         if company_name:
             try:
-                # Facebook Ad Library is public
-                ad_search_url = f"https://www.facebook.com/ads/library/?active_status=all&ad_type=all&country=ALL&q={requests.utils.quote(company_name)}"
-                response = requests.get(ad_search_url, headers=get_headers(), timeout=10)
+                response = http_client.get(ad_library_url(company_name), timeout=10)
                 
-                if 'ad' in response.text.lower() and company_name.lower() in response.text.lower():
-                    intel['ad_presence']['status'] = 'detected'
-                    intel['ad_presence']['signals'].append('Facebook ads found')
-                    intel['business_score'] += 15
-                    
-                    # Check landing page quality
-                    if domain:
-                        url = f'https://{domain}' if not domain.startswith('http') else domain
-                        try:
-                            import time
-                            start = time.time()
-                            page_response = requests.get(url, timeout=10)
-                            load_time = time.time() - start
-                            
-                            if load_time > 4:
-                                intel['ad_presence']['signals'].append(f'Landing page slow ({round(load_time, 1)}s) - optimization needed')
-                            
-                            soup = BeautifulSoup(page_response.text, 'html.parser')
-                            
-                            # Check for tracking
-                            has_analytics = 'google-analytics' in page_response.text.lower() or 'gtag' in page_response.text.lower()
-                            has_pixel = 'facebook.com/tr' in page_response.text.lower()
-                            
-                            if not has_analytics and not has_pixel:
-                                intel['ad_presence']['signals'].append('No tracking detected - analytics setup needed')
-                        except:
-                            pass
+                # Check landing page quality
+                if add_ad_signals(intel, company_name, response.text) and url:
+                    try:
+                        start = time.time()
+                        page_response = http_client.get(url, timeout=10)
+                        add_landing_page_signals(intel, time.time() - start, page_response.text)
+                    except:
+                        pass
             except:
                 pass
         
-        # Business classification
-        if intel['business_score'] >= 50:
-            intel['business_level'] = 'High Activity - Strong growth signals'
-        elif intel['business_score'] >= 25:
-            intel['business_level'] = 'Moderate Activity - Some opportunities'
-        else:
-            intel['business_level'] = 'Low Activity - Early stage or limited public presence'
-        
-        # Opportunity recommendations
-        opportunities = []
-        if intel['funding']['status'] == 'likely_funded':
-            opportunities.append('Pitch: Web/mobile app development, automation, cloud services')
-        if intel['product_launches']['status'] == 'active':
-            opportunities.append('Pitch: App enhancements, maintenance, analytics dashboards')
-        if intel['ad_presence']['status'] == 'detected':
-            opportunities.append('Pitch: Landing page optimization, CRO, tracking setup')
-        
-        intel['opportunities'] = opportunities
-        
-        return jsonify(intel)
+        return jsonify(finish_business_intel(intel))
         
     except Exception as e:
         return jsonify({'error': f'Business intelligence failed: {str(e)}'}), 500
@@ -0,0 +1,97 @@
+"""
+Composite analysis endpoint
+Fetches a page once, parses it once, runs every single-page extractor over it
+"""
+
+from flask import Blueprint, request, jsonify
+import requests
+
+import fingerprints
+import page_cache
+import parsing
+from scraper_core import contacts_from_page, tech_from_page, metadata_from_page, METADATA_READ, TECH_READ
+from scraper import competitors_from_page, keywords_from_page, score_from_page, DEFAULT_KEYWORDS
+
+scraper_analyze_bp = Blueprint('scraper_analyze', __name__)
+scraper_analyze_bp.after_request(page_cache.add_cache_header)
+
+# section name -> extractor(url, response, soup, options)
+SECTIONS = {
+    'contacts': lambda url, response, soup, options: contacts_from_page(url, response, soup),
+    'tech': lambda url, response, soup, options: tech_from_page(url, response, soup),
+    'metadata': lambda url, response, soup, options: metadata_from_page(url, response, soup),
+    'keywords': lambda url, response, soup, options: keywords_from_page(
+        url, response, soup, options.get('keywords') or DEFAULT_KEYWORDS),
+    'competitors': lambda url, response, soup, options: competitors_from_page(response, soup),
+    'score': lambda url, response, soup, options: score_from_page(response, soup),
+}
+
+# Sections that only read the document through the parsing accessors (work on raw lxml trees)
+FAST_SECTIONS = {'contacts', 'tech', 'metadata'}
+
+
+def analyze_page(url, sections=None, options=None):
+    """Run the requested sections over one fetch and one parse of url"""
+    sections = sections or list(SECTIONS)
+    options = options or {}
+
+    if set(sections) == {'metadata'}:
+        read_limits = METADATA_READ
+    elif {'metadata', 'tech'}.issuperset(sections):
+        read_limits = TECH_READ
+    else:
+        read_limits = {}
+
+    response = page_cache.fetch_page(url, timeout=20, **read_limits)
+
+    # Unchanged since the last scan: reuse that scan's result instead of parsing again
+    fingerprint = fingerprints.content_hash(response)
+    variant = fingerprints.variant(sections, options)
+    cached = fingerprints.cached_analysis(url, variant, fingerprint)
+    if cached is not None:
+        cached['unchanged'] = True
+        return cached
+
+    if FAST_SECTIONS.issuperset(sections):
+        soup = parsing.parse_fast(response.text)
+    else:
+        soup = parsing.parse(response.text)
+
+    result = {'url': url, 'status_code': response.status_code, 'truncated': response.truncated, 'errors': {}}
+    for name in sections:
+        try:
+            result[name] = SECTIONS[name](url, response, soup, options)
+        except Exception as e:
+            result['errors'][name] = str(e)
+
+    if 200 <= response.status_code < 300 and not result['errors']:
+        fingerprints.record(url, variant, fingerprint, result)
+    result['unchanged'] = False
+    return result
+
+
+@scraper_analyze_bp.route('/api/analyze/full', methods=['POST'])
+def analyze_full():
+    """Contacts, tech, metadata, keywords, competitors and lead score in one call"""
+    try:
+        data = request.json
+        url = data.get('url', '').strip()
+        sections = data.get('sections') or list(SECTIONS)
+
+        if not url:
+            return jsonify({'error': 'URL is required'}), 400
+
+        unknown = [name for name in sections if name not in SECTIONS]
+        if unknown:
+            return jsonify({'error': f'Unknown sections: {", ".join(unknown)}',
+                            'available': list(SECTIONS)}), 400
+
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+
+        return jsonify(analyze_page(url, sections, {'keywords': data.get('keywords')}))
+
+    except requests.exceptions.RequestException as e:
+        return jsonify({'error': f'Failed to fetch URL: {str(e)}'}), 500
+    except Exception as e:
+        return jsonify({'error': f'Full analysis failed: {str(e)}'}), 500
@@ -0,0 +1,227 @@
+"""
+Async versions of the heavy fan-out endpoints
+Same inputs and outputs as the threaded routes in scraper.py / scraper_osint.py,
+but every outbound fetch of a request runs concurrently on the asyncio engine
+(requires Flask's async extra: pip install "flask[async]")
+"""
+
+import asyncio
+from urllib.parse import urlparse
+
+from flask import Blueprint, request, jsonify
+
+import async_fetch
+import sitemap
+from scraper import (
+    GROWTH_SUBDOMAINS, GROWTH_CAREERS_PATHS, growth_from_results,
+    PROFILE_CAREERS_PATHS, PROFILE_PRESS_PATHS, linkedin_search_url, github_search_url,
+    website_source, linkedin_source, github_source, page_source, profile_summary,
+    normalize_profile_domain,
+    BUSINESS_PRESS_PATHS, funding_search_url, ad_library_url, new_business_intel,
+    add_funding_signals, add_launch_signals, add_sitemap_signals, add_ad_signals,
+    add_landing_page_signals, finish_business_intel,
+)
+from scraper_osint import FEED_PATHS, feeds_from_results
+
+scraper_async_bp = Blueprint('scraper_async', __name__)
+
+
+async def _nothing():
+    return None
+
+
+async def _settle(*aws):
+    """gather() that returns exceptions instead of raising them"""
+    return await asyncio.gather(*aws, return_exceptions=True)
+
+
+def _ok_text(result, status=200):
+    """Body of a fetched page, or None for failures and non-matching statuses"""
+    if isinstance(result, BaseException) or result is None:
+        return None
+    if status is not None and result.status_code != status:
+        return None
+    return result.text
+
+
+@scraper_async_bp.route('/api/async/growth/signals', methods=['POST'])
+async def growth_signals_async():
+    """Detect company growth indicators (concurrent fetches)"""
+    try:
+        data = request.json
+        url = data.get('url', '').strip()
+
+        if not url:
+            return jsonify({'error': 'URL is required'}), 400
+
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+
+        parsed_url = urlparse(url)
+        domain = parsed_url.netloc
+        base_url = f"{parsed_url.scheme}://{domain}"
+
+        # The sitemap reader streams through the sync client, so it runs on a worker thread
+        sub_results, page, career_url, sitemap_summary = await _settle(
+            async_fetch.probe_urls([f"https://{subdomain}.{domain}" for subdomain in GROWTH_SUBDOMAINS],
+                                   timeout=3, deadline=5, allow_redirects=True),
+            async_fetch.get(url, timeout=15),
+            async_fetch.first_ok([base_url + path for path in GROWTH_CAREERS_PATHS], timeout=5, deadline=6),
+            asyncio.to_thread(sitemap.summarize, base_url, timeout=10),
+        )
+        if isinstance(page, BaseException):
+            raise page
+
+        active_subdomains = [] if isinstance(sub_results, BaseException) else [
+            sub for sub, result in zip(GROWTH_SUBDOMAINS, sub_results) if result.ok]
+        hiring_found = not isinstance(career_url, BaseException) and career_url is not None
+
+        if isinstance(sitemap_summary, BaseException):
+            sitemap_summary = None
+
+        return jsonify(growth_from_results(url, active_subdomains, page.text, hiring_found, sitemap_summary))
+
+    except Exception as e:
+        return jsonify({'error': f'Growth signals detection failed: {str(e)}'}), 500
+
+
+@scraper_async_bp.route('/api/async/profile/aggregate', methods=['POST'])
+async def aggregate_profile_async():
+    """Create enriched company profile from multiple sources (concurrent fetches)"""
+    try:
+        data = request.json
+        domain = data.get('domain', '').strip()
+        company_name = data.get('company_name', '').strip()
+
+        if not domain:
+            return jsonify({'error': 'Domain is required'}), 400
+
+        domain = normalize_profile_domain(domain)
+        url = f'https://{domain}'
+
+        website, linkedin, github, career_url, press_url = await _settle(
+            async_fetch.get(url, timeout=15),
+            async_fetch.get(linkedin_search_url(company_name), timeout=10) if company_name else _nothing(),
+            async_fetch.get(github_search_url(company_name or domain), timeout=10),
+            async_fetch.first_ok([url + path for path in PROFILE_CAREERS_PATHS], timeout=5, deadline=6),
+            async_fetch.first_ok([url + path for path in PROFILE_PRESS_PATHS], timeout=5, deadline=6),
+        )
+
+        sources = {}
+        if isinstance(website, BaseException):
+            sources['website'] = {'status': 'failed', 'error': str(website)}
+        else:
+            sources['website'] = website_source(domain, website.text)
+
+        if company_name:
+            try:
+                if isinstance(linkedin, BaseException):
+                    raise linkedin
+                sources['linkedin'] = linkedin_source(linkedin.text)
+            except:
+                sources['linkedin'] = {'status': 'error'}
+
+        try:
+            if isinstance(github, BaseException):
+                raise github
+            sources['github'] = github_source(github.text)
+        except:
+            sources['github'] = {'status': 'error'}
+
+        sources['careers'] = page_source(None if isinstance(career_url, BaseException) else career_url)
+        sources['press'] = page_source(None if isinstance(press_url, BaseException) else press_url)
+
+        return jsonify({
+            'company': company_name or domain,
+            'domain': domain,
+            'sources': sources,
+            'enriched_data': profile_summary(sources)
+        })
+
+    except Exception as e:
+        return jsonify({'error': f'Profile aggregation failed: {str(e)}'}), 500
+
+
+@scraper_async_bp.route('/api/async/business/intelligence', methods=['POST'])
+async def business_intelligence_async():
+    """Comprehensive business intelligence - funding, ads, product launches (concurrent fetches)"""
+    try:
+        data = request.json
+        company_name = data.get('company_name', '').strip()
+        domain = data.get('domain', '').strip()
+
+        if not company_name and not domain:
+            return jsonify({'error': 'Company name or domain is required'}), 400
+
+        intel = new_business_intel()
+        url = (f'https://{domain}' if not domain.startswith('http') else domain) if domain else None
+
+        # The landing page is fetched speculatively and only scored when ads are found
+        funding, press_url, sitemap_summary, ads, landing = await _settle(
+            async_fetch.get(funding_search_url(company_name), timeout=10) if company_name else _nothing(),
+            async_fetch.first_ok([url + path for path in BUSINESS_PRESS_PATHS],
+                                 method='GET', timeout=8, deadline=10) if url else _nothing(),
+            asyncio.to_thread(sitemap.summarize, url, timeout=8) if url else _nothing(),
+            async_fetch.get(ad_library_url(company_name), timeout=10) if company_name else _nothing(),
+            async_fetch.timed_get(url, timeout=10) if url and company_name else _nothing(),
+        )
+
+        funding_html = _ok_text(funding, status=None)
+        if funding_html is not None:
+            try:
+                add_funding_signals(intel, funding_html)
+            except:
+                pass
+
+        if isinstance(press_url, str):
+            try:
+                add_launch_signals(intel, (await async_fetch.fetch_page(press_url, timeout=8)).text)
+            except:
+                pass
+
+        if sitemap_summary and not isinstance(sitemap_summary, BaseException):
+            try:
+                add_sitemap_signals(intel, sitemap_summary)
+            except:
+                pass
+
+        ads_html = _ok_text(ads, status=None)
+        if ads_html is not None and add_ad_signals(intel, company_name, ads_html):
+            if landing is not None and not isinstance(landing, BaseException):
+                page, load_time = landing
+                add_landing_page_signals(intel, load_time, page.text)
+
+        return jsonify(finish_business_intel(intel))
+
+    except Exception as e:
+        return jsonify({'error': f'Business intelligence failed: {str(e)}'}), 500
+
+
+@scraper_async_bp.route('/api/async/osint/feeds', methods=['POST'])
+async def discover_feeds_async():
+    """Discover RSS/Atom feeds on a website (concurrent fetches)"""
+    try:
+        data = request.json
+        url = data.get('url', '').strip()
+
+        if not url:
+            return jsonify({'error': 'URL is required'}), 400
+
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+
+        parsed_url = urlparse(url)
+        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+        active_feed_urls, page = await _settle(
+            async_fetch.all_ok([base_url + path for path in FEED_PATHS],
+                               timeout=5, deadline=6, allow_redirects=True),
+            async_fetch.get(url, timeout=10),
+        )
+        if isinstance(active_feed_urls, BaseException):
+            active_feed_urls = []
+
+        return jsonify(feeds_from_results(url, active_feed_urls, _ok_text(page, status=None)))
+
+    except Exception as e:
+        return jsonify({'error': f'Feed discovery failed: {str(e)}'}), 500
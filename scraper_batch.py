@@ -0,0 +1,201 @@
+"""
+Bulk enrichment endpoint
+Runs the existing analyses over many domains on a bounded worker pool
+and streams each result back as newline-delimited JSON. The domain list
+can be streamed in as NDJSON too; it is read as the work proceeds, so
+memory stays flat however long the list is.
+"""
+
+import itertools
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
+
+import politeness
+import resolver
+
+scraper_batch_bp = Blueprint('scraper_batch', __name__)
+
+# Analyses over the landing page only; grouped into one /api/analyze/full call per domain
+PAGE_ANALYSES = ('contacts', 'tech', 'metadata', 'keywords', 'competitors', 'score')
+
+# Analyses that fan out to other pages/hosts; each runs its own route
+ROUTE_ANALYSES = {
+    'crawl': '/api/scrape/contacts/crawl',
+    'whois': '/api/whois/lookup',
+    'sitemap': '/api/sitemap/parse',
+    'feeds': '/api/osint/feeds',
+    'growth': '/api/growth/signals',
+    'profile': '/api/profile/aggregate',
+    'health': '/api/tech/health',
+    'jobs': '/api/jobs/intelligence',
+    'business': '/api/business/intelligence',
+}
+
+DEFAULT_ANALYSES = ['contacts', 'tech', 'score']
+DEFAULT_WORKERS = 8
+MAX_WORKERS = 32
+PREFETCH_AHEAD = 64         # domains whose DNS lookups are started ahead of their tasks
+DEDUP_WINDOW = 10000        # recent domains remembered to skip repeats (LRU)
+NDJSON = 'application/x-ndjson'
+
+
+def run_route(app, path, payload):
+    """Dispatch a route in-process (hooks included) without an HTTP round trip; returns (status, body)"""
+    with app.test_request_context(path, method='POST', json=payload):
+        response = app.full_dispatch_request()
+        try:
+            body = response.get_json()
+        except Exception:
+            body = None
+        return response.status_code, body
+
+
+def build_tasks(domain, analyses, options):
+    """Split one domain's requested analyses into route calls"""
+    payload = {'url': domain, 'domain': domain}
+    payload.update(options)
+    sections = [a for a in analyses if a in PAGE_ANALYSES]
+    tasks = []
+    if sections:
+        tasks.append(('page', '/api/analyze/full', dict(payload, sections=sections)))
+    for name in analyses:
+        if name in ROUTE_ANALYSES:
+            tasks.append((name, ROUTE_ANALYSES[name], payload))
+    return tasks
+
+
+def read_ndjson(stream):
+    """Domains from NDJSON lines: a JSON string, an object with 'domain' or 'url', or a bare name"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            item = line.decode('utf-8', errors='replace')
+        if isinstance(item, dict):
+            item = item.get('domain') or item.get('url')
+        yield item if isinstance(item, str) else ''
+
+
+def _prefetched(domains):
+    """Yield domains, with DNS lookups started for this chunk and the next before they are needed"""
+    domains = iter(domains)
+    chunk = list(itertools.islice(domains, PREFETCH_AHEAD))
+    while chunk:
+        following = list(itertools.islice(domains, PREFETCH_AHEAD))
+        resolver.prefetch(chunk + following)
+        yield from chunk
+        chunk = following
+
+
+def iter_tasks(domains, analyses, options):
+    """Route calls for each domain in turn; a domain repeated within DEDUP_WINDOW domains runs once"""
+    seen = OrderedDict()
+    for domain in _prefetched(str(domain).strip() for domain in domains):
+        if not domain:
+            continue
+        if domain in seen:
+            seen.move_to_end(domain)
+            continue
+        seen[domain] = None
+        if len(seen) > DEDUP_WINDOW:
+            seen.popitem(last=False)
+        for name, path, payload in build_tasks(domain, analyses, options):
+            yield domain, name, path, payload
+
+
+def enrich_stream(app, domains, analyses, options=None, workers=DEFAULT_WORKERS):
+    """Yield one NDJSON line per finished task, keeping at most 2*workers tasks in flight"""
+    # Spread each domain's tasks out so no host gets them back to back
+    tasks = politeness.interleave(iter_tasks(domains, analyses, options or {}),
+                                  lambda task: resolver.normalize_host(task[0]))
+    max_in_flight = workers * 2
+    in_flight = {}
+    stop = threading.Event()
+
+    def run(domain, name, path, payload):
+        if stop.is_set():
+            return None
+        status, body = run_route(app, path, payload)
+        return {'domain': domain, 'analysis': name, 'status': status, 'result': body}
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='enrich')
+    try:
+        exhausted = False
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < max_in_flight:
+                try:
+                    domain, name, path, payload = next(tasks)
+                except StopIteration:
+                    exhausted = True
+                    break
+                future = executor.submit(run, domain, name, path, payload)
+                in_flight[future] = (domain, name)
+
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                domain, name = in_flight.pop(future)
+                try:
+                    line = future.result()
+                except Exception as e:
+                    line = {'domain': domain, 'analysis': name, 'status': 500,
+                            'result': {'error': str(e)}}
+                if line is not None:
+                    yield json.dumps(line) + '\n'
+    finally:
+        # Client went away or generator closed: drop queued work, let running tasks finish
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _split(value):
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+@scraper_batch_bp.route('/api/batch/enrich', methods=['POST'])
+def batch_enrich():
+    """Enrich a list of domains; streams application/x-ndjson as results finish
+
+    The body is JSON with a domains list, or NDJSON with one domain per line
+    and the settings in the query string (?analyses=contacts,tech&workers=8).
+    """
+    try:
+        if request.mimetype == NDJSON:
+            data = {'analyses': _split(request.args.get('analyses')), 'workers': request.args.get('workers'),
+                    'keywords': _split(request.args.get('keywords'))}
+            domains = read_ndjson(request.stream)
+        else:
+            data = request.json
+            domains = iter(data.get('domains') or [])
+        analyses = data.get('analyses') or DEFAULT_ANALYSES
+        workers = data.get('workers')
+        workers = max(1, min(int(DEFAULT_WORKERS if workers is None else workers), MAX_WORKERS))
+        options = {}
+        if data.get('keywords'):
+            options['keywords'] = data['keywords']
+
+        first = next(domains, None)
+        if first is None:
+            return jsonify({'error': 'domains list is required'}), 400
+        domains = itertools.chain([first], domains)
+
+        unknown = [a for a in analyses if a not in PAGE_ANALYSES and a not in ROUTE_ANALYSES]
+        if unknown:
+            return jsonify({'error': f'Unknown analyses: {", ".join(unknown)}',
+                            'available': list(PAGE_ANALYSES) + list(ROUTE_ANALYSES)}), 400
+
+        app = current_app._get_current_object()
+        # The request stays open while its NDJSON body is still being read
+        return Response(stream_with_context(enrich_stream(app, domains, analyses, options, workers)),
+                        mimetype=NDJSON)
+
+    except Exception as e:
+        return jsonify({'error': f'Batch enrichment failed: {str(e)}'}), 500
@@ -0,0 +1,31 @@
+"""
+Change detection endpoints
+Which leads' pages, tech stacks or contacts changed between scans
+(fingerprints.py)
+"""
+
+from flask import Blueprint, request, jsonify
+
+import fingerprints
+
+scraper_changes_bp = Blueprint('scraper_changes', __name__)
+
+
+@scraper_changes_bp.route('/api/changes', methods=['GET'])
+def list_changes():
+    """Changes found by each page's latest scan, or every change after ?since=; filter with ?kind= and ?url="""
+    try:
+        args = request.args
+        changes, next_cursor = fingerprints.changes(
+            since=args.get('since'),
+            kind=args.get('kind'),
+            url=args.get('url'),
+            limit=args.get('limit', fingerprints.DEFAULT_LIMIT, type=int),
+            cursor=args.get('cursor', type=int),
+        )
+        return jsonify({'changes': changes, 'next_cursor': next_cursor, 'stats': fingerprints.stats()})
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Listing changes failed: {str(e)}'}), 500
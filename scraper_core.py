@@ -5,24 +5,52 @@ Contact finder, WHOIS, Tech detection, Sitemap, Metadata
 
 from flask import Blueprint, request, jsonify
 import requests
-from bs4 import BeautifulSoup
-import re
+import contacts
+import crawler
+import fingerprints
+import http_client
+import http_cache
+import page_cache
+import parsing
+import politeness
+import probe
+import resolver
+import signatures
+import sitemap
 from urllib.parse import urlparse, urljoin
-import socket
 
 scraper_core_bp = Blueprint('scraper_core', __name__)
+scraper_core_bp.after_request(page_cache.add_cache_header)
 
-def get_headers():
+# Streamed read limits: metadata lives in <head>, tech fingerprints in the first few hundred KB
+METADATA_READ = {'max_bytes': 256 * 1024, 'stop_at': b'</head>'}
+TECH_READ = {'max_bytes': 512 * 1024}
+
+
+def _unless_unchanged(url, response, section, extract):
+    """extract(url, response, soup) for one section, reusing the stored result while the page's fingerprint is unchanged"""
+    fingerprint = fingerprints.content_hash(response)
+    variant = fingerprints.variant([section], {})
+    cached = fingerprints.cached_analysis(url, variant, fingerprint)
+    if cached is not None:
+        return cached[section]
+    result = extract(url, response, parsing.parse_fast(response.text))
+    if 200 <= response.status_code < 300:
+        fingerprints.record(url, variant, fingerprint, {section: result, 'truncated': response.truncated})
+    return result
+
+def contacts_from_page(url, response, soup):
+    """Emails, phones and social profiles from an already parsed page"""
+    found = contacts.extract_contacts(parsing.text_content(soup), response.text)
+    
     return {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate',
-        'DNT': '1',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1'
+        'url': url,
+        'emails': found['emails'][:10],
+        'phones': found['phones'][:10],
+        'social_links': found['social_links']
     }
 
+
 @scraper_core_bp.route('/api/scrape/contacts', methods=['POST'])
 def scrape_contacts():
     """Extract contact information from a website"""
@@ -36,40 +64,9 @@ def scrape_contacts():
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
         
-        response = requests.get(url, headers=get_headers(), timeout=15, allow_redirects=True)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        text = soup.get_text()
+        response = page_cache.fetch_page(url, timeout=15)
         
-        # Email patterns
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = list(set(re.findall(email_pattern, text)))
-        
-        # Phone patterns
-        phone_pattern = r'(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        phones = list(set(re.findall(phone_pattern, text)))
-        
-        # Social media links
-        social_links = {}
-        social_patterns = {
-            'LinkedIn': r'https?://(?:www\.)?linkedin\.com/(?:company|in)/[^\s<>"]+',
-            'Twitter': r'https?://(?:www\.)?(?:twitter|x)\.com/[^\s<>"]+',
-            'Facebook': r'https?://(?:www\.)?facebook\.com/[^\s<>"]+',
-            'Instagram': r'https?://(?:www\.)?instagram\.com/[^\s<>"]+',
-            'YouTube': r'https?://(?:www\.)?youtube\.com/[^\s<>"]+',
-            'GitHub': r'https?://(?:www\.)?github\.com/[^\s<>"]+',
-        }
-        
-        for platform, pattern in social_patterns.items():
-            matches = re.findall(pattern, text + ' ' + str(soup))
-            if matches:
-                social_links[platform] = matches[0]
-        
-        return jsonify({
-            'url': url,
-            'emails': emails[:10],
-            'phones': phones[:10],
-            'social_links': social_links
-        })
+        return jsonify(_unless_unchanged(url, response, 'contacts', contacts_from_page))
         
     except requests.exceptions.RequestException as e:
         return jsonify({'error': f'Failed to fetch URL: {str(e)}'}), 500
@@ -77,6 +74,31 @@ def scrape_contacts():
         return jsonify({'error': f'Scraping failed: {str(e)}'}), 500
 
 
+@scraper_core_bp.route('/api/scrape/contacts/crawl', methods=['POST'])
+def crawl_contacts():
+    """Crawl a site (contact, about and team pages first) and merge the contacts of every page"""
+    try:
+        data = request.json
+        url = data.get('url', '').strip()
+
+        if not url:
+            return jsonify({'error': 'URL is required'}), 400
+
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+
+        return jsonify(crawler.crawl_contacts(url,
+                                              max_pages=data.get('max_pages', crawler.DEFAULT_PAGES),
+                                              max_depth=data.get('max_depth', crawler.DEFAULT_DEPTH),
+                                              deadline=min(float(data.get('deadline', crawler.DEFAULT_DEADLINE)),
+                                                           crawler.DEFAULT_DEADLINE * 4)))
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Crawl failed: {str(e)}'}), 500
+
+
 @scraper_core_bp.route('/api/whois/lookup', methods=['POST'])
 def whois_lookup():
     """Perform WHOIS lookup for a domain"""
@@ -91,16 +113,15 @@ def whois_lookup():
         domain = domain.replace('https://', '').replace('http://', '').split('/')[0]
         
         # Try to get basic DNS info
-        try:
-            ip_address = socket.gethostbyname(domain)
-        except socket.gaierror:
-            ip_address = 'Not found'
+        resolution = resolver.resolve(domain)
+        # IPv4 like socket.gethostbyname gave; an IPv6-only host reports its IPv6 address
+        ip_address = (resolution.ipv4 or resolution.addresses[0]) if resolution.ok else 'Not found'
         
         # Try to get WHOIS data from a free API
         whois_api_url = f"https://www.whoisxmlapi.com/whoisserver/WhoisService?apiKey=at_00000000000000000000000000000&domainName={domain}&outputFormat=JSON"
         
         try:
-            whois_response = requests.get(whois_api_url, timeout=10)
+            whois_response = http_client.get(whois_api_url, timeout=10)
             whois_data = whois_response.json()
         except:
             whois_data = {}
@@ -116,6 +137,30 @@ def whois_lookup():
         return jsonify({'error': f'WHOIS lookup failed: {str(e)}'}), 500
 
 
+def tech_from_page(url, response, soup):
+    """Technologies detected from an already fetched page"""
+    headers = response.headers
+    found = signatures.match(response.text, headers, soup)
+    
+    detected_tech = {
+        'frameworks': found.names('tech', 'frameworks'),
+        'cms': found.names('tech', 'cms'),
+        'analytics': found.names('tech', 'analytics'),
+        'hosting': found.names('tech', 'hosting'),
+        'libraries': found.names('tech', 'libraries')
+    }
+    
+    # Server detection from headers
+    server = headers.get('Server', 'Unknown')
+    if server != 'Unknown':
+        detected_tech['hosting'].append(server)
+    
+    return {
+        'url': url,
+        'technologies': detected_tech
+    }
+
+
 @scraper_core_bp.route('/api/tech/detect', methods=['POST'])
 def detect_tech():
     """Detect technologies used on a website"""
@@ -129,62 +174,9 @@ def detect_tech():
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
         
-        response = requests.get(url, headers=get_headers(), timeout=15)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        headers = response.headers
-        html = response.text.lower()
-        
-        detected_tech = {
-            'frameworks': [],
-            'cms': [],
-            'analytics': [],
-            'hosting': [],
-            'libraries': []
-        }
-        
-        # Framework detection
-        if 'react' in html or 'react-' in html:
-            detected_tech['frameworks'].append('React')
-        if 'vue' in html or 'vue.js' in html:
-            detected_tech['frameworks'].append('Vue.js')
-        if 'angular' in html or 'ng-' in html:
-            detected_tech['frameworks'].append('Angular')
-        if 'next' in html or '_next' in html:
-            detected_tech['frameworks'].append('Next.js')
+        response = page_cache.fetch_page(url, timeout=15, **TECH_READ)
         
-        # CMS detection
-        if 'wp-content' in html or 'wordpress' in html:
-            detected_tech['cms'].append('WordPress')
-        if 'shopify' in html:
-            detected_tech['cms'].append('Shopify')
-        if 'wix.com' in html:
-            detected_tech['cms'].append('Wix')
-        if 'squarespace' in html:
-            detected_tech['cms'].append('Squarespace')
-        
-        # Analytics
-        if 'google-analytics' in html or 'gtag' in html:
-            detected_tech['analytics'].append('Google Analytics')
-        if 'hotjar' in html:
-            detected_tech['analytics'].append('Hotjar')
-        
-        # Libraries
-        if 'jquery' in html:
-            detected_tech['libraries'].append('jQuery')
-        if 'bootstrap' in html:
-            detected_tech['libraries'].append('Bootstrap')
-        if 'tailwind' in html:
-            detected_tech['libraries'].append('Tailwind CSS')
-        
-        # Server detection from headers
-        server = headers.get('Server', 'Unknown')
-        if server != 'Unknown':
-            detected_tech['hosting'].append(server)
-        
-        return jsonify({
-            'url': url,
-            'technologies': detected_tech
-        })
+        return jsonify(_unless_unchanged(url, response, 'tech', tech_from_page))
         
     except Exception as e:
         return jsonify({'error': f'Tech detection failed: {str(e)}'}), 500
@@ -203,36 +195,71 @@ def parse_sitemap():
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
         
-        # Try common sitemap locations
-        sitemap_urls = [
-            urljoin(url, '/sitemap.xml'),
-            urljoin(url, '/sitemap_index.xml'),
-            urljoin(url, '/sitemap-index.xml'),
-        ]
-        
-        urls_found = []
+        # Tries the common sitemap locations and follows sitemap indexes
+        summary = sitemap.summarize(url, timeout=10)
         
-        for sitemap_url in sitemap_urls:
-            try:
-                response = requests.get(sitemap_url, headers=get_headers(), timeout=10)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'xml')
-                    locs = soup.find_all('loc')
-                    urls_found.extend([loc.text for loc in locs])
-                    break
-            except:
-                continue
+        if not summary:
+            return jsonify({'url': url, 'urls': [], 'total': 0})
         
         return jsonify({
             'url': url,
-            'urls': urls_found[:100],
-            'total': len(urls_found)
+            'urls': summary['sample'],
+            'total': summary['url_count'],
+            'truncated': summary['truncated'],
+            'sitemaps': summary['sitemaps'],
+            'path_prefixes': summary['path_prefixes'],
+            'lastmod_by_month': summary['lastmod_by_month']
         })
         
     except Exception as e:
         return jsonify({'error': f'Sitemap parsing failed: {str(e)}'}), 500
 
 
+def metadata_from_page(url, response, soup):
+    """SEO metadata from an already parsed page"""
+    metadata = {
+        'title': '',
+        'description': '',
+        'keywords': '',
+        'og_data': {},
+        'twitter_data': {}
+    }
+    
+    # Title
+    title = parsing.title(soup)
+    if title:
+        metadata['title'] = title.strip()
+    
+    meta_tags = parsing.meta_tags(soup)
+    
+    # Meta description
+    desc_tag = next((tag for tag in meta_tags if tag.get('name') == 'description'), None)
+    if desc_tag:
+        metadata['description'] = desc_tag.get('content', '')
+    
+    # Meta keywords
+    kw_tag = next((tag for tag in meta_tags if tag.get('name') == 'keywords'), None)
+    if kw_tag:
+        metadata['keywords'] = kw_tag.get('content', '')
+    
+    # Open Graph
+    for og_tag in meta_tags:
+        prop = og_tag.get('property', '')
+        if prop.startswith('og:'):
+            metadata['og_data'][prop] = og_tag.get('content', '')
+    
+    # Twitter Cards
+    for tw_tag in meta_tags:
+        name = tw_tag.get('name', '')
+        if name.startswith('twitter:'):
+            metadata['twitter_data'][name] = tw_tag.get('content', '')
+    
+    return {
+        'url': url,
+        'metadata': metadata
+    }
+
+
 @scraper_core_bp.route('/api/metadata/extract', methods=['POST'])
 def extract_metadata():
     """Extract SEO metadata from a website"""
@@ -246,48 +273,23 @@ def extract_metadata():
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
         
-        response = requests.get(url, headers=get_headers(), timeout=15)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        metadata = {
-            'title': '',
-            'description': '',
-            'keywords': '',
-            'og_data': {},
-            'twitter_data': {}
-        }
-        
-        # Title
-        title_tag = soup.find('title')
-        if title_tag:
-            metadata['title'] = title_tag.text.strip()
-        
-        # Meta description
-        desc_tag = soup.find('meta', attrs={'name': 'description'})
-        if desc_tag:
-            metadata['description'] = desc_tag.get('content', '')
-        
-        # Meta keywords
-        kw_tag = soup.find('meta', attrs={'name': 'keywords'})
-        if kw_tag:
-            metadata['keywords'] = kw_tag.get('content', '')
-        
-        # Open Graph
-        for og_tag in soup.find_all('meta', property=re.compile(r'^og:')):
-            prop = og_tag.get('property', '')
-            content = og_tag.get('content', '')
-            metadata['og_data'][prop] = content
+        response = page_cache.fetch_page(url, timeout=15, **METADATA_READ)
         
-        # Twitter Cards
-        for tw_tag in soup.find_all('meta', attrs={'name': re.compile(r'^twitter:')}):
-            name = tw_tag.get('name', '')
-            content = tw_tag.get('content', '')
-            metadata['twitter_data'][name] = content
-        
-        return jsonify({
-            'url': url,
-            'metadata': metadata
-        })
+        return jsonify(_unless_unchanged(url, response, 'metadata', metadata_from_page))
         
     except Exception as e:
         return jsonify({'error': f'Metadata extraction failed: {str(e)}'}), 500
+
+
+
+@scraper_core_bp.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Report page/probe cache hit rates and memory use"""
+    return jsonify({
+        'page_cache': page_cache.cache.stats(),
+        'probe_cache': probe.outcomes.stats(),
+        'http_cache': http_cache.stats(),
+        'sitemap_cache': sitemap.summaries.stats(),
+        'dns_cache': resolver.stats(),
+        'politeness': politeness.stats()
+    })
@@ -0,0 +1,74 @@
+"""
+Job endpoints
+Submit long-running enrichments as background jobs and poll for their
+results (jobs.py)
+"""
+
+from flask import Blueprint, request, jsonify
+
+from jobs import manager, DEFAULT_TIMEOUT, MAX_WAIT
+
+scraper_jobs_bp = Blueprint('scraper_jobs', __name__)
+
+
+@scraper_jobs_bp.route('/api/jobs/submit', methods=['POST'])
+def submit_job():
+    """Queue an analysis (any name /api/batch/enrich accepts) and return its job id"""
+    try:
+        data = request.json
+        analysis = data.get('analysis', '').strip()
+        target = (data.get('url') or data.get('domain') or '').strip()
+
+        if not analysis or not target:
+            return jsonify({'error': 'analysis and url are required'}), 400
+
+        options = {}
+        if data.get('keywords'):
+            options['keywords'] = data['keywords']
+
+        job = manager.submit(analysis, target, options, timeout=data.get('timeout', DEFAULT_TIMEOUT))
+        return jsonify(job), 202
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Job submission failed: {str(e)}'}), 500
+
+
+@scraper_jobs_bp.route('/api/jobs/status/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Job status, with the result once it has finished; ?wait=N long-polls up to N seconds"""
+    try:
+        wait = min(request.args.get('wait', 0, type=float), MAX_WAIT)
+        job = manager.get(job_id, wait=wait)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(job)
+
+    except Exception as e:
+        return jsonify({'error': f'Job lookup failed: {str(e)}'}), 500
+
+
+@scraper_jobs_bp.route('/api/jobs/cancel/<job_id>', methods=['POST'])
+def cancel_job(job_id):
+    try:
+        job = manager.cancel(job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(job)
+
+    except Exception as e:
+        return jsonify({'error': f'Job cancellation failed: {str(e)}'}), 500
+
+
+@scraper_jobs_bp.route('/api/jobs/list', methods=['GET'])
+def list_jobs():
+    """Jobs newest first; filter with ?status=queued|running|done|failed|cancelled|timeout"""
+    try:
+        jobs, next_cursor = manager.list(status=request.args.get('status'),
+                                         limit=request.args.get('limit', 50, type=int),
+                                         cursor=request.args.get('cursor'))
+        return jsonify({'jobs': jobs, 'next_cursor': next_cursor, 'stats': manager.stats()})
+
+    except Exception as e:
+        return jsonify({'error': f'Listing jobs failed: {str(e)}'}), 500
@@ -0,0 +1,92 @@
+"""
+Lead store endpoints
+Full-text search over every stored enrichment result, plus saving,
+reading and deleting individual leads (leads.py)
+"""
+
+import json
+
+from flask import Blueprint, request, jsonify
+
+import leads
+
+scraper_leads_bp = Blueprint('scraper_leads', __name__)
+
+
+@scraper_leads_bp.route('/api/leads/search', methods=['GET'])
+def search_leads():
+    """Search stored leads (q is full text over title, description, keywords and tech)"""
+    try:
+        args = request.args
+        order = args.get('order', 'auto')
+        if order not in ('auto', 'rank', 'recent'):
+            return jsonify({'error': 'order must be auto, rank or recent'}), 400
+
+        return jsonify(leads.search(
+            q=args.get('q', '').strip(),
+            source=args.get('source'),
+            domain=args.get('domain'),
+            limit=args.get('limit', leads.DEFAULT_LIMIT, type=int),
+            cursor=args.get('cursor'),
+            order=order,
+        ))
+
+    except Exception as e:
+        return jsonify({'error': f'Lead search failed: {str(e)}'}), 500
+
+
+@scraper_leads_bp.route('/api/leads/<int:lead_id>', methods=['GET'])
+def get_lead(lead_id):
+    """One stored lead with its full result"""
+    try:
+        lead = leads.get(lead_id)
+        if lead is None:
+            return jsonify({'error': 'Lead not found'}), 404
+        return jsonify(lead)
+
+    except Exception as e:
+        return jsonify({'error': f'Lead lookup failed: {str(e)}'}), 500
+
+
+@scraper_leads_bp.route('/api/leads/save', methods=['POST'])
+def save_lead():
+    """Store a result from the dashboard's Save button"""
+    try:
+        data = request.json
+        kind = str(data.get('type', '')).strip()
+        url = str(data.get('url', '')).strip()
+
+        if not kind or not url:
+            return jsonify({'error': 'type and url are required'}), 400
+
+        result = data.get('data')
+        if isinstance(result, str):
+            try:
+                result = json.loads(result)
+            except ValueError:
+                pass
+
+        lead_id = leads.save(f'saved/{kind}', url, result)
+        return jsonify({'status': 'ok', 'id': lead_id})
+
+    except Exception as e:
+        return jsonify({'error': f'Saving lead failed: {str(e)}'}), 500
+
+
+@scraper_leads_bp.route('/api/leads/delete/<int:lead_id>', methods=['DELETE'])
+def delete_lead(lead_id):
+    try:
+        leads.delete(lead_id)
+        return jsonify({'status': 'deleted'})
+
+    except Exception as e:
+        return jsonify({'error': f'Deleting lead failed: {str(e)}'}), 500
+
+
+@scraper_leads_bp.route('/api/leads/stats', methods=['GET'])
+def lead_stats():
+    try:
+        return jsonify(leads.stats())
+
+    except Exception as e:
+        return jsonify({'error': f'Lead stats failed: {str(e)}'}), 500
@@ -0,0 +1,19 @@
+"""
+Metrics endpoint
+Endpoint latency, per-phase timings, outbound requests per host and cache
+hit ratios in Prometheus text format (metrics.py)
+"""
+
+from flask import Blueprint, Response
+
+import metrics
+
+scraper_metrics_bp = Blueprint('scraper_metrics', __name__)
+
+
+@scraper_metrics_bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    try:
+        return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+    except Exception as e:
+        return Response(f'# metrics failed: {str(e)}\n', status=500, mimetype='text/plain')
@@ -5,23 +5,14 @@ Google Dorking, GitHub OSINT, RSS Feeds, Competitors, Keywords, Scoring
 
 from flask import Blueprint, request, jsonify
 import requests
-from bs4 import BeautifulSoup
+import http_client
+import parsing
+import probe
 import re
 from urllib.parse import urlparse, urljoin
 
 scraper_osint_bp = Blueprint('scraper_osint', __name__)
 
-def get_headers():
-    return {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate',
-        'DNT': '1',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1'
-    }
-
 @scraper_osint_bp.route('/api/dork/search', methods=['POST'])
 def google_dork():
     """Perform Google dork search and extract result URLs"""
@@ -48,7 +39,7 @@ def google_dork():
             'Cache-Control': 'max-age=0'
         }
         
-        response = requests.get(search_url, headers=headers, timeout=15)
+        response = http_client.get(search_url, headers=headers, timeout=15)
         
         if response.status_code != 200:
             return jsonify({
@@ -59,7 +50,7 @@ def google_dork():
                 'total': 0
             })
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = parsing.parse(response.text)
         results = []
         
         for g in soup.select('div.g, div[data-sokoban-container]'):
@@ -137,8 +128,8 @@ def github_osint():
         
         for query in search_queries[:1]:
             github_url = f"https://github.com/search?q={requests.utils.quote(query)}&type=repositories"
-            response = requests.get(github_url, headers=get_headers(), timeout=15)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            response = http_client.get(github_url, timeout=15)
+            soup = parsing.parse(response.text)
             
             for repo in soup.find_all('a', class_='v-align-middle')[:5]:
                 href = repo.get('href', '')
@@ -158,6 +149,45 @@ def github_osint():
         return jsonify({'error': f'GitHub OSINT failed: {str(e)}'}), 500
 
 
+FEED_PATHS = [
+    '/feed', '/rss', '/feed.xml', '/rss.xml', '/atom.xml',
+    '/blog/feed', '/blog/rss', '/feeds/posts/default'
+]
+
+
+def feeds_from_results(url, active_feed_urls, page_html):
+    """Feed list from probed feed paths plus <link rel=alternate> tags on the page"""
+    feeds = []
+    for feed_url in active_feed_urls:
+        feeds.append({
+            'url': feed_url,
+            'type': 'RSS/Atom',
+            'status': 'Active'
+        })
+    
+    if page_html:
+        try:
+            soup = parsing.parse(page_html)
+            
+            for link in soup.find_all('link', type=['application/rss+xml', 'application/atom+xml']):
+                feed_href = link.get('href', '')
+                if feed_href:
+                    feed_full = urljoin(url, feed_href)
+                    if feed_full not in [f['url'] for f in feeds]:
+                        feeds.append({
+                            'url': feed_full,
+                            'type': link.get('type', 'RSS'),
+                            'title': link.get('title', 'Feed')
+                        })
+        except:
+            pass
+    
+    return {
+        'feeds': feeds,
+        'total': len(feeds)
+    }
+
+
 @scraper_osint_bp.route('/api/osint/feeds', methods=['POST'])
 def discover_feeds():
     """Discover RSS/Atom feeds on a website"""
@@ -174,46 +204,16 @@ def discover_feeds():
         parsed_url = urlparse(url)
         base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
         
-        feeds = []
-        feed_paths = [
-            '/feed', '/rss', '/feed.xml', '/rss.xml', '/atom.xml',
-            '/blog/feed', '/blog/rss', '/feeds/posts/default'
-        ]
-        
-        for path in feed_paths:
-            try:
-                feed_url = base_url + path
-                response = requests.head(feed_url, headers=get_headers(), timeout=5, allow_redirects=True)
-                if response.status_code == 200:
-                    feeds.append({
-                        'url': feed_url,
-                        'type': 'RSS/Atom',
-                        'status': 'Active'
-                    })
-            except:
-                pass
+        active_feed_urls = probe.all_ok([base_url + path for path in FEED_PATHS],
+                                        timeout=5, deadline=6, allow_redirects=True)
         
+        page_html = None
         try:
-            response = requests.get(url, headers=get_headers(), timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            for link in soup.find_all('link', type=['application/rss+xml', 'application/atom+xml']):
-                feed_href = link.get('href', '')
-                if feed_href:
-                    feed_full = urljoin(url, feed_href)
-                    if feed_full not in [f['url'] for f in feeds]:
-                        feeds.append({
-                            'url': feed_full,
-                            'type': link.get('type', 'RSS'),
-                            'title': link.get('title', 'Feed')
-                        })
+            page_html = http_client.get(url, timeout=10).text
         except:
             pass
         
-        return jsonify({
-            'feeds': feeds,
-            'total': len(feeds)
-        })
+        return jsonify(feeds_from_results(url, active_feed_urls, page_html))
         
     except Exception as e:
         return jsonify({'error': f'Feed discovery failed: {str(e)}'}), 500
@@ -0,0 +1,39 @@
+"""
+Profiling endpoints
+Recently profiled requests, slowest first, and the top functions of each
+(profiling.py). Available only while profiling is enabled.
+"""
+
+from flask import Blueprint, request, jsonify
+
+import profiling
+
+scraper_profiles_bp = Blueprint('scraper_profiles', __name__)
+
+
+@scraper_profiles_bp.route('/api/profiles', methods=['GET'])
+def list_profiles():
+    """Kept profiles, slowest first (?order=recent for newest first); filter with ?path="""
+    if not profiling.enabled():
+        return jsonify({'error': 'Profiling is disabled'}), 403
+    try:
+        args = request.args
+        profiles = profiling.recent(limit=args.get('limit', 20, type=int), path=args.get('path'),
+                                    order=args.get('order', 'slowest'))
+        return jsonify({'profiles': profiles})
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Listing profiles failed: {str(e)}'}), 500
+
+
+@scraper_profiles_bp.route('/api/profiles/<int:profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """One profile with its top functions by cumulative and by own time"""
+    if not profiling.enabled():
+        return jsonify({'error': 'Profiling is disabled'}), 403
+    profile = profiling.get(profile_id)
+    if profile is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return jsonify(profile)
@@ -0,0 +1,151 @@
+"""
+Production server mode
+Serves the app headless with a production WSGI server:
+    gunicorn    Linux / macOS: --workers processes with --threads threads each, so
+                throughput scales with cores. SIGTERM drains in-flight requests
+                for up to GRACEFUL_TIMEOUT seconds before the workers exit.
+    waitress    Windows (or --server waitress): one process with workers x threads threads
+Each gunicorn worker imports app.py itself and keeps its own in-memory caches
+and metrics; the database, the HTTP cache and the job queue are shared SQLite
+files. POST /shutdown is refused unless --allow-shutdown is given, since the
+UI's Exit button would otherwise stop the server for everyone.
+
+    python app.py --serve [--host 0.0.0.0] [--port 5000] [--workers 4] [--threads 8]
+"""
+
+import argparse
+import os
+import signal
+import sys
+
+import paths
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 5000
+DEFAULT_THREADS = 8         # per worker; requests mostly wait on remote sites
+WORKER_TIMEOUT = 180        # seconds a request may run (crawls, long polls) before its worker is restarted
+GRACEFUL_TIMEOUT = 30       # seconds in-flight requests get to finish on shutdown
+KEEPALIVE = 5
+WORKER_ENV = 'LEADGEN_SERVER_WORKER'    # set for the app in a multi-process server
+
+
+def is_worker():
+    """True inside a multi-process server, where job recovery has already run"""
+    return os.getenv(WORKER_ENV) == '1'
+
+
+def options(argv=None):
+    parser = argparse.ArgumentParser(prog='app.py --serve', description='Serve the app with a production WSGI server')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--host', default=DEFAULT_HOST, help='address to bind (0.0.0.0 for all interfaces)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='processes (default: CPU count)')
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS, help='threads per process')
+    parser.add_argument('--server', choices=('auto', 'gunicorn', 'waitress'), default='auto')
+    parser.add_argument('--data-dir', help=f'folder for the database and caches (or {paths.DATA_DIR_ENV})')
+    parser.add_argument('--allow-shutdown', action='store_true', help='let POST /shutdown from this machine stop the server')
+    return parser.parse_args(argv)
+
+
+def _load_app(opts, stop):
+    """Import app.py in this process and let /shutdown call stop when allowed"""
+    import app as application
+    application.load_blueprints()       # before the worker takes requests
+    if opts.allow_shutdown:
+        application.on_shutdown(stop)
+    return application
+
+
+def _recover_jobs():
+    """Requeue jobs a previous run left running, once, before any worker starts"""
+    import jobs
+    import storage
+
+    storage.configure(paths.db_path())
+    jobs.manager.recover()
+    storage.close()     # no connection may cross the fork into the workers
+
+
+def _worker_exit(server, worker):
+    application = sys.modules.get('app')
+    if application is not None:
+        application.close()
+
+
+def run_gunicorn(opts):
+    from gunicorn.app.base import BaseApplication
+
+    _recover_jobs()
+    os.environ[WORKER_ENV] = '1'
+    host = f'[{opts.host}]' if ':' in opts.host else opts.host
+    config = {
+        'bind': [f'{host}:{opts.port}'],
+        'workers': max(1, opts.workers),
+        'threads': max(1, opts.threads),
+        'worker_class': 'gthread',
+        'timeout': WORKER_TIMEOUT,
+        'graceful_timeout': GRACEFUL_TIMEOUT,
+        'keepalive': KEEPALIVE,
+        'worker_exit': _worker_exit,
+    }
+
+    class Server(BaseApplication):
+        def load_config(self):
+            for name, value in config.items():
+                self.cfg.set(name, value)
+
+        def load(self):
+            # In the worker: SIGTERM to the arbiter stops every worker gracefully
+            return _load_app(opts, lambda: os.kill(os.getppid(), signal.SIGTERM)).app
+
+    Server().run()
+
+
+def run_waitress(opts):
+    import waitress
+
+    # SIGINT ends waitress' loop in the main thread; in-flight requests finish first
+    application = _load_app(opts, lambda: signal.raise_signal(signal.SIGINT))
+    try:
+        waitress.serve(application.app, host=opts.host, port=opts.port,
+                       threads=max(1, opts.workers) * max(1, opts.threads), channel_timeout=WORKER_TIMEOUT)
+    finally:
+        application.close()
+
+
+def _available(module):
+    try:
+        __import__(module)
+        return True
+    except ImportError:
+        return False
+
+
+def main(argv=None):
+    opts = options(argv)
+    if opts.data_dir:
+        os.environ[paths.DATA_DIR_ENV] = opts.data_dir
+    server = opts.server
+    if server == 'auto':
+        if os.name != 'nt' and _available('gunicorn'):
+            server = 'gunicorn'
+        elif _available('waitress'):
+            server = 'waitress'
+        else:
+            print('Error: server mode needs a WSGI server: pip install gunicorn (Linux/macOS) or waitress')
+            return 1
+    capacity = (f'{opts.workers} worker(s) x {opts.threads} thread(s)' if server == 'gunicorn'
+                else f'{opts.workers * opts.threads} thread(s)')
+    print(f'Serving on http://{opts.host}:{opts.port} with {server} ({capacity}), data in {paths.data_dir()}')
+    try:
+        if server == 'gunicorn':
+            run_gunicorn(opts)
+        else:
+            run_waitress(opts)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
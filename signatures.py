@@ -0,0 +1,195 @@
+"""
+Data-driven signature engine for tech, integration, health and hiring detection
+Rules live in signatures.json. All literal body patterns are compiled into one
+multi-pattern matcher (Aho-Corasick when pyahocorasick is installed, otherwise
+a trie-shaped regex), so a page is scanned once however many rules there are.
+
+A rule matches when any of its sources matches:
+    body        case-insensitive substrings of the page
+    script_src  case-insensitive substrings of <script src> values
+    meta        {meta name: substring of its content}
+    headers     {header name: substring of its value, '' = header present}
+and, if it has a "regex", that pattern also matches the raw page.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+import metrics
+import parsing
+
+SIGNATURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'signatures.json')
+
+
+def _trie_regex(patterns):
+    """One regex for many literals, factored by common prefix; matches the longest pattern at a position"""
+    trie = {}
+    for pattern in patterns:
+        node = trie
+        for ch in pattern:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+class PatternSet:
+    """Set of literal patterns found in one pass over a text"""
+
+    def __init__(self, patterns):
+        self.patterns = sorted(set(patterns))
+        self._automaton = None
+        self._regex = None
+        if not self.patterns:
+            return
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for pattern in self.patterns:
+                self._automaton.add_word(pattern, pattern)
+            self._automaton.make_automaton()
+        else:
+            self._regex = re.compile(_trie_regex(self.patterns))
+            known = set(self.patterns)
+            # The regex reports the longest pattern starting at a position; shorter ones there are its prefixes
+            self._prefixes = {p: [p[:i] for i in range(1, len(p) + 1) if p[:i] in known] for p in self.patterns}
+
+    def search(self, text):
+        found = set()
+        if self._automaton is not None:
+            for _, pattern in self._automaton.iter(text):
+                found.add(pattern)
+        elif self._regex is not None:
+            search = self._regex.search
+            match = search(text)
+            while match is not None:
+                found.update(self._prefixes[match.group()])
+                match = search(text, match.start() + 1)
+        return found
+
+
+class Matches:
+    """Rules that matched one page, in signatures.json order"""
+
+    def __init__(self, rules):
+        self.rules = rules
+
+    def group(self, group, category=None):
+        return [rule for rule in self.rules
+                if rule['group'] == group and (category is None or rule.get('category') == category)]
+
+    def names(self, group, category=None):
+        return [rule['name'] for rule in self.group(group, category)]
+
+
+class SignatureEngine:
+    def __init__(self, rules):
+        # Identifies the rule set, so results cached under another one can be told apart
+        self.digest = hashlib.blake2b(json.dumps(rules, sort_keys=True).encode('utf-8'), digest_size=8).hexdigest()
+        self.rules = []
+        self._by_body = {}
+        self._by_script = {}
+        self._meta_rules = []
+        self._header_rules = []
+        for index, rule in enumerate(rules):
+            rule = dict(rule)
+            rule['body'] = [p.lower() for p in rule.get('body', ())]
+            rule['script_src'] = [p.lower() for p in rule.get('script_src', ())]
+            rule['meta'] = {k.lower(): v.lower() for k, v in rule.get('meta', {}).items()}
+            rule['headers'] = {k: v.lower() for k, v in rule.get('headers', {}).items()}
+            if rule.get('regex'):
+                rule['regex'] = re.compile(rule['regex'])
+            for pattern in rule['body']:
+                self._by_body.setdefault(pattern, []).append(index)
+            for pattern in rule['script_src']:
+                self._by_script.setdefault(pattern, []).append(index)
+            if rule['meta']:
+                self._meta_rules.append(index)
+            if rule['headers']:
+                self._header_rules.append(index)
+            self.rules.append(rule)
+        self.header_names = sorted({name.lower() for rule in self.rules for name in rule['headers']})
+        self._body = PatternSet(self._by_body)
+        self._script = PatternSet(self._by_script)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r', encoding='utf8') as f:
+            return cls(json.load(f)['rules'])
+
+    def match(self, html, headers=None, soup=None):
+        """Match every rule against a page; a parsed document (soup or lxml tree) enables script_src and meta rules"""
+        candidates = set()
+        for pattern in self._body.search(html.lower()):
+            candidates.update(self._by_body[pattern])
+
+        if soup is not None:
+            if self._by_script:
+                sources = '\n'.join(parsing.script_sources(soup)).lower()
+                for pattern in self._script.search(sources):
+                    candidates.update(self._by_script[pattern])
+            if self._meta_rules:
+                metas = {}
+                for attrs in parsing.meta_tags(soup):
+                    if attrs.get('name') and attrs.get('content'):
+                        metas.setdefault(attrs['name'].lower(), []).append(attrs['content'].lower())
+                for index in self._meta_rules:
+                    for name, needle in self.rules[index]['meta'].items():
+                        if any(needle in content for content in metas.get(name, ())):
+                            candidates.add(index)
+
+        if headers:
+            for index in self._header_rules:
+                for name, needle in self.rules[index]['headers'].items():
+                    value = headers.get(name)
+                    if value is not None and needle in value.lower():
+                        candidates.add(index)
+
+        matched = []
+        for index in sorted(candidates):
+            rule = self.rules[index]
+            if rule.get('regex') is not None and not rule['regex'].search(html):
+                continue
+            matched.append(rule)
+        return Matches(matched)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Engine for signatures.json, compiled on first use"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = SignatureEngine.from_file(SIGNATURES_PATH)
+    return _engine
+
+
+def load(path):
+    """Replace the rule set (e.g. with a larger fingerprint file)"""
+    global _engine
+    engine = SignatureEngine.from_file(path)
+    with _engine_lock:
+        _engine = engine
+
+
+def match(html, headers=None, soup=None):
+    with metrics.timed('tech'):
+        return get_engine().match(html, headers, soup)
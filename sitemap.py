@@ -0,0 +1,319 @@
+"""
+Streaming sitemap reader
+Parses sitemaps incrementally with lxml iterparse straight from the socket
+(plain or .xml.gz), follows sitemap indexes breadth-first under a URL budget,
+and reduces everything to a small summary: URL count, a sample of URLs,
+a path-prefix histogram and the lastmod distribution by month. Memory stays
+constant however large the sitemap is. Summaries are cached per site, and
+each file's share of it in http_cache along with the file's validators.
+"""
+
+import gzip
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from urllib.parse import urljoin, urlsplit
+
+from lxml import etree
+
+import http_cache
+
+SITEMAP_PATHS = ['/sitemap.xml', '/sitemap_index.xml', '/sitemap-index.xml']
+URL_BUDGET = 50000          # page URLs read per site before stopping
+MAX_SITEMAPS = 50           # sitemap files fetched per site (index + children)
+SAMPLE_SIZE = 100           # page URLs kept verbatim
+MAX_PREFIXES = 500          # distinct path prefixes tracked; the rest count as '(other)'
+MAX_SUMMARIES = 512         # sites kept in the summary cache (LRU)
+ERROR_TTL = 60              # seconds 'no sitemap' is kept when a location failed to answer
+
+MONTH_RE = re.compile(r'^\d{4}-\d{2}')
+# First path segment of an absolute URL (cheaper than urlsplit on every entry)
+PREFIX_RE = re.compile(r'^[^:/?#]+://[^/?#]*/*([^/?#]*)')
+
+
+class _Prefixed:
+    """File-like object that replays already-read bytes before the rest of a stream"""
+
+    def __init__(self, prefix, stream):
+        self.prefix = prefix
+        self.stream = stream
+
+    def read(self, size=-1):
+        if self.prefix:
+            if size is None or size < 0:
+                data, self.prefix = self.prefix + self.stream.read(), b''
+                return data
+            data, self.prefix = self.prefix[:size], self.prefix[size:]
+            if len(data) < size:
+                data += self.stream.read(size - len(data))
+            return data
+        return self.stream.read(size)
+
+
+def _body(response):
+    """File-like body of a streamed response, gunzipped when the file itself is .xml.gz"""
+    raw = response.raw
+    raw.decode_content = True       # undo Content-Encoding: gzip transparently
+    magic = raw.read(2)
+    body = _Prefixed(magic, raw)
+    if magic == b'\x1f\x8b':        # the file itself is gzipped (.xml.gz)
+        body = gzip.GzipFile(fileobj=body)
+    return body
+
+
+class _Reader:
+    """Accumulates one site's summary across all of its sitemap files"""
+
+    def __init__(self, url_budget, sample_size):
+        self.url_budget = url_budget
+        self.sample_size = sample_size
+        self.url_count = 0
+        self.sample = []
+        self.prefixes = Counter()
+        self.months = Counter()
+        self.lastmod_count = 0
+        self.child_sitemaps = []
+        self.truncated = False
+
+    def add_url(self, loc, lastmod):
+        self.url_count += 1
+        if len(self.sample) < self.sample_size:
+            self.sample.append(loc)
+        match = PREFIX_RE.match(loc)
+        prefix = '/' + match.group(1) if match else '/'
+        if prefix in self.prefixes or len(self.prefixes) < MAX_PREFIXES:
+            self.prefixes[prefix] += 1
+        else:
+            self.prefixes['(other)'] += 1
+        if lastmod:
+            self.lastmod_count += 1
+            if MONTH_RE.match(lastmod):
+                self.months[lastmod[:7]] += 1
+
+    def read(self, body):
+        """Parse one sitemap file; returns False once the URL budget is spent"""
+        context = etree.iterparse(body, events=('end',), tag=('{*}url', '{*}sitemap'),
+                                  recover=True, huge_tree=True)
+        for _, elem in context:
+            loc = lastmod = ''
+            for child in elem:
+                tag = child.tag
+                if isinstance(tag, str):
+                    if tag.endswith('loc'):
+                        loc = (child.text or '').strip()
+                    elif tag.endswith('lastmod'):
+                        lastmod = (child.text or '').strip()
+            if loc:
+                if elem.tag.endswith('sitemap'):
+                    self.child_sitemaps.append(loc)
+                else:
+                    self.add_url(loc, lastmod)
+            # Drop what has been read so the tree never grows
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+            if self.url_count >= self.url_budget:
+                self.truncated = True
+                return False
+        return True
+
+    def partial(self):
+        """What one file contributed, JSON-serializable (cached per file by http_cache)"""
+        return {
+            'url_count': self.url_count,
+            'sample': self.sample,
+            'prefixes': dict(self.prefixes),
+            'months': dict(self.months),
+            'lastmod_count': self.lastmod_count,
+            'sitemaps': self.child_sitemaps,
+            'truncated': self.truncated,
+        }
+
+    def merge(self, partial):
+        """Add one file's partial() to this site's totals"""
+        self.url_count += partial['url_count']
+        self.sample.extend(partial['sample'][:max(0, self.sample_size - len(self.sample))])
+        for prefix, count in partial['prefixes'].items():
+            if prefix in self.prefixes or len(self.prefixes) < MAX_PREFIXES:
+                self.prefixes[prefix] += count
+            else:
+                self.prefixes['(other)'] += count
+        self.months.update(partial['months'])
+        self.lastmod_count += partial['lastmod_count']
+        self.child_sitemaps.extend(partial['sitemaps'])
+        self.truncated = self.truncated or partial['truncated']
+
+    def summary(self, root_url, sitemaps):
+        return {
+            'sitemap_url': root_url,
+            'sitemaps': sitemaps,
+            'url_count': self.url_count,
+            'truncated': self.truncated,
+            'sample': self.sample,
+            'path_prefixes': dict(self.prefixes.most_common(20)),
+            'lastmod_count': self.lastmod_count,
+            'lastmod_by_month': dict(sorted(self.months.items())),
+        }
+
+
+def _parse(url_budget, sample_size):
+    """http_cache.fetch_parsed parser reading one sitemap file into a partial summary"""
+    def parse(response):
+        reader = _Reader(url_budget, sample_size)
+        try:
+            complete = reader.read(_body(response))
+        except (etree.XMLSyntaxError, OSError, EOFError):
+            complete = False        # keep what was read, but don't cache it
+        return reader.partial(), complete
+    return parse
+
+
+def _transient(status_code):
+    return status_code == 429 or status_code >= 500
+
+
+def read_sitemaps(root_url, url_budget=URL_BUDGET, max_sitemaps=MAX_SITEMAPS,
+                  sample_size=SAMPLE_SIZE, timeout=10):
+    """Summary of the sitemap at root_url and every sitemap it indexes
+
+    Returns None when there is no sitemap there (a 4xx answer, or a body that
+    isn't a sitemap). Raises OSError (requests' errors included) when the root
+    sitemap couldn't be read: connection error, timeout, 429 or 5xx. Each file
+    is read through http_cache, which keeps its partial summary and revalidates
+    it once the 'sitemap' policy expires.
+    """
+    reader = _Reader(url_budget, sample_size)
+    queue = deque([root_url])
+    seen = {root_url}
+    fetched = []
+
+    while queue and len(fetched) < max_sitemaps:
+        url = queue.popleft()
+        try:
+            status_code, partial = http_cache.fetch_parsed(
+                url, _parse(url_budget - reader.url_count, sample_size), policy='sitemap', timeout=timeout)
+        except Exception:
+            if url == root_url:
+                raise
+            continue
+        if partial is None:
+            if url == root_url:
+                if _transient(status_code):
+                    raise OSError(f'{url} answered HTTP {status_code}')
+                return None
+            continue
+        if url == root_url and not partial['url_count'] and not partial['sitemaps']:
+            return None     # not a sitemap (e.g. an HTML soft 404)
+        reader.merge(partial)
+        fetched.append(url)
+        for child in reader.child_sitemaps:
+            if child not in seen:
+                seen.add(child)
+                queue.append(child)
+        reader.child_sitemaps = []
+        if reader.url_count >= url_budget:
+            break       # a cached file may overshoot the budget; it cost no reading
+
+    if queue:
+        reader.truncated = True
+    return reader.summary(root_url, fetched)
+
+
+class SummaryCache:
+    """site -> (summary, expires), LRU-bounded; a None summary records 'no sitemap'"""
+
+    def __init__(self, max_entries=MAX_SUMMARIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, site):
+        with self._lock:
+            entry = self._entries.get(site)
+            if entry is None or entry[1] < time.time():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(site)
+            self.hits += 1
+            return entry
+
+    def put(self, site, summary, ttl):
+        with self._lock:
+            self._entries[site] = (summary, time.time() + ttl)
+            self._entries.move_to_end(site)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'sites': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+summaries = SummaryCache()
+_site_locks = {}           # site -> [lock, callers holding or waiting for it]
+_site_locks_guard = threading.Lock()
+
+
+def _site(url):
+    parts = urlsplit(url if '://' in url else 'https://' + url)
+    return f'{parts.scheme}://{parts.netloc.lower()}'
+
+
+def summarize(url, url_budget=URL_BUDGET, timeout=10):
+    """Cached sitemap summary for the site of url (tries the usual sitemap locations), or None
+
+    Summaries live for http_cache.POLICIES['sitemap'] seconds, or ERROR_TTL when
+    no sitemap was found but a location couldn't be read. Concurrent callers
+    for the same site wait for one reader instead of each downloading the sitemap.
+    """
+    site = _site(url)
+    cached = summaries.get(site)
+    if cached is not None:
+        return cached[0]
+
+    # Every caller for the site shares one lock while any of them holds or waits for it
+    with _site_locks_guard:
+        entry = _site_locks.setdefault(site, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            cached = summaries.get(site)
+            if cached is not None:
+                return cached[0]
+            summary, failed = None, False
+            for path in SITEMAP_PATHS:
+                try:
+                    summary = read_sitemaps(urljoin(site, path), url_budget=url_budget, timeout=timeout)
+                except Exception:
+                    failed = True
+                    continue
+                if summary is not None:
+                    break
+            # 'No sitemap' is remembered for the full policy only when every location said so
+            ttl = ERROR_TTL if summary is None and failed else http_cache.POLICIES.get('sitemap', 0)
+            summaries.put(site, summary, ttl)
+            return summary
+    finally:
+        with _site_locks_guard:
+            entry[1] -= 1
+            if not entry[1]:
+                del _site_locks[site]
+
+
+def recent_lastmods(summary, years=2):
+    """Number of URLs whose lastmod falls in the current or previous (years - 1) calendar years"""
+    first_year = time.gmtime().tm_year - years + 1
+    return sum(count for month, count in summary['lastmod_by_month'].items() if int(month[:4]) >= first_year)
@@ -0,0 +1,141 @@
+"""
+Startup timing
+Phases of startup (Flask app ready, blueprints loaded, ...) are timed on
+every launch. Import cost per module is recorded only when asked for
+(python app.py --startup-report, or LEADGEN_STARTUP_REPORT=1 for a normal
+run): a meta path finder wraps every loader and times its exec_module, so
+the report lists each module's own import time and its cumulative time
+including the modules it imported. GET /api/startup returns both.
+
+Times start when this module is imported, which app.py does first; the
+interpreter's own startup before that is not included.
+"""
+
+import os
+import sys
+import threading
+import time
+
+REPORT_ENV = 'LEADGEN_STARTUP_REPORT'
+TOP_MODULES = 40            # modules listed in a report
+
+STARTED = time.perf_counter()
+
+_phases = {}                # name -> (seconds since start when it ended, duration)
+_modules = {}               # module name -> [cumulative, own] seconds
+_local = threading.local()  # stack of child import time per thread
+_timer = None
+
+
+def mark(name, duration=None):
+    """Record that phase name finished now (taking duration seconds, if known)"""
+    at = time.perf_counter() - STARTED
+    _phases[name] = (at, at if duration is None else duration)
+
+
+class timed:
+    """with timed('phase'): ... records the block as a phase"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        mark(self.name, time.perf_counter() - self.start)
+
+
+class _TimedLoader:
+    """Wraps a loader to time exec_module; restores the original loader afterwards"""
+
+    def __init__(self, loader):
+        self.loader = loader
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            _modules[module.__name__] = [elapsed, elapsed - children]
+            module.__loader__ = self.loader
+            if getattr(module, '__spec__', None) is not None:
+                module.__spec__.loader = self.loader
+
+
+class _TimingFinder:
+    """Asks the other finders for a spec and gives it a timed loader"""
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+            find_spec = getattr(finder, 'find_spec', None)
+            if find_spec is None:
+                continue
+            spec = find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = _TimedLoader(spec.loader)
+        return spec
+
+
+def record_imports():
+    """Start timing module imports (modules already imported are not listed)"""
+    global _timer
+    if _timer is None:
+        _timer = _TimingFinder()
+        sys.meta_path.insert(0, _timer)
+
+
+def stop_recording():
+    global _timer
+    if _timer is not None:
+        sys.meta_path.remove(_timer)
+        _timer = None
+
+
+def requested():
+    return os.getenv(REPORT_ENV) == '1' or '--startup-report' in sys.argv[1:]
+
+
+def report(top=TOP_MODULES):
+    """Phases in order and the costliest imports (by cumulative time) in ms"""
+    phases = [{'phase': name, 'at_ms': round(at * 1000, 1), 'took_ms': round(took * 1000, 1)}
+              for name, (at, took) in sorted(_phases.items(), key=lambda item: item[1][0])]
+    modules = sorted(_modules.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    return {
+        'phases': phases,
+        'imports_recorded': _timer is not None or bool(_modules),
+        'modules': [{'module': name, 'cumulative_ms': round(cumulative * 1000, 1), 'own_ms': round(own * 1000, 1)}
+                    for name, (cumulative, own) in modules],
+        'modules_imported': len(_modules),
+    }
+
+
+def format_report(top=TOP_MODULES):
+    """report() as text for the console"""
+    data = report(top)
+    lines = ['Startup phases (ms since start, duration):']
+    lines += [f"  {p['at_ms']:8.1f}  {p['took_ms']:8.1f}  {p['phase']}" for p in data['phases']]
+    if data['modules']:
+        lines.append(f"Costliest imports of {data['modules_imported']} modules (cumulative ms, own ms):")
+        lines += [f"  {m['cumulative_ms']:8.1f}  {m['own_ms']:8.1f}  {m['module']}" for m in data['modules']]
+    return '\n'.join(lines)
@@ -0,0 +1,251 @@
+"""
+SQLite storage for search history and saved searches
+Connections are pooled and reused across requests (WAL journal, so reads
+never wait for a writer). Tables are indexed on timestamp and keyword, and
+reads are paginated with a keyset cursor (the last id seen), so a page costs
+the same however many rows the table holds. Saved entries are unique per
+keyword + category, and bulk writes run in one transaction.
+"""
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+TABLES = ('history', 'saved')
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+MAX_BULK = 10000            # rows per bulk request
+POOL_SIZE = 8               # idle connections kept open
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, keyword TEXT, category TEXT, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)""",
+    """CREATE TABLE IF NOT EXISTS saved (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, keyword TEXT, category TEXT, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)""",
+    'CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history(timestamp)',
+    'CREATE INDEX IF NOT EXISTS idx_history_keyword ON history(keyword)',
+    'CREATE INDEX IF NOT EXISTS idx_history_category ON history(category)',
+    'CREATE INDEX IF NOT EXISTS idx_saved_timestamp ON saved(timestamp)',
+]
+
+class Pool:
+    """Pooled connections to one SQLite file (WAL); init(conn) runs once per file before first use"""
+
+    def __init__(self, init, size=POOL_SIZE):
+        self.path = None
+        self._init = init
+        self._pool = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._initialized = None
+
+    def configure(self, path):
+        """Use the SQLite file at path; open connections to the previous file are dropped"""
+        with self._lock:
+            self.path = path
+            self._initialized = None
+            self._drain()
+
+    def reinit(self):
+        """Run init again on the next connection (the schema changed)"""
+        with self._lock:
+            self._initialized = None
+
+    def close(self):
+        """Close pooled connections (shutdown); later use opens new ones"""
+        with self._lock:
+            self._drain()
+
+    def _drain(self):
+        while True:
+            try:
+                self._pool.get_nowait()[0].close()
+            except queue.Empty:
+                return
+
+    def open(self):
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Pooled connection; commits on success, rolls back on error"""
+        path = self.path
+        if path is None:
+            raise RuntimeError('database is not configured')
+        try:
+            conn, conn_path = self._pool.get_nowait()
+            if conn_path != path:
+                conn.close()
+                raise queue.Empty
+        except queue.Empty:
+            conn = self.open()
+        try:
+            if self._initialized != path:
+                with self._lock:
+                    if self._initialized != path:
+                        self._init(conn)
+                        self._initialized = path
+            yield conn
+            conn.commit()
+        except BaseException:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                conn.close()        # unusable; the pool opens a fresh one
+                conn = None
+            raise
+        finally:
+            # Back to the pool on success and on error alike, so errors don't leak handles
+            if conn is not None:
+                try:
+                    self._pool.put_nowait((conn, path))
+                except queue.Full:
+                    conn.close()
+
+
+_extensions = []            # schema statements registered by other modules
+
+
+def configure(path):
+    """Use the SQLite file at path; open connections to the previous file are dropped"""
+    _db.configure(path)
+
+
+def configured():
+    return _db.path is not None
+
+
+def register_schema(statements):
+    """Extra CREATE ... IF NOT EXISTS statements run along with the built-in schema"""
+    _extensions.extend(statements)
+    _db.reinit()
+
+
+def close():
+    """Close pooled connections (shutdown); later use opens new ones"""
+    _db.close()
+
+
+def init(conn=None):
+    """Create tables and indexes; de-duplicates saved entries the first time the unique index is added"""
+    own = conn is None
+    conn = conn or _db.open()
+    try:
+        for statement in SCHEMA + _extensions:
+            conn.execute(statement)
+        has_unique = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_saved_keyword_category'").fetchone()
+        if not has_unique:
+            conn.execute('DELETE FROM saved WHERE id NOT IN (SELECT MAX(id) FROM saved GROUP BY keyword, category)')
+            conn.execute('CREATE UNIQUE INDEX idx_saved_keyword_category ON saved(keyword, category)')
+        conn.commit()
+    finally:
+        if own:
+            conn.close()
+
+
+_db = Pool(init)
+
+
+def connection():
+    """Pooled connection to the database; commits on success, rolls back on error"""
+    if _db.path is None:
+        raise RuntimeError('storage is not configured (storage.configure(path))')
+    return _db.connection()
+
+
+def _table(table):
+    if table not in TABLES:
+        raise ValueError(f'Unknown table: {table}')
+    return table
+
+
+def _row(r):
+    return {'id': r[0], 'keyword': r[1], 'category': r[2], 'timestamp': r[3]}
+
+
+def _items(items):
+    """[(keyword, category)] from [{'keyword', 'category'}]; raises ValueError on bad input"""
+    if not isinstance(items, list):
+        raise ValueError('items must be a list')
+    if len(items) > MAX_BULK:
+        raise ValueError(f'At most {MAX_BULK} items per request')
+    rows = []
+    for item in items:
+        if not isinstance(item, dict) or not item.get('keyword'):
+            raise ValueError('Every item needs a keyword')
+        rows.append((item['keyword'], item.get('category') or ''))
+    return rows
+
+
+def add(table, keyword, category):
+    """Insert one row (saved: refresh the existing entry instead of duplicating it); returns its id"""
+    return (add_many(table, [{'keyword': keyword, 'category': category}], upsert=True) or [None])[0]
+
+
+def add_many(table, items, upsert=False):
+    """Insert rows in one transaction and return their ids
+
+    For saved, an existing keyword + category is skipped (upsert=False) or has
+    its timestamp refreshed (upsert=True); its id is returned either way.
+    """
+    table = _table(table)
+    rows = _items(items)
+    if table == 'history':
+        sql = 'INSERT INTO history(keyword, category) VALUES (?, ?) RETURNING id'
+    elif upsert:
+        sql = ('INSERT INTO saved(keyword, category) VALUES (?, ?) ON CONFLICT(keyword, category) '
+               'DO UPDATE SET timestamp=CURRENT_TIMESTAMP RETURNING id')
+    else:
+        # No-op update so RETURNING still reports the existing row's id
+        sql = ('INSERT INTO saved(keyword, category) VALUES (?, ?) ON CONFLICT(keyword, category) '
+               'DO UPDATE SET keyword=excluded.keyword RETURNING id')
+    with connection() as conn:
+        return [conn.execute(sql, row).fetchone()[0] for row in rows]
+
+
+def query(table, limit=DEFAULT_LIMIT, cursor=None, keyword=None, category=None, q=None, since=None, until=None):
+    """One page of rows, newest first, and the cursor for the next page (None at the end)
+
+    cursor is the id returned as next_cursor by the previous page. keyword and
+    category match exactly, q is a substring of the keyword, since/until bound
+    the timestamp ('YYYY-MM-DD[ HH:MM:SS]', UTC).
+    """
+    table = _table(table)
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    where, params = [], []
+    if cursor is not None:
+        where.append('id < ?')
+        params.append(int(cursor))
+    if keyword:
+        where.append('keyword = ?')
+        params.append(keyword)
+    if category:
+        where.append('category = ?')
+        params.append(category)
+    if q:
+        where.append("keyword LIKE ? ESCAPE '\\'")
+        params.append('%' + q.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+    if since:
+        where.append('timestamp >= ?')
+        params.append(since)
+    if until:
+        where.append('timestamp <= ?')
+        params.append(until)
+    sql = f'SELECT id, keyword, category, timestamp FROM {table}'
+    if where:
+        sql += ' WHERE ' + ' AND '.join(where)
+    sql += ' ORDER BY id DESC LIMIT ?'
+    with connection() as conn:
+        rows = conn.execute(sql, params + [limit + 1]).fetchall()
+    next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+    return [_row(r) for r in rows[:limit]], next_cursor
+
+
+def delete(table, id):
+    table = _table(table)
+    with connection() as conn:
+        conn.execute(f'DELETE FROM {table} WHERE id=?', (id,))
@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import http_cache
+import storage
+from fixture_server import FixtureServer
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """storage on a fresh SQLite file for this test"""
+    monkeypatch.setattr(storage, '_db', storage.Pool(storage.init))
+    storage.configure(str(tmp_path / 'leads.db'))
+    yield storage
+    storage.close()
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """http_cache on a fresh SQLite file for this test, with its policies and counters restored afterwards"""
+    monkeypatch.setattr(http_cache, '_db', storage.Pool(http_cache._init))
+    monkeypatch.setattr(http_cache, 'POLICIES', dict(http_cache.POLICIES))
+    monkeypatch.setattr(http_cache, '_stats', dict.fromkeys(http_cache._stats, 0))
+    http_cache.configure(path=str(tmp_path / 'http_cache.db'))
+    yield http_cache
+    http_cache.close()
+
+
+@pytest.fixture
+def web():
+    with FixtureServer() as server:
+        yield server
+
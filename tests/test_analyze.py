@@ -0,0 +1,58 @@
+import pytest
+from flask import Flask
+
+import page_cache
+import scraper_analyze
+import scraper_core
+
+PAGE = '''<html><head><title>Acme CRM</title>
+<meta name="description" content="Sales pipeline software">
+<meta property="og:title" content="Acme">
+<script src="/wp-content/themes/acme/app.js"></script><script src="/js/jquery-1.12.4.min.js"></script>
+</head><body><h1>Acme</h1><p>Write to sales@acme.test or call +1 (555) 010-2000.</p>
+<a href="https://twitter.com/acme">Twitter</a><p>We are hiring engineers. Pricing and enterprise plans.</p>
+</body></html>'''
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(page_cache, 'cache', page_cache.PageCache())
+    app = Flask(__name__)
+    app.register_blueprint(scraper_core.scraper_core_bp)
+    app.register_blueprint(scraper_analyze.scraper_analyze_bp)
+    return app.test_client()
+
+
+@pytest.fixture
+def site(web):
+    web.routes['/'] = (200, {'Content-Type': 'text/html', 'Server': 'nginx'}, PAGE)
+    return web
+
+
+def test_every_section_from_one_fetch(client, site):
+    result = client.post('/api/analyze/full', json={'url': site.base_url + '/'}).get_json()
+    assert set(scraper_analyze.SECTIONS) <= set(result) and result['errors'] == {}
+    assert site.requests == 1
+    assert result['contacts']['emails'] == ['sales@acme.test']
+    assert 'WordPress' in result['tech']['technologies']['cms']
+    assert result['metadata']['metadata']['title'] == 'Acme CRM'
+
+
+def test_sections_match_the_single_page_endpoints(client, site):
+    url = site.base_url + '/'
+    full = client.post('/api/analyze/full', json={'url': url}).get_json()
+    for section, endpoint in (('contacts', '/api/scrape/contacts'), ('tech', '/api/tech/detect'),
+                              ('metadata', '/api/metadata/extract')):
+        page_cache.cache.clear()
+        assert client.post(endpoint, json={'url': url}).get_json() == full[section], section
+
+
+def test_requested_sections_only(client, site):
+    result = client.post('/api/analyze/full', json={'url': site.base_url + '/', 'sections': ['metadata']}).get_json()
+    assert 'metadata' in result and 'contacts' not in result and 'score' not in result
+
+
+def test_bad_requests_are_rejected(client):
+    assert client.post('/api/analyze/full', json={}).status_code == 400
+    response = client.post('/api/analyze/full', json={'url': 'acme.test', 'sections': ['horoscope']})
+    assert response.status_code == 400 and 'horoscope' in response.get_json()['error']
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+from flask import Blueprint, Flask, request, jsonify
+from werkzeug.test import EnvironBuilder
+
+import scraper_batch
+
+NDJSON = {'Content-Type': 'application/x-ndjson'}
+
+
+class Lines:
+    """Request body that counts the NDJSON lines read from it"""
+
+    def __init__(self, lines):
+        self.lines = iter(line.encode() + b'\n' for line in lines)
+        self.read = 0
+
+    def readline(self, size=-1):
+        line = next(self.lines, b'')
+        self.read += bool(line)
+        return line
+
+    def __iter__(self):
+        return iter(self.readline, b'')
+
+
+@pytest.fixture
+def client():
+    calls = []
+    stub = Blueprint('stub', __name__)
+
+    @stub.route('/api/analyze/full', methods=['POST'])
+    def analyze():
+        calls.append(request.json)
+        return jsonify({'url': request.json['url'], 'sections': request.json['sections']})
+
+    app = Flask(__name__)
+    app.register_blueprint(stub)
+    app.register_blueprint(scraper_batch.scraper_batch_bp)
+    client = app.test_client()
+    client.calls = calls
+    return client
+
+
+def results(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_json_list_streams_one_line_per_domain(client):
+    response = client.post('/api/batch/enrich', json={'domains': ['a.test', 'b.test', 'a.test', ' '],
+                                                      'analyses': ['contacts', 'tech']})
+    assert response.mimetype == 'application/x-ndjson'
+    lines = results(response)
+    assert sorted(line['domain'] for line in lines) == ['a.test', 'b.test']
+    assert all(line['status'] == 200 and line['analysis'] == 'page' for line in lines)
+    assert lines[0]['result']['sections'] == ['contacts', 'tech']
+
+
+def test_ndjson_body_with_settings_in_the_query(client):
+    body = '"a.test"\n{"domain": "b.test"}\n\nc.test\n{"url": "d.test"}\nnull\n'
+    response = client.post('/api/batch/enrich?analyses=metadata&workers=2', data=body, headers=NDJSON)
+    assert sorted(line['domain'] for line in results(response)) == ['a.test', 'b.test', 'c.test', 'd.test']
+    assert all(call['sections'] == ['metadata'] for call in client.calls)
+
+
+def test_ndjson_body_is_read_as_the_work_proceeds(client):
+    body = Lines(f'd{i}.test' for i in range(1000))
+    environ = EnvironBuilder('/api/batch/enrich', method='POST', query_string='workers=1',
+                             headers=NDJSON).get_environ()
+    environ.update({'wsgi.input': body, 'wsgi.input_terminated': True})
+    output = client.application(environ, lambda status, headers: None)
+    assert json.loads(next(iter(output)))['status'] == 200
+    assert body.read < 1000
+    output.close()
+
+
+def test_repeats_are_skipped_within_the_dedup_window(monkeypatch):
+    monkeypatch.setattr(scraper_batch, 'DEDUP_WINDOW', 2)
+    domains = ['a', 'b', 'a', 'c', 'd', 'a']
+    tasks = scraper_batch.iter_tasks(domains, ['tech'], {})
+    assert [domain for domain, *_ in tasks] == ['a', 'b', 'c', 'd', 'a']
+
+
+def test_empty_or_unknown_requests_are_rejected(client):
+    assert client.post('/api/batch/enrich', json={'domains': []}).status_code == 400
+    assert client.post('/api/batch/enrich', data='\n\n', headers=NDJSON).status_code == 400
+    response = client.post('/api/batch/enrich', json={'domains': ['a.test'], 'analyses': ['tarot']})
+    assert response.status_code == 400
@@ -0,0 +1,97 @@
+import gzip
+import json
+import os
+import zlib
+
+import pytest
+from flask import Flask, Response, jsonify, request
+
+import compression
+
+brotli = pytest.importorskip('brotli')
+
+ROWS = [{'domain': f'site{i}.test', 'emails': [f'sales@site{i}.test']} for i in range(100)]
+
+
+@pytest.fixture
+def asset(tmp_path):
+    path = tmp_path / 'index.html'
+    path.write_text('<html>' + 'lead generation ' * 500 + '</html>')
+    return compression.StaticAsset(str(path), 'text/html')
+
+
+@pytest.fixture
+def client(asset):
+    app = Flask(__name__)
+    compression.init_app(app)
+    app.add_url_rule('/', 'index', lambda: asset.response(request))
+    app.add_url_rule('/rows', 'rows', lambda: jsonify(ROWS))
+    app.add_url_rule('/small', 'small', lambda: jsonify({'ok': True}))
+    app.add_url_rule('/stream', 'stream', lambda: Response(
+        (json.dumps(row) + '\n' for row in ROWS[:3]), mimetype='application/x-ndjson'))
+    return app.test_client()
+
+
+def test_json_is_compressed_for_clients_that_accept_it(client):
+    plain = client.get('/rows')
+    assert 'Content-Encoding' not in plain.headers and plain.get_json() == ROWS
+    assert 'Accept-Encoding' in plain.headers['Vary']
+
+    zipped = client.get('/rows', headers={'Accept-Encoding': 'gzip'})
+    assert zipped.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(zipped.data)) == ROWS
+
+    best = client.get('/rows', headers={'Accept-Encoding': 'gzip, br'})
+    assert best.headers['Content-Encoding'] == 'br'
+    assert json.loads(brotli.decompress(best.data)) == ROWS
+    assert len(best.data) < len(plain.data) / 4
+
+
+def test_small_json_is_sent_as_is(client):
+    response = client.get('/small', headers={'Accept-Encoding': 'gzip, br'})
+    assert 'Content-Encoding' not in response.headers and response.get_json() == {'ok': True}
+
+
+def test_ndjson_stream_is_compressed_line_by_line(client):
+    response = client.get('/stream', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip' and 'Content-Length' not in response.headers
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    lines = decompressor.decompress(response.data).decode().splitlines()
+    assert [json.loads(line) for line in lines] == ROWS[:3]
+
+
+def test_index_etag_and_304(client, asset):
+    first = client.get('/', headers={'Accept-Encoding': 'br'})
+    assert first.status_code == 200 and first.headers['Content-Encoding'] == 'br'
+    assert first.headers['Cache-Control'] == 'no-cache'
+    etag = first.headers['ETag']
+    assert brotli.decompress(first.data).startswith(b'<html>lead generation')
+
+    # The same weak ETag covers every encoding
+    assert client.get('/', headers={'Accept-Encoding': 'gzip'}).headers['ETag'] == etag
+    again = client.get('/', headers={'If-None-Match': etag, 'Accept-Encoding': 'br'})
+    assert again.status_code == 304 and again.data == b''
+
+    # Changing the file changes the ETag
+    with open(asset.path, 'a') as f:
+        f.write('<!-- v2 -->')
+    os.utime(asset.path, ns=(0, os.stat(asset.path).st_mtime_ns + 10 ** 9))
+    changed = client.get('/', headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+    assert changed.data.endswith(b'<!-- v2 -->')
+
+
+def test_every_encoding_is_built_when_the_file_is_read(asset, monkeypatch):
+    asset._load()
+    assert set(asset._bodies) == {None, 'gzip', 'br'}
+    assert gzip.decompress(asset.body('gzip')) == asset.body()
+    assert brotli.decompress(asset.body('br')) == asset.body()
+
+    # Serving never compresses again
+    monkeypatch.setattr(compression, 'compress', lambda *args, **kwargs: pytest.fail('compressed on request'))
+    for encoding in ('br', 'gzip', None):
+        assert asset.body(encoding)
+
+
+def test_missing_index(tmp_path):
+    assert compression.StaticAsset(str(tmp_path / 'missing.html'), 'text/html').response(None) is None
@@ -0,0 +1,70 @@
+import random
+import re
+
+import contacts
+import parsing
+
+# The per-pattern scans extract_contacts replaced
+OLD_EMAIL = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+OLD_SOCIAL = {
+    'LinkedIn': r'https?://(?:www\.)?linkedin\.com/(?:company|in)/[^\s<>"]+',
+    'Twitter': r'https?://(?:www\.)?(?:twitter|x)\.com/[^\s<>"]+',
+    'Facebook': r'https?://(?:www\.)?facebook\.com/[^\s<>"]+',
+    'Instagram': r'https?://(?:www\.)?instagram\.com/[^\s<>"]+',
+    'YouTube': r'https?://(?:www\.)?youtube\.com/[^\s<>"]+',
+    'GitHub': r'https?://(?:www\.)?github\.com/[^\s<>"]+',
+}
+
+SNIPPETS = [
+    '<p>Email sales@acme.test for a demo</p>', '<p>Support: help.desk@support.acme.test</p>',
+    '<a href="mailto:press@acme.test?subject=Hi">Press</a>', '<p>Call +1 (555) 010-2000</p>',
+    '<a href="tel:+15550103000">Call us</a>', '<a href="https://www.linkedin.com/company/acme">in</a>',
+    '<a href="https://twitter.com/acme">tw</a>', '<p>Follow https://x.com/acme_hq</p>',
+    '<a href="https://github.com/acme">gh</a>', '<a href="https://facebook.com/acmeinc">fb</a>',
+    '<p>Order 5550104000 ships today</p>', '<footer>© 2026 Acme</footer>',
+]
+
+
+def pages(count=200, seed=5):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield '<html><body>' + ''.join(rng.sample(SNIPPETS, rng.randint(0, 6))) + '</body></html>'
+
+
+def extract(html):
+    return contacts.extract_contacts(parsing.text_content(parsing.parse_fast(html)), html)
+
+
+def test_emails_and_platforms_match_the_old_scans():
+    for html in pages():
+        text = parsing.text_content(parsing.parse_fast(html))
+        found = extract(html)
+        assert set(re.findall(OLD_EMAIL, text)) <= set(found['emails']), html
+        old_platforms = {name for name, pattern in OLD_SOCIAL.items() if re.search(pattern, text + ' ' + html)}
+        assert set(found['social_links']) == old_platforms, html
+
+
+def test_mailto_and_tel_links_are_read_from_the_markup():
+    html = ('<a href="mailto:a@acme.test,%20b@acme.test?subject=x">mail</a>'
+            '<a href="mailto:not-an-address">bad</a><a href="tel:+44%2020%207946%200000">tel</a>')
+    found = extract(html)
+    assert found['emails'] == ['a@acme.test', 'b@acme.test']
+    assert found['phones'] == ['+44 20 7946 0000']
+
+
+def test_digits_inside_emails_and_profile_urls_are_not_phones():
+    found = contacts.extract_contacts('Write to jane5550102000@acme.test or see https://github.com/u5550103000')
+    assert found['phones'] == []
+    assert found['emails'] == ['jane5550102000@acme.test']
+    assert found['social_links'] == {'GitHub': 'https://github.com/u5550103000'}
+
+
+def test_first_seen_order_and_first_profile_per_platform():
+    text = 'b@acme.test a@acme.test b@acme.test https://x.com/first'
+    found = contacts.extract_contacts(text, '<a href="https://twitter.com/second">t</a>')
+    assert found['emails'] == ['b@acme.test', 'a@acme.test']
+    assert found['social_links'] == {'Twitter': 'https://x.com/first'}
+
+
+def test_find_emails():
+    assert contacts.find_emails('x a@b.io y a@b.io c@d.org') == ['a@b.io', 'c@d.org']
@@ -0,0 +1,119 @@
+import pytest
+
+import crawler
+import page_cache
+
+HTML = {'Content-Type': 'text/html'}
+
+
+@pytest.fixture
+def site(web, cache, monkeypatch):
+    """Fixture server with a fresh page cache; web.fetched lists the paths requested, in order"""
+    monkeypatch.setattr(page_cache, 'cache', page_cache.PageCache())
+    web.fetched = []
+
+    def page(body):
+        def respond(handler):
+            web.fetched.append(handler.path)
+            return 200, HTML, body
+        return respond
+
+    web.page = page
+    return web
+
+
+def links(*paths):
+    return ''.join(f'<a href="{path}">{path}</a>' for path in paths)
+
+
+def test_canonicalize():
+    base = 'https://Example.com/a/page'
+    assert crawler.canonicalize('../b//c?utm_source=x&id=2#top', base) == 'https://example.com/b/c?id=2'
+    assert crawler.canonicalize('HTTPS://EXAMPLE.COM:443/') == 'https://example.com/'
+    assert crawler.canonicalize('/files/report.pdf', base) is None
+    assert crawler.canonicalize('mailto:sales@example.com', base) is None
+    assert crawler.canonicalize('javascript:void(0)', base) is None
+
+
+def test_priority_prefers_contact_pages():
+    urls = ['https://a.test/blog/post', 'https://a.test/products', 'https://a.test/about-us',
+            'https://a.test/contact', 'https://a.test/pricing']
+    ranked = sorted(urls, key=crawler.priority, reverse=True)
+    assert ranked[:2] == ['https://a.test/contact', 'https://a.test/about-us']
+    assert crawler.priority('https://a.test/blog/post') < crawler.priority('https://a.test/pricing')
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = crawler.BloomFilter(2000)
+    items = [f'https://a.test/page/{i}' for i in range(2000)]
+    assert all(bloom.add(item) for item in items)
+    assert not any(bloom.add(item) for item in items)
+    assert all(item in bloom for item in items)
+    assert len(bloom) == 2000
+    false_positives = sum(f'https://b.test/{i}' in bloom for i in range(20000))
+    assert false_positives < 20000 * crawler.BLOOM_ERROR_RATE * 5
+
+
+def test_visited_set_switches_to_bloom_for_large_budgets():
+    small = crawler.visited_set(crawler.BLOOM_THRESHOLD)
+    large = crawler.visited_set(crawler.BLOOM_THRESHOLD + 1)
+    assert not isinstance(small, crawler.BloomFilter) and isinstance(large, crawler.BloomFilter)
+    for seen in (small, large):
+        assert seen.add('https://a.test/') and not seen.add('https://a.test/')
+
+
+def test_crawl_orders_dedups_and_stays_on_site(site):
+    site.routes['/'] = site.page(links('/blog', '/contact', '/about', '/blog#comments', '//blog',
+                                       'https://elsewhere.test/contact', '/logo.png'))
+    site.routes['/blog'] = site.page(links('/', '/contact'))
+    site.routes['/contact'] = site.page(links('/', '/about'))
+    site.routes['/about'] = site.page(links('/'))
+    result = crawler.crawl(site.base_url + '/', workers=1)
+    assert result['stopped'] == 'done'
+    assert site.fetched == ['/', '/contact', '/about', '/blog']
+    assert sorted(page['depth'] for page in result['pages']) == [0, 1, 1, 1]
+
+
+def test_crawl_respects_robots(site):
+    site.routes['/robots.txt'] = (200, {'Content-Type': 'text/plain'}, 'User-agent: *\nDisallow: /private\n')
+    site.routes['/'] = site.page(links('/private/team', '/public'))
+    site.routes['/public'] = site.page('')
+    site.routes['/private/team'] = site.page('')
+    crawler.crawl(site.base_url + '/', workers=1)
+    assert site.fetched == ['/', '/public']
+
+
+def test_crawl_budget_and_depth(site):
+    site.routes['/'] = site.page(links(*(f'/p{i}' for i in range(10))))
+    for i in range(10):
+        site.routes[f'/p{i}'] = site.page(links(f'/p{i}/deeper'))
+    result = crawler.crawl(site.base_url + '/', max_pages=4)
+    assert result['stopped'] == 'max_pages' and len(result['pages']) == 4
+    site.fetched.clear()
+    page_cache.cache.clear()
+    result = crawler.crawl(site.base_url + '/', max_depth=1)
+    assert result['stopped'] == 'done' and len(result['pages']) == 11
+    assert not any(path.endswith('/deeper') for path in site.fetched)
+
+
+def test_large_budget_crawl_visits_each_page_once(site):
+    # Every page links to every other, so only the visited set keeps the crawl finite
+    paths = ['/'] + [f'/p{i}' for i in range(30)]
+    for path in paths:
+        site.routes[path] = site.page(links(*paths))
+    result = crawler.crawl(site.base_url + '/', max_pages=crawler.BLOOM_THRESHOLD * 2)
+    assert result['stopped'] == 'done'
+    assert sorted(site.fetched) == sorted(paths)
+
+
+def test_crawl_contacts_merges_pages(site):
+    site.routes['/'] = site.page('<p>sales@acme.test</p>' + links('/contact', '/team'))
+    site.routes['/contact'] = site.page('<p>Sales@acme.test, call +1 (555) 010-2000</p>'
+                                        '<a href="https://twitter.com/acme">Twitter</a>')
+    site.routes['/team'] = site.page('<p>jane@acme.test</p>')
+    result = crawler.crawl_contacts(site.base_url + '/')
+    assert result['pages_crawled'] == 3
+    assert sorted(result['emails']) == ['jane@acme.test', 'sales@acme.test']
+    assert result['found_on']['sales@acme.test'] == [site.base_url + '/', site.base_url + '/contact']
+    assert result['phones'] == ['+1 (555) 010-2000']
+    assert result['social_links'] == {'Twitter': 'https://twitter.com/acme'}
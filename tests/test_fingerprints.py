@@ -0,0 +1,131 @@
+import threading
+
+import pytest
+from flask import Flask
+from requests.structures import CaseInsensitiveDict
+
+import fingerprints
+import page_cache
+import parsing
+import scraper_analyze
+import scraper_changes
+import scraper_core
+from page_cache import Page
+
+PAGE = '''<html><head><title>Acme</title>{extra}</head><body>
+<!-- rendered in {ms} ms --><input type="hidden" name="csrf_token" value="{token}">
+<script nonce="{token}" src="/js/jquery-1.12.4.min.js"></script>
+<p>Write to {email}</p></body></html>'''
+
+
+def page(email='sales@acme.test', extra='', ms=12, token='a1'):
+    return PAGE.format(email=email, extra=extra, ms=ms, token=token)
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    monkeypatch.setattr(page_cache, 'cache', page_cache.PageCache())
+    app = Flask(__name__)
+    app.register_blueprint(scraper_core.scraper_core_bp)
+    app.register_blueprint(scraper_analyze.scraper_analyze_bp)
+    app.register_blueprint(scraper_changes.scraper_changes_bp)
+    return app.test_client()
+
+
+@pytest.fixture
+def site(web):
+    web.serve = lambda body, headers=None: web.routes.__setitem__(
+        '/', (200, dict({'Content-Type': 'text/html'}, **(headers or {})), body))
+    web.serve(page())
+    return web
+
+
+def scan(client, site, endpoint='/api/analyze/full'):
+    page_cache.cache.clear()
+    return client.post(endpoint, json={'url': site.base_url + '/'}).get_json()
+
+
+def test_volatile_markup_does_not_change_the_fingerprint():
+    def fingerprint(body, headers=None):
+        return fingerprints.content_hash(Page('https://a.test/', 200, CaseInsensitiveDict(headers), body, len(body)))
+
+    assert fingerprint(page()) == fingerprint(page(ms=48, token='b2'))
+    assert fingerprint(page()) == fingerprint(page().replace('\n', '\n\n  '))
+    assert fingerprint(page()) != fingerprint(page(email='jane@acme.test'))
+    assert fingerprint(page(), {'Server': 'nginx'}) != fingerprint(page(), {'Server': 'Apache'})
+
+
+def test_unchanged_page_is_not_parsed_again(client, site, monkeypatch):
+    monkeypatch.setattr(fingerprints, '_lookups', {'hits': 0, 'misses': 0})
+    first = scan(client, site)
+    assert first['unchanged'] is False
+    site.serve(page(ms=99, token='zz'))
+
+    def no_parse(*args, **kwargs):
+        raise AssertionError('parsed an unchanged page')
+
+    monkeypatch.setattr(parsing, 'parse', no_parse)
+    monkeypatch.setattr(parsing, 'parse_fast', no_parse)
+    second = scan(client, site)
+    assert second['unchanged'] is True
+    assert second['contacts'] == first['contacts']
+    assert fingerprints.cache_stats() == {'hits': 1, 'misses': 1}
+
+
+def test_single_page_endpoints_reuse_stored_results(client, site, monkeypatch):
+    results = {endpoint: scan(client, site, endpoint)
+               for endpoint in ('/api/scrape/contacts', '/api/tech/detect', '/api/metadata/extract')}
+    site.serve(page(ms=99, token='zz'))
+    monkeypatch.setattr(parsing, 'parse_fast', lambda *args, **kwargs: pytest.fail('parsed an unchanged page'))
+    for endpoint, first in results.items():
+        assert scan(client, site, endpoint) == first, endpoint
+
+
+def test_changes_are_recorded_and_listed(client, site):
+    scan(client, site)
+    site.serve(page(email='jane@acme.test', extra='<link href="/wp-content/themes/acme/style.css">'))
+    scan(client, site)
+    # A rescan that finds nothing new adds no rows
+    scan(client, site)
+    found = {change['kind']: change for change in
+             client.get('/api/changes', query_string={'since': 0}).get_json()['changes']}
+    assert set(found) == {'page', 'tech', 'contacts'}
+    assert found['tech']['added'] == ['WordPress'] and found['tech']['removed'] == []
+    assert found['contacts']['added'] == ['jane@acme.test']
+    assert found['contacts']['removed'] == ['sales@acme.test']
+
+    # Without since only the latest scan's changes are listed, and that scan changed nothing
+    assert client.get('/api/changes').get_json()['changes'] == []
+    only_tech = client.get('/api/changes', query_string={'since': 0, 'kind': 'tech'}).get_json()
+    assert [change['kind'] for change in only_tech['changes']] == ['tech']
+    assert only_tech['stats']['changes'] == {'page': 1, 'tech': 1, 'contacts': 1}
+    assert client.get('/api/changes', query_string={'kind': 'weather'}).status_code == 400
+
+
+def test_changes_page_with_a_cursor(client, site):
+    for n in range(4):
+        site.serve(page(email=f'sales{n}@acme.test'))
+        scan(client, site, '/api/scrape/contacts')
+    first = client.get('/api/changes', query_string={'since': 0, 'kind': 'contacts', 'limit': 2}).get_json()
+    second = client.get('/api/changes', query_string={'since': 0, 'kind': 'contacts', 'limit': 2,
+                                                      'cursor': first['next_cursor']}).get_json()
+    assert len(first['changes']) == 2 and len(second['changes']) == 1
+    assert second['next_cursor'] is None
+    assert second['changes'][0]['added'] == ['sales1@acme.test']
+
+
+def test_lookup_counters_are_exact_under_threads(db, monkeypatch):
+    monkeypatch.setattr(fingerprints, '_lookups', {'hits': 0, 'misses': 0})
+    fingerprints.record('https://a.test/', 'v', 'hash', {'truncated': False})
+
+    def lookups():
+        for _ in range(50):
+            fingerprints.cached_analysis('https://a.test/', 'v', 'hash')
+            fingerprints.cached_analysis('https://a.test/', 'v', 'other')
+
+    threads = [threading.Thread(target=lookups) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert fingerprints.cache_stats() == {'hits': 400, 'misses': 400}
@@ -0,0 +1,122 @@
+import sqlite3
+from contextlib import contextmanager
+
+
+class Resource:
+    """Fixture route with an ETag that answers 304 to a matching If-None-Match"""
+
+    def __init__(self, body, etag, content_type='text/html', cache_control=None):
+        self.body = body
+        self.etag = etag
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.validators = []        # If-None-Match of every request received
+
+    def __call__(self, handler):
+        sent = handler.headers.get('If-None-Match')
+        self.validators.append(sent)
+        if sent == self.etag:
+            return 304, {'ETag': self.etag}, b''
+        headers = {'Content-Type': self.content_type, 'ETag': self.etag}
+        if self.cache_control:
+            headers['Cache-Control'] = self.cache_control
+        return 200, headers, self.body
+
+
+def test_fresh_entry_is_served_without_a_request(cache, web):
+    page = Resource('<p>v1</p>', '"v1"')
+    web.routes['/'] = page
+    assert cache.fetch(web.base_url + '/').text == '<p>v1</p>'
+    assert cache.fetch(web.base_url + '/').text == '<p>v1</p>'
+    assert page.validators == [None]
+    assert cache.stats()['fresh_hits'] == 1
+
+
+def test_expired_entry_is_revalidated_and_304_reuses_the_body(cache, web):
+    cache.configure(policies={'page': 0})
+    page = Resource('<p>v1</p>', '"v1"')
+    web.routes['/'] = page
+    cache.fetch(web.base_url + '/')
+    again = cache.fetch(web.base_url + '/')
+    assert page.validators == [None, '"v1"']
+    assert again.status_code == 200 and again.text == '<p>v1</p>'
+    assert cache.stats()['revalidated'] == 1
+
+
+def test_changed_resource_replaces_the_stored_body(cache, web):
+    cache.configure(policies={'page': 0})
+    page = Resource('<p>v1</p>', '"v1"')
+    web.routes['/'] = page
+    cache.fetch(web.base_url + '/')
+    page.body, page.etag = '<p>v2</p>', '"v2"'
+    assert cache.fetch(web.base_url + '/').text == '<p>v2</p>'
+    assert page.validators == [None, '"v1"']
+    assert cache.fetch(web.base_url + '/').text == '<p>v2</p>'
+    assert page.validators[-1] == '"v2"'
+
+
+def test_truncated_and_error_responses_are_not_stored(cache, web):
+    web.routes['/big'] = Resource('x' * 10000, '"big"')
+    web.routes['/down'] = (503, {}, 'down')
+    assert cache.fetch(web.base_url + '/big', max_bytes=100).truncated
+    cache.fetch(web.base_url + '/down')
+    assert cache.stats()['entries'] == 0
+
+
+def test_cache_control_decides_what_is_stored_and_for_how_long(cache, web):
+    for path, cache_control in (('/nostore', 'no-store'), ('/private', 'private, max-age=600'),
+                                ('/nocache', 'no-cache'), ('/short', 'public, max-age=0'), ('/long', 'max-age=86400')):
+        web.routes[path] = Resource(path, '"1"', cache_control=cache_control)
+        cache.fetch(web.base_url + path)
+        cache.fetch(web.base_url + path)
+    sent = {path: resource.validators for path, resource in web.routes.items()}
+    assert sent['/nostore'] == sent['/private'] == [None, None]
+    assert sent['/nocache'] == sent['/short'] == [None, '"1"']
+    assert sent['/long'] == [None]
+
+
+def test_running_size_total_follows_stores_replacements_and_evictions(cache, web):
+    def total():
+        with cache._db.connection() as conn:
+            return conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    cache.configure(policies={'page': 0})
+    page = Resource('x' * 1000, '"1"')
+    web.routes['/'] = page
+    cache.fetch(web.base_url + '/')
+    assert cache.stats()['bytes'] == total() > 1000
+    page.body, page.etag = 'y' * 10, '"2"'
+    cache.fetch(web.base_url + '/')
+    assert cache.stats()['bytes'] == total() < 1000
+
+    cache.configure(max_bytes=3000)
+    for i in range(5):
+        web.routes[f'/{i}'] = Resource('z' * 1000, f'"{i}"')
+        cache.fetch(web.base_url + f'/{i}')
+    stats = cache.stats()
+    assert stats['evictions'] > 0 and stats['bytes'] == total() <= 3000
+    cache.clear()
+    assert cache.stats()['bytes'] == 0
+
+
+def test_fresh_hit_survives_a_locked_database(cache, web, monkeypatch):
+    web.routes['/'] = Resource('<p>v1</p>', '"v1"')
+    cache.fetch(web.base_url + '/')
+    connection = cache._db.connection
+
+    class Locked:
+        def __init__(self, conn):
+            self.conn = conn
+
+        def execute(self, sql, *args):
+            if sql.startswith('UPDATE'):
+                raise sqlite3.OperationalError('database is locked')
+            return self.conn.execute(sql, *args)
+
+    @contextmanager
+    def locked():
+        with connection() as conn:
+            yield Locked(conn)
+
+    monkeypatch.setattr(cache._db, 'connection', locked)
+    assert cache.fetch(web.base_url + '/').text == '<p>v1</p>'
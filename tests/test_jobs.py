@@ -0,0 +1,135 @@
+import threading
+import time
+
+import pytest
+
+import jobs
+
+
+class Routes:
+    """Stand-in for run_route: URLs ending in /stuck block until release is set"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = []
+
+    def __call__(self, app, path, payload):
+        url = payload.get('url', '')
+        self.calls.append(url)
+        if url.endswith('/stuck'):
+            self.release.wait(10)
+        if url.endswith('/broken'):
+            raise RuntimeError('route blew up')
+        if url.endswith('/missing'):
+            return 404, {'error': 'Not found'}
+        return 200, {'url': url}
+
+
+@pytest.fixture
+def routes(monkeypatch):
+    routes = Routes()
+    monkeypatch.setattr(jobs, 'run_route', routes)
+    monkeypatch.setattr(jobs, 'POLL_INTERVAL', 0.05)
+    yield routes
+    routes.release.set()
+
+
+@pytest.fixture
+def manager(db, routes):
+    manager = jobs.JobManager(workers=2, max_abandoned=1)
+    manager.init_app(None)
+    yield manager
+    manager.shutdown()
+
+
+def wait_for(manager, job_id, status, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job['status'] == status:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f'{job_id} is {manager.get(job_id)["status"]}, expected {status}')
+
+
+def test_job_runs_to_done_with_its_result(manager):
+    job = manager.submit('growth', 'https://acme.test/')
+    assert job['status'] in (jobs.QUEUED, jobs.RUNNING) and 'result' not in job
+    done = manager.get(job['id'], wait=5)
+    assert done['status'] == jobs.DONE and done['status_code'] == 200
+    assert done['result']['url'].startswith('https://acme.test')
+    assert done['started_at'] >= done['created_at'] and done['finished_at'] >= done['started_at']
+
+
+def test_error_answers_and_exceptions_fail_the_job(manager):
+    missing = manager.submit('growth', 'https://acme.test/missing')
+    broken = manager.submit('growth', 'https://acme.test/broken')
+    missing, broken = manager.get(missing['id'], wait=5), manager.get(broken['id'], wait=5)
+    assert missing['status'] == jobs.FAILED and missing['status_code'] == 404 and missing['error'] == 'Not found'
+    assert broken['status'] == jobs.FAILED and 'route blew up' in broken['error']
+
+
+def test_unknown_analysis_is_rejected(manager):
+    with pytest.raises(ValueError):
+        manager.submit('astrology', 'https://acme.test/')
+
+
+def test_cancel_queued_job_never_runs(manager, routes):
+    blockers = [manager.submit('growth', f'https://b{i}.test/stuck', timeout=30) for i in range(2)]
+    for job in blockers:
+        wait_for(manager, job['id'], jobs.RUNNING)
+    queued = manager.submit('growth', 'https://later.test/')
+    assert manager.cancel(queued['id'])['status'] == jobs.CANCELLED
+    routes.release.set()
+    for job in blockers:
+        assert manager.get(job['id'], wait=5)['status'] == jobs.DONE
+    assert 'https://later.test/' not in routes.calls
+
+
+def test_cancel_from_another_process_stops_a_running_job(manager, routes):
+    job = manager.submit('growth', 'https://acme.test/stuck', timeout=30)
+    wait_for(manager, job['id'], jobs.RUNNING)
+    other = jobs.JobManager()       # another server process on the same database
+    assert other.cancel(job['id'])['status'] == jobs.CANCELLED
+    routes.release.set()
+    time.sleep(0.2)
+    # The route's late result is discarded
+    assert manager.get(job['id'])['status'] == jobs.CANCELLED
+    assert manager.get(job['id'])['result'] is None
+
+
+def test_long_poll_from_another_process_sees_the_result(manager):
+    job = manager.submit('growth', 'https://acme.test/')
+    assert jobs.JobManager().get(job['id'], wait=5)['status'] == jobs.DONE
+
+
+def test_timeout_counts_from_start_and_abandoned_routes_dont_time_out_queued_jobs(manager, routes):
+    # 2 workers + 1 spare thread: the third stuck job starts once the first two are abandoned
+    stuck = [manager.submit('growth', f'https://s{i}.test/stuck', timeout=1) for i in range(3)]
+    quick = manager.submit('growth', 'https://quick.test/', timeout=1)
+    for job in stuck:
+        job = manager.get(job['id'], wait=5)
+        assert job['status'] == jobs.TIMEOUT and job['elapsed'] >= 1
+    # Every route thread is held by an abandoned route: the next job waits, queued, instead of timing out
+    time.sleep(1.2)
+    assert manager.get(quick['id'])['status'] == jobs.QUEUED
+    assert manager.stats()['abandoned_routes'] == 3
+    routes.release.set()
+    assert manager.get(quick['id'], wait=5)['status'] == jobs.DONE
+    assert manager.stats()['abandoned_routes'] == 0
+
+
+def test_recover_requeues_running_jobs(db, routes):
+    manager = jobs.JobManager(workers=1)
+    manager.init_app(None)
+    job = manager.submit('growth', 'https://acme.test/stuck', timeout=30)
+    wait_for(manager, job['id'], jobs.RUNNING)
+    manager.shutdown()
+    assert manager.get(job['id'])['status'] == jobs.QUEUED
+
+    jobs._update(job['id'], status=jobs.RUNNING)    # as if the process had been killed
+    restarted = jobs.JobManager(workers=1)
+    routes.release.set()
+    restarted.init_app(None)
+    assert restarted.get(job['id'], wait=5)['status'] == jobs.DONE
+    restarted.shutdown()
@@ -0,0 +1,114 @@
+import pytest
+from flask import Flask, jsonify, request
+
+import leads
+
+
+@pytest.fixture
+def store(db, monkeypatch):
+    monkeypatch.setattr(leads, 'writer', leads.LeadWriter())
+    return leads
+
+
+@pytest.fixture
+def client(store):
+    app = Flask(__name__)
+    app.after_request(leads.record_response)
+
+    @app.route('/api/tech/detect', methods=['POST'])
+    def detect():
+        url = request.json['url']
+        if 'broken' in url:
+            return jsonify({'error': 'Tech detection failed'})
+        return jsonify({'url': url, 'technologies': {'cms': ['WordPress'], 'frameworks': ['React']}})
+
+    @app.route('/api/metadata/extract', methods=['POST'])
+    def metadata():
+        return jsonify({'url': request.json['url'],
+                        'metadata': {'title': request.json.get('title', 'Acme CRM'), 'description': 'Sales pipeline'}})
+
+    @app.route('/api/history/add', methods=['POST'])
+    def history():
+        return jsonify({'url': 'https://acme.test', 'title': 'not a lead'})
+
+    return app.test_client()
+
+
+def urls(result):
+    return [lead['url'] for lead in result['leads']]
+
+
+def test_successful_results_are_recorded_and_searchable(client, store):
+    client.post('/api/tech/detect', json={'url': 'https://acme.test'})
+    client.post('/api/metadata/extract', json={'url': 'https://acme.test'})
+    client.post('/api/tech/detect', json={'url': 'https://broken.test'})
+    client.post('/api/history/add', json={'keyword': 'x', 'category': 'y'})
+    store.writer.flush()
+    assert store.stats()['leads'] == 2
+    found = store.search(q='wordpress')
+    assert urls(found) == ['https://acme.test'] and found['leads'][0]['domain'] == 'acme.test'
+    assert '[WordPress]' in found['leads'][0]['snippet']
+    assert urls(store.search(q='title:acme')) == ['https://acme.test']
+    assert store.search(q='tech:acme')['total'] == 0
+
+
+def test_rescans_refresh_one_row_per_endpoint_and_url(client, store):
+    client.post('/api/metadata/extract', json={'url': 'https://acme.test', 'title': 'Old name'})
+    store.writer.flush()
+    client.post('/api/metadata/extract', json={'url': 'https://acme.test', 'title': 'New name'})
+    store.writer.flush()
+    assert store.stats()['leads'] == 1
+    assert store.search(q='old')['total'] == 0
+    assert store.search(q='new')['total'] == 1
+
+
+def test_fts_query_quotes_terms():
+    assert leads.fts_query('c++ "quoted" acme*') == '"c++" """quoted""" "acme"*'
+    assert leads.fts_query('OR title:acme NOT tech:php OR') == 'title : "acme" NOT tech : "php"'
+    assert leads.fts_query('unknown:field') == '"unknown:field"'
+
+
+def test_rank_and_recent_pages_cover_every_match_once(store):
+    for i in range(12):
+        store.save('/api/metadata/extract', f'https://s{i}.test',
+                   {'title': 'crm ' * (i % 3 + 1) + f'site {i}', 'description': 'software'})
+    for order in ('rank', 'recent'):
+        seen, cursor = [], None
+        while True:
+            page = store.search(q='crm', limit=5, cursor=cursor, order=order)
+            seen += urls(page)
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        assert sorted(seen) == sorted(f'https://s{i}.test' for i in range(12)), order
+        assert page['total'] == 12
+    recent = store.search(q='crm', order='recent')
+    assert urls(recent)[0] == 'https://s11.test'
+    assert urls(store.search(q='crm', order='rank'))[0] in {f'https://s{i}.test' for i in (2, 5, 8, 11)}
+
+
+def test_listing_without_q_pages_by_update_time(store):
+    for i in range(7):
+        store.save('/api/tech/detect', f'https://l{i}.test', {'technologies': ['React']})
+    first = store.search(limit=4)
+    second = store.search(limit=4, cursor=first['next_cursor'])
+    assert len(first['leads']) == 4 and len(second['leads']) == 3 and second['next_cursor'] is None
+    assert not set(urls(first)) & set(urls(second))
+
+
+def test_prune_keeps_the_newest_and_every_saved_lead(store, monkeypatch):
+    monkeypatch.setattr(leads, 'MAX_LEADS', 5)
+    saved = store.save('saved/company', 'https://keep.test', {'title': 'keeper'})
+    for i in range(8):
+        store.writer.submit('/api/tech/detect', f'https://p{i}.test', {'title': f'pruned{i}'})
+        store.writer.flush()
+    assert store.stats()['leads'] == 6
+    assert store.get(saved)['result'] == {'title': 'keeper'}
+    assert store.search(q='pruned0')['total'] == 0
+    assert store.search(q='pruned7')['total'] == 1
+
+
+def test_deleted_leads_leave_the_index(store):
+    lead_id = store.save('/api/tech/detect', 'https://gone.test', {'title': 'ephemeral'})
+    store.delete(lead_id)
+    assert store.get(lead_id) is None and store.search(q='ephemeral')['total'] == 0
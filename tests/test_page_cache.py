@@ -0,0 +1,38 @@
+import time
+
+import page_cache
+
+
+def test_capped_lookup_counts_one_miss_and_one_hit():
+    cache = page_cache.PageCache()
+    assert cache.get('https://a.test/', 'https://a.test/ [1024:None]') is None
+    assert (cache.hits, cache.misses) == (0, 1)
+    page = page_cache.Page('https://a.test/', 200, {}, 'x', 1, truncated=True)
+    cache.put('https://a.test/ [1024:None]', page)
+    assert cache.get('https://a.test/', 'https://a.test/ [1024:None]') is page
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_expired_page_is_a_miss():
+    cache = page_cache.PageCache(ttl=0)
+    cache.put('k', page_cache.Page('k', 200, {}, 'x', 1))
+    time.sleep(0.01)
+    assert cache.get('k') is None
+    assert cache.expirations == 1 and cache.misses == 1
+
+
+def test_repeated_fetches_hit_the_network_once(web, monkeypatch):
+    monkeypatch.setattr(page_cache, 'cache', page_cache.PageCache())
+    web.routes['/'] = (200, {'Content-Type': 'text/html'}, '<p>home</p>')
+    first = page_cache.fetch_page(web.base_url + '/?b=2&a=1#top')
+    second = page_cache.fetch_page(web.base_url.upper().replace('HTTP', 'http') + '/?a=1&b=2')
+    assert first is second and first.text == '<p>home</p>'
+    assert web.requests == 1
+
+
+def test_error_pages_are_not_cached(web, monkeypatch):
+    monkeypatch.setattr(page_cache, 'cache', page_cache.PageCache())
+    web.routes['/down'] = (503, {}, 'down')
+    page_cache.fetch_page(web.base_url + '/down')
+    page_cache.fetch_page(web.base_url + '/down')
+    assert web.requests == 2
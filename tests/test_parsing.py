@@ -0,0 +1,27 @@
+import pytest
+
+import parsing
+
+HTML = '''<html><head><title>Acme</title><meta name="description" content="CRM">
+<script src="/app.js"></script></head><body><p>Hello <b>world</b></p><a href="/contact">Contact</a></body></html>'''
+
+
+@pytest.fixture(params=parsing.BACKENDS)
+def backend(request, monkeypatch):
+    monkeypatch.setitem(parsing._config, 'backend', parsing._config['backend'])
+    parsing.configure(backend=request.param)
+    return request.param
+
+
+def test_accessors_agree_across_backends(backend):
+    doc = parsing.parse_fast(HTML)
+    assert parsing.title(doc) == 'Acme'
+    assert {'name': 'description', 'content': 'CRM'} in parsing.meta_tags(doc)
+    assert parsing.script_sources(doc) == ['/app.js']
+    assert parsing.links(doc) == ['/contact']
+    assert 'Hello world' in parsing.text_content(doc)
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        parsing.configure(backend='regex')
@@ -0,0 +1,190 @@
+import time
+
+import pytest
+
+import politeness
+
+TOLERANCE = 0.03
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    """Politeness with a fresh host table and the default settings restored afterwards"""
+    monkeypatch.setattr(politeness, '_config', dict(politeness._config, respect_robots=False))
+    monkeypatch.setattr(politeness, 'HOST_LIMITS', dict(politeness.HOST_LIMITS))
+    monkeypatch.setattr(politeness, 'limiter', politeness.Politeness())
+    return politeness.limiter
+
+
+def timed_slots(url, count):
+    """Seconds since the first slot at which each of count sequential slots was granted"""
+    times = []
+    for _ in range(count):
+        with politeness.slot(url):
+            times.append(time.perf_counter())
+    return [t - times[0] for t in times]
+
+
+def test_burst_then_steady_rate():
+    bucket = politeness.HostBucket('a.test', rate=10, burst=3, concurrency=2)
+    delays = [bucket.reserve() for _ in range(6)]
+    assert delays[:3] == [0.0, 0.0, 0.0]
+    assert delays[3:] == pytest.approx([0.1, 0.2, 0.3], abs=TOLERANCE)
+
+
+def test_requests_are_spaced_per_host(limiter):
+    politeness.configure(rate=20, burst=2)
+    times = timed_slots('https://a.test/page', 6)
+    for k, t in enumerate(times[2:], start=1):
+        assert t >= k / 20 - TOLERANCE
+    # Another host has its own bucket
+    assert timed_slots('https://b.test/page', 2)[-1] < 0.02
+
+
+def test_local_hosts_are_exempt(limiter):
+    politeness.configure(rate=1, burst=1)
+    assert timed_slots('http://127.0.0.1:8000/', 5)[-1] < 0.05
+    assert limiter.stats()['hosts'] == 0
+
+
+def test_subdomains_inherit_host_limits(limiter):
+    politeness.configure(host_limits={'slow.test': (0.5, 2, 1)})
+    bucket = limiter.bucket('api.slow.test')
+    assert (bucket.rate, bucket.burst, bucket.concurrency) == (0.5, 2, 1)
+
+
+def test_concurrency_cap(limiter):
+    import threading
+
+    politeness.configure(host_limits={'busy.test': (1000, 1000, 2)})
+    peak, lock = [0, 0], threading.Lock()
+
+    def hold():
+        with politeness.slot('https://busy.test/'):
+            with lock:
+                peak[0] += 1
+                peak[1] = max(peak[1], peak[0])
+            time.sleep(0.05)
+            with lock:
+                peak[0] -= 1
+
+    threads = [threading.Thread(target=hold) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[1] == 2
+
+
+def test_crawl_delay_slows_the_bucket():
+    bucket = politeness.HostBucket('a.test', rate=4, burst=8, concurrency=6)
+    bucket.slow_down(2)
+    assert (bucket.rate, bucket.burst) == (0.5, 1)
+    bucket.slow_down(10 ** 6)
+    assert bucket.crawl_delay == politeness.MAX_CRAWL_DELAY
+
+
+def test_robots_crawl_delay_is_read(web):
+    web.routes['/robots.txt'] = (200, {'Content-Type': 'text/plain'}, 'User-agent: *\nCrawl-delay: 3\n')
+    assert politeness.robots_crawl_delay(web.base_url) == 3.0
+    web.routes['/robots.txt'] = (200, {'Content-Type': 'text/plain'}, 'User-agent: *\nRequest-rate: 1/5\n')
+    assert politeness.robots_crawl_delay(web.base_url) == 5.0
+    del web.routes['/robots.txt']
+    assert politeness.robots_crawl_delay(web.base_url) is None
+
+
+def test_interleave_alternates_hosts(limiter):
+    items = [('a', i) for i in range(3)] + [('b', i) for i in range(3)]
+    order = [host for host, _ in politeness.interleave(items, lambda item: item[0])]
+    assert order == ['a', 'b', 'a', 'b', 'a', 'b']
+
+
+def test_reserve_refuses_waits_beyond_max_wait():
+    bucket = politeness.HostBucket('a.test', rate=1, burst=2, concurrency=1)
+    assert bucket.reserve(max_wait=0.5) == 0.0
+    assert bucket.reserve(max_wait=0.5) == 0.0
+    with pytest.raises(politeness.HostBusy):
+        bucket.reserve(max_wait=0.5)
+    # The refused request took no token
+    assert bucket.requests == 2 and bucket.refused == 1
+    assert bucket.reserve(max_wait=2) == pytest.approx(1.0, abs=TOLERANCE)
+
+
+def test_slot_fails_fast_on_a_busy_host(limiter):
+    politeness.configure(host_limits={'slow.test': (0.1, 1, 1)}, max_wait=0.2)
+    with politeness.slot('https://slow.test/'):
+        pass
+    start = time.perf_counter()
+    with pytest.raises(politeness.HostBusy):
+        with politeness.slot('https://slow.test/'):
+            pass
+    assert time.perf_counter() - start < 0.05
+    assert limiter.stats()['refused'] == 1
+
+
+def test_slot_gives_up_waiting_for_a_concurrency_slot(limiter):
+    politeness.configure(host_limits={'busy.test': (1000, 1000, 1)}, max_wait=0.1)
+    with politeness.slot('https://busy.test/a'):
+        with pytest.raises(politeness.HostBusy):
+            with politeness.slot('https://busy.test/b'):
+                pass
+    assert limiter.bucket('busy.test').in_flight == 0
+
+
+def test_async_slots_share_the_concurrency_cap(limiter):
+    import asyncio
+    import threading
+
+    politeness.configure(host_limits={'busy.test': (1000, 1000, 2)})
+    peak = [0, 0]
+    released = threading.Event()
+
+    async def hold():
+        async with politeness.slot_async('https://busy.test/'):
+            peak[0] += 1
+            peak[1] = max(peak[1], peak[0])
+            await asyncio.sleep(0.05)
+            peak[0] -= 1
+
+    def thread_slot():
+        # A threaded request holds one of the two slots throughout
+        with politeness.slot('https://busy.test/'):
+            released.wait(5)
+
+    thread = threading.Thread(target=thread_slot)
+    thread.start()
+    time.sleep(0.02)
+
+    async def main():
+        await asyncio.gather(*(hold() for _ in range(6)))
+
+    asyncio.run(main())
+    released.set()
+    thread.join()
+    assert peak[1] == 1
+    assert limiter.bucket('busy.test').in_flight == 0
+
+
+def test_redirect_hops_take_tokens(limiter, web):
+    politeness.configure(exempt=[], host_limits={'127.0.0.1': (1000, 1000, 6)})
+    web.routes['/old'] = (301, {'Location': '/older'}, '')
+    web.routes['/older'] = (302, {'Location': '/page'}, '')
+    web.routes['/page'] = (200, {'Content-Type': 'text/html'}, '<p>ok</p>')
+    import http_client
+
+    response = http_client.get(web.base_url + '/old')
+    assert response.status_code == 200 and len(response.history) == 2
+    assert limiter.bucket('127.0.0.1').requests == 3
+    http_client.get(web.base_url + '/old', allow_redirects=False)
+    assert limiter.bucket('127.0.0.1').requests == 4
+
+
+def test_eviction_keeps_buckets_in_use(limiter):
+    limiter.max_hosts = 2
+    with politeness.slot('https://busy.test/'):
+        for host in ('a.test', 'b.test', 'c.test'):
+            limiter.bucket(host)
+        assert 'busy.test' in limiter._buckets
+    # Buckets still refilling after use are kept too; untouched ones go first
+    assert 'busy.test' in limiter._buckets
+    assert len(limiter._buckets) <= 3
@@ -0,0 +1,59 @@
+import time
+
+import pytest
+
+import probe
+
+
+def slow(status, seconds):
+    def route(handler):
+        time.sleep(seconds)
+        return status, {}, b''
+    return route
+
+
+@pytest.fixture
+def outcomes(monkeypatch):
+    monkeypatch.setattr(probe, 'outcomes', probe.OutcomeCache())
+    return probe.outcomes
+
+
+def test_results_come_back_in_input_order_and_are_cached(web, outcomes):
+    web.routes.update({'/a': (200, {}, ''), '/b': (404, {}, '')})
+    urls = [web.base_url + path for path in ('/b', '/a', '/c')]
+    assert [r.status_code for r in probe.probe(urls)] == [404, 200, 404]
+    again = probe.probe(urls)
+    assert all(r.cached for r in again) and web.requests == 3
+
+
+def test_deadline_bounds_the_whole_call(web, outcomes):
+    web.routes.update({'/fast': (200, {}, ''), '/slow': slow(200, 2)})
+    started = time.perf_counter()
+    results = probe.probe([web.base_url + '/slow', web.base_url + '/fast'], timeout=5, deadline=0.3)
+    assert time.perf_counter() - started < 1
+    assert [r.status_code for r in results] == [None, 200]
+
+
+def test_first_match_waits_for_higher_priority_urls(web, outcomes):
+    web.routes.update({'/careers': slow(200, 0.3), '/jobs': (200, {}, ''), '/gone': (404, {}, '')})
+    urls = [web.base_url + path for path in ('/gone', '/careers', '/jobs', '/never')]
+    results = probe.probe(urls, first_match=True)
+    assert [r.status_code for r in results] == [404, 200]
+    assert probe.first_ok(urls) == web.base_url + '/careers'
+
+
+def test_first_match_returns_without_waiting_for_lower_priority_urls(web, outcomes):
+    web.routes.update({'/careers': (200, {}, ''), '/slow': slow(200, 2)})
+    started = time.perf_counter()
+    assert probe.first_ok([web.base_url + '/careers', web.base_url + '/slow']) == web.base_url + '/careers'
+    assert time.perf_counter() - started < 1
+
+
+def test_failed_probes_expire_sooner_than_answers():
+    outcomes = probe.OutcomeCache(ttl=600, error_ttl=30)
+    for status in (None, 503, 429, 404, 200):
+        outcomes.put(('HEAD', f'https://a.test/{status}', False), status)
+    expires = {status: outcomes.get(('HEAD', f'https://a.test/{status}', False))[1] - time.time()
+               for status in (None, 503, 429, 404, 200)}
+    assert all(expires[status] <= 30 for status in (None, 503, 429))
+    assert all(expires[status] > 590 for status in (404, 200))
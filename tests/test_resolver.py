@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+import resolver
+
+dns_stub = pytest.importorskip('dns_stub')      # needs dnspython
+
+
+@pytest.fixture
+def stub():
+    records = {'acme.test': ['10.0.0.1', '2001:db8::1'], 'v6only.test': ['2001:db8::2'], 'mx-only.test': []}
+    with dns_stub.StubDnsServer(records, ttl=120, negative_ttl=45) as server:
+        yield server
+
+
+def stub_resolver(stub, timeout=1):
+    return resolver.Resolver(resolver.DnsLookup(['127.0.0.1'], stub.port), timeout=timeout)
+
+
+def test_answers_are_cached_for_their_ttl(stub):
+    dns = stub_resolver(stub)
+    first = dns.resolve('https://ACME.test/path')
+    assert first.ok and first.addresses == ['10.0.0.1'] and first.ttl == 120 and not first.cached
+    again = dns.resolve('acme.test')
+    assert again.cached and again.addresses == ['10.0.0.1'] and stub.queries == 1
+
+
+def test_negative_answers_are_cached_for_the_soa_minimum(stub):
+    dns = stub_resolver(stub)
+    for host, status in (('ghost.test', resolver.NXDOMAIN), ('mx-only.test', resolver.NO_ADDRESS)):
+        result = dns.resolve(host)
+        assert result.status == status and result.missing
+        assert resolver.MIN_TTL <= result.ttl <= 45
+    queries = stub.queries
+    assert dns.resolve('ghost.test').cached and dns.resolve('mx-only.test').cached
+    assert stub.queries == queries
+    assert dns.cache.stats()['negative'] == 2
+
+
+def test_missing_hosts_and_prefetch(stub, monkeypatch):
+    monkeypatch.setattr(resolver, '_resolver', stub_resolver(stub))
+    assert resolver.missing_hosts(['https://acme.test/', 'https://ghost.test/x', 'http://127.0.0.1:1/']) == {'ghost.test'}
+    resolver.prefetch(['v6only.test', 'acme.test'])
+    time.sleep(0.2)
+    assert resolver.resolve('v6only.test').cached
+
+
+def test_concurrent_callers_share_one_lookup(stub):
+    stub.latency = 0.2
+    dns = stub_resolver(stub)
+    threads = [threading.Thread(target=dns.resolve, args=('acme.test',)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert stub.queries == 1
+
+
+def test_slow_ipv6_only_host_is_not_reported_as_an_error(stub):
+    # A (no answer) then AAAA, each close to the timeout
+    stub.latency = 1.6
+    result = stub_resolver(stub, timeout=2).resolve('v6only.test')
+    assert result.ok and result.addresses == ['2001:db8::2']
+
+
+def test_whois_reports_the_ipv4_address(monkeypatch):
+    import http_client
+    import scraper_core
+
+    monkeypatch.setattr(resolver, '_resolver', resolver.Resolver(
+        lambda host, timeout: (resolver.OK, ['2001:db8::1', '93.184.216.34'], 300)))
+    monkeypatch.setattr(http_client, 'get', lambda *args, **kwargs: (_ for _ in ()).throw(OSError('offline')))
+    app = Flask(__name__)
+    app.register_blueprint(scraper_core.scraper_core_bp)
+    body = app.test_client().post('/api/whois/lookup', json={'domain': 'https://example.test/'}).get_json()
+    assert body['ip_address'] == '93.184.216.34'
+    assert resolver.Resolution('v6.test', resolver.OK, ['2001:db8::1']).ipv4 is None
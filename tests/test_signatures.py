@@ -0,0 +1,123 @@
+import random
+import re
+
+import pytest
+
+import parsing
+import signatures
+
+# The detectors the signature engine replaced, as they were written before it
+
+OLD_TECH = {
+    'frameworks': [('React', ('react', 'react-')), ('Vue.js', ('vue', 'vue.js')),
+                   ('Angular', ('angular', 'ng-')), ('Next.js', ('next', '_next'))],
+    'cms': [('WordPress', ('wp-content', 'wordpress')), ('Shopify', ('shopify',)),
+            ('Wix', ('wix.com',)), ('Squarespace', ('squarespace',))],
+    'analytics': [('Google Analytics', ('google-analytics', 'gtag')), ('Hotjar', ('hotjar',))],
+    'libraries': [('jQuery', ('jquery',)), ('Bootstrap', ('bootstrap',)), ('Tailwind CSS', ('tailwind',))],
+}
+
+OLD_INTEGRATIONS = {
+    'Salesforce': r'salesforce', 'HubSpot': r'hubspot', 'Slack': r'slack', 'Zoom': r'zoom',
+    'Microsoft Teams': r'teams\.microsoft', 'Google Workspace': r'workspace\.google',
+    'Stripe': r'stripe', 'PayPal': r'paypal',
+}
+
+
+def old_tech(html):
+    html = html.lower()
+    return {category: [name for name, needles in rules if any(n in html for n in needles)]
+            for category, rules in OLD_TECH.items()}
+
+
+def old_integrations(html):
+    text = html.lower()
+    return [name for name, pattern in OLD_INTEGRATIONS.items() if re.search(pattern, text)]
+
+
+def old_outdated(html):
+    found = []
+    if 'jquery/1.' in html.lower() or 'jquery-1.' in html.lower():
+        found.append('jQuery 1.x (outdated)')
+    if 'bootstrap/3.' in html.lower() or 'bootstrap-3.' in html.lower():
+        found.append('Bootstrap 3 (outdated)')
+    if 'angularjs' in html.lower() or 'angular.js' in html.lower():
+        found.append('AngularJS (legacy)')
+    if '/wp-content/' in html and re.search(r'WordPress [1-4]\.', html):
+        found.append('Old WordPress version')
+    return found
+
+
+SNIPPETS = [
+    '<script src="/static/react-dom.production.min.js"></script>', '<div id="__next"></div>',
+    '<script src="https://cdn.jsdelivr.net/npm/vue@2"></script>', '<html ng-app="shop">',
+    '<link href="/wp-content/themes/x/style.css">', '<meta name="generator" content="WordPress 4.9">',
+    '<p>Powered by WordPress 4.2.1</p>', 'cdn.shopify.com/s/files', 'static.wixstatic.com wix.com',
+    '<script async src="https://www.googletagmanager.com/gtag/js?id=G-1"></script>', 'static.hotjar.com',
+    '<script src="/js/jquery-1.12.4.min.js"></script>', '<script src="/js/jquery/3.6.0/jquery.js"></script>',
+    '<link href="/css/bootstrap-3.3.7.min.css">', 'class="tailwind md:flex"', 'AngularJS app',
+    'Connect Salesforce and HubSpot', 'Join us on Slack', 'Zoom webinar', 'teams.microsoft.com/l/meetup',
+    'workspace.google.com', 'Pay with Stripe or PayPal', 'squarespace-cdn.com',
+    '<p>Nothing to see here</p>', '<h1>NEXT steps</h1>',
+]
+
+
+def pages(count=200, seed=3):
+    rng = random.Random(seed)
+    filler = '<p>' + 'lorem ipsum dolor sit amet ' * 20 + '</p>'
+    for _ in range(count):
+        parts = rng.sample(SNIPPETS, rng.randint(0, 8)) + [filler] * rng.randint(0, 3)
+        rng.shuffle(parts)
+        yield '<html><head><title>t</title></head><body>' + ''.join(parts) + '</body></html>'
+
+
+@pytest.fixture(params=['default', 'trie regex'])
+def engine(request, monkeypatch):
+    """The shipped rules, on the installed backend and on the regex fallback"""
+    if request.param == 'trie regex':
+        monkeypatch.setattr(signatures, 'ahocorasick', None)
+    return signatures.SignatureEngine.from_file(signatures.SIGNATURES_PATH)
+
+
+def test_tech_detection_matches_the_old_detector(engine):
+    for html in pages():
+        found = engine.match(html, soup=parsing.parse_fast(html))
+        for category, rules in OLD_TECH.items():
+            old_names = {name for name, _ in rules}
+            new = [name for name in found.names('tech', category) if name in old_names]
+            assert sorted(new) == sorted(old_tech(html)[category]), (category, html)
+
+
+def test_integrations_and_outdated_match_the_old_detectors(engine):
+    for html in pages():
+        found = engine.match(html)
+        assert sorted(found.names('integration')) == sorted(old_integrations(html)), html
+        assert sorted(found.names('outdated')) == sorted(old_outdated(html)), html
+
+
+def test_every_body_pattern_is_found_on_its_own(engine):
+    for rule in engine.rules:
+        for pattern in rule['body']:
+            html = f'<html><body><p>xx {pattern.upper()} yy</p></body></html>'
+            if rule.get('regex') is not None and not rule['regex'].search(html):
+                continue
+            assert rule['name'] in [r['name'] for r in engine.match(html).rules], (rule['name'], pattern)
+
+
+def test_overlapping_patterns_all_match(monkeypatch):
+    monkeypatch.setattr(signatures, 'ahocorasick', None)
+    engine = signatures.SignatureEngine([
+        {'name': 'A', 'group': 'g', 'body': ['abc']},
+        {'name': 'B', 'group': 'g', 'body': ['bcd']},
+        {'name': 'C', 'group': 'g', 'body': ['ab']},
+        {'name': 'D', 'group': 'g', 'body': ['zzz']},
+    ])
+    assert engine.match('xabcdx').names('g') == ['A', 'B', 'C']
+
+
+def test_header_and_meta_rules():
+    engine = signatures.get_engine()
+    html = '<html><head><meta name="generator" content="Drupal 10"></head><body></body></html>'
+    found = engine.match(html, headers={'CF-RAY': '123-AMS'}, soup=parsing.parse_fast(html))
+    assert 'Drupal' in found.names('tech', 'cms')
+    assert 'Cloudflare' in found.names('tech', 'hosting')
@@ -0,0 +1,116 @@
+import gzip
+import threading
+import time
+
+import pytest
+
+import sitemap
+from test_http_cache import Resource
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+XML = {'Content-Type': 'application/xml'}
+
+
+def urlset(base, prefix, count, lastmod='2026-01-01'):
+    entries = ''.join(f'<url><loc>{base}/{prefix}/{i}</loc><lastmod>{lastmod}</lastmod></url>' for i in range(count))
+    return f'<urlset {NS}>{entries}</urlset>'
+
+
+def index(base, *files):
+    return f'<sitemapindex {NS}>' + ''.join(f'<sitemap><loc>{base}{f}</loc></sitemap>' for f in files) + '</sitemapindex>'
+
+
+@pytest.fixture
+def summaries(monkeypatch):
+    monkeypatch.setattr(sitemap, 'summaries', sitemap.SummaryCache())
+    return sitemap.summaries
+
+
+def test_index_children_gzip_and_histograms(web):
+    base = web.base_url
+    web.routes.update({
+        '/sitemap.xml': (200, XML, index(base, '/blog.xml.gz', '/docs.xml')),
+        '/blog.xml.gz': (200, {'Content-Type': 'application/x-gzip'},
+                         gzip.compress(urlset(base, 'blog', 30, '2025-12-31').encode())),
+        # Content-Encoding gzip is undone by the transport
+        '/docs.xml': (200, dict(XML, **{'Content-Encoding': 'gzip'}), gzip.compress(urlset(base, 'docs', 10).encode())),
+    })
+    summary = sitemap.read_sitemaps(base + '/sitemap.xml', sample_size=5)
+    assert summary['url_count'] == 40 and not summary['truncated']
+    assert summary['sitemaps'] == [base + '/sitemap.xml', base + '/blog.xml.gz', base + '/docs.xml']
+    assert summary['path_prefixes'] == {'/blog': 30, '/docs': 10}
+    assert summary['lastmod_by_month'] == {'2025-12': 30, '2026-01': 10}
+    assert summary['sample'] == [f'{base}/blog/{i}' for i in range(5)]
+
+
+def test_url_budget_stops_the_read_early(web):
+    web.routes['/sitemap.xml'] = (200, XML, urlset(web.base_url, 'p', 100000))
+    started = time.perf_counter()
+    summary = sitemap.read_sitemaps(web.base_url + '/sitemap.xml', url_budget=1000)
+    assert summary['url_count'] == 1000 and summary['truncated']
+    assert time.perf_counter() - started < 2
+
+
+def test_sitemap_file_limit_truncates(web):
+    base = web.base_url
+    web.routes['/sitemap.xml'] = (200, XML, index(base, *[f'/{i}.xml' for i in range(5)]))
+    for i in range(5):
+        web.routes[f'/{i}.xml'] = (200, XML, urlset(base, str(i), 2))
+    summary = sitemap.read_sitemaps(base + '/sitemap.xml', max_sitemaps=3)
+    assert summary['url_count'] == 4 and summary['truncated'] and len(summary['sitemaps']) == 3
+
+
+def test_missing_and_non_sitemap_roots(web):
+    web.routes['/soft404'] = (200, {'Content-Type': 'text/html'}, '<html><body>Not here</body></html>')
+    assert sitemap.read_sitemaps(web.base_url + '/nothing.xml') is None
+    assert sitemap.read_sitemaps(web.base_url + '/soft404') is None
+    web.routes['/down.xml'] = (503, {}, 'down')
+    with pytest.raises(OSError):
+        sitemap.read_sitemaps(web.base_url + '/down.xml')
+
+
+def test_concurrent_callers_share_one_read(web, summaries):
+    def slow_sitemap(handler):
+        time.sleep(0.3)
+        return 200, XML, urlset(web.base_url, 'p', 5)
+
+    web.routes['/sitemap.xml'] = slow_sitemap
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(sitemap.summarize(web.base_url))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert web.requests == 1
+    assert len(results) == 8 and all(result == results[0] and result['url_count'] == 5 for result in results)
+    assert sitemap._site_locks == {}
+
+
+def test_sitemap_files_are_revalidated_through_the_cache(cache, web):
+    cache.configure(policies={'sitemap': 0})
+    base = web.base_url
+    files = {'/sitemap.xml': Resource(index(base, '/a.xml', '/b.xml'), '"i1"', 'application/xml'),
+             '/a.xml': Resource(urlset(base, 'blog', 5), '"a1"', 'application/xml'),
+             '/b.xml': Resource(urlset(base, 'docs', 3), '"b1"', 'application/xml')}
+    web.routes.update(files)
+
+    first = sitemap.read_sitemaps(base + '/sitemap.xml')
+    second = sitemap.read_sitemaps(base + '/sitemap.xml')
+    assert first == second
+    assert first['url_count'] == 8 and first['path_prefixes'] == {'/blog': 5, '/docs': 3}
+    for resource in files.values():
+        assert resource.validators == [None, resource.etag]
+
+
+def test_sitemap_read_errors_are_not_cached_as_missing(web, summaries):
+    web.routes['/sitemap.xml'] = (503, {}, 'down')
+    assert sitemap.summarize(web.base_url) is None
+    _, expires = summaries._entries[sitemap._site(web.base_url)]
+    assert expires - time.time() <= sitemap.ERROR_TTL
+
+    summaries.clear()
+    for path in sitemap.SITEMAP_PATHS:
+        web.routes[path] = (404, {}, 'not found')
+    assert sitemap.summarize(web.base_url) is None
+    _, expires = summaries._entries[sitemap._site(web.base_url)]
+    assert expires - time.time() > sitemap.ERROR_TTL
@@ -0,0 +1,77 @@
+import sqlite3
+
+import pytest
+
+
+def keywords(rows):
+    return [row['keyword'] for row in rows]
+
+
+def test_keyset_pages_cover_every_row_once_newest_first(db):
+    db.add_many('history', [{'keyword': f'k{i}', 'category': 'company'} for i in range(25)])
+    seen, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = db.query('history', limit=10, cursor=cursor)
+        seen += keywords(rows)
+        pages += 1
+        if cursor is None:
+            break
+    assert pages == 3
+    assert seen == [f'k{i}' for i in reversed(range(25))]
+
+
+def test_last_full_page_has_no_cursor(db):
+    db.add_many('history', [{'keyword': f'k{i}'} for i in range(10)])
+    rows, cursor = db.query('history', limit=10)
+    assert len(rows) == 10 and cursor is None
+
+
+def test_filters_apply_across_pages(db):
+    db.add_many('history', [{'keyword': f'{"acme" if i % 2 else "other"} {i}', 'category': 'c'} for i in range(30)])
+    rows, cursor = db.query('history', limit=5, q='acme')
+    more, _ = db.query('history', limit=100, q='acme', cursor=cursor)
+    assert len(rows) == 5 and len(more) == 10
+    assert all(k.startswith('acme') for k in keywords(rows + more))
+    assert not set(keywords(rows)) & set(keywords(more))
+
+
+def test_like_wildcards_in_q_are_literal(db):
+    db.add_many('history', [{'keyword': '100% growth'}, {'keyword': '100 growth'}, {'keyword': 'a_b'}, {'keyword': 'axb'}])
+    assert keywords(db.query('history', q='100%')[0]) == ['100% growth']
+    assert keywords(db.query('history', q='a_b')[0]) == ['a_b']
+
+
+def test_saved_entries_are_unique_per_keyword_and_category(db):
+    first = db.add('saved', 'acme', 'company')
+    assert db.add('saved', 'acme', 'company') == first
+    assert db.add_many('saved', [{'keyword': 'acme', 'category': 'company'}, {'keyword': 'acme', 'category': 'person'}])[0] == first
+    rows, _ = db.query('saved')
+    assert len(rows) == 2
+
+
+def test_bad_input_is_rejected(db):
+    with pytest.raises(ValueError):
+        db.add_many('history', [{'category': 'no keyword'}])
+    with pytest.raises(ValueError):
+        db.query('users')
+
+
+def test_failed_transactions_roll_back_and_return_their_connection(db):
+    pool = db._db
+    with db.connection():
+        pass
+    idle = pool._pool.qsize()
+    for _ in range(20):
+        with pytest.raises(sqlite3.IntegrityError):
+            with db.connection() as conn:
+                conn.execute("INSERT INTO history(keyword, category) VALUES ('kept', 'x')")
+                conn.execute("INSERT INTO saved(id, keyword, category) VALUES (1, 'a', ''), (1, 'b', '')")
+    assert pool._pool.qsize() == idle
+    assert db.query('history')[0] == []
+
+
+def test_connections_are_reused(db):
+    with db.connection() as conn:
+        first = conn
+    with db.connection() as conn:
+        assert conn is first